@@ -7,11 +7,19 @@ from .logistics_agent import LogisticsAgent
 from .inventory_agent import InventoryAgent
 from .carbon_accounting_agent import CarbonAccountingAgent
 from .recommendation_agent import RecommendationAgent
+from .carbon_cube import build_cube
+from .macc import MACCError, build_macc, parse_options as parse_abatement, reduction_opportunities
+from .scope_allocation import AllocationError, allocate_products
 
 # Import enhanced orchestrator
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 from orchestration import AgentOrchestrator
 from orchestration.agentcore_adapter import AgentCoreAdapter
+from orchestration.executors import build_executor
+from orchestration.retry_policy import Deadline
+from orchestration.instrumentation import METRICS, StageProfiler, span
+from orchestration.response_shaping import ResultStore
+from carbon_ledger import CarbonLedger
 
 class AgentCore:
     def __init__(self):
@@ -20,7 +28,10 @@ class AgentCore:
         self.inventory_agent = InventoryAgent()
         self.carbon_agent = CarbonAccountingAgent()
         self.recommendation_agent = RecommendationAgent()
-        self.orchestrator = AgentOrchestrator()
+        # One orchestrator shared by all requests; per-run state lives in
+        # its OrchestrationContext, so concurrent calls are isolated
+        self.orchestrator = AgentOrchestrator(self.sourcing_agent, self.logistics_agent,
+                                              self.inventory_agent, self.carbon_agent)
         self.agentcore_adapter = AgentCoreAdapter()
         if self.agentcore_adapter.enabled:
             # Register local agent functions so AgentCore can call them
@@ -30,28 +41,138 @@ class AgentCore:
                 self.inventory_agent.generate_waste_reduction_recommendations,
                 self.carbon_agent.calculate_overall_footprint
             )
+        # Runs the workflow once per request on the backend picked by
+        # AGENT_EXECUTION_BACKEND (local / agentcore / shadow)
+        self.executor = build_executor(orchestrator=self.orchestrator, adapter=self.agentcore_adapter)
+        # Aggregate cubes by cube_id, for roll-ups without re-running analysis
+        self.cube_store = ResultStore()
+        # Per-entity emission history, when CARBON_LEDGER_DIR is set
+        self.ledger = CarbonLedger.from_env()
         
-    def orchestrate_sustainability_analysis(self, supply_chain_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Enhanced orchestration with proper flow control and context passing"""
+    def orchestrate_sustainability_analysis(self, supply_chain_data: Dict[str, Any], profile: Any = None,
+                                            deadline_ms: float = None) -> Dict[str, Any]:
+        """Enhanced orchestration with proper flow control and context passing
         
-        # Use enhanced orchestrator for Phase 2 Step 2 requirements
-        # If AgentCore is enabled, delegate workflow there first
-        if getattr(self.agentcore_adapter, 'enabled', False):
-            agentcore_result = self.agentcore_adapter.run_workflow(supply_chain_data)
-        else:
-            agentcore_result = {'agentcore_used': False}
+        `profile` toggles optional captures for this request: True (stage
+        spans only), or a dict / list naming 'memory' (tracemalloc peak) and
+        'cprofile'. Stage spans are always recorded into the /metrics registry.
+        `deadline_ms` bounds retries and backoff: once it passes, agents not
+        yet started are skipped and get fallback results.
+        Carbon results carry 'rollups': one-dimensional breakdowns plus a
+        `cube_id` for further roll-ups and drill-downs (see carbon_cube()),
+        and an 'abatement_curve' of per-entity actions; an 'abatement' entry
+        in `supply_chain_data` sets its budget and cost assumptions (see
+        agents/macc.py), and 'reduction_opportunities' sums its selection.
+        With 'line_items' (and optional 'allocation' bases), supplier and
+        lane emissions are allocated to products by scope in
+        'product_allocation' (see agents/scope_allocation.py). Invalid
+        abatement or allocation options are reported as an 'error' there.
+        Stages after the agents (cube, abatement curve, allocation, ledger)
+        do not start once the deadline has passed; they are listed in
+        'orchestration_metadata.skipped_stages'.
+        """
+        profiler = StageProfiler.from_options(profile)
+        deadline = Deadline.from_ms(deadline_ms)
+        skipped_stages = []
 
-        orchestration_result = self.orchestrator.orchestrate_agents(supply_chain_data)
+        def in_time(stage):
+            # Post-analysis stages are extras: once the deadline passes, skip and say so
+            if deadline.expired():
+                skipped_stages.append(stage)
+                return False
+            return True
+
+        with profiler:
+            final_results, orchestration_result = self._run_analysis(supply_chain_data, deadline)
+            carbon = final_results.get('carbon_accounting', {})
+            if 'benchmarking' in carbon:
+                # Record once per request, after ranking, so retries and shadow runs do not count twice
+                self.carbon_agent.benchmarks.observe({
+                    'total_footprint': carbon['total_carbon_footprint_tons'],
+                    'sustainability_score': carbon['sustainability_score']
+                }, supply_chain_data.get('segment'))
+            if 'carbon_accounting' in final_results:
+                if in_time('carbon_cube'):
+                    with span('carbon_cube'):
+                        cube = build_cube(supply_chain_data, final_results)
+                        final_results['carbon_accounting']['rollups'] = {
+                            'cube_id': self.cube_store.put(cube), **cube.summary()
+                        }
+                if in_time('abatement_curve'):
+                    with span('abatement_curve'):
+                        self._add_abatement_curve(supply_chain_data, final_results)
+                if supply_chain_data.get('line_items') and in_time('scope_allocation'):
+                    with span('scope_allocation'):
+                        try:
+                            allocation = allocate_products(
+                                supply_chain_data, final_results, supply_chain_data.get('allocation')).summary()
+                        except AllocationError as e:
+                            allocation = {'error': str(e)}
+                        final_results['carbon_accounting']['product_allocation'] = allocation
+        METRICS.observe_profiler(profiler)
+        
+        # Add orchestration metadata
+        final_results['orchestration_metadata'] = {
+            'orchestration_id': orchestration_result.get('orchestration_id'),
+            'execution_time': orchestration_result.get('total_execution_time', 0),
+            'agent_execution_summary': orchestration_result.get('execution_summary', {}),
+            'context_flow': orchestration_result.get('context_flow', []),
+            'execution_backend': orchestration_result.get('backend'),
+            'agentcore_used': orchestration_result.get('agentcore_used', False),
+            'agentcore_trace': orchestration_result.get('trace') if orchestration_result.get('agentcore_used') else None,
+            'profile': profiler.report(),
+            'skipped_stages': skipped_stages
+        }
+        if 'shadow' in orchestration_result:
+            final_results['orchestration_metadata']['shadow'] = orchestration_result['shadow']
+        if 'agentcore_fallback' in orchestration_result:
+            final_results['orchestration_metadata']['agentcore_fallback'] = orchestration_result['agentcore_fallback']
+        if self.ledger is not None and in_time('ledger'):
+            # History is best-effort: a full disk must not fail the analysis
+            try:
+                with span('ledger'):
+                    entries = self.ledger.record(orchestration_result.get('orchestration_id'), final_results,
+                                                 orchestration_result.get('start_time'))
+                final_results['orchestration_metadata']['ledger'] = {'recorded': True, 'entries': entries}
+            except Exception as e:
+                METRICS.incr('ledger_errors_total')
+                final_results['orchestration_metadata']['ledger'] = {'recorded': False, 'error': str(e)}
+        
+        return final_results
+    
+    def _add_abatement_curve(self, supply_chain_data: Dict[str, Any], final_results: Dict[str, Any]):
+        carbon = final_results['carbon_accounting']
+        try:
+            options = parse_abatement(supply_chain_data.get('abatement') or True)
+            macc = build_macc(supply_chain_data, final_results, options['costs'])
+        except MACCError as e:
+            # Bad options from a caller that skipped API validation (Lambda, Bedrock tools)
+            carbon['abatement_curve'] = {'error': str(e)}
+            return
+        summary = macc.summary(options.get('budget'), options.get('max_cost_per_ton'), options['limit'])
+        carbon['abatement_curve'] = summary
+        if summary['selection']['actions']:
+            # Concrete actions replace the per-category rules of thumb
+            carbon['reduction_opportunities'] = reduction_opportunities(summary)
+    
+    def carbon_cube(self, cube_id: str):
+        """Aggregate cube of a recent analysis, or None once expired"""
+        return self.cube_store.get(cube_id)
+    
+    def _run_analysis(self, supply_chain_data: Dict[str, Any], deadline: Deadline = None):
+        orchestration_result = self.executor.run(supply_chain_data, deadline)
         
         # Extract final results and add legacy summary for compatibility
         final_results = orchestration_result.get('final_results', {})
         # Run recommendation synthesis (non-critical; fails silently)
         try:
             import asyncio
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
+            if deadline is not None and deadline.expired():
+                raise TimeoutError('Deadline exceeded, recommendations skipped')
             recommendation_payload = {'analysis_results': final_results}
-            rec_results = loop.run_until_complete(self.recommendation_agent.process(recommendation_payload))
+            with span('recommendations'):
+                # asyncio.run closes its loop, so worker threads do not leak one per request
+                rec_results = asyncio.run(self.recommendation_agent.process(recommendation_payload))
             final_results['recommendations'] = rec_results
         except Exception as e:
             final_results['recommendations'] = {
@@ -59,19 +180,10 @@ class AgentCore:
                 'error': str(e),
                 'fallback': True
             }
-        final_results['summary'] = self._generate_executive_summary(final_results)
-        
-        # Add orchestration metadata
-        final_results['orchestration_metadata'] = {
-            'orchestration_id': orchestration_result.get('orchestration_id'),
-            'execution_time': orchestration_result.get('total_execution_time', 0),
-            'agent_execution_summary': orchestration_result.get('execution_summary', {}),
-            'context_flow': orchestration_result.get('context_flow', []),
-            'agentcore_used': agentcore_result.get('agentcore_used', False),
-            'agentcore_trace': agentcore_result.get('trace') if agentcore_result.get('agentcore_used') else None
-        }
+        with span('summary'):
+            final_results['summary'] = self._generate_executive_summary(final_results)
         
-        return final_results
+        return final_results, orchestration_result
     
     def _generate_executive_summary(self, results: Dict[str, Any]) -> Dict[str, Any]:
         """Generate executive summary of all analyses"""
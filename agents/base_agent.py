@@ -2,26 +2,25 @@ from abc import ABC, abstractmethod
 from typing import Dict, Any
 import json
 import os
+import sys
 
-try:
-    import boto3  # type: ignore
-    _BOTO3_AVAILABLE = True
-except Exception:  # ImportError or other issues
-    _BOTO3_AVAILABLE = False
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from aws_config import LazyClient
+from .bedrock_gateway import get_gateway
 
 class BaseAgent(ABC):
+    # Shared pooled client, built on first invoke_bedrock call; None when
+    # boto3 is unavailable or client creation fails
+    bedrock = LazyClient('bedrock-runtime', optional=True)
+    # None means the process-wide gateway; set per instance to isolate
+    gateway = None
+
     def __init__(self, name: str):
         self.name = name
-        self.bedrock = None
         self.context = {}
-        # Lazy / safe bedrock client initialization
-        if _BOTO3_AVAILABLE and not bool(int(os.getenv('DISABLE_BEDROCK', '0'))):
-            try:
-                import boto3  # local scope
-                self.bedrock = boto3.client('bedrock-runtime', region_name='us-east-1')
-            except Exception:
-                # Graceful fallback: operate without bedrock
-                self.bedrock = None
+        if bool(int(os.getenv('DISABLE_BEDROCK', '0'))):
+            # Instance attribute shadows the shared client
+            self.bedrock = None
     
     async def execute(self, parameters: Dict[str, Any], shared_context: Dict[str, Any] = None) -> Dict[str, Any]:
         if shared_context:
@@ -43,13 +42,8 @@ class BaseAgent(ABC):
             "messages": [{"role": "user", "content": prompt}]
         })
         try:
-            response = self.bedrock.invoke_model(
-                body=body,
-                modelId=model_id,
-                accept="application/json",
-                contentType="application/json"
-            )
-            response_body = json.loads(response.get('body').read())
+            gateway = self.gateway or get_gateway()
+            response_body = await gateway.invoke(self.bedrock, body, model_id)
             return response_body.get('content', [{}])[0].get('text', '').strip() or "[Empty response]"
         except Exception as e:
             return f"[Bedrock error fallback] {e.__class__.__name__}: {e}" 
\ No newline at end of file
@@ -0,0 +1,225 @@
+"""
+Bedrock invoke_model gateway shared by all agents.
+
+Blocking boto3 calls run on a dedicated thread pool so agent coroutines never
+stall the event loop. Identical in-flight requests are coalesced (single
+flight), and an AIMD limiter adapts concurrency to throttling responses.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, Optional
+
+THROTTLING_ERROR_CODES = {
+    'ThrottlingException',
+    'TooManyRequestsException',
+    'ServiceQuotaExceededException',
+    'ServiceUnavailableException'
+}
+
+
+def is_throttling_error(error: Exception) -> bool:
+    """True for botocore ClientErrors (or look-alikes) signalling throttling"""
+    response = getattr(error, 'response', None)
+    if isinstance(response, dict):
+        code = response.get('Error', {}).get('Code')
+        if code in THROTTLING_ERROR_CODES:
+            return True
+    return 'Throttl' in type(error).__name__
+
+
+class AdaptiveLimiter:
+    """Additive-increase / multiplicative-decrease concurrency limit"""
+
+    def __init__(self, initial_limit: int = 8, min_limit: int = 1, max_limit: int = 64,
+                 decrease_factor: float = 0.5):
+        self.limit = float(initial_limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.decrease_factor = decrease_factor
+        self.in_flight = 0
+        self._cond = threading.Condition()
+
+    def acquire(self):
+        with self._cond:
+            while self.in_flight >= int(self.limit):
+                self._cond.wait()
+            self.in_flight += 1
+
+    def release(self, throttled: bool = False):
+        with self._cond:
+            self.in_flight -= 1
+            if throttled:
+                self.limit = max(self.min_limit, self.limit * self.decrease_factor)
+            else:
+                # +1 per window of `limit` successful calls
+                self.limit = min(self.max_limit, self.limit + 1.0 / self.limit)
+            self._cond.notify_all()
+
+
+class GatewayMetrics:
+    """Thread-safe counters plus a bounded latency window"""
+
+    def __init__(self, window: int = 1024):
+        self._lock = threading.Lock()
+        self._latencies_ms = deque(maxlen=window)
+        self.counters = {
+            'requests': 0,
+            'bedrock_calls': 0,
+            'coalesced': 0,
+            'errors': 0,
+            'throttled': 0,
+            'retries': 0,
+            'input_tokens': 0,
+            'output_tokens': 0
+        }
+
+    def incr(self, name: str, amount: int = 1):
+        with self._lock:
+            self.counters[name] += amount
+
+    def record_call(self, latency_ms: float, usage: Optional[Dict[str, Any]] = None):
+        with self._lock:
+            self._latencies_ms.append(latency_ms)
+            if usage:
+                self.counters['input_tokens'] += int(usage.get('input_tokens', 0))
+                self.counters['output_tokens'] += int(usage.get('output_tokens', 0))
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = dict(self.counters)
+            latencies = sorted(self._latencies_ms)
+
+        def pct(p):
+            return latencies[min(len(latencies) - 1, int(p * len(latencies)))] if latencies else 0.0
+
+        counters['latency_ms'] = {
+            'count': len(latencies),
+            'avg': sum(latencies) / len(latencies) if latencies else 0.0,
+            'p50': pct(0.50),
+            'p95': pct(0.95),
+            'max': latencies[-1] if latencies else 0.0
+        }
+        return counters
+
+
+class BedrockGateway:
+    def __init__(self, max_workers: int = 16, limiter: Optional[AdaptiveLimiter] = None,
+                 max_throttle_retries: int = 3, retry_base_delay: float = 0.2):
+        self.limiter = limiter or AdaptiveLimiter(initial_limit=min(8, max_workers), max_limit=max_workers)
+        self.metrics = GatewayMetrics()
+        self.max_throttle_retries = max_throttle_retries
+        self.retry_base_delay = retry_base_delay
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='bedrock-gateway')
+        self._inflight: Dict[tuple, Future] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, client, body: str, model_id: str) -> Future:
+        """Schedule an invoke_model call, joining an identical one in flight"""
+        key = (id(client), model_id, hashlib.sha256(body.encode('utf-8')).hexdigest())
+        self.metrics.incr('requests')
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                self.metrics.incr('coalesced')
+                return future
+            future = self._executor.submit(self._invoke_blocking, client, body, model_id)
+            self._inflight[key] = future
+        future.add_done_callback(lambda f: self._forget(key, f))
+        return future
+
+    async def invoke(self, client, body: str, model_id: str) -> Dict[str, Any]:
+        """Await a (possibly shared) invoke_model result without blocking the loop.
+
+        Each waiter gets its own asyncio future, so one cancelled caller does
+        not cancel the shared call for everyone else.
+        """
+        shared = self.submit(client, body, model_id)
+        loop = asyncio.get_running_loop()
+        waiter = loop.create_future()
+
+        def _copy_result(done: Future):
+            if waiter.cancelled():
+                return
+            if done.cancelled():
+                waiter.cancel()
+            elif done.exception() is not None:
+                waiter.set_exception(done.exception())
+            else:
+                waiter.set_result(done.result())
+
+        def _on_done(done: Future):
+            try:
+                loop.call_soon_threadsafe(_copy_result, done)
+            except RuntimeError:
+                pass  # Caller's loop already closed
+
+        shared.add_done_callback(_on_done)
+        return await waiter
+
+    def snapshot(self) -> Dict[str, Any]:
+        metrics = self.metrics.snapshot()
+        metrics['in_flight'] = self.limiter.in_flight
+        metrics['concurrency_limit'] = int(self.limiter.limit)
+        return metrics
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
+
+    def _forget(self, key: tuple, future: Future):
+        with self._lock:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    def _invoke_blocking(self, client, body: str, model_id: str) -> Dict[str, Any]:
+        attempt = 0
+        while True:
+            self.limiter.acquire()
+            throttled = False
+            start = time.perf_counter()
+            try:
+                self.metrics.incr('bedrock_calls')
+                response = client.invoke_model(
+                    body=body,
+                    modelId=model_id,
+                    accept="application/json",
+                    contentType="application/json"
+                )
+                payload = json.loads(response.get('body').read())
+                self.metrics.record_call((time.perf_counter() - start) * 1000, payload.get('usage'))
+                return payload
+            except Exception as e:
+                throttled = is_throttling_error(e)
+                self.metrics.incr('throttled' if throttled else 'errors')
+                if not throttled or attempt >= self.max_throttle_retries:
+                    raise
+            finally:
+                self.limiter.release(throttled)
+
+            # Full-jitter exponential backoff before retrying a throttled call
+            self.metrics.incr('retries')
+            time.sleep(random.uniform(0, self.retry_base_delay * (2 ** attempt)))
+            attempt += 1
+
+
+_default_gateway: Optional[BedrockGateway] = None
+_default_gateway_lock = threading.Lock()
+
+
+def get_gateway() -> BedrockGateway:
+    """Process-wide gateway, created on first use"""
+    global _default_gateway
+    if _default_gateway is None:
+        with _default_gateway_lock:
+            if _default_gateway is None:
+                _default_gateway = BedrockGateway(
+                    max_workers=int(os.getenv('BEDROCK_GATEWAY_WORKERS', '16'))
+                )
+    return _default_gateway
@@ -1,81 +1,118 @@
-import boto3
 import json
 import os
 from typing import Dict, Any, List
 from strands_client import StrandsWrapper
+from aws_config import LazyClient
+from orchestration.instrumentation import span
+from .carbon_uncertainty import simulate_footprint
+from .emission_factors import load_emission_factors
+from .peer_benchmarks import PeerBenchmarks, default_benchmarks
+from .scope_allocation import scope_breakdown
+from .units import EMISSIONS, OUTPUT_UNITS, convert
 
 class CarbonAccountingAgent:
-    def __init__(self):
-        self.bedrock_client = boto3.client('bedrock-runtime')
+    bedrock_client = LazyClient('bedrock-runtime')
+
+    def __init__(self, benchmarks: PeerBenchmarks = None):
         self.strands = StrandsWrapper(api_key=os.getenv('STRANDS_API_KEY'))
+        # Shared peer sketches unless a registry is injected (tests, sharded workers)
+        self.benchmarks = benchmarks or default_benchmarks()
         
     def calculate_overall_footprint(self, supply_chain_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Calculate overall carbon footprint across supply chain"""
+        """Calculate overall carbon footprint across supply chain
+        
+        An 'uncertainty' entry (True or options, see agents/carbon_uncertainty.py)
+        adds Monte Carlo P5/P50/P95 ranges next to the point estimate. An
+        optional 'segment' (e.g. industry) narrows the peer benchmark.
+        """
         
         # Extract data from other agents
         sourcing_data = supply_chain_data.get('sourcing', {})
         logistics_data = supply_chain_data.get('logistics', {})
         inventory_data = supply_chain_data.get('inventory', {})
         
-        footprint_breakdown = self._calculate_footprint_breakdown(
-            sourcing_data, logistics_data, inventory_data
-        )
-        
-        total_footprint = sum(footprint_breakdown.values())
+        with span('aggregation'):
+            footprint_breakdown = self._calculate_footprint_breakdown(
+                sourcing_data, logistics_data, inventory_data
+            )
+            
+            total_footprint = sum(footprint_breakdown.values())
+            sustainability_score = self._calculate_overall_sustainability_score(supply_chain_data)
         
         # Generate comprehensive Strands explanation
-        strands_explanation = self.strands.generate_explanation({
-            'total_carbon_footprint_tons': total_footprint,
-            'sustainability_score': self._calculate_overall_sustainability_score(supply_chain_data),
-            'footprint_breakdown': footprint_breakdown
-        })
-        
-        return {
+        with span('strands_calls'):
+            strands_explanation = self.strands.generate_explanation({
+                'total_carbon_footprint_tons': total_footprint,
+                'sustainability_score': sustainability_score,
+                'footprint_breakdown': footprint_breakdown
+            })
+        
+        result = {
             'agent': 'carbon_accounting',
             'total_carbon_footprint_tons': total_footprint,
             'footprint_breakdown': footprint_breakdown,
             'footprint_percentage': self._calculate_percentages(footprint_breakdown, total_footprint),
+            'scope_breakdown': scope_breakdown(footprint_breakdown),
             'reduction_opportunities': self._identify_reduction_opportunities(footprint_breakdown),
-            'sustainability_score': self._calculate_overall_sustainability_score(supply_chain_data),
-            'benchmarking': self._benchmark_performance(total_footprint),
+            'sustainability_score': sustainability_score,
+            'benchmarking': self._benchmark_performance(total_footprint, sustainability_score,
+                                                        supply_chain_data.get('segment')),
             'strands_explanation': strands_explanation,
-            'strands_powered': True
+            'strands_powered': True,
+            'emission_factors_version': load_emission_factors().version,
+            'units': OUTPUT_UNITS['carbon_accounting']
         }
+        
+        if supply_chain_data.get('uncertainty'):
+            with span('uncertainty'):
+                result['uncertainty'] = simulate_footprint(sourcing_data, logistics_data, inventory_data,
+                                                           supply_chain_data['uncertainty'])
+        return result
     
     def _calculate_footprint_breakdown(self, sourcing: Dict, logistics: Dict, inventory: Dict) -> Dict[str, float]:
-        """Calculate carbon footprint by category"""
+        """Calculate carbon footprint by category, in t CO2e
+        
+        Each agent's totals are converted from the units it reports, so an
+        output in other units is rescaled and one in incompatible units
+        raises UnitError instead of being added up as tons.
+        """
         
         # Sourcing emissions (from suppliers)
         sourcing_emissions = 0
         if 'analysis' in sourcing:
-            sourcing_emissions = sum(
+            sourcing_emissions = self._in_tonnes(sourcing, 'sourcing', 'carbon_footprint', sum(
                 supplier.get('carbon_footprint', 0) 
                 for supplier in sourcing['analysis']
-            )
+            ))
         
         # Logistics emissions (from transportation)
         logistics_emissions = 0
         if 'optimized_routes' in logistics:
-            logistics_emissions = sum(
+            logistics_emissions = self._in_tonnes(logistics, 'logistics', 'current_emissions', sum(
                 route.get('current_emissions', 0) 
                 for route in logistics['optimized_routes']
-            )
+            ))
         
         # Inventory emissions (waste-related)
+        factors = load_emission_factors()
         inventory_emissions = 0
         if 'waste_analysis' in inventory:
             inventory_emissions = sum(
-                item.get('waste_percentage', 0) * 0.1  # Convert waste % to emissions
-                for item in inventory['waste_analysis']
-            )
+                item.get('waste_percentage', 0) for item in inventory['waste_analysis']
+            ) * factors.multiplier('inventory_waste_per_percent')  # Convert waste % to emissions
         
         return {
             'sourcing': sourcing_emissions,
             'logistics': logistics_emissions,
             'inventory_waste': inventory_emissions,
-            'operations': sourcing_emissions * 0.2  # Estimate operational emissions
+            'operations': sourcing_emissions * factors.multiplier('operations_share_of_sourcing')  # Estimate operational emissions
         }
     
+    @staticmethod
+    def _in_tonnes(section: Dict, agent: str, field: str, total: float) -> float:
+        """An agent's summed field converted from its reported unit to t CO2e"""
+        return convert(total, section.get('units', {}).get(field, OUTPUT_UNITS[agent][field]), EMISSIONS)
+    
     def _calculate_percentages(self, breakdown: Dict[str, float], total: float) -> Dict[str, float]:
         """Calculate percentage breakdown of emissions"""
         if total == 0:
@@ -121,7 +158,7 @@ class CarbonAccountingAgent:
         
         # Sourcing score
         sourcing_data = supply_chain_data.get('sourcing', {})
-        if 'analysis' in sourcing_data:
+        if sourcing_data.get('analysis'):
             avg_supplier_score = sum(
                 supplier.get('sustainability_score', 0) 
                 for supplier in sourcing_data['analysis']
@@ -142,23 +179,7 @@ class CarbonAccountingAgent:
         
         return sum(scores) / len(scores) if scores else 50
     
-    def _benchmark_performance(self, total_footprint: float) -> Dict[str, str]:
-        """Benchmark performance against industry standards"""
-        if total_footprint < 100:
-            performance = 'Excellent'
-            percentile = '90th'
-        elif total_footprint < 300:
-            performance = 'Good'
-            percentile = '70th'
-        elif total_footprint < 500:
-            performance = 'Average'
-            percentile = '50th'
-        else:
-            performance = 'Needs Improvement'
-            percentile = '25th'
-        
-        return {
-            'performance_rating': performance,
-            'industry_percentile': percentile,
-            'comparison': f'Your footprint is in the {percentile} percentile of similar companies'
-        }
\ No newline at end of file
+    def _benchmark_performance(self, total_footprint: float, sustainability_score: float = 50,
+                               segment: str = None) -> Dict[str, Any]:
+        """Benchmark against previously analyzed supply chains (static thresholds until enough peers)"""
+        return self.benchmarks.benchmark(total_footprint, sustainability_score, segment)
@@ -0,0 +1,186 @@
+"""
+Aggregate cube over per-row footprint results.
+
+``build_cube`` turns one analysis into a fact table with one row per
+supplier (sourcing and operations facts), route (logistics) and inventory
+item (inventory waste), matching the CarbonAccountingAgent breakdown. Each
+fact is labelled on every dimension in ``DIMENSIONS``; a dimension that does
+not apply to a fact (e.g. transport mode for a supplier) gets ``NOT_APPLICABLE``.
+
+Labels are integer-encoded per dimension, combined with
+``np.ravel_multi_index`` and summed with ``np.bincount`` in a single pass,
+keeping only non-empty cells. ``rollup`` and ``drill_down`` then group and
+filter those cells, never the rows, and cache their answers.
+"""
+
+from datetime import datetime, timezone
+from itertools import islice
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from .emission_factors import load_emission_factors
+
+DIMENSIONS = ('category', 'supplier_location', 'product_category', 'transport_mode', 'lane', 'month')
+CATEGORIES = ('sourcing', 'logistics', 'inventory_waste', 'operations')
+NOT_APPLICABLE = 'n/a'
+UNKNOWN = 'unknown'
+# Group-bys over at most this many cells use a dense bincount
+DENSE_GROUP_LIMIT = 1 << 20
+
+
+class CubeError(ValueError):
+    """Roll-up over an unknown or repeated dimension"""
+
+
+def _month(row: Dict[str, Any], period: str) -> str:
+    value = row.get('month') or row.get('date')
+    return str(value)[:7] if value else period
+
+
+class CarbonCube:
+    """Non-empty cells of the (DIMENSIONS) cube with their emission sums"""
+
+    def __init__(self, vocabularies: Dict[str, List[str]], codes: Dict[str, np.ndarray], values: np.ndarray):
+        self.vocabularies = vocabularies
+        self.shape = tuple(len(vocabularies[d]) for d in DIMENSIONS)
+        if np.prod(self.shape, dtype=np.float64) >= 2**63:
+            raise CubeError('Too many dimension values to index the cube')
+        self.facts = len(values)
+        self._index = {d: {label: i for i, label in enumerate(vocabularies[d])} for d in DIMENSIONS}
+
+        flat = np.ravel_multi_index(tuple(codes[d] for d in DIMENSIONS), self.shape) if self.facts else np.zeros(0, np.int64)
+        cells, inverse = np.unique(flat, return_inverse=True)
+        self.coords = np.stack(np.unravel_index(cells, self.shape)) if len(cells) else np.zeros((len(DIMENSIONS), 0), np.intp)
+        self.emissions = np.bincount(inverse, weights=values, minlength=len(cells))
+        self.counts = np.bincount(inverse, minlength=len(cells))
+        self._cache: Dict[tuple, List[Dict[str, Any]]] = {}
+
+    @property
+    def cells(self) -> int:
+        return len(self.emissions)
+
+    def total(self, where: Optional[Dict[str, Any]] = None) -> float:
+        return float(self.emissions[self._mask(where)].sum())
+
+    def _mask(self, where: Optional[Dict[str, Any]]) -> np.ndarray:
+        mask = np.ones(self.cells, bool)
+        for dim, wanted in (where or {}).items():
+            if dim not in self._index:
+                raise CubeError(f"Unknown dimension '{dim}', expected one of {list(DIMENSIONS)}")
+            if isinstance(wanted, str):
+                wanted = [wanted]
+            codes = [self._index[dim][label] for label in wanted if label in self._index[dim]]
+            mask &= np.isin(self.coords[DIMENSIONS.index(dim)], codes)
+        return mask
+
+    def rollup(self, by: Sequence[str] = (), where: Optional[Dict[str, Any]] = None,
+               limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Emissions grouped by `by`, over cells matching `where` (dim -> label or labels)
+
+        Rows are sorted by emissions, largest first, with the number of facts
+        behind each and its share of the filtered total.
+        """
+        by = list(by)
+        for dim in by:
+            if dim not in self._index:
+                raise CubeError(f"Unknown dimension '{dim}', expected one of {list(DIMENSIONS)}")
+        if len(set(by)) != len(by):
+            raise CubeError('Roll-up dimensions must be distinct')
+        key = (tuple(by), tuple(sorted((d, tuple([v] if isinstance(v, str) else v)) for d, v in (where or {}).items())))
+        rows = self._cache.get(key)
+        if rows is None:
+            rows = self._cache[key] = self._group(by, self._mask(where))
+        return rows[:limit] if limit else rows
+
+    def _group(self, by: List[str], mask: np.ndarray) -> List[Dict[str, Any]]:
+        emissions, counts = self.emissions[mask], self.counts[mask]
+        total = float(emissions.sum())
+        axes = [DIMENSIONS.index(d) for d in by]
+        shape = tuple(self.shape[a] for a in axes)
+        keys = np.ravel_multi_index(tuple(self.coords[a][mask] for a in axes), shape) if by else np.zeros(len(emissions), np.intp)
+
+        if np.prod(shape, dtype=np.float64) <= DENSE_GROUP_LIMIT:
+            size = int(np.prod(shape))
+            group_counts = np.bincount(keys, weights=counts, minlength=size)
+            groups = np.flatnonzero(group_counts)
+            sums = np.bincount(keys, weights=emissions, minlength=size)[groups]
+            group_counts = group_counts[groups]
+        else:
+            groups, inverse = np.unique(keys, return_inverse=True)
+            sums = np.bincount(inverse, weights=emissions)
+            group_counts = np.bincount(inverse, weights=counts)
+
+        order = np.argsort(-sums, kind='stable')
+        labels = np.unravel_index(groups[order], shape) if by else ()
+        rows = []
+        for j, i in enumerate(order.tolist()):
+            row = {dim: self.vocabularies[dim][int(labels[k][j])] for k, dim in enumerate(by)}
+            row.update({
+                'emissions': float(sums[i]),
+                'rows': int(group_counts[i]),
+                'share_percent': round(float(sums[i]) / total * 100, 2) if total else 0.0
+            })
+            rows.append(row)
+        return rows
+
+    def drill_down(self, path: Dict[str, Any], into: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Break the cell at `path` (e.g. {'category': 'logistics'}) down by `into`"""
+        return self.rollup([into], where=path, limit=limit)
+
+    def summary(self, top: int = 10) -> Dict[str, Any]:
+        """One-dimensional roll-ups for every dimension (top `top` values each)"""
+        return {
+            'facts': self.facts,
+            'cells': self.cells,
+            'total': self.total(),
+            'by_dimension': {dim: self.rollup([dim], limit=top) for dim in DIMENSIONS}
+        }
+
+
+def build_cube(supply_chain_data: Dict[str, Any], results: Dict[str, Any], period: str = None) -> CarbonCube:
+    """Cube over one analysis: input rows plus the agents' per-row results
+
+    Agent rows line up with input rows by position. Facts without a 'month'
+    or 'date' field fall into `period` (default: the current UTC month).
+    """
+    period = period or datetime.now(timezone.utc).strftime('%Y-%m')
+    factors = load_emission_factors()
+    supplier_rows = results.get('sourcing', {}).get('analysis') or []
+    route_rows = results.get('logistics', {}).get('optimized_routes') or []
+    waste_rows = results.get('inventory', {}).get('waste_analysis') or []
+    # An agent that fell back returns no rows; its entity contributes no facts
+    suppliers = list(islice(supply_chain_data.get('suppliers') or [], len(supplier_rows)))
+    routes = list(islice(supply_chain_data.get('routes') or [], len(route_rows)))
+    inventory = list(islice(supply_chain_data.get('inventory') or [], len(waste_rows)))
+
+    carbon = np.array([row.get('carbon_footprint', 0) for row in supplier_rows[:len(suppliers)]], float)
+    values = np.concatenate([
+        carbon,
+        carbon * factors.multiplier('operations_share_of_sourcing'),
+        np.array([row.get('current_emissions', 0) for row in route_rows[:len(routes)]], float),
+        np.array([row.get('waste_percentage', 0) for row in waste_rows[:len(inventory)]], float)
+        * factors.multiplier('inventory_waste_per_percent')
+    ])
+    n_s, n_r, n_i = len(carbon), len(routes), len(inventory)
+    na_s, na_r, na_i = [NOT_APPLICABLE] * n_s, [NOT_APPLICABLE] * n_r, [NOT_APPLICABLE] * n_i
+
+    supplier_months = [_month(row, period) for row in suppliers]
+    labels = {
+        'category': ['sourcing'] * n_s + ['operations'] * n_s + ['logistics'] * n_r + ['inventory_waste'] * n_i,
+        'supplier_location': [row.get('location') or UNKNOWN for row in suppliers] * 2 + na_r + na_i,
+        'product_category': na_s * 2 + na_r + [row.get('category') or UNKNOWN for row in inventory],
+        'transport_mode': na_s * 2 + [row.get('transport_mode') or 'truck' for row in routes] + na_i,
+        'lane': na_s * 2 + [f"{row.get('origin') or UNKNOWN} -> {row.get('destination') or UNKNOWN}"
+                            for row in routes] + na_i,
+        'month': supplier_months * 2 + [_month(row, period) for row in routes]
+                 + [_month(row, period) for row in inventory]
+    }
+    vocabularies, codes = {}, {}
+    for dim in DIMENSIONS:
+        seed: Iterable[str] = CATEGORIES if dim == 'category' else (NOT_APPLICABLE,)
+        index = {label: i for i, label in enumerate(seed)}
+        codes[dim] = np.fromiter((index.setdefault(label, len(index)) for label in labels[dim]),
+                                 np.intp, len(labels[dim]))
+        vocabularies[dim] = list(index)
+    return CarbonCube(vocabularies, codes, values)
@@ -0,0 +1,206 @@
+"""
+Carbon-adjusted costs under one or more carbon price curves.
+
+A price spec is a number (one flat price per ton CO2e), a curve, or a list
+of curves (one price scenario each):
+
+- ``{'name': 'flat', 'price': 85}``
+- ``{'name': 'ramp', 'by_year': {'2025': 80, '2030': 140}}``: linear between
+  years, flat outside them; years run from ``MIN_YEAR`` to ``MAX_YEAR``
+- ``{'name': 'ets', 'by_region': {'Germany': 90, 'EU': {'2025': 80, '2030': 140}},
+  'price': 40}``: regional prices (numbers or ``by_year`` tables); ``price``
+  covers every other region (default 0)
+
+Curves compile into one (scenarios, regions + 1, years) price tensor. For a
+batch of entities with cost, emissions, region and year columns, the
+adjusted cost of every entity under every scenario is a single broadcast,
+``cost + emissions * prices[:, region, year]``. ``totals`` does the same in
+entity chunks (optionally in float32) and keeps only per-scenario totals and
+the cheapest entity, so millions of entities times dozens of prices never
+materialize at once.
+"""
+
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+MAX_SCENARIOS = 1000
+# by_year tables must fall in this range; it bounds the compiled year axis
+MIN_YEAR, MAX_YEAR = 1900, 2200
+DEFAULT_CHUNK = 1 << 16
+
+
+class PricingError(ValueError):
+    """Carbon price curve with a negative, non-numeric or undated price"""
+
+
+def _price(value: Any, where: str) -> float:
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not np.isfinite(value) or value < 0:
+        raise PricingError(f"{where} must be a non-negative number")
+    return float(value)
+
+
+def _table(value: Any, where: str) -> Dict[int, float]:
+    """{year: price} from a number (no year dependence) or a by_year table"""
+    if not isinstance(value, dict):
+        return {0: _price(value, where)}
+    if not value:
+        raise PricingError(f"{where} needs at least one year")
+    table = {}
+    for year, price in value.items():
+        try:
+            key = int(year)
+        except (TypeError, ValueError) as e:
+            raise PricingError(f"{where} has invalid year '{year}'") from e
+        if not MIN_YEAR <= key <= MAX_YEAR:
+            raise PricingError(f"{where} years must be between {MIN_YEAR} and {MAX_YEAR}, got '{year}'")
+        table[key] = _price(price, f"{where}[{year}]")
+    return table
+
+
+def parse_curves(spec: Any) -> List[Dict[str, Any]]:
+    """Normalized curves: name, default {year: price}, {region: {year: price}}"""
+    if isinstance(spec, (int, float)) and not isinstance(spec, bool):
+        spec = [{'name': 'carbon_price', 'price': spec}]
+    elif isinstance(spec, dict):
+        spec = [spec]
+    if not isinstance(spec, list) or not spec:
+        raise PricingError("carbon_price must be a number, a curve or a list of curves")
+    if len(spec) > MAX_SCENARIOS:
+        raise PricingError(f"At most {MAX_SCENARIOS} carbon price curves")
+    curves = []
+    for i, curve in enumerate(spec):
+        if isinstance(curve, (int, float)) and not isinstance(curve, bool):
+            curve = {'price': curve}
+        if not isinstance(curve, dict):
+            raise PricingError(f"Carbon price curve {i} must be a number or an object")
+        name = str(curve.get('name') or f'price_{i}')
+        default = _table(curve['by_year'], f'{name}.by_year') if 'by_year' in curve \
+            else _table(curve.get('price', 0), f'{name}.price')
+        regions = curve.get('by_region') or {}
+        if not isinstance(regions, dict):
+            raise PricingError(f"{name}.by_region must be an object")
+        curves.append({
+            'name': name,
+            'default': default,
+            'regions': {str(r): _table(v, f'{name}.by_region.{r}') for r, v in regions.items()}
+        })
+    return curves
+
+
+class CarbonPricing:
+    """Compiled price scenarios over (region, year)"""
+
+    def __init__(self, spec: Any, year: Optional[int] = None):
+        curves = parse_curves(spec)
+        self.names = [c['name'] for c in curves]
+        self.regions = sorted({r for c in curves for r in c['regions']})
+        self._region_index = {r: i for i, r in enumerate(self.regions)}
+        tables = [t for c in curves for t in [c['default'], *c['regions'].values()]]
+        years = sorted({y for t in tables for y in t if y})
+        self.default_year = year or datetime.now(timezone.utc).year
+        self.years = np.arange(years[0], years[-1] + 1) if years else np.array([self.default_year])
+
+        # (scenario, region, year); the last region slot is "any other region"
+        self.prices = np.empty((len(curves), len(self.regions) + 1, len(self.years)))
+        for s, curve in enumerate(curves):
+            for r, region in enumerate(self.regions + [None]):
+                table = curve['regions'].get(region, curve['default']) if region else curve['default']
+                if 0 in table:
+                    self.prices[s, r] = table[0]
+                else:
+                    known = sorted(table)
+                    self.prices[s, r] = np.interp(self.years, known, [table[y] for y in known])
+        self._flat = self.prices.shape[1:] == (1, 1) or bool(np.all(self.prices == self.prices[:, :1, :1]))
+
+    @classmethod
+    def from_spec(cls, spec: Any) -> Optional['CarbonPricing']:
+        return None if spec is None or spec is False else cls(spec)
+
+    @property
+    def scenarios(self) -> int:
+        return len(self.names)
+
+    def region_codes(self, regions: Optional[Iterable[Optional[str]]], n: int) -> np.ndarray:
+        other = len(self.regions)
+        if regions is None or not self.regions:
+            return np.full(n, other, np.intp)
+        if isinstance(regions, np.ndarray) and regions.dtype.kind in 'iu':
+            return regions  # already codes from region_codes()
+        return np.fromiter((self._region_index.get(r, other) for r in regions), np.intp, n)
+
+    def year_codes(self, years: Optional[Iterable[Any]], n: int) -> np.ndarray:
+        if years is None or len(self.years) == 1:
+            year = np.full(n, self.default_year, np.int64)
+        elif isinstance(years, np.ndarray) and years.dtype.kind in 'iu':
+            year = years
+        elif isinstance(years, np.ndarray) and years.dtype.kind == 'f':
+            year = np.where(np.isfinite(years), years, self.default_year).astype(np.int64)
+        else:
+            year = np.fromiter((self._year(y) for y in years), np.int64, n)
+        return np.clip(year, self.years[0], self.years[-1]) - self.years[0]
+
+    def _year(self, value: Any) -> int:
+        """Year of an int, float or ISO date string; default_year when missing or unreadable"""
+        try:
+            return int(str(value)[:4]) if not isinstance(value, float) else int(value)
+        except (TypeError, ValueError, OverflowError):
+            return self.default_year
+
+    def entity_prices(self, region_codes: np.ndarray, year_codes: np.ndarray, dtype=np.float64) -> np.ndarray:
+        """(scenarios, entities) price per ton; flat curves broadcast without a gather"""
+        prices = self.prices.astype(dtype, copy=False)
+        if self._flat:
+            return prices[:, 0, 0, None]
+        return prices[:, region_codes, year_codes]
+
+    def _adjust(self, cost: np.ndarray, emissions: np.ndarray, region_codes: np.ndarray,
+                year_codes: np.ndarray, dtype) -> np.ndarray:
+        prices = self.entity_prices(region_codes, year_codes, dtype)
+        if self._flat:
+            return cost[None, :] + emissions[None, :] * prices
+        # The gathered prices are a fresh (scenarios, entities) array: update it in place
+        prices *= emissions[None, :]
+        prices += cost[None, :]
+        return prices
+
+    def adjusted_costs(self, cost: np.ndarray, emissions: np.ndarray, regions: Sequence = None,
+                       years: Sequence = None, dtype=np.float64) -> np.ndarray:
+        """(scenarios, entities) cost + emissions x carbon price"""
+        n = len(cost)
+        return self._adjust(np.asarray(cost, dtype), np.asarray(emissions, dtype),
+                            self.region_codes(regions, n), self.year_codes(years, n), dtype)
+
+    def totals(self, cost: np.ndarray, emissions: np.ndarray, region_codes: np.ndarray = None,
+               year_codes: np.ndarray = None, chunk: int = DEFAULT_CHUNK, dtype=np.float64) -> Dict[str, np.ndarray]:
+        """Per-scenario total adjusted cost and cheapest entity, in entity chunks"""
+        n = len(cost)
+        region_codes = self.region_codes(None, n) if region_codes is None else region_codes
+        year_codes = self.year_codes(None, n) if year_codes is None else year_codes
+        cost, emissions = np.asarray(cost, dtype), np.asarray(emissions, dtype)
+        total = np.zeros(self.scenarios)
+        best_cost = np.full(self.scenarios, np.inf)
+        best = np.full(self.scenarios, -1, np.int64)
+        for start in range(0, n, chunk):
+            stop = min(start + chunk, n)
+            adjusted = self._adjust(cost[start:stop], emissions[start:stop],
+                                    region_codes[start:stop], year_codes[start:stop], dtype)
+            total += adjusted.sum(axis=1, dtype=np.float64)
+            i = adjusted.argmin(axis=1)
+            low = adjusted[np.arange(self.scenarios), i]
+            better = low < best_cost
+            best_cost[better], best[better] = low[better], i[better] + start
+        return {'total': total, 'best': best, 'best_cost': best_cost}
+
+    def summary(self, cost: np.ndarray, adjusted: np.ndarray, ids: Sequence) -> Dict[str, Any]:
+        """Per-scenario totals and cheapest entity of an adjusted_costs() matrix"""
+        base = float(np.sum(cost))
+        totals = adjusted.sum(axis=1)
+        best = adjusted.argmin(axis=1) if adjusted.shape[1] else [None] * self.scenarios
+        return {'scenarios': [{
+            'name': name,
+            'total_adjusted_cost': float(totals[s]),
+            'total_carbon_cost': float(totals[s]) - base,
+            'best': ids[best[s]] if best[s] is not None else None
+        } for s, name in enumerate(self.names)]}
@@ -0,0 +1,219 @@
+"""
+Monte Carlo uncertainty for the carbon footprint breakdown.
+
+Each uncertain input is a multiplicative factor drawn from a configurable
+distribution (mean 1 unless configured otherwise):
+
+- ``emission_factor``: scales every lane's emissions. ``shared`` by default,
+  i.e. one draw per sample for all lanes, since the lanes share one factor
+  table and its error is systematic rather than independent per row.
+- ``distance``: per-lane distance error.
+- ``waste_rate``: per-item waste percentage (clipped to the InventoryAgent
+  cap, ``MAX_WASTE_PERCENT``).
+- ``supplier_footprint``: per-supplier reported footprint.
+
+Supported distributions: ``normal`` (``cv``, truncated at 0), ``lognormal``
+(``sigma``), ``uniform`` (``low``/``high``), ``triangular``
+(``low``/``mode``/``high``) and ``fixed``.
+
+Samples are evaluated as (samples x rows) matrices in chunks sized to
+``chunk_bytes`` so memory stays bounded, and only per-sample category totals
+are kept. Every chunk draws from its own ``SeedSequence`` child, and the
+chunk layout depends only on the sample count and row count, so results for
+a given seed are identical for any worker count. Large runs are spread over
+worker processes.
+"""
+
+import copy
+import multiprocessing
+import os
+import secrets
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from .emission_factors import load_emission_factors
+from .inventory_agent import MAX_WASTE_PERCENT
+
+CATEGORIES = ('sourcing', 'logistics', 'inventory_waste', 'operations')
+PERCENTILES = (5, 50, 95)
+
+DEFAULT_DISTRIBUTIONS = {
+    'emission_factor': {'distribution': 'lognormal', 'sigma': 0.15, 'shared': True},
+    'distance': {'distribution': 'normal', 'cv': 0.05},
+    'waste_rate': {'distribution': 'triangular', 'low': 0.5, 'mode': 1.0, 'high': 1.5},
+    'supplier_footprint': {'distribution': 'normal', 'cv': 0.1}
+}
+DISTRIBUTION_PARAMS = {
+    'normal': ('cv',),
+    'lognormal': ('sigma',),
+    'uniform': ('low', 'high'),
+    'triangular': ('low', 'mode', 'high'),
+    'fixed': ()
+}
+
+DEFAULT_SAMPLES = 10000
+MAX_SAMPLES = 1_000_000
+MAX_SEED = 1 << 63
+CHUNK_BYTES = 32 * 2**20
+MAX_CHUNK_SAMPLES = 10000
+# Below this many sampled cells a process pool costs more than it saves
+PARALLEL_MIN_CELLS = 20_000_000
+
+
+class UncertaintyError(ValueError):
+    """Bad sample count, seed, percentiles or spread override"""
+
+
+def parse_options(options: Any) -> Dict[str, Any]:
+    """Validated options from True or a dict of samples/seed/workers/distributions"""
+    if options is True:
+        options = {}
+    if not isinstance(options, dict):
+        raise UncertaintyError("uncertainty must be true or an object")
+
+    samples = options.get('samples', DEFAULT_SAMPLES)
+    if not isinstance(samples, int) or isinstance(samples, bool) or not 1 <= samples <= MAX_SAMPLES:
+        raise UncertaintyError(f"uncertainty.samples must be an integer between 1 and {MAX_SAMPLES}")
+    seed = options.get('seed')
+    if seed is not None and (not isinstance(seed, int) or isinstance(seed, bool) or not 0 <= seed < MAX_SEED):
+        raise UncertaintyError("uncertainty.seed must be a non-negative 63-bit integer")
+    workers = options.get('workers')
+    if workers is not None and (not isinstance(workers, int) or workers < 1):
+        raise UncertaintyError("uncertainty.workers must be a positive integer")
+
+    distributions = copy.deepcopy(DEFAULT_DISTRIBUTIONS)
+    for name, spec in (options.get('distributions') or {}).items():
+        if name not in distributions:
+            raise UncertaintyError(f"Unknown uncertain input '{name}', expected one of {list(distributions)}")
+        if not isinstance(spec, dict):
+            raise UncertaintyError(f"Distribution for '{name}' must be an object")
+        kind = spec.get('distribution', distributions[name]['distribution'])
+        if kind not in DISTRIBUTION_PARAMS:
+            raise UncertaintyError(f"Unknown distribution '{kind}', expected one of {list(DISTRIBUTION_PARAMS)}")
+        # Changing the distribution type drops the default's parameters
+        merged = dict(spec) if kind != distributions[name]['distribution'] else {**distributions[name], **spec}
+        merged['distribution'] = kind
+        for param in DISTRIBUTION_PARAMS[kind]:
+            value = merged.get(param)
+            if not isinstance(value, (int, float)) or isinstance(value, bool) or value < 0:
+                raise UncertaintyError(f"'{name}' {kind} distribution needs a non-negative '{param}'")
+        if kind in ('uniform', 'triangular') and not merged['low'] <= merged.get('mode', merged['low']) <= merged['high']:
+            raise UncertaintyError(f"'{name}' needs low <= mode <= high")
+        distributions[name] = merged
+    return {'samples': samples, 'seed': seed, 'workers': workers, 'distributions': distributions}
+
+
+def _draw(rng: np.random.Generator, spec: Dict[str, Any], shape: tuple) -> np.ndarray:
+    if spec.get('shared'):
+        shape = (shape[0], 1)
+    kind = spec['distribution']
+    if kind == 'normal':
+        return np.maximum(rng.normal(1.0, spec['cv'], shape), 0)
+    if kind == 'lognormal':
+        # mu = -sigma^2/2 keeps the mean at 1
+        return rng.lognormal(-spec['sigma'] ** 2 / 2, spec['sigma'], shape)
+    if kind == 'uniform':
+        return rng.uniform(spec['low'], spec['high'], shape)
+    if kind == 'triangular':
+        if spec['low'] == spec['high']:
+            return np.full(shape, float(spec['low']))
+        return rng.triangular(spec['low'], spec['mode'], spec['high'], shape)
+    return np.ones(shape)
+
+
+def _chunk_totals(model: Dict[str, Any], size: int, seed: np.random.SeedSequence) -> np.ndarray:
+    """(len(CATEGORIES), size) category totals for one chunk of samples"""
+    rng = np.random.default_rng(seed)
+    dists = model['distributions']
+    carbon, emissions, waste = model['supplier_carbon'], model['route_emissions'], model['waste_percent']
+
+    # Matrix-vector products keep the (size x rows) draws in BLAS
+    sourcing = _draw(rng, dists['supplier_footprint'], (size, len(carbon))) @ carbon
+    factor = _draw(rng, dists['emission_factor'], (size, len(emissions)))
+    distance = _draw(rng, dists['distance'], (size, len(emissions)))
+    if factor.shape[1] == 1:
+        logistics = factor[:, 0] * (distance @ emissions)
+    else:
+        logistics = (factor * distance) @ emissions
+    wasted = _draw(rng, dists['waste_rate'], (size, len(waste)))
+    wasted *= waste
+    np.clip(wasted, 0, MAX_WASTE_PERCENT, out=wasted)
+    inventory = wasted.sum(axis=1) * model['waste_multiplier']
+    return np.stack([sourcing, logistics, inventory, sourcing * model['operations_share']])
+
+
+_worker_model: Optional[Dict[str, Any]] = None
+
+
+def _init_worker(model: Dict[str, Any]):
+    global _worker_model
+    _worker_model = model
+
+
+def _worker_chunk(task: tuple) -> np.ndarray:
+    return _chunk_totals(_worker_model, *task)
+
+
+def _summarize(values: np.ndarray) -> Dict[str, float]:
+    p5, p50, p95 = np.percentile(values, PERCENTILES)
+    return {'p5': float(p5), 'p50': float(p50), 'p95': float(p95), 'mean': float(values.mean())}
+
+
+def simulate_footprint(sourcing: Dict[str, Any], logistics: Dict[str, Any], inventory: Dict[str, Any],
+                       options: Any = True, chunk_bytes: int = CHUNK_BYTES) -> Dict[str, Any]:
+    """P5/P50/P95 per footprint category (and total) over sampled inputs.
+
+    Inputs are the agent results CarbonAccountingAgent aggregates; with every
+    distribution ``fixed`` each sample equals its point estimate.
+    """
+    opts = parse_options(options)
+    factors = load_emission_factors()
+    model = {
+        'supplier_carbon': np.array([s.get('carbon_footprint', 0) for s in sourcing.get('analysis') or []], float),
+        'route_emissions': np.array([r.get('current_emissions', 0) for r in logistics.get('optimized_routes') or []], float),
+        'waste_percent': np.array([i.get('waste_percentage', 0) for i in inventory.get('waste_analysis') or []], float),
+        'waste_multiplier': factors.multiplier('inventory_waste_per_percent'),
+        'operations_share': factors.multiplier('operations_share_of_sourcing'),
+        'distributions': opts['distributions']
+    }
+
+    samples = opts['samples']
+    rows = max(len(model['supplier_carbon']), len(model['route_emissions']), len(model['waste_percent']), 1)
+    chunk = int(min(MAX_CHUNK_SAMPLES, max(1, chunk_bytes // (8 * rows))))
+    sizes = [min(chunk, samples - start) for start in range(0, samples, chunk)]
+    # Reported seeds must fit a signed 64-bit JSON integer
+    seed = opts['seed'] if opts['seed'] is not None else secrets.randbits(63)
+    seed_seq = np.random.SeedSequence(seed)
+    tasks = list(zip(sizes, seed_seq.spawn(len(sizes))))
+
+    workers = opts['workers'] or int(os.getenv('CARBON_MC_WORKERS', 0)) or os.cpu_count() or 1
+    if samples * rows < PARALLEL_MIN_CELLS or len(tasks) == 1:
+        workers = 1
+    workers = min(workers, len(tasks))
+    parts = None
+    if workers > 1:
+        try:
+            # Spawn, not fork: the API serves requests from threads
+            with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'),
+                                     initializer=_init_worker, initargs=(model,)) as pool:
+                parts = list(pool.map(_worker_chunk, tasks))
+        except (OSError, BrokenProcessPool):
+            # No process support (e.g. AWS Lambda lacks /dev/shm): run in-process
+            workers = 1
+    if parts is None:
+        parts = [_chunk_totals(model, size, seed) for size, seed in tasks]
+    totals = np.concatenate(parts, axis=1)
+
+    return {
+        'samples': samples,
+        'seed': seed,
+        'percentiles': list(PERCENTILES),
+        'categories': {name: _summarize(totals[i]) for i, name in enumerate(CATEGORIES)},
+        'total': _summarize(totals.sum(axis=0)),
+        'distributions': opts['distributions'],
+        'chunks': len(tasks),
+        'workers': workers
+    }
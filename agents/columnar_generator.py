@@ -0,0 +1,427 @@
+"""
+Seeded, vectorized synthetic data generation with NumPy.
+
+Produces the same entities as DataGeneratorAgent (suppliers, routes,
+products) as columnar dicts of arrays. Categorical fields are integer codes
+into the vocabularies in `VOCABULARIES`, and certifications are a bitmask.
+
+With profile='realistic', routes run between real cities (see
+agents/geography.py) with distinct endpoints, great-circle distances and a
+transport mode chosen by distance class; lanes between landmasses (no road
+or rail link) are always shipped or flown. Supplier and product attributes are
+drawn from correlated distributions rather than independent uniforms.
+
+Reproducibility does not depend on how the work is split up. Rows are
+generated in fixed blocks of `BLOCK_ROWS`, and each (entity, block, column)
+draws from its own `SeedSequence` stream. Any chunking, sharding or worker
+count therefore yields identical data for a given seed. IDs are a bijective
+64-bit hash of (seed, entity, row index), so they are unique per entity and
+stable across runs.
+"""
+
+import json
+import os
+import uuid
+import zlib
+from collections.abc import Mapping, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional
+
+import numpy as np
+
+from .data_generator import (CERTIFICATIONS, EMISSIONS_PER_MILE, PRODUCT_CATEGORIES, ROUTE_CITIES,
+                             SUPPLIER_LOCATIONS, TRANSPORT_COST_PER_KM, TRANSPORT_MODES)
+from .emission_factors import KM_PER_MILE, load_emission_factors
+from .geography import CITY_NAMES, CITY_REGIONS, GRID_CARBON_INTENSITY, city_distance_matrix, overland_matrix
+
+BLOCK_ROWS = 65536
+
+ENTITY_KEYS = {'suppliers': 1, 'routes': 2, 'products': 3}
+
+VOCABULARIES = {
+    'location': SUPPLIER_LOCATIONS,
+    'origin': ROUTE_CITIES,
+    'destination': ROUTE_CITIES,
+    'mode': TRANSPORT_MODES,
+    'category': PRODUCT_CATEGORIES,
+    'certifications': CERTIFICATIONS
+}
+
+PROFILES = ('uniform', 'realistic')
+
+_FACTORS = load_emission_factors()
+# Generator mode codes -> emission factor table codes
+_MODE_FACTOR_CODES = _FACTORS.mode_codes(TRANSPORT_MODES)
+_MODE_EMISSIONS_PER_MILE = np.array([EMISSIONS_PER_MILE[m] for m in TRANSPORT_MODES])
+
+# Realistic profile parameters. Mode columns follow TRANSPORT_MODES order
+# (truck, rail, ship, air); rows are distance classes.
+_CITY_KM = city_distance_matrix()
+_CITY_OVERLAND = overland_matrix()
+_CITY_FACTOR_REGIONS = _FACTORS.region_codes(CITY_REGIONS)
+_DISTANCE_CLASS_KM = np.array([800.0, 2500.0])
+_MODE_PROBABILITIES = np.array([
+    [0.85, 0.15, 0.00, 0.00],   # short haul, same landmass
+    [0.50, 0.35, 0.00, 0.15],   # medium haul
+    [0.25, 0.45, 0.15, 0.15],   # long haul overland
+    [0.00, 0.00, 0.80, 0.20],   # overseas
+])
+_MODE_CUMULATIVE = np.cumsum(_MODE_PROBABILITIES, axis=1)
+_MODE_CIRCUITY = np.array([1.20, 1.25, 1.35, 1.05])
+_MODE_COST_PER_KM = np.array([TRANSPORT_COST_PER_KM[m] for m in TRANSPORT_MODES])
+_LOCATION_GRID_INTENSITY = np.array([GRID_CARBON_INTENSITY[loc] for loc in SUPPLIER_LOCATIONS])
+# Mean waste rate and holding cost per product category
+_CATEGORY_WASTE_RATE = np.array([0.010, 0.030, 0.080, 0.020, 0.015])
+_CATEGORY_HOLDING_COST = np.array([20.0, 8.0, 12.0, 15.0, 18.0])
+
+# Row schema of DataGeneratorAgent, per entity
+ENTITY_FIELDS = {
+    'suppliers': ('id', 'name', 'location', 'sustainability_score', 'cost', 'certifications', 'carbon_footprint'),
+    'routes': ('id', 'origin', 'destination', 'mode', 'distance', 'emissions_per_mile', 'cost'),
+    'products': ('id', 'name', 'category', 'current_stock', 'reorder_point', 'waste_rate', 'holding_cost')
+}
+
+# Fallback company-name pattern from StrandsWrapper.generate_company_names
+_NAME_PREFIXES = ["Eco", "Green", "Sustain", "Bio", "Clean", "Renewable"]
+_NAME_SUFFIXES = ["Tech", "Corp", "Solutions", "Materials", "Energy", "Systems"]
+
+
+def _row_name(entity: str, index: int) -> str:
+    if entity == 'suppliers':
+        return f"{_NAME_PREFIXES[index % 6]}{_NAME_SUFFIXES[index % 6]} {index // 6 + 1}"
+    return f"Product {index + 1}"
+
+
+def _certification_names(mask: int) -> List[str]:
+    return [c for bit, c in enumerate(CERTIFICATIONS) if mask >> bit & 1]
+
+_U64 = np.uint64
+_MASK64 = 0xFFFFFFFFFFFFFFFF
+
+
+def _splitmix64(x: np.ndarray) -> np.ndarray:
+    """Vectorized SplitMix64 finalizer; a bijection on uint64"""
+    z = x + _U64(0x9E3779B97F4A7C15)
+    z = (z ^ (z >> _U64(30))) * _U64(0xBF58476D1CE4E5B9)
+    z = (z ^ (z >> _U64(27))) * _U64(0x94D049BB133111EB)
+    return z ^ (z >> _U64(31))
+
+
+def _splitmix64_int(x: int) -> int:
+    """Scalar `_splitmix64` on a Python int, avoiding per-call array overhead"""
+    z = (x + 0x9E3779B97F4A7C15) & _MASK64
+    z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & _MASK64
+    return z ^ (z >> 31)
+
+
+class ColumnarDataGenerator:
+    def __init__(self, seed: int = 0, block_rows: int = BLOCK_ROWS, profile: str = 'uniform'):
+        if profile not in PROFILES:
+            raise ValueError(f"Unknown profile '{profile}', expected one of {PROFILES}")
+        self.seed = int(seed)
+        self.block_rows = block_rows
+        self.profile = profile
+        self.vocabularies = dict(VOCABULARIES)
+        if profile == 'realistic':
+            self.vocabularies['origin'] = self.vocabularies['destination'] = CITY_NAMES
+
+    # ------------------------------------------------------------------
+    # Generation
+    # ------------------------------------------------------------------
+    def generate(self, entity: str, count: int, start: int = 0) -> Dict[str, np.ndarray]:
+        """Columns for rows [start, start + count) of `entity`"""
+        if entity not in ENTITY_KEYS:
+            raise ValueError(f"Unknown entity '{entity}'")
+        stop = start + count
+        if count <= 0:
+            return self._block(entity, 0, 0, 0)
+
+        first_block, last_block = start // self.block_rows, (stop - 1) // self.block_rows
+        parts = []
+        for block in range(first_block, last_block + 1):
+            block_start = block * self.block_rows
+            lo = max(start, block_start) - block_start
+            hi = min(stop, block_start + self.block_rows) - block_start
+            parts.append(self._block(entity, block, lo, hi))
+        if len(parts) == 1:
+            return parts[0]
+        return {name: np.concatenate([p[name] for p in parts]) for name in parts[0]}
+
+    def iter_chunks(self, entity: str, count: int, chunk_rows: int = 1_000_000) -> Iterator[Dict[str, np.ndarray]]:
+        """Stream `count` rows as column chunks of at most `chunk_rows`"""
+        for start in range(0, count, chunk_rows):
+            yield self.generate(entity, min(chunk_rows, count - start), start)
+
+    def _rng(self, entity: str, block: int, column: str) -> np.random.Generator:
+        seq = np.random.SeedSequence(
+            self.seed, spawn_key=(ENTITY_KEYS[entity], block, zlib.crc32(column.encode()))
+        )
+        return np.random.default_rng(seq)
+
+    def _block(self, entity: str, block: int, lo: int, hi: int) -> Dict[str, np.ndarray]:
+        """Rows lo..hi of one block. Each column stream is drawn from its
+        start, so a partial block is an exact prefix-slice of the full one."""
+        index = np.arange(block * self.block_rows + lo, block * self.block_rows + hi, dtype=np.int64)
+
+        def draw(column: str, fn):
+            return fn(self._rng(entity, block, column), hi)[lo:hi]
+
+        columns: Dict[str, np.ndarray] = {'index': index, 'id': self.ids(entity, index)}
+        if self.profile == 'realistic':
+            columns.update(self._realistic_columns(entity, index, draw))
+        elif entity == 'suppliers':
+            columns['location'] = (index % len(SUPPLIER_LOCATIONS)).astype(np.int8)
+            columns['sustainability_score'] = draw('sustainability_score', lambda r, k: r.integers(60, 101, k, dtype=np.int16))
+            columns['cost'] = draw('cost', lambda r, k: r.integers(25, 76, k, dtype=np.int16))
+            columns['certifications_mask'] = self._certification_masks(
+                draw('certification_count', lambda r, k: r.integers(1, 4, k, dtype=np.int8)),
+                draw('certification_order', lambda r, k: r.random((k, len(CERTIFICATIONS))))
+            )
+            columns['carbon_footprint'] = draw('carbon_footprint', lambda r, k: r.integers(100, 601, k, dtype=np.int16))
+        elif entity == 'routes':
+            columns['origin'] = draw('origin', lambda r, k: r.integers(0, len(ROUTE_CITIES), k, dtype=np.int8))
+            columns['destination'] = draw('destination', lambda r, k: r.integers(0, len(ROUTE_CITIES), k, dtype=np.int8))
+            columns['mode'] = draw('mode', lambda r, k: r.integers(0, len(TRANSPORT_MODES), k, dtype=np.int8))
+            columns['distance'] = draw('distance', lambda r, k: r.integers(100, 2101, k, dtype=np.int32))
+            # Derived from the same mode draw, so the two always agree
+            columns['emissions_per_mile'] = _MODE_EMISSIONS_PER_MILE[columns['mode']]
+            columns['cost'] = draw('cost', lambda r, k: r.integers(200, 1201, k, dtype=np.int32))
+        else:
+            columns['category'] = (index % len(PRODUCT_CATEGORIES)).astype(np.int8)
+            columns['current_stock'] = draw('current_stock', lambda r, k: r.integers(100, 1001, k, dtype=np.int32))
+            columns['reorder_point'] = draw('reorder_point', lambda r, k: r.integers(50, 251, k, dtype=np.int32))
+            columns['waste_rate'] = draw('waste_rate', lambda r, k: r.uniform(0, 0.1, k))
+            columns['holding_cost'] = draw('holding_cost', lambda r, k: r.integers(5, 26, k, dtype=np.int16))
+        return columns
+
+    def _realistic_columns(self, entity: str, index: np.ndarray, draw) -> Dict[str, np.ndarray]:
+        normal = lambda r, k: r.standard_normal(k)
+        if entity == 'suppliers':
+            location = (index % len(SUPPLIER_LOCATIONS)).astype(np.int8)
+            # One latent "sustainability maturity" factor drives score,
+            # certifications, cost premium and footprint together
+            z = draw('maturity', normal)
+            score = 80 + 9 * z + 3 * draw('score_noise', normal)
+            cost = 50 + 7 * z + 6 * draw('cost_noise', normal)
+            footprint = ((300 - 70 * z) * (0.6 + _LOCATION_GRID_INTENSITY[location])
+                         * np.exp(0.1 * draw('footprint_noise', normal)))
+            return {
+                'location': location,
+                'sustainability_score': np.clip(np.rint(score), 0, 100).astype(np.int16),
+                'cost': np.clip(np.rint(cost), 10, 100).astype(np.int16),
+                'certifications_mask': self._certification_masks(
+                    1 + (z > -0.3) + (z > 0.9),
+                    draw('certification_order', lambda r, k: r.random((k, len(CERTIFICATIONS))))
+                ),
+                'carbon_footprint': np.clip(np.rint(footprint), 20, 2000).astype(np.int16)
+            }
+
+        if entity == 'routes':
+            n_cities = len(CITY_NAMES)
+            origin = draw('origin', lambda r, k: r.integers(0, n_cities, k))
+            # A non-zero offset can never land back on the origin
+            destination = (origin + draw('destination_offset', lambda r, k: r.integers(1, n_cities, k))) % n_cities
+            great_circle = _CITY_KM[origin, destination]
+
+            distance_class = np.searchsorted(_DISTANCE_CLASS_KM, great_circle, side='right')
+            distance_class[~_CITY_OVERLAND[origin, destination]] = 3
+            u = draw('mode', lambda r, k: r.random(k))
+            mode = np.minimum((u[:, None] >= _MODE_CUMULATIVE[distance_class]).sum(axis=1), len(TRANSPORT_MODES) - 1)
+
+            distance = great_circle * _MODE_CIRCUITY[mode] * draw('distance_noise', lambda r, k: r.uniform(0.97, 1.03, k))
+            cost = distance * _MODE_COST_PER_KM[mode] * np.exp(0.15 * draw('cost_noise', normal))
+            return {
+                'origin': origin.astype(np.int8),
+                'destination': destination.astype(np.int8),
+                'mode': mode.astype(np.int8),
+                'distance': np.rint(distance).astype(np.int32),
+                # Regional factor of the origin city
+                'emissions_per_mile': np.round(_FACTORS.lookup(_MODE_FACTOR_CODES[mode], _CITY_FACTOR_REGIONS[origin]) * KM_PER_MILE, 4),
+                'cost': np.maximum(np.rint(cost), 1).astype(np.int32)
+            }
+
+        category = (index % len(PRODUCT_CATEGORIES)).astype(np.int8)
+        stock = np.clip(np.rint(400 * np.exp(0.5 * draw('stock_noise', normal))), 20, 5000)
+        return {
+            'category': category,
+            'current_stock': stock.astype(np.int32),
+            'reorder_point': np.rint(stock * draw('reorder_share', lambda r, k: r.uniform(0.15, 0.35, k))).astype(np.int32),
+            'waste_rate': np.clip(_CATEGORY_WASTE_RATE[category] * np.exp(0.4 * draw('waste_noise', normal)), 0, 0.3),
+            'holding_cost': np.clip(np.rint(_CATEGORY_HOLDING_COST[category]
+                                            * np.exp(0.2 * draw('holding_noise', normal))), 1, 60).astype(np.int16)
+        }
+
+    @staticmethod
+    def _certification_masks(how_many: np.ndarray, order: np.ndarray) -> np.ndarray:
+        """`how_many` distinct certifications per row, encoded as a bitmask"""
+        # Random rank of each certification per row; keep the lowest `how_many`
+        ranks = order.argsort(axis=1).argsort(axis=1)
+        chosen = ranks < how_many[:, None]
+        bits = (1 << np.arange(len(CERTIFICATIONS))).astype(np.uint8)
+        return (chosen * bits).sum(axis=1).astype(np.uint8)
+
+    def ids(self, entity: str, index: np.ndarray) -> np.ndarray:
+        key = _U64(_splitmix64_int((self.seed * 8 + ENTITY_KEYS[entity]) & _MASK64))
+        return _splitmix64(index.astype(_U64) + key)
+
+    # ------------------------------------------------------------------
+    # Row conversion
+    # ------------------------------------------------------------------
+    @staticmethod
+    def format_id(id_value: int) -> str:
+        """Render a 64-bit ID as a (stable) UUID string"""
+        id_value = int(id_value)
+        low = _splitmix64_int(id_value ^ 0x5DEECE66D)
+        return str(uuid.UUID(int=(id_value << 64) | low, version=4))
+
+    def to_records(self, entity: str, columns: Dict[str, np.ndarray]) -> List[Dict[str, Any]]:
+        """Expand columns into DataGeneratorAgent-style row dicts"""
+        cols = {name: values.tolist() for name, values in columns.items()}
+        vocab = self.vocabularies
+        records = []
+        for i, (index, id_value) in enumerate(zip(cols['index'], cols['id'])):
+            row: Dict[str, Any] = {'id': self.format_id(id_value)}
+            if entity == 'suppliers':
+                row.update({
+                    'name': _row_name(entity, index),
+                    'location': vocab['location'][cols['location'][i]],
+                    'sustainability_score': cols['sustainability_score'][i],
+                    'cost': cols['cost'][i],
+                    'certifications': _certification_names(cols['certifications_mask'][i]),
+                    'carbon_footprint': cols['carbon_footprint'][i]
+                })
+            elif entity == 'routes':
+                row.update({
+                    'origin': vocab['origin'][cols['origin'][i]],
+                    'destination': vocab['destination'][cols['destination'][i]],
+                    'mode': vocab['mode'][cols['mode'][i]],
+                    'distance': cols['distance'][i],
+                    'emissions_per_mile': cols['emissions_per_mile'][i],
+                    'cost': cols['cost'][i]
+                })
+            else:
+                row.update({
+                    'name': _row_name(entity, index),
+                    'category': vocab['category'][cols['category'][i]],
+                    'current_stock': cols['current_stock'][i],
+                    'reorder_point': cols['reorder_point'][i],
+                    'waste_rate': cols['waste_rate'][i],
+                    'holding_cost': cols['holding_cost'][i]
+                })
+            records.append(row)
+        return records
+
+    # ------------------------------------------------------------------
+    # Sharded output to disk
+    # ------------------------------------------------------------------
+    def write_dataset(self, out_dir: str, counts: Dict[str, int], chunk_rows: int = 1_000_000,
+                      workers: Optional[int] = None) -> Dict[str, Any]:
+        """Write each entity as .npz chunk files plus a manifest.json.
+
+        Chunks are generated in parallel worker processes; because every
+        block has its own seed stream, the files are identical for any
+        `workers` value.
+        """
+        os.makedirs(out_dir, exist_ok=True)
+        # Align chunks to whole blocks so no block is generated twice
+        chunk_rows = max(self.block_rows, chunk_rows // self.block_rows * self.block_rows)
+
+        tasks = []
+        for entity, count in counts.items():
+            for shard, start in enumerate(range(0, count, chunk_rows)):
+                path = os.path.join(out_dir, f"{entity}-{shard:05d}.npz")
+                tasks.append((self.seed, self.block_rows, self.profile, entity, start, min(chunk_rows, count - start), path))
+
+        if workers == 1 or len(tasks) <= 1:
+            files = [_write_chunk(task) for task in tasks]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                files = list(pool.map(_write_chunk, tasks))
+
+        manifest = {
+            'seed': self.seed,
+            'block_rows': self.block_rows,
+            'profile': self.profile,
+            'counts': counts,
+            'vocabularies': self.vocabularies,
+            'files': files
+        }
+        with open(os.path.join(out_dir, 'manifest.json'), 'w') as f:
+            json.dump(manifest, f, indent=2)
+        return manifest
+
+
+class ColumnarRows(Sequence):
+    """Read-only row-dict view over generated columns.
+
+    Rows are `Mapping`s in the DataGeneratorAgent schema that decode codes,
+    bitmasks and IDs only for the fields actually read, so row-oriented
+    consumers can walk columnar data without `to_records` copies.
+    """
+
+    def __init__(self, entity: str, columns: Dict[str, np.ndarray],
+                 vocabularies: Optional[Dict[str, List[str]]] = None):
+        self.entity = entity
+        self.columns = columns
+        self.vocabularies = vocabularies or VOCABULARIES
+        self.fields = ENTITY_FIELDS[entity]
+
+    def __len__(self) -> int:
+        return len(self.columns['id'])
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return ColumnarRows(self.entity, {k: v[i] for k, v in self.columns.items()}, self.vocabularies)
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError('row index out of range')
+        return _ColumnarRow(self, i)
+
+    def value(self, key: str, i: int) -> Any:
+        if key not in self.fields:
+            raise KeyError(key)
+        cols = self.columns
+        if key == 'id':
+            return ColumnarDataGenerator.format_id(int(cols['id'][i]))
+        if key == 'name':
+            return _row_name(self.entity, int(cols['index'][i]))
+        if key == 'certifications':
+            return _certification_names(int(cols['certifications_mask'][i]))
+        if key in self.vocabularies:
+            return self.vocabularies[key][cols[key][i]]
+        return cols[key][i].item()
+
+
+class _ColumnarRow(Mapping):
+    __slots__ = ('_rows', '_i')
+
+    def __init__(self, rows: ColumnarRows, i: int):
+        self._rows = rows
+        self._i = i
+
+    def __getitem__(self, key):
+        return self._rows.value(key, self._i)
+
+    def __iter__(self):
+        return iter(self._rows.fields)
+
+    def __len__(self):
+        return len(self._rows.fields)
+
+
+def _write_chunk(task) -> Dict[str, Any]:
+    seed, block_rows, profile, entity, start, count, path = task
+    columns = ColumnarDataGenerator(seed, block_rows, profile).generate(entity, count, start)
+    np.savez(path, **columns)
+    return {'entity': entity, 'path': os.path.basename(path), 'start': start, 'rows': count}
+
+
+def load_dataset(out_dir: str, entity: str) -> Iterator[Dict[str, np.ndarray]]:
+    """Stream the chunks written by `write_dataset` back in row order"""
+    with open(os.path.join(out_dir, 'manifest.json')) as f:
+        manifest = json.load(f)
+    for entry in sorted((e for e in manifest['files'] if e['entity'] == entity), key=lambda e: e['start']):
+        with np.load(os.path.join(out_dir, entry['path'])) as chunk:
+            yield {name: chunk[name] for name in chunk.files}
@@ -1,23 +1,57 @@
 import uuid
 import random
 from datetime import datetime
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from .base_agent import BaseAgent
+from .emission_factors import load_emission_factors
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 from strands_client import StrandsWrapper
 
+SUPPLIER_LOCATIONS = ['USA', 'Germany', 'Japan', 'Canada', 'Sweden']
+TRANSPORT_MODES = ['truck', 'rail', 'ship', 'air']
+ROUTE_CITIES = ['New York', 'Los Angeles', 'Chicago', 'Houston', 'Phoenix']
+PRODUCT_CATEGORIES = ['Electronics', 'Textiles', 'Food', 'Chemicals', 'Automotive']
+CERTIFICATIONS = ['ISO 14001', 'LEED', 'Energy Star', 'Fair Trade', 'Organic']
+# Freight cost per km by mode (USD), used by the realistic profile and scenarios
+TRANSPORT_COST_PER_KM = {'truck': 0.35, 'rail': 0.20, 'ship': 0.08, 'air': 1.50}
+# Default-class factors from the shared emission factor table, per mile
+EMISSIONS_PER_MILE = load_emission_factors().per_mile_by_mode()
+
 class DataGeneratorAgent(BaseAgent):
-    def __init__(self):
+    def __init__(self, seed: Optional[int] = None):
         super().__init__("DataGeneratorAgent")
         self.strands = StrandsWrapper(api_key=os.getenv('STRANDS_API_KEY'))
+        # Private RNG so a seed makes every field, IDs included, reproducible
+        self.rng = random.Random(seed)
     
     async def process(self, parameters: Dict[str, Any]) -> Dict[str, Any]:
+        if parameters.get('seed') is not None:
+            self.rng.seed(parameters['seed'])
         suppliers = parameters.get('suppliers', 20)
         routes = parameters.get('routes', 30)
         products = parameters.get('products', 15)
         
+        profile = parameters.get('profile', 'uniform')
+        if parameters.get('format') == 'columnar' or profile == 'realistic':
+            # NumPy arrays per field instead of one dict per row
+            from .columnar_generator import ColumnarDataGenerator
+            seed = parameters.get('seed')
+            generator = ColumnarDataGenerator(
+                seed=self.rng.getrandbits(63) if seed is None else seed, profile=profile
+            )
+            counts = {'suppliers': suppliers, 'routes': routes, 'products': products}
+            if parameters.get('format') == 'columnar':
+                data = {entity: generator.generate(entity, n) for entity, n in counts.items()}
+                data['format'] = 'columnar'
+            else:
+                data = {entity: generator.to_records(entity, generator.generate(entity, n))
+                        for entity, n in counts.items()}
+            data['profile'] = profile
+            data['timestamp'] = datetime.now().isoformat()
+            return data
+        
         return {
             'suppliers': self.generate_suppliers(suppliers),
             'routes': self.generate_routes(routes),
@@ -28,49 +62,48 @@ class DataGeneratorAgent(BaseAgent):
     def generate_suppliers(self, count: int) -> List[Dict[str, Any]]:
         # Use Strands to generate realistic company names
         company_names = self.strands.generate_company_names(count, "sustainability")
-        locations = ['USA', 'Germany', 'Japan', 'Canada', 'Sweden']
         
         return [{
-            'id': str(uuid.uuid4()),
+            'id': self._new_id(),
             'name': company_names[i] if i < len(company_names) else f"Company {i+1}",
-            'location': locations[i % len(locations)],
-            'sustainability_score': random.randint(60, 100),
-            'cost': random.randint(25, 75),
+            'location': SUPPLIER_LOCATIONS[i % len(SUPPLIER_LOCATIONS)],
+            'sustainability_score': self.rng.randint(60, 100),
+            'cost': self.rng.randint(25, 75),
             'certifications': self.get_random_certifications(),
-            'carbon_footprint': random.randint(100, 600)
+            'carbon_footprint': self.rng.randint(100, 600)
         } for i in range(count)]
     
     def generate_routes(self, count: int) -> List[Dict[str, Any]]:
-        modes = ['truck', 'rail', 'ship', 'air']
-        cities = ['New York', 'Los Angeles', 'Chicago', 'Houston', 'Phoenix']
-        
-        return [{
-            'id': str(uuid.uuid4()),
-            'origin': random.choice(cities),
-            'destination': random.choice(cities),
-            'mode': random.choice(modes),
-            'distance': random.randint(100, 2100),
-            'emissions_per_mile': self.get_emissions_by_mode(random.choice(modes)),
-            'cost': random.randint(200, 1200)
-        } for _ in range(count)]
+        routes = []
+        for _ in range(count):
+            mode = self.rng.choice(TRANSPORT_MODES)
+            routes.append({
+                'id': self._new_id(),
+                'origin': self.rng.choice(ROUTE_CITIES),
+                'destination': self.rng.choice(ROUTE_CITIES),
+                'mode': mode,
+                'distance': self.rng.randint(100, 2100),
+                'emissions_per_mile': self.get_emissions_by_mode(mode),
+                'cost': self.rng.randint(200, 1200)
+            })
+        return routes
     
     def generate_products(self, count: int) -> List[Dict[str, Any]]:
-        categories = ['Electronics', 'Textiles', 'Food', 'Chemicals', 'Automotive']
-        
         return [{
-            'id': str(uuid.uuid4()),
+            'id': self._new_id(),
             'name': f"Product {i + 1}",
-            'category': categories[i % len(categories)],
-            'current_stock': random.randint(100, 1000),
-            'reorder_point': random.randint(50, 250),
-            'waste_rate': random.uniform(0, 0.1),
-            'holding_cost': random.randint(5, 25)
+            'category': PRODUCT_CATEGORIES[i % len(PRODUCT_CATEGORIES)],
+            'current_stock': self.rng.randint(100, 1000),
+            'reorder_point': self.rng.randint(50, 250),
+            'waste_rate': self.rng.uniform(0, 0.1),
+            'holding_cost': self.rng.randint(5, 25)
         } for i in range(count)]
     
+    def _new_id(self) -> str:
+        return str(uuid.UUID(int=self.rng.getrandbits(128), version=4))
+    
     def get_random_certifications(self) -> List[str]:
-        certs = ['ISO 14001', 'LEED', 'Energy Star', 'Fair Trade', 'Organic']
-        return random.sample(certs, random.randint(1, 3))
+        return self.rng.sample(CERTIFICATIONS, self.rng.randint(1, 3))
     
     def get_emissions_by_mode(self, mode: str) -> float:
-        emissions = {'truck': 0.4, 'rail': 0.1, 'ship': 0.05, 'air': 1.2}
-        return emissions.get(mode, 0.4)
\ No newline at end of file
+        return EMISSIONS_PER_MILE.get(mode, EMISSIONS_PER_MILE['truck'])
\ No newline at end of file
@@ -0,0 +1,205 @@
+"""
+Emission factor database shared by all agents.
+
+Factors live in a versioned JSON file (``data/emission_factors.json``, or
+``EMISSION_FACTORS_PATH``) and are compiled once into a dense NumPy array
+indexed by (mode, region, vehicle class, year). Fallbacks are resolved at
+compile time, so every lookup is a plain array index:
+
+- a missing (region, vehicle class) pair uses the class's ``GLOBAL`` entry,
+  then the region's ``default`` class, then ``GLOBAL``/``default``; unknown
+  names count as ``GLOBAL`` / ``default``;
+- a year without its own entry uses the latest earlier year (or the
+  earliest year listed), and years outside the table are clamped;
+- an unknown mode uses the file's default mode.
+
+``lookup`` takes whole columns (lists or arrays of names, or integer codes
+from ``*_codes``) and returns a factor array; ``factor`` is the scalar form.
+Transport factors are always returned in kg CO2e / (t km); a file declaring
+other ``units.transport`` is converted once at compile time. Files from
+before unit checking spell the unit out in prose; those strings are read as
+the units they describe.
+
+``mode_shifts`` says which modes a lane can realistically move to:
+``allowed`` target modes per current mode, and a ``min_distance_km`` per
+target (rail and ship only pay off, and usually only exist, on long lanes).
+A trucked or railed lane is overland, so it never moves to ship; air lanes
+may move to any surface mode. ``feasible_shifts`` applies the table to
+whole columns.
+"""
+
+import json
+import os
+import threading
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from .units import TRANSPORT_FACTOR, convert
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                            'data', 'emission_factors.json')
+KM_PER_MILE = 1.609344
+# units.transport strings written before units were parsed
+LEGACY_UNITS = {'kg CO2e per km (per tonne of cargo)': TRANSPORT_FACTOR}
+# Used when the factor file has no 'mode_shifts' block
+DEFAULT_MODE_SHIFTS = {
+    'allowed': {'truck': ['rail'], 'rail': ['truck'], 'ship': [], 'air': ['truck', 'rail', 'ship']},
+    'min_distance_km': {'rail': 300, 'ship': 1500}
+}
+
+
+class EmissionFactorTable:
+    """Compiled transport factors plus grid intensities and multipliers"""
+
+    def __init__(self, spec: Dict[str, Any]):
+        self.version = spec['version']
+        defaults = spec.get('defaults', {})
+        rows = spec['transport']
+
+        self.modes: List[str] = sorted({r['mode'] for r in rows})
+        self.regions: List[str] = sorted({r['region'] for r in rows})
+        self.vehicle_classes: List[str] = sorted({r['vehicle_class'] for r in rows})
+        self.min_year = min(r['year'] for r in rows)
+        self.max_year = max(r['year'] for r in rows)
+        self._mode_index = {m: i for i, m in enumerate(self.modes)}
+        self._region_index = {r: i for i, r in enumerate(self.regions)}
+        self._class_index = {v: i for i, v in enumerate(self.vehicle_classes)}
+
+        self.default_mode = self._mode_index[defaults.get('mode', 'truck')]
+        self.default_region = self._region_index[defaults.get('region', 'GLOBAL')]
+        self.default_class = self._class_index[defaults.get('vehicle_class', 'default')]
+
+        self.factors = self._compile(rows)
+        transport_unit = spec.get('units', {}).get('transport', TRANSPORT_FACTOR)
+        self.factors *= convert(1.0, LEGACY_UNITS.get(transport_unit, transport_unit), TRANSPORT_FACTOR)
+        self.grid_intensity: Dict[str, float] = dict(spec.get('grid_intensity', {}))
+        self.multipliers: Dict[str, float] = dict(spec.get('multipliers', {}))
+
+        shifts = spec.get('mode_shifts', DEFAULT_MODE_SHIFTS)
+        self._shift_allowed = np.zeros((len(self.modes), len(self.modes)), bool)
+        for source, targets in shifts.get('allowed', {}).items():
+            if source in self._mode_index:
+                self._shift_allowed[self._mode_index[source], [self._mode_index[t] for t in targets
+                                                               if t in self._mode_index and t != source]] = True
+        min_km = shifts.get('min_distance_km', {})
+        self._shift_min_km = np.array([float(min_km.get(m, 0)) for m in self.modes])
+
+        # Lowest-emission mode per (region, year) for the default vehicle class
+        best = self.factors[:, :, self.default_class, :]
+        self._best_mode = best.argmin(axis=0)
+        self._best_factor = best.min(axis=0)
+
+    def _compile(self, rows: List[Dict[str, Any]]) -> np.ndarray:
+        series: Dict[tuple, Dict[int, float]] = {}
+        for row in rows:
+            series.setdefault((row['mode'], row['region'], row['vehicle_class']), {})[row['year']] = float(row['factor'])
+
+        global_region = self.regions[self.default_region]
+        default_class = self.vehicle_classes[self.default_class]
+        years = range(self.min_year, self.max_year + 1)
+        factors = np.empty((len(self.modes), len(self.regions), len(self.vehicle_classes), len(years)))
+        for m, mode in enumerate(self.modes):
+            if (mode, global_region, default_class) not in series:
+                raise ValueError(f"Emission factors need a {global_region}/{default_class} entry for mode '{mode}'")
+            for r, region in enumerate(self.regions):
+                for v, vehicle_class in enumerate(self.vehicle_classes):
+                    # A known vehicle class outweighs the region (electric vs diesel)
+                    for key in ((mode, region, vehicle_class), (mode, global_region, vehicle_class),
+                                (mode, region, default_class), (mode, global_region, default_class)):
+                        if key in series:
+                            by_year = series[key]
+                            break
+                    known = sorted(by_year)
+                    for y, year in enumerate(years):
+                        earlier = [k for k in known if k <= year]
+                        factors[m, r, v, y] = by_year[earlier[-1] if earlier else known[0]]
+        return factors
+
+    # --- code translation -------------------------------------------------
+
+    @staticmethod
+    def _to_codes(values, index: Dict[str, int], default: int):
+        if values is None:
+            return default
+        if isinstance(values, str):
+            return index.get(values, default)
+        if isinstance(values, np.ndarray) and values.dtype.kind in 'iu':
+            return values  # already codes from *_codes()
+        return np.fromiter((index.get(v, default) for v in values), dtype=np.intp, count=len(values))
+
+    def mode_codes(self, modes: Iterable[Optional[str]]) -> np.ndarray:
+        return np.asarray(self._to_codes(list(modes), self._mode_index, self.default_mode), dtype=np.intp)
+
+    def region_codes(self, regions: Iterable[Optional[str]]) -> np.ndarray:
+        return np.asarray(self._to_codes(list(regions), self._region_index, self.default_region), dtype=np.intp)
+
+    def vehicle_class_codes(self, classes: Iterable[Optional[str]]) -> np.ndarray:
+        return np.asarray(self._to_codes(list(classes), self._class_index, self.default_class), dtype=np.intp)
+
+    def _year_codes(self, years):
+        if years is None:
+            return self.max_year - self.min_year
+        years = np.asarray(years, dtype=np.float64)
+        years = np.where(np.isnan(years), self.max_year, years)
+        return np.clip(years.astype(np.int64), self.min_year, self.max_year) - self.min_year
+
+    # --- lookups ------------------------------------------------------------
+
+    def lookup(self, modes, regions=None, vehicle_classes=None, years=None) -> np.ndarray:
+        """Factor per row; each argument is a column, a single value or None"""
+        return self.factors[
+            self._to_codes(modes, self._mode_index, self.default_mode),
+            self._to_codes(regions, self._region_index, self.default_region),
+            self._to_codes(vehicle_classes, self._class_index, self.default_class),
+            self._year_codes(years)
+        ]
+
+    def factor(self, mode: str, region: str = None, vehicle_class: str = None, year: int = None) -> float:
+        return float(self.lookup(mode, region, vehicle_class, year))
+
+    def best_modes(self, regions=None, years=None):
+        """(mode codes, factors) of the lowest-emission mode per row"""
+        r = self._to_codes(regions, self._region_index, self.default_region)
+        y = self._year_codes(years)
+        return self._best_mode[r, y], self._best_factor[r, y]
+
+    def feasible_shifts(self, modes, distance_km) -> np.ndarray:
+        """(rows, modes) mask of the modes each lane can move to; never its own mode"""
+        codes = np.atleast_1d(self._to_codes(modes, self._mode_index, self.default_mode))
+        distance = np.atleast_1d(np.asarray(distance_km, dtype=np.float64))
+        return self._shift_allowed[codes] & (distance[:, None] >= self._shift_min_km)
+
+    def best_mode(self, region: str = None, year: int = None) -> str:
+        return self.modes[int(self.best_modes(region, year)[0])]
+
+    def per_mile_by_mode(self, region: str = None, year: int = None) -> Dict[str, float]:
+        """Default-class factors per mile, keyed by mode"""
+        return {mode: round(self.factor(mode, region, None, year) * KM_PER_MILE, 4) for mode in self.modes}
+
+    def multiplier(self, name: str) -> float:
+        return self.multipliers[name]
+
+
+_tables: Dict[str, EmissionFactorTable] = {}
+_tables_lock = threading.Lock()
+
+
+def load_emission_factors(path: str = None) -> EmissionFactorTable:
+    """Compiled table for `path` (default: EMISSION_FACTORS_PATH or the bundled file), cached"""
+    path = os.path.abspath(path or os.getenv('EMISSION_FACTORS_PATH') or DEFAULT_PATH)
+    table = _tables.get(path)
+    if table is None:
+        with _tables_lock:
+            table = _tables.get(path)
+            if table is None:
+                with open(path) as f:
+                    table = _tables[path] = EmissionFactorTable(json.load(f))
+    return table
+
+
+def reload_emission_factors(path: str = None) -> EmissionFactorTable:
+    """Drop the cached table so an edited file is picked up"""
+    with _tables_lock:
+        _tables.clear()
+    return load_emission_factors(path)
@@ -0,0 +1,105 @@
+"""
+City coordinates and great-circle distances for synthetic logistics data
+"""
+
+from typing import Dict, List
+
+import numpy as np
+
+from .emission_factors import load_emission_factors
+
+EARTH_RADIUS_KM = 6371.0088
+
+# (name, country, region, latitude, longitude)
+CITIES = [
+    ('New York', 'USA', 'North America', 40.7128, -74.0060),
+    ('Los Angeles', 'USA', 'North America', 34.0522, -118.2437),
+    ('Chicago', 'USA', 'North America', 41.8781, -87.6298),
+    ('Houston', 'USA', 'North America', 29.7604, -95.3698),
+    ('Phoenix', 'USA', 'North America', 33.4484, -112.0740),
+    ('Atlanta', 'USA', 'North America', 33.7490, -84.3880),
+    ('Seattle', 'USA', 'North America', 47.6062, -122.3321),
+    ('Dallas', 'USA', 'North America', 32.7767, -96.7970),
+    ('Memphis', 'USA', 'North America', 35.1495, -90.0490),
+    ('Toronto', 'Canada', 'North America', 43.6532, -79.3832),
+    ('Vancouver', 'Canada', 'North America', 49.2827, -123.1207),
+    ('Montreal', 'Canada', 'North America', 45.5017, -73.5673),
+    ('Mexico City', 'Mexico', 'North America', 19.4326, -99.1332),
+    ('Sao Paulo', 'Brazil', 'South America', -23.5505, -46.6333),
+    ('Buenos Aires', 'Argentina', 'South America', -34.6037, -58.3816),
+    ('Rotterdam', 'Netherlands', 'Europe', 51.9244, 4.4777),
+    ('Hamburg', 'Germany', 'Europe', 53.5511, 9.9937),
+    ('Munich', 'Germany', 'Europe', 48.1351, 11.5820),
+    ('Berlin', 'Germany', 'Europe', 52.5200, 13.4050),
+    ('Paris', 'France', 'Europe', 48.8566, 2.3522),
+    ('London', 'United Kingdom', 'Europe', 51.5074, -0.1278),
+    ('Madrid', 'Spain', 'Europe', 40.4168, -3.7038),
+    ('Milan', 'Italy', 'Europe', 45.4642, 9.1900),
+    ('Warsaw', 'Poland', 'Europe', 52.2297, 21.0122),
+    ('Stockholm', 'Sweden', 'Europe', 59.3293, 18.0686),
+    ('Gothenburg', 'Sweden', 'Europe', 57.7089, 11.9746),
+    ('Istanbul', 'Turkey', 'Europe', 41.0082, 28.9784),
+    ('Dubai', 'United Arab Emirates', 'Middle East', 25.2048, 55.2708),
+    ('Mumbai', 'India', 'Asia', 19.0760, 72.8777),
+    ('Delhi', 'India', 'Asia', 28.7041, 77.1025),
+    ('Singapore', 'Singapore', 'Asia', 1.3521, 103.8198),
+    ('Bangkok', 'Thailand', 'Asia', 13.7563, 100.5018),
+    ('Shanghai', 'China', 'Asia', 31.2304, 121.4737),
+    ('Shenzhen', 'China', 'Asia', 22.5431, 114.0579),
+    ('Beijing', 'China', 'Asia', 39.9042, 116.4074),
+    ('Seoul', 'South Korea', 'Asia', 37.5665, 126.9780),
+    ('Tokyo', 'Japan', 'Asia', 35.6762, 139.6503),
+    ('Osaka', 'Japan', 'Asia', 34.6937, 135.5023),
+    ('Sydney', 'Australia', 'Oceania', -33.8688, 151.2093),
+    ('Johannesburg', 'South Africa', 'Africa', -26.2041, 28.0473),
+]
+
+# Landmass per country: lanes between landmasses cross the sea. Continents
+# joined only by roadless or closed borders (Darien Gap, Korean DMZ,
+# Sahara/Arabia) count as separate landmasses.
+LANDMASSES = {
+    'USA': 'North America', 'Canada': 'North America', 'Mexico': 'North America',
+    'Brazil': 'South America', 'Argentina': 'South America',
+    'Netherlands': 'Eurasia', 'Germany': 'Eurasia', 'France': 'Eurasia', 'Spain': 'Eurasia',
+    'Italy': 'Eurasia', 'Poland': 'Eurasia', 'Sweden': 'Eurasia', 'Turkey': 'Eurasia',
+    'United Arab Emirates': 'Eurasia', 'India': 'Eurasia', 'Singapore': 'Eurasia',
+    'Thailand': 'Eurasia', 'China': 'Eurasia',
+    'United Kingdom': 'Great Britain', 'South Korea': 'Korea', 'Japan': 'Japan',
+    'Australia': 'Australia', 'South Africa': 'Southern Africa'
+}
+# Landmasses joined by a fixed link freight can use (Channel Tunnel)
+FIXED_LINKS = {frozenset(('Great Britain', 'Eurasia'))}
+
+CITY_NAMES: List[str] = [c[0] for c in CITIES]
+CITY_COUNTRIES: List[str] = [c[1] for c in CITIES]
+CITY_REGIONS: List[str] = [c[2] for c in CITIES]
+CITY_LANDMASSES: List[str] = [LANDMASSES[c[1]] for c in CITIES]
+CITY_LAT = np.array([c[3] for c in CITIES])
+CITY_LON = np.array([c[4] for c in CITIES])
+
+# Grid carbon intensity (kg CO2e per kWh) of supplier locations, from the
+# shared emission factor table
+GRID_CARBON_INTENSITY: Dict[str, float] = load_emission_factors().grid_intensity
+
+
+def haversine_km(lat1, lon1, lat2, lon2) -> np.ndarray:
+    """Great-circle distance in km; accepts scalars or broadcastable arrays"""
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(v, dtype=np.float64)) for v in (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+def city_distance_matrix() -> np.ndarray:
+    """Great-circle km between every pair of cities in `CITIES`"""
+    return haversine_km(CITY_LAT[:, None], CITY_LON[:, None], CITY_LAT[None, :], CITY_LON[None, :])
+
+
+def overland_matrix() -> np.ndarray:
+    """Whether freight can travel overland between every pair of cities in `CITIES`"""
+    names = sorted(set(CITY_LANDMASSES))
+    index = np.array([names.index(m) for m in CITY_LANDMASSES])
+    linked = np.eye(len(names), dtype=bool)
+    for link in FIXED_LINKS:
+        a, b = (names.index(m) for m in link)
+        linked[a, b] = linked[b, a] = True
+    return linked[index[:, None], index[None, :]]
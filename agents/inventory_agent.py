@@ -1,50 +1,85 @@
-import boto3
 import json
 import os
 from typing import Dict, Any, List
 from strands_client import StrandsWrapper
+from aws_config import LazyClient
+from orchestration.instrumentation import span
+from .carbon_pricing import CarbonPricing
+from .emission_factors import load_emission_factors
+from .units import OUTPUT_UNITS
+
+# Waste estimate from months of stock is capped here; models of it share the cap
+MAX_WASTE_PERCENT = 50
 
 class InventoryAgent:
+    bedrock_client = LazyClient('bedrock-runtime')
+
     def __init__(self):
-        self.bedrock_client = boto3.client('bedrock-runtime')
         self.strands = StrandsWrapper(api_key=os.getenv('STRANDS_API_KEY'))
         
-    def generate_waste_reduction_recommendations(self, inventory_data: List[Dict]) -> Dict[str, Any]:
-        """Generate waste reduction recommendations for inventory"""
+    def generate_waste_reduction_recommendations(self, inventory_data: List[Dict], carbon_price: Any = None) -> Dict[str, Any]:
+        """Generate waste reduction recommendations for inventory
+        
+        With a `carbon_price` spec (see agents/carbon_pricing.py) each SKU gets
+        a carbon-adjusted cost: holding cost of its stock plus its waste
+        emissions times the price.
+        """
         recommendations = []
         waste_analysis = []
         
-        for item in inventory_data:
-            waste_metrics = self._analyze_waste_metrics(item)
-            item_recommendations = self._generate_item_recommendations(item, waste_metrics)
-            
-            waste_analysis.append({
-                'product_id': item.get('id'),
-                'name': item.get('name'),
-                'current_stock': item.get('current_stock', 0),
-                'waste_percentage': waste_metrics['waste_percentage'],
-                'expiry_risk': waste_metrics['expiry_risk'],
-                'overstock_risk': waste_metrics['overstock_risk'],
-                'recommendations': item_recommendations
-            })
-            
-            recommendations.extend(item_recommendations)
+        with span('per_row_loop'):
+            for item in inventory_data:
+                with span('scoring'):
+                    waste_metrics = self._analyze_waste_metrics(item)
+                    item_recommendations = self._generate_item_recommendations(item, waste_metrics)
+                
+                waste_analysis.append({
+                    'product_id': item.get('id'),
+                    'name': item.get('name'),
+                    'current_stock': item.get('current_stock', 0),
+                    'waste_percentage': waste_metrics['waste_percentage'],
+                    'expiry_risk': waste_metrics['expiry_risk'],
+                    'overstock_risk': waste_metrics['overstock_risk'],
+                    'recommendations': item_recommendations
+                })
+                
+                recommendations.extend(item_recommendations)
         
         # Generate Strands-powered explanation
-        strands_explanation = self.strands.generate_explanation({
-            'waste_analysis': waste_analysis,
-            'total_items': len(inventory_data)
-        })
+        with span('strands_calls'):
+            strands_explanation = self.strands.generate_explanation({
+                'waste_analysis': waste_analysis,
+                'total_items': len(inventory_data)
+            })
         
-        return {
+        with span('aggregation'):
+            total_waste_reduction_potential = self._calculate_total_waste_reduction(waste_analysis)
+            priority_actions = self._prioritize_recommendations(recommendations)
+            high_risk_items = [item for item in waste_analysis if item['waste_percentage'] > 15]
+        
+        result = {
             'agent': 'inventory',
             'waste_analysis': waste_analysis,
-            'total_waste_reduction_potential': self._calculate_total_waste_reduction(waste_analysis),
-            'priority_actions': self._prioritize_recommendations(recommendations),
-            'high_risk_items': [item for item in waste_analysis if item['waste_percentage'] > 15],
+            'total_waste_reduction_potential': total_waste_reduction_potential,
+            'priority_actions': priority_actions,
+            'high_risk_items': high_risk_items,
             'strands_explanation': strands_explanation,
-            'strands_powered': True
+            'strands_powered': True,
+            'units': OUTPUT_UNITS['inventory']
         }
+        pricing = CarbonPricing.from_spec(carbon_price)
+        if pricing is not None:
+            with span('carbon_pricing'):
+                cost = [(item.get('holding_cost') or 0) * (item.get('current_stock') or 0) for item in inventory_data]
+                waste = load_emission_factors().multiplier('inventory_waste_per_percent')
+                adjusted = pricing.adjusted_costs(cost, [row['waste_percentage'] * waste for row in waste_analysis],
+                                                  [item.get('region') for item in inventory_data],
+                                                  [item.get('year') for item in inventory_data])
+                for row, base, value in zip(waste_analysis, cost, adjusted[0].tolist()):
+                    row['carbon_adjusted_cost'] = value
+                    row['carbon_cost'] = value - base
+                result['carbon_pricing'] = pricing.summary(cost, adjusted, [r['product_id'] for r in waste_analysis])
+        return result
     
     def _analyze_waste_metrics(self, item: Dict) -> Dict[str, float]:
         """Analyze waste metrics for inventory item"""
@@ -54,7 +89,7 @@ class InventoryAgent:
         
         # Calculate waste percentage
         months_of_stock = current_stock / max(demand_rate, 1)
-        waste_percentage = min(50, max(0, (months_of_stock - 3) * 5))
+        waste_percentage = min(MAX_WASTE_PERCENT, max(0, (months_of_stock - 3) * 5))
         
         # Expiry risk based on shelf life
         expiry_risk = 'High' if shelf_life_days < 30 else 'Medium' if shelf_life_days < 90 else 'Low'
@@ -1,60 +1,156 @@
-import boto3
 import json
 import os
 from typing import Dict, Any, List
 import math
+
+import numpy as np
 from strands_client import StrandsWrapper
+from aws_config import LazyClient
+from orchestration.instrumentation import span
+from .carbon_pricing import CarbonPricing
+from .data_generator import TRANSPORT_COST_PER_KM
+from .emission_factors import load_emission_factors
+from .units import OUTPUT_UNITS, freight_emissions
 
 class LogisticsAgent:
+    bedrock_client = LazyClient('bedrock-runtime')
+
     def __init__(self):
-        self.bedrock_client = boto3.client('bedrock-runtime')
         self.strands = StrandsWrapper(api_key=os.getenv('STRANDS_API_KEY'))
         
-    def optimize_routes_for_emissions(self, routes: List[Dict]) -> Dict[str, Any]:
-        """Optimize transportation routes for emission reduction"""
+    def optimize_routes_for_emissions(self, routes: List[Dict], carbon_price: Any = None) -> Dict[str, Any]:
+        """Optimize transportation routes for emission reduction
+        
+        With a `carbon_price` spec (see agents/carbon_pricing.py) each route
+        gets its carbon-adjusted cost on the current mode and on the cheapest
+        mode the lane can shift to (``feasible_shifts`` in
+        agents/emission_factors.py), and best_routes ranks by that saving.
+        Emissions are t CO2e for the route's ``cargo_tonnes`` (default: the
+        factor table's ``default_cargo_tonnes``); see ``units`` in the result.
+        """
         optimized_routes = []
+        factors = load_emission_factors()
         
-        for route in routes:
-            emissions = self._calculate_route_emissions(route)
-            optimization = self._optimize_single_route(route, emissions)
-            
-            optimized_routes.append({
-                'route_id': route.get('id'),
-                'origin': route.get('origin'),
-                'destination': route.get('destination'),
-                'distance_km': route.get('distance_km', 0),
-                'current_emissions': emissions['current'],
-                'optimized_emissions': emissions['optimized'],
-                'emission_reduction': emissions['reduction_percent'],
-                'transport_mode': optimization['recommended_mode'],
-                'recommendations': optimization['recommendations']
-            })
+        # One vectorized factor lookup for the whole batch
+        with span('factor_lookup'):
+            current_factors = factors.lookup(
+                [route.get('transport_mode', 'truck') for route in routes],
+                [route.get('region') for route in routes],
+                [route.get('vehicle_class') for route in routes],
+                [route.get('year', np.nan) for route in routes]
+            )
+            optimal_modes, optimal_factors = factors.best_modes(
+                [route.get('region') for route in routes],
+                [route.get('year', np.nan) for route in routes]
+            )
         
-        return {
+        with span('emissions'):
+            distance = np.array([route.get('distance_km', 0) or 0 for route in routes], float)
+            default_cargo = factors.multiplier('default_cargo_tonnes')
+            cargo = np.array([route.get('cargo_tonnes') or default_cargo for route in routes], float)
+            current_emissions = freight_emissions(distance, current_factors, cargo)
+            optimal_emissions = freight_emissions(distance, optimal_factors, cargo)
+        
+        with span('per_row_loop'):
+            for route, tonnes, current, optimal in zip(routes, cargo.tolist(), current_emissions.tolist(),
+                                                       np.broadcast_to(optimal_emissions, len(routes)).tolist()):
+                emissions = self._calculate_route_emissions(route, current, optimal)
+                optimization = self._optimize_single_route(route, emissions)
+                
+                optimized_routes.append({
+                    'route_id': route.get('id'),
+                    'origin': route.get('origin'),
+                    'destination': route.get('destination'),
+                    'distance_km': route.get('distance_km', 0),
+                    'cargo_tonnes': tonnes,
+                    'current_emissions': emissions['current'],
+                    'optimized_emissions': emissions['optimized'],
+                    'emission_reduction': emissions['reduction_percent'],
+                    'transport_mode': optimization['recommended_mode'],
+                    'recommendations': optimization['recommendations']
+                })
+        
+        with span('aggregation'):
+            total_emission_reduction = sum(r['emission_reduction'] for r in optimized_routes) / max(len(optimized_routes), 1)
+        
+        pricing = CarbonPricing.from_spec(carbon_price)
+        if pricing is not None:
+            with span('carbon_pricing'):
+                pricing_summary = self._price_routes(pricing, routes, optimized_routes, optimal_modes, factors)
+        
+        with span('ranking'):
+            if pricing is not None:
+                best_routes = sorted(optimized_routes, key=lambda x: x['carbon_adjusted_saving'], reverse=True)[:5]
+            else:
+                best_routes = sorted(optimized_routes, key=lambda x: x['emission_reduction'], reverse=True)[:5]
+        
+        result = {
             'agent': 'logistics',
             'optimized_routes': optimized_routes,
-            'total_emission_reduction': sum(r['emission_reduction'] for r in optimized_routes) / len(optimized_routes),
-            'best_routes': sorted(optimized_routes, key=lambda x: x['emission_reduction'], reverse=True)[:5]
+            'total_emission_reduction': total_emission_reduction,
+            'best_routes': best_routes,
+            'emission_factors_version': factors.version,
+            'units': OUTPUT_UNITS['logistics']
         }
+        if pricing is not None:
+            result['carbon_pricing'] = pricing_summary
+        return result
     
-    def _calculate_route_emissions(self, route: Dict) -> Dict[str, float]:
-        """Calculate emissions for different transport modes"""
-        distance = route.get('distance_km', 0)
-        current_mode = route.get('transport_mode', 'truck')
-        
-        # Emission factors (kg CO2 per km per ton)
-        emission_factors = {
-            'truck': 0.62,
-            'rail': 0.14,
-            'ship': 0.10,
-            'air': 2.1
-        }
+    def _price_routes(self, pricing: CarbonPricing, routes: List[Dict], optimized_routes: List[Dict],
+                      optimal_modes, factors) -> Dict[str, Any]:
+        """Carbon-adjusted cost of each route now and on the cheapest mode it can shift to"""
+        cost_per_km = np.array([TRANSPORT_COST_PER_KM.get(m, 0.0) for m in factors.modes])
+        distance = np.array([row['distance_km'] or 0 for row in optimized_routes], float)
+        cargo = np.array([row['cargo_tonnes'] for row in optimized_routes], float)
+        modes = factors.mode_codes(route.get('transport_mode', 'truck') for route in routes)
+        given = np.array([np.nan if route.get('cost') is None else route['cost'] for route in routes], float)
+        current_cost = np.where(np.isnan(given), distance * cost_per_km[modes], given)
+        regions = [route.get('region') for route in routes]
+        years = [route.get('year') for route in routes]
+        current = pricing.adjusted_costs(current_cost, [r['current_emissions'] for r in optimized_routes], regions, years)
         
-        current_emissions = distance * emission_factors.get(current_mode, 0.62)
+        # Staying put is always an option; each feasible shift competes with it
+        best, best_mode = current.copy(), np.broadcast_to(modes, current.shape).copy()
+        feasible = factors.feasible_shifts(modes, distance)
+        for m in np.flatnonzero(feasible.any(axis=0)):
+            # A quoted cost scales with the per-km cost ratio of the new mode
+            ratio = np.divide(cost_per_km[m], cost_per_km[modes], out=np.ones(len(routes)), where=cost_per_km[modes] > 0)
+            cost = np.where(np.isnan(given), distance * cost_per_km[m], given * ratio)
+            emissions = freight_emissions(distance, factors.lookup(factors.modes[m], regions, None, years), cargo)
+            adjusted = np.where(feasible[:, m], pricing.adjusted_costs(cost, emissions, regions, years), np.inf)
+            cheaper = adjusted < best
+            best[cheaper], best_mode[cheaper] = adjusted[cheaper], m
         
-        # Find optimal mode
-        optimal_mode = min(emission_factors.keys(), key=lambda x: emission_factors[x])
-        optimal_emissions = distance * emission_factors[optimal_mode]
+        for row, now, low, mode, lowest in zip(optimized_routes, current[0].tolist(), best[0].tolist(),
+                                               best_mode[0].tolist(),
+                                               np.broadcast_to(optimal_modes, len(routes)).tolist()):
+            row['carbon_adjusted_cost'] = now
+            row['optimized_carbon_adjusted_cost'] = low
+            row['carbon_adjusted_saving'] = now - low
+            row['cheapest_mode'] = factors.modes[mode]
+            row['lowest_emission_mode'] = factors.modes[lowest]
+        summary = pricing.summary(current_cost, current, [r['route_id'] for r in optimized_routes])
+        for scenario, saving in zip(summary['scenarios'], (current - best).sum(axis=1).tolist()):
+            scenario['switching_saving'] = saving
+        return {'ranking_basis': 'carbon_adjusted_saving', **summary}
+    
+    def _calculate_route_emissions(self, route: Dict, current_emissions: float = None,
+                                   optimal_emissions: float = None) -> Dict[str, float]:
+        """Current and lowest-emission-mode emissions of a route, in t CO2e
+        
+        Callers with a batch pass both in from one vectorized
+        ``freight_emissions`` call; otherwise the route is looked up alone.
+        """
+        if current_emissions is None or optimal_emissions is None:
+            factors = load_emission_factors()
+            region, year = route.get('region'), route.get('year')
+            current_factor = factors.factor(route.get('transport_mode', 'truck'), region,
+                                            route.get('vehicle_class'), year)
+            # Lowest-emission mode for the route's region and year
+            optimal_factor = float(factors.best_modes(region, year)[1])
+            current_emissions, optimal_emissions = freight_emissions(
+                route.get('distance_km', 0) or 0, [current_factor, optimal_factor],
+                route.get('cargo_tonnes') or factors.multiplier('default_cargo_tonnes')).tolist()
         
         reduction_percent = ((current_emissions - optimal_emissions) / current_emissions) * 100 if current_emissions > 0 else 0
         
@@ -69,18 +165,19 @@ class LogisticsAgent:
         distance = route.get('distance_km', 0)
         
         # Use Strands for intelligent transport reasoning
-        strands_reasoning = self.strands.reason_about_transport({
-            'distance_km': distance,
-            'current_mode': route.get('transport_mode', 'truck'),
-            'emissions': emissions
-        })
+        with span('strands_calls'):
+            strands_reasoning = self.strands.reason_about_transport({
+                'distance_km': distance,
+                'current_mode': route.get('transport_mode', 'truck'),
+                'emissions': emissions
+            })
         
         recommendations = []
         if distance > 500:
             recommendations.append("Consider rail transport for long-distance shipping")
         if distance > 1000:
             recommendations.append("Evaluate intermodal transportation options")
-        if emissions['current'] > 100:
+        if emissions['current'] > 0.1:  # t CO2e
             recommendations.append("Implement load consolidation to reduce trips")
         
         return {
@@ -0,0 +1,383 @@
+"""
+Marginal abatement cost curve (MACC) over concrete per-entity actions.
+
+``build_macc`` turns one analysis (input rows plus the agents' per-row
+results, aligned by position as in ``build_cube``) into candidate actions:
+
+- ``supplier_switch``: replace a supplier with a best-in-class one (the
+  ``benchmark_percentile`` footprint of the suppliers analyzed), abating
+  the sourcing and operations difference. Cost is a fixed onboarding cost
+  plus a low-carbon price premium per ton abated.
+- ``mode_shift``: move a route to each mode with a lower factor for its
+  region and year that can serve the lane, per the factor table's
+  ``mode_shifts`` (truck and rail swap with each other, rail needs 300 km;
+  only air lanes move to ship, over 1500 km). Cost is a fixed re-tendering
+  cost plus the distance times the ``TRANSPORT_COST_PER_KM`` difference, so
+  long shifts to rail usually save money.
+- ``order_reduction``: order down to the waste-free stock level (3 months
+  of demand), or half way there. Cost is a fixed replanning cost minus the
+  holding cost of the units no longer stocked.
+
+Options for one entity are mutually exclusive. Per entity, options are
+reduced to the lower convex hull of (tons abated, cost) starting at "do
+nothing", walked one vectorized round per option, so each hull step is an
+upgrade with an increasing cost per ton. Sorting all steps by cost per ton
+gives the curve; a budget is filled greedily along it, then with later
+steps that still fit, never taking an upgrade before the step it builds on
+(the classic greedy for the multiple-choice knapsack).
+"""
+
+from itertools import islice
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from .data_generator import TRANSPORT_COST_PER_KM
+from .emission_factors import load_emission_factors
+from .inventory_agent import MAX_WASTE_PERCENT
+from .scenario_engine import row_column
+from .units import freight_emissions
+
+ACTIONS = ('supplier_switch', 'mode_shift', 'order_reduction')
+# reduction_opportunities category per action
+ACTION_CATEGORIES = {
+    'supplier_switch': ('Supplier Management', 'Switch to low-carbon suppliers'),
+    'mode_shift': ('Transportation', 'Shift routes to lower-emission transport modes'),
+    'order_reduction': ('Waste Reduction', 'Reduce order quantities to demand-based stock levels')
+}
+ENTITY_TYPES = {'supplier_switch': 'supplier', 'mode_shift': 'route', 'order_reduction': 'product'}
+DEFAULT_COSTS = {
+    'supplier_switch_fixed': 1000.0,      # qualification and onboarding, per supplier
+    'supplier_premium_per_ton': 40.0,     # price premium of low-carbon supply, per ton abated
+    'benchmark_percentile': 10.0,         # best-in-class supplier footprint
+    'mode_shift_fixed': 150.0,            # re-tendering, per route
+    'order_change_fixed': 50.0,           # replanning, per item
+    'holding_cost_per_unit': 1.0,         # when an item has no 'holding_cost'
+    'target_months_of_stock': 3.0         # InventoryAgent charges no waste at or below this
+}
+ORDER_LEVELS = ('full', 'half')
+MAX_CANDIDATES = 5_000_000
+
+
+class MACCError(ValueError):
+    """Cost assumption, budget or limit the curve cannot use"""
+
+
+def _first_per_group(groups: np.ndarray) -> np.ndarray:
+    """Mask of the first element of each run in a sorted group array"""
+    first = np.ones(len(groups), bool)
+    first[1:] = groups[1:] != groups[:-1]
+    return first
+
+
+class MACC:
+    """Abatement curve over candidate actions; one action per entity at most
+
+    Columns are parallel arrays: `entity` (int id), `action` (index into
+    ACTIONS), `cost`, `abatement` (tons) and `target` (mode code for
+    mode shifts, index into ORDER_LEVELS for order reductions). `labels`
+    maps entity ids to display ids; `modes` names mode codes.
+    """
+
+    def __init__(self, entity: np.ndarray, action: np.ndarray, cost: np.ndarray, abatement: np.ndarray,
+                 target: Optional[np.ndarray] = None, labels: Optional[Sequence[str]] = None,
+                 modes: Sequence[str] = ()):
+        self.entity = np.asarray(entity, np.int64)
+        self.action = np.asarray(action, np.int8)
+        self.cost = np.asarray(cost, np.float64)
+        self.abatement = np.asarray(abatement, np.float64)
+        self.target = np.zeros(len(self.entity), np.int16) if target is None else np.asarray(target, np.int16)
+        if not (len(self.entity) == len(self.action) == len(self.cost) == len(self.abatement) == len(self.target)):
+            raise MACCError('Candidate columns must have equal length')
+        if len(self.entity) > MAX_CANDIDATES:
+            raise MACCError(f'At most {MAX_CANDIDATES} candidate actions')
+        self.labels = labels
+        self.modes = list(modes)
+        self._build_steps()
+
+    @property
+    def candidates(self) -> int:
+        return len(self.entity)
+
+    def _build_steps(self):
+        """Lower convex hull steps per entity, then all steps by cost per ton"""
+        # Candidates grouped by entity once; every round keeps that order
+        idx = np.flatnonzero(self.abatement > 0)
+        idx = idx[np.argsort(self.entity[idx], kind='stable')]
+        ent, a, c = self.entity[idx], self.abatement[idx], self.cost[idx]
+        n_entities = int(self.entity.max()) + 1 if len(self.entity) else 0
+        prev_a, prev_c = np.zeros(n_entities), np.zeros(n_entities)
+        steps = {'candidate': [], 'slope': [], 'abatement': [], 'cost': [], 'round': []}
+        alive = np.arange(len(idx))
+        round_ = 0
+        while len(alive):
+            gain = a[alive] - prev_a[ent[alive]]
+            keep = gain > 1e-12
+            alive, gain = alive[keep], gain[keep]
+            if not len(alive):
+                break
+            slope = (c[alive] - prev_c[ent[alive]]) / gain
+            # Smallest slope per entity from its current hull point; the larger option on ties
+            heads = _first_per_group(ent[alive])
+            starts, group = np.flatnonzero(heads), np.cumsum(heads) - 1
+            best = slope == np.minimum.reduceat(slope, starts)[group]
+            size = np.where(best, a[alive], -np.inf)
+            best &= size == np.maximum.reduceat(size, starts)[group]
+            first = np.flatnonzero(best)
+            first = first[_first_per_group(group[first])]
+            chosen = alive[first]
+            chosen_ent = ent[chosen]
+            steps['candidate'].append(idx[chosen])
+            steps['slope'].append(slope[first])
+            steps['abatement'].append(gain[first])
+            steps['cost'].append(c[chosen] - prev_c[chosen_ent])
+            steps['round'].append(np.full(len(chosen), round_, np.int16))
+            prev_a[chosen_ent], prev_c[chosen_ent] = a[chosen], c[chosen]
+            taken = np.zeros(len(alive), bool)
+            taken[first] = True
+            alive = alive[~taken]
+            round_ += 1
+
+        steps = {k: np.concatenate(v) if v else np.zeros(0, np.int64 if k == 'candidate' else np.float64)
+                 for k, v in steps.items()}
+        # Within an entity slopes increase by round, so (slope, round) keeps upgrades in order
+        order = np.lexsort((steps['round'], steps['slope'])) if len(steps['slope']) else np.zeros(0, np.intp)
+        self.steps = {k: v[order] for k, v in steps.items()}
+        self.steps['entity'] = self.entity[self.steps['candidate']]
+        self.cumulative_abatement = np.cumsum(self.steps['abatement'])
+        self.cumulative_cost = np.cumsum(self.steps['cost'])
+
+    @property
+    def potential(self) -> float:
+        """Tons abated if every entity took its largest hull option"""
+        return float(self.cumulative_abatement[-1]) if len(self.cumulative_abatement) else 0.0
+
+    def curve(self, points: Optional[int] = None) -> List[Dict[str, float]]:
+        """Curve points in cost-per-ton order, optionally sampled down to `points`"""
+        n = len(self.steps['slope'])
+        rows = np.arange(n)
+        if points is not None and n > points:
+            rows = np.unique(np.linspace(0, n - 1, points).round().astype(np.int64))
+        return [{
+            'cost_per_ton': float(self.steps['slope'][i]),
+            'abatement_tons': float(self.steps['abatement'][i]),
+            'cumulative_abatement_tons': float(self.cumulative_abatement[i]),
+            'cumulative_cost': float(self.cumulative_cost[i])
+        } for i in rows]
+
+    def select(self, budget: Optional[float] = None, max_cost_per_ton: Optional[float] = None) -> np.ndarray:
+        """Candidate index chosen per entity under a budget (greedy by cost per ton)
+
+        Steps above `max_cost_per_ton` are never taken. Without a budget every
+        remaining step is; negative-cost steps free budget for later ones.
+        """
+        if budget is not None and (not np.isfinite(budget) or budget < 0):
+            raise MACCError('budget must be a non-negative number')
+        steps = self.steps
+        allowed = np.ones(len(steps['slope']), bool)
+        if max_cost_per_ton is not None:
+            allowed &= steps['slope'] <= max_cost_per_ton
+        taken = np.zeros(len(allowed), bool)
+        if budget is None:
+            taken = allowed
+        else:
+            # Steps are in (slope, round) order: an entity's previous hull step
+            # always comes first, and negative-cost steps lead. The prefix that
+            # fits the budget is taken outright, then later steps one by one.
+            order = np.flatnonzero(allowed)
+            spent = np.cumsum(steps['cost'][order])
+            head = int(np.searchsorted(np.maximum.accumulate(spent) > budget, True))
+            taken[order[:head]] = True
+            remaining = float(budget) - (float(spent[head - 1]) if head else 0.0)
+            n_entities = int(self.entity.max()) + 1 if len(self.entity) else 0
+            done = np.bincount(steps['entity'][order[:head]], minlength=n_entities)  # hull steps taken
+            rest = order[head:]
+            # Cheapest cost still ahead: stop once nothing further can fit
+            cheapest = np.minimum.accumulate(steps['cost'][rest][::-1])[::-1].tolist()
+            entities, rounds = steps['entity'][rest].tolist(), steps['round'][rest].tolist()
+            costs = steps['cost'][rest].tolist()
+            for j, i in enumerate(rest.tolist()):
+                if cheapest[j] > remaining:
+                    break
+                e = entities[j]
+                if rounds[j] == done[e] and costs[j] <= remaining:
+                    taken[i] = True
+                    done[e] += 1
+                    remaining -= costs[j]
+        # The last hull step taken per entity is its chosen option
+        chosen = np.flatnonzero(taken)
+        last = chosen[np.lexsort((steps['round'][chosen], steps['entity'][chosen]))]
+        keep = np.ones(len(last), bool)
+        keep[:-1] = steps['entity'][last][1:] != steps['entity'][last][:-1]
+        return steps['candidate'][last[keep]]
+
+    def describe(self, candidate: int) -> Dict[str, Any]:
+        action = ACTIONS[self.action[candidate]]
+        entity = int(self.entity[candidate])
+        cost, tons = float(self.cost[candidate]), float(self.abatement[candidate])
+        row = {
+            'entity_type': ENTITY_TYPES[action],
+            'entity_id': self.labels[entity] if self.labels is not None else entity,
+            'action': action,
+            'cost': cost,
+            'abatement_tons': tons,
+            'cost_per_ton': cost / tons if tons else None
+        }
+        if action == 'mode_shift' and self.modes:
+            row['to_mode'] = self.modes[self.target[candidate]]
+        elif action == 'order_reduction':
+            row['level'] = ORDER_LEVELS[self.target[candidate]]
+        return row
+
+    def summary(self, budget: Optional[float] = None, max_cost_per_ton: Optional[float] = None,
+                limit: int = 20, points: int = 50) -> Dict[str, Any]:
+        """JSON-ready curve, selection totals per action and the cheapest chosen actions"""
+        chosen = self.select(budget, max_cost_per_ton)
+        cost, tons = self.cost[chosen], self.abatement[chosen]
+        by_action = {}
+        for code, name in enumerate(ACTIONS):
+            mask = self.action[chosen] == code
+            if mask.any():
+                by_action[name] = {'actions': int(mask.sum()), 'abatement_tons': float(tons[mask].sum()),
+                                   'cost': float(cost[mask].sum())}
+        cheapest = chosen[np.argsort(cost / tons, kind='stable')[:limit]]
+        return {
+            'candidates': self.candidates,
+            'steps': len(self.steps['slope']),
+            'potential_abatement_tons': self.potential,
+            'curve': self.curve(points),
+            'selection': {
+                'budget': budget,
+                'max_cost_per_ton': max_cost_per_ton,
+                'actions': len(chosen),
+                'abatement_tons': float(tons.sum()),
+                'cost': float(cost.sum()),
+                'by_action': by_action
+            },
+            'top_actions': [self.describe(i) for i in cheapest]
+        }
+
+
+def reduction_opportunities(summary: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """CarbonAccountingAgent-style opportunities from a MACC selection"""
+    opportunities = []
+    for action, totals in summary['selection']['by_action'].items():
+        category, text = ACTION_CATEGORIES[action]
+        opportunities.append({
+            'category': category,
+            'potential_reduction_tons': totals['abatement_tons'],
+            'action': text,
+            'cost': totals['cost'],
+            'actions': totals['actions']
+        })
+    return sorted(opportunities, key=lambda o: o['potential_reduction_tons'], reverse=True)
+
+
+def _costs(overrides: Optional[Dict[str, Any]]) -> Dict[str, float]:
+    costs = dict(DEFAULT_COSTS)
+    for key, value in (overrides or {}).items():
+        if key not in DEFAULT_COSTS:
+            raise MACCError(f"Unknown cost assumption '{key}', expected one of {list(DEFAULT_COSTS)}")
+        try:
+            costs[key] = float(value)
+        except (TypeError, ValueError):
+            raise MACCError(f"Cost assumption '{key}' must be a number")
+    if not 0 <= costs['benchmark_percentile'] <= 100:
+        raise MACCError('benchmark_percentile must be between 0 and 100')
+    return costs
+
+
+def parse_options(options: Any) -> Dict[str, Any]:
+    """Validated options from True or a dict of budget/max_cost_per_ton/costs/limit"""
+    if options is True:
+        options = {}
+    if not isinstance(options, dict):
+        raise MACCError("abatement must be true or an object")
+    parsed = {'costs': _costs(options.get('costs')), 'limit': options.get('limit', 20)}
+    for key in ('budget', 'max_cost_per_ton'):
+        value = options.get(key)
+        if value is not None:
+            if isinstance(value, bool) or not isinstance(value, (int, float)) or not np.isfinite(value):
+                raise MACCError(f"abatement.{key} must be a number")
+            if key == 'budget' and value < 0:
+                raise MACCError("abatement.budget must not be negative")
+        parsed[key] = value
+    if not isinstance(parsed['limit'], int) or isinstance(parsed['limit'], bool) or not 0 <= parsed['limit'] <= 1000:
+        raise MACCError("abatement.limit must be an integer between 0 and 1000")
+    return parsed
+
+
+def build_macc(supply_chain_data: Dict[str, Any], results: Dict[str, Any],
+               costs: Optional[Dict[str, Any]] = None, factors=None) -> MACC:
+    """Candidate actions for one analysis; agent rows line up with input rows by position"""
+    costs = _costs(costs)
+    factors = factors or load_emission_factors()
+    supplier_rows = results.get('sourcing', {}).get('analysis') or []
+    route_rows = results.get('logistics', {}).get('optimized_routes') or []
+    waste_rows = results.get('inventory', {}).get('waste_analysis') or []
+    routes = list(islice(supply_chain_data.get('routes') or [], len(route_rows)))
+    inventory = list(islice(supply_chain_data.get('inventory') or [], len(waste_rows)))
+    labels: List[str] = []
+    columns = []  # (entity, action, cost, abatement, target) per action family
+
+    # Supplier switch: down to the best-in-class footprint
+    if supplier_rows:
+        carbon = row_column(supplier_rows, 'carbon_footprint', 0)
+        target = np.percentile(carbon, costs['benchmark_percentile'])
+        tons = np.maximum(carbon - target, 0) * (1 + factors.multiplier('operations_share_of_sourcing'))
+        ids = np.arange(len(labels), len(labels) + len(carbon))
+        labels.extend(str(row.get('supplier_id')) for row in supplier_rows)
+        mask = tons > 0
+        columns.append((ids[mask], ACTIONS.index('supplier_switch'),
+                        costs['supplier_switch_fixed'] + costs['supplier_premium_per_ton'] * tons[mask], tons[mask],
+                        np.zeros(int(mask.sum()), np.int16)))
+
+    # Mode shift: every feasible mode with a lower factor for the route
+    if routes:
+        n_modes = len(factors.modes)
+        distance = row_column(routes, 'distance_km', 0)
+        mode = factors.mode_codes(row.get('transport_mode') or 'truck' for row in routes)
+        region = factors.region_codes(row.get('region') for row in routes)
+        vehicle_class = factors.vehicle_class_codes(row.get('vehicle_class') for row in routes)
+        year = row_column(routes, 'year', np.nan)
+        current = factors.lookup(mode, region, vehicle_class, year)
+        cargo = row_column(routes, 'cargo_tonnes', factors.multiplier('default_cargo_tonnes'))
+        cost_per_km = np.array([TRANSPORT_COST_PER_KM.get(m, 0.0) for m in factors.modes])
+        feasible = factors.feasible_shifts(mode, distance)
+        ids = np.arange(len(labels), len(labels) + len(routes))
+        labels.extend(str(row.get('id', row.get('route_id'))) for row in routes)
+        for to in range(n_modes):
+            # Target modes run the default vehicle class
+            tons = freight_emissions(distance, current - factors.lookup(np.full(len(routes), to), region, None, year),
+                                     cargo)
+            mask = (tons > 0) & feasible[:, to]
+            cost = costs['mode_shift_fixed'] + distance * (cost_per_km[to] - cost_per_km[mode])
+            columns.append((ids[mask], ACTIONS.index('mode_shift'), cost[mask], tons[mask],
+                            np.full(int(mask.sum()), to, np.int16)))
+
+    # Order reduction: InventoryAgent waste% = clip((months - 3) * 5, 0, 50)
+    if inventory:
+        stock = row_column(inventory, 'current_stock', 0)
+        demand = np.maximum(row_column(inventory, 'monthly_demand', 1), 1)
+        holding = row_column(inventory, 'holding_cost', costs['holding_cost_per_unit'])
+        months = stock / demand
+        target_months = costs['target_months_of_stock']
+        waste_per_percent = factors.multiplier('inventory_waste_per_percent')
+        waste_now = np.clip((months - 3) * 5, 0, MAX_WASTE_PERCENT)
+        ids = np.arange(len(labels), len(labels) + len(inventory))
+        labels.extend(str(row.get('id')) for row in inventory)
+        for level, name in enumerate(ORDER_LEVELS):
+            new_months = np.minimum(months, target_months if name == 'full' else (months + target_months) / 2)
+            tons = (waste_now - np.clip((new_months - 3) * 5, 0, MAX_WASTE_PERCENT)) * waste_per_percent
+            mask = tons > 0
+            cost = costs['order_change_fixed'] - (months - new_months) * demand * holding
+            columns.append((ids[mask], ACTIONS.index('order_reduction'), cost[mask], tons[mask],
+                            np.full(int(mask.sum()), level, np.int16)))
+
+    if not columns:
+        return MACC(np.zeros(0), np.zeros(0), np.zeros(0), np.zeros(0), labels=labels, modes=factors.modes)
+    entity, action, cost, tons, target = zip(*columns)
+    return MACC(np.concatenate(entity),
+                np.concatenate([np.full(len(e), a, np.int8) for e, a in zip(entity, action)]),
+                np.concatenate(cost), np.concatenate(tons), np.concatenate(target),
+                labels=labels, modes=factors.modes)
@@ -0,0 +1,237 @@
+"""
+Peer benchmarking from quantile sketches of every analyzed supply chain.
+
+``PeerBenchmarks`` keeps one KLL sketch per (metric, segment); the segment
+``all`` always receives every observation. ``benchmark`` only reads, so
+re-running an analysis (retries, shadow execution) ranks it the same way;
+the caller records each finished analysis once with ``observe``.
+Percentiles reflect real history while memory stays fixed per sketch. With
+fewer than ``MIN_PEERS`` observations the static footprint thresholds are
+used instead.
+
+Sketches persist as one JSON file of base64 sketches (``BENCHMARK_SKETCH_PATH``),
+written atomically every ``save_every`` observations, and registries from
+sharded workers combine with ``merge`` / ``merge_files``. Footprints are only
+comparable under one set of emission factors, so every registry records the
+factor file ``version`` it was built with; sketches from another version (or
+from files without one) are skipped with a warning, and a new factor version
+starts from the static thresholds again.
+"""
+
+import base64
+import json
+import os
+import tempfile
+import threading
+import warnings
+from typing import Any, Dict, Iterable, Optional, Set
+
+from .emission_factors import load_emission_factors
+from .quantile_sketch import KLLSketch
+
+METRICS = ('total_footprint', 'sustainability_score')
+# Lower footprint is better; higher score is better
+LOWER_IS_BETTER = {'total_footprint': True, 'sustainability_score': False}
+ALL_SEGMENT = 'all'
+MIN_PEERS = 20
+MAX_SEGMENTS = 1000
+MAX_SEGMENT_LENGTH = 64
+SKETCH_K = 200
+RATINGS = ((90, 'Excellent'), (70, 'Good'), (50, 'Average'), (0, 'Needs Improvement'))
+# (total footprint in t CO2e, percentile) for analyses without enough peers.
+# Sourcing dominates the total at roughly 40-50 t CO2e per supplier, so a
+# couple of suppliers rank 90th and a dozen or more fall below 50th.
+STATIC_THRESHOLDS = ((100, 90), (300, 70), (500, 50))
+
+
+class SegmentError(ValueError):
+    """Segment that is not a short non-empty string"""
+
+
+def parse_segment(segment: Any) -> str:
+    """`segment` if it is a non-empty string of at most MAX_SEGMENT_LENGTH characters"""
+    if not isinstance(segment, str) or not 0 < len(segment) <= MAX_SEGMENT_LENGTH:
+        raise SegmentError(f"segment must be a string of 1 to {MAX_SEGMENT_LENGTH} characters")
+    return segment
+
+
+def _valid_segment(segment: Any) -> Optional[str]:
+    """The segment, or None when it would not be a usable sketch key"""
+    try:
+        return parse_segment(segment)
+    except SegmentError:
+        return None
+
+
+def _ordinal(n: int) -> str:
+    suffix = 'th' if 10 <= n % 100 <= 20 else {1: 'st', 2: 'nd', 3: 'rd'}.get(n % 10, 'th')
+    return f'{n}{suffix}'
+
+
+def static_benchmark(total_footprint: float) -> Dict[str, Any]:
+    """Fixed thresholds on a t CO2e total, used until enough peers have been seen"""
+    for limit, percentile in STATIC_THRESHOLDS:
+        if total_footprint < limit:
+            break
+    else:
+        percentile = 25
+    return {
+        'performance_rating': next(name for floor, name in RATINGS if percentile >= floor),
+        'industry_percentile': _ordinal(percentile),
+        'comparison': f'Your footprint is in the {_ordinal(percentile)} percentile of similar companies',
+        'source': 'static'
+    }
+
+
+class PeerBenchmarks:
+    """Sketches of footprints and scores per segment"""
+
+    def __init__(self, path: Optional[str] = None, save_every: int = 50, k: int = SKETCH_K,
+                 factors_version: Optional[str] = None):
+        self.path = path
+        self.save_every = save_every
+        self.k = k
+        self.factors_version = factors_version or load_emission_factors().version
+        self._sketches: Dict[tuple, KLLSketch] = {}
+        self._segments: Set[str] = set()
+        self._unsaved = 0
+        self._lock = threading.Lock()
+        if path and os.path.exists(path):
+            self.merge_files([path])
+
+    def _sketch(self, metric: str, segment: str) -> KLLSketch:
+        key = (metric, segment)
+        sketch = self._sketches.get(key)
+        if sketch is None:
+            sketch = self._sketches[key] = KLLSketch(self.k)
+            self._segments.add(segment)
+        return sketch
+
+    def segments(self) -> Iterable[str]:
+        return sorted(self._segments)
+
+    def peers(self, metric: str, segment: str = ALL_SEGMENT) -> int:
+        sketch = self._sketches.get((metric, segment))
+        return sketch.n if sketch else 0
+
+    def percentile(self, metric: str, value: float, segment: str = ALL_SEGMENT) -> Optional[float]:
+        """Share of peers (0-100) this value beats; None with no peers"""
+        sketch = self._sketches.get((metric, segment))
+        if sketch is None or sketch.n == 0:
+            return None
+        rank = sketch.rank(value)
+        return (1 - rank) * 100 if LOWER_IS_BETTER[metric] else rank * 100
+
+    def observe(self, values: Dict[str, float], segment: Optional[str] = None):
+        """Record one analysis; an invalid segment only feeds the 'all' sketches"""
+        segment = _valid_segment(segment)
+        with self._lock:
+            segments = [ALL_SEGMENT]
+            if segment and segment != ALL_SEGMENT:
+                if segment in self._segments or len(self._segments) < MAX_SEGMENTS:
+                    segments.append(segment)
+            for metric, value in values.items():
+                for name in segments:
+                    self._sketch(metric, name).update(value)
+            self._unsaved += 1
+            if self.path and self._unsaved >= self.save_every:
+                self._save_locked()
+
+    def benchmark(self, total_footprint: float, sustainability_score: float,
+                  segment: Optional[str] = None) -> Dict[str, Any]:
+        """Rank against the peers observed so far (read-only)"""
+        segment = _valid_segment(segment)
+        with self._lock:
+            scope = segment if segment and self.peers('total_footprint', segment) >= MIN_PEERS else ALL_SEGMENT
+            peers = self.peers('total_footprint', scope)
+            if peers >= MIN_PEERS:
+                footprint_pct = self.percentile('total_footprint', total_footprint, scope)
+                score_pct = self.percentile('sustainability_score', sustainability_score, scope)
+        if peers < MIN_PEERS:
+            result = static_benchmark(total_footprint)
+            result['peers'] = peers
+        else:
+            rounded = int(footprint_pct)
+            result = {
+                'performance_rating': next(name for floor, name in RATINGS if footprint_pct >= floor),
+                'industry_percentile': _ordinal(rounded),
+                'comparison': f'Your footprint is lower than {footprint_pct:.0f}% of {peers} analyzed '
+                              f'supply chains' + (f" in '{scope}'" if scope != ALL_SEGMENT else ''),
+                'source': 'peer_sketch',
+                'footprint_percentile': round(footprint_pct, 1),
+                'score_percentile': round(score_pct, 1),
+                'peers': peers
+            }
+        result['segment'] = scope
+        return result
+
+    def distribution(self, metric: str, segment: str = ALL_SEGMENT,
+                     quantiles=(0.05, 0.25, 0.5, 0.75, 0.95)) -> Dict[str, Any]:
+        with self._lock:
+            sketch = self._sketches.get((metric, segment))
+            if sketch is None:
+                return {'peers': 0}
+            return {'peers': sketch.n, **{f'p{int(q * 100)}': sketch.quantile(q) for q in quantiles}}
+
+    # --- persistence and merging ---------------------------------------------
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'format': 'kll',
+            'k': self.k,
+            'factors_version': self.factors_version,
+            'sketches': {f'{metric}|{segment}': base64.b64encode(sketch.to_bytes()).decode()
+                         for (metric, segment), sketch in self._sketches.items()}
+        }
+
+    def merge_dict(self, data: Dict[str, Any]) -> bool:
+        """Fold in serialized sketches; False if they belong to another factor version"""
+        if data.get('factors_version') != self.factors_version:
+            warnings.warn(f"Skipping peer sketches for emission factors {data.get('factors_version')!r}, "
+                          f"expected {self.factors_version!r}")
+            return False
+        with self._lock:
+            for key, encoded in data.get('sketches', {}).items():
+                metric, segment = key.split('|', 1)
+                self._sketch(metric, segment).merge(KLLSketch.from_bytes(base64.b64decode(encoded)))
+        return True
+
+    def merge(self, other: 'PeerBenchmarks') -> 'PeerBenchmarks':
+        """Fold another registry (e.g. from a sharded worker) into this one"""
+        self.merge_dict(other.to_dict())
+        return self
+
+    def merge_files(self, paths: Iterable[str]):
+        for path in paths:
+            with open(path) as f:
+                self.merge_dict(json.load(f))
+
+    def _save_locked(self):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        with os.fdopen(fd, 'w') as f:
+            json.dump(self.to_dict(), f)
+        os.replace(tmp, self.path)
+        self._unsaved = 0
+
+    def save(self, path: Optional[str] = None):
+        with self._lock:
+            if path:
+                self.path = path
+            if self.path:
+                self._save_locked()
+
+
+_default: Optional[PeerBenchmarks] = None
+_default_lock = threading.Lock()
+
+
+def default_benchmarks() -> PeerBenchmarks:
+    """Process-wide registry, persisted to BENCHMARK_SKETCH_PATH when set"""
+    global _default
+    if _default is None:
+        with _default_lock:
+            if _default is None:
+                _default = PeerBenchmarks(os.getenv('BENCHMARK_SKETCH_PATH') or None)
+    return _default
@@ -0,0 +1,259 @@
+"""
+GHG Protocol scopes for the footprint, and allocation of shared emissions to products.
+
+Every footprint category maps onto scope columns (``COLUMNS``) through one
+matrix built from the emission factor table:
+
+- ``sourcing``: Scope 3 category 1 (purchased goods and services)
+- ``logistics``: Scope 3 category 4 (upstream transportation and distribution)
+- ``inventory_waste``: Scope 3 category 5 (waste generated in operations)
+- ``operations``: Scope 2 for the ``operations_scope_2_share`` multiplier
+  (purchased electricity), Scope 1 for the rest
+
+``scope_breakdown`` applies it to a footprint breakdown. ``allocate_products``
+splits supplier and route emissions over the products they serve, using
+line items ``{'product_id', 'supplier_id', 'route_id', 'mass_kg', 'value'}``
+(a list of rows or a dict of columns). Supplier emissions follow each line's
+share of the supplier's value, and lane emissions its share of the lane's
+mass, by default; a source whose lines all weigh zero is split evenly.
+Inventory waste is already per product.
+
+The allocation matrix has one non-zero per line item (its share of the
+source), so allocating is a sparse matrix product done with ``np.bincount``
+over line items, one pass per scope column.
+"""
+
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .emission_factors import load_emission_factors
+
+CATEGORIES = ('sourcing', 'logistics', 'inventory_waste', 'operations')
+COLUMNS = ('scope_1', 'scope_2', 'scope_3_cat_1', 'scope_3_cat_4', 'scope_3_cat_5')
+SCOPE_3_CATEGORIES = {
+    'scope_3_cat_1': (1, 'Purchased goods and services'),
+    'scope_3_cat_4': (4, 'Upstream transportation and distribution'),
+    'scope_3_cat_5': (5, 'Waste generated in operations')
+}
+BASES = {'mass': 'mass_kg', 'value': 'value'}
+DEFAULT_BASIS = {'suppliers': 'value', 'routes': 'mass'}
+
+
+class AllocationError(ValueError):
+    """Unknown allocation basis or malformed line items"""
+
+
+def scope_matrix(factors=None) -> np.ndarray:
+    """(CATEGORIES x COLUMNS) shares of each category's emissions per scope column"""
+    factors = factors or load_emission_factors()
+    electricity = factors.multiplier('operations_scope_2_share')
+    matrix = np.zeros((len(CATEGORIES), len(COLUMNS)))
+    matrix[CATEGORIES.index('sourcing'), COLUMNS.index('scope_3_cat_1')] = 1
+    matrix[CATEGORIES.index('logistics'), COLUMNS.index('scope_3_cat_4')] = 1
+    matrix[CATEGORIES.index('inventory_waste'), COLUMNS.index('scope_3_cat_5')] = 1
+    matrix[CATEGORIES.index('operations'), COLUMNS.index('scope_1')] = 1 - electricity
+    matrix[CATEGORIES.index('operations'), COLUMNS.index('scope_2')] = electricity
+    return matrix
+
+
+def _by_scope(columns: np.ndarray) -> Dict[str, Any]:
+    """Scope totals plus Scope 3 per category from a COLUMNS vector"""
+    values = dict(zip(COLUMNS, (float(v) for v in columns)))
+    return {
+        'scope_1': values['scope_1'],
+        'scope_2': values['scope_2'],
+        'scope_3': sum(values[c] for c in SCOPE_3_CATEGORIES),
+        'scope_3_categories': [{'category': number, 'name': name, 'emissions': values[column]}
+                               for column, (number, name) in SCOPE_3_CATEGORIES.items()]
+    }
+
+
+def scope_breakdown(footprint_breakdown: Dict[str, float], factors=None) -> Dict[str, Any]:
+    """Scope 1/2/3 totals of a CarbonAccountingAgent footprint breakdown"""
+    vector = np.array([footprint_breakdown.get(c, 0.0) for c in CATEGORIES], float)
+    return _by_scope(vector @ scope_matrix(factors))
+
+
+def parse_basis(options: Any) -> Dict[str, str]:
+    """Validated {'suppliers': basis, 'routes': basis} from None or a partial dict"""
+    if options is None:
+        options = {}
+    if not isinstance(options, dict):
+        raise AllocationError("allocation must be an object")
+    basis = dict(DEFAULT_BASIS)
+    for source, value in options.items():
+        if source not in DEFAULT_BASIS:
+            raise AllocationError(f"Unknown allocation source '{source}', expected one of {list(DEFAULT_BASIS)}")
+        if value not in BASES:
+            raise AllocationError(f"Allocation basis must be one of {list(BASES)}, got '{value}'")
+        basis[source] = value
+    return basis
+
+
+def allocate_shared(source_codes: np.ndarray, product_codes: np.ndarray, weights: np.ndarray,
+                    source_emissions: np.ndarray, n_products: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Split (sources x k) emissions over products by line-item weight
+
+    `source_codes` is -1 for lines whose source is unknown; those lines are
+    ignored. Returns (products x k) allocated emissions and the (k,) totals
+    of sources without any line item.
+    """
+    n_sources, k = source_emissions.shape
+    known = source_codes >= 0
+    source_codes, product_codes, weights = source_codes[known], product_codes[known], weights[known]
+    counts = np.bincount(source_codes, minlength=n_sources)
+    totals = np.bincount(source_codes, weights=weights, minlength=n_sources)
+    even = (totals <= 0) & (counts > 0)
+    if even.any():
+        weights = np.where(even[source_codes], 1.0, weights)
+        totals = np.where(even, counts, totals)
+    share = weights / totals[source_codes]
+    allocated = np.empty((n_products, k))
+    for j in range(k):
+        allocated[:, j] = np.bincount(product_codes, weights=share * source_emissions[source_codes, j],
+                                      minlength=n_products)
+    return allocated, source_emissions[counts == 0].sum(axis=0)
+
+
+class ProductAllocation:
+    """Emissions per product and scope column after allocation"""
+
+    def __init__(self, products: List[str], emissions: np.ndarray, unallocated: np.ndarray,
+                 basis: Dict[str, str], line_items: int, unmatched: int):
+        self.products = products
+        self.emissions = emissions
+        self.unallocated = unallocated
+        self.basis = basis
+        self.line_items = line_items
+        self.unmatched = unmatched
+        self._index = {product: i for i, product in enumerate(products)}
+
+    def totals(self) -> np.ndarray:
+        return self.emissions.sum(axis=1)
+
+    def product(self, product_id: str) -> Optional[Dict[str, Any]]:
+        i = self._index.get(str(product_id))
+        if i is None:
+            return None
+        row = self.emissions[i]
+        return {'product_id': self.products[i], 'total': float(row.sum()), **_by_scope(row)}
+
+    def top(self, limit: int = 20) -> List[Dict[str, Any]]:
+        totals = self.totals()
+        count = min(limit, len(totals))
+        top = np.argpartition(-totals, count - 1)[:count] if count else np.zeros(0, np.intp)
+        top = top[np.argsort(-totals[top], kind='stable')]
+        return [self.product(self.products[i]) for i in top]
+
+    def summary(self, limit: int = 20) -> Dict[str, Any]:
+        return {
+            'basis': self.basis,
+            'line_items': self.line_items,
+            'unmatched_line_items': self.unmatched,
+            'products': len(self.products),
+            'allocated': _by_scope(self.emissions.sum(axis=0)),
+            'unallocated': _by_scope(self.unallocated),
+            'top_products': self.top(limit)
+        }
+
+
+def parse_line_items(line_items: Any) -> Dict[str, Sequence]:
+    """Validated line item columns from a list of rows or a dict of columns
+
+    Weight columns come back as float arrays; a missing weight counts as 0.
+    """
+    if isinstance(line_items, dict):
+        columns = dict(line_items)
+        if not all(isinstance(v, (list, tuple, np.ndarray)) for v in columns.values()):
+            raise AllocationError('line_items columns must be lists')
+        if len({len(v) for v in columns.values()}) > 1:
+            raise AllocationError('line_items columns must have equal length')
+    elif isinstance(line_items, (list, tuple)):
+        if not all(isinstance(row, dict) for row in line_items):
+            raise AllocationError('line_items rows must be objects')
+        keys = ('product_id', 'supplier_id', 'route_id', 'mass_kg', 'value')
+        columns = {key: [row.get(key) for row in line_items] for key in keys}
+    else:
+        raise AllocationError('line_items must be a list of rows or a dict of columns')
+
+    n = len(next(iter(columns.values()), ()))
+    if n and columns.get('product_id') is None:
+        raise AllocationError("line_items need a 'product_id'")
+    for key in BASES.values():
+        if columns.get(key) is not None:
+            try:
+                columns[key] = _weights(columns[key], n)
+            except (TypeError, ValueError):
+                raise AllocationError(f"line_items '{key}' must be numbers") from None
+    return columns
+
+
+def _weights(column: Optional[Sequence], n: int) -> np.ndarray:
+    if column is None:
+        return np.zeros(n)
+    if isinstance(column, np.ndarray) and column.dtype.kind in 'iuf':
+        return np.nan_to_num(column.astype(np.float64, copy=False))
+    return np.fromiter((0.0 if v is None else v for v in column), np.float64, n)
+
+
+def _codes(column: Optional[Sequence], index: Dict[str, int], n: int) -> np.ndarray:
+    if column is None:
+        return np.full(n, -1, np.intp)
+    return np.fromiter((index.get(str(v), -1) for v in column), np.intp, n)
+
+
+def allocate_products(supply_chain_data: Dict[str, Any], results: Dict[str, Any],
+                      options: Any = None, factors=None) -> ProductAllocation:
+    """Allocate one analysis' supplier and lane emissions to products via its line items"""
+    basis = parse_basis(options)
+    factors = factors or load_emission_factors()
+    matrix = scope_matrix(factors)
+    columns = parse_line_items(supply_chain_data.get('line_items') or [])
+    n = len(next(iter(columns.values()), ()))
+
+    product_index: Dict[str, int] = {}
+    product_codes = np.fromiter((product_index.setdefault(str(p), len(product_index))
+                                 for p in columns.get('product_id', ())), np.intp, n)
+    waste_rows = results.get('inventory', {}).get('waste_analysis') or []
+    waste_codes = np.fromiter((product_index.setdefault(str(row.get('product_id')), len(product_index))
+                               for row in waste_rows), np.intp, len(waste_rows))
+    n_products = len(product_index)
+    emissions = np.zeros((n_products, len(COLUMNS)))
+    unallocated = np.zeros(len(COLUMNS))
+    matched = np.zeros(n, bool)
+
+    # Supplier emissions: sourcing plus the operations estimated from it
+    supplier_rows = results.get('sourcing', {}).get('analysis') or []
+    if supplier_rows:
+        carbon = np.array([row.get('carbon_footprint', 0) for row in supplier_rows], float)
+        operations = carbon * factors.multiplier('operations_share_of_sourcing')
+        source = np.outer(carbon, matrix[CATEGORIES.index('sourcing')]) \
+            + np.outer(operations, matrix[CATEGORIES.index('operations')])
+        index = {str(row.get('supplier_id')): i for i, row in enumerate(supplier_rows)}
+        codes = _codes(columns.get('supplier_id'), index, n)
+        allocated, missing = allocate_shared(codes, product_codes, _weights(columns.get(BASES[basis['suppliers']]), n),
+                                             source, n_products)
+        emissions += allocated
+        unallocated += missing
+        matched |= codes >= 0
+
+    route_rows = results.get('logistics', {}).get('optimized_routes') or []
+    if route_rows:
+        current = np.array([row.get('current_emissions', 0) for row in route_rows], float)
+        source = np.outer(current, matrix[CATEGORIES.index('logistics')])
+        index = {str(row.get('route_id')): i for i, row in enumerate(route_rows)}
+        codes = _codes(columns.get('route_id'), index, n)
+        allocated, missing = allocate_shared(codes, product_codes, _weights(columns.get(BASES[basis['routes']]), n),
+                                             source, n_products)
+        emissions += allocated
+        unallocated += missing
+        matched |= codes >= 0
+
+    if waste_rows:
+        waste = np.array([row.get('waste_percentage', 0) for row in waste_rows], float) \
+            * factors.multiplier('inventory_waste_per_percent')
+        emissions += np.outer(np.bincount(waste_codes, weights=waste, minlength=n_products),
+                              matrix[CATEGORIES.index('inventory_waste')])
+
+    return ProductAllocation(list(product_index), emissions, unallocated, basis, n, int(n - matched.sum()))
@@ -1,43 +1,81 @@
-import boto3
 import json
 import os
 from typing import Dict, Any, List
 from strands_client import StrandsWrapper
+from aws_config import LazyClient
+from orchestration.instrumentation import span
+from .carbon_pricing import CarbonPricing
+from .units import OUTPUT_UNITS
 
 class SourcingAgent:
+    bedrock_client = LazyClient('bedrock-runtime')
+
     def __init__(self):
-        self.bedrock_client = boto3.client('bedrock-runtime')
         self.strands = StrandsWrapper(api_key=os.getenv('STRANDS_API_KEY'))
         
-    def analyze_supplier_sustainability(self, suppliers: List[Dict]) -> Dict[str, Any]:
-        """Analyze supplier sustainability profiles using Strands AI"""
+    def analyze_supplier_sustainability(self, suppliers: List[Dict], carbon_price: Any = None) -> Dict[str, Any]:
+        """Analyze supplier sustainability profiles using Strands AI
+        
+        With a `carbon_price` spec (see agents/carbon_pricing.py) each supplier
+        gets a carbon-adjusted cost (its 'cost' plus footprint times the price
+        of the first curve, by 'location' and 'year') and top_suppliers ranks
+        by that cost instead of the sustainability score.
+        """
         results = []
         
-        for supplier in suppliers:
-            # Use Strands for enhanced sustainability analysis
-            strands_analysis = self.strands.analyze_sustainability(supplier)
-            
-            score = self._calculate_sustainability_score(supplier)
-            recommendations = self._generate_recommendations(supplier, score)
-            
-            results.append({
-                'supplier_id': supplier.get('id'),
-                'name': supplier.get('name'),
-                'sustainability_score': score,
-                'carbon_footprint': supplier.get('carbon_footprint', 0),
-                'certifications': supplier.get('certifications', []),
-                'recommendations': recommendations,
-                'risk_level': self._assess_risk_level(score),
-                'strands_insights': strands_analysis.get('insights', []),
-                'strands_explanation': self.strands.generate_explanation({'sustainability_score': score})
-            })
+        with span('per_row_loop'):
+            for supplier in suppliers:
+                # Use Strands for enhanced sustainability analysis
+                with span('strands_calls'):
+                    strands_analysis = self.strands.analyze_sustainability(supplier)
+                
+                with span('scoring'):
+                    score = self._calculate_sustainability_score(supplier)
+                    recommendations = self._generate_recommendations(supplier, score)
+                
+                with span('strands_calls'):
+                    strands_explanation = self.strands.generate_explanation({'sustainability_score': score})
+                
+                results.append({
+                    'supplier_id': supplier.get('id'),
+                    'name': supplier.get('name'),
+                    'sustainability_score': score,
+                    'carbon_footprint': supplier.get('carbon_footprint', 0),
+                    'certifications': supplier.get('certifications', []),
+                    'recommendations': recommendations,
+                    'risk_level': self._assess_risk_level(score),
+                    'strands_insights': strands_analysis.get('insights', []),
+                    'strands_explanation': strands_explanation
+                })
+        
+        pricing = CarbonPricing.from_spec(carbon_price)
+        if pricing is not None:
+            with span('carbon_pricing'):
+                cost = [supplier.get('cost') or 0 for supplier in suppliers]
+                adjusted = pricing.adjusted_costs(cost, [r['carbon_footprint'] or 0 for r in results],
+                                                  [supplier.get('location') for supplier in suppliers],
+                                                  [supplier.get('year') for supplier in suppliers])
+                for row, base, value in zip(results, cost, adjusted[0].tolist()):
+                    row['carbon_adjusted_cost'] = value
+                    row['carbon_cost'] = value - base
+        
+        with span('ranking'):
+            if pricing is not None:
+                top_suppliers = sorted(results, key=lambda x: x['carbon_adjusted_cost'])[:5]
+            else:
+                top_suppliers = sorted(results, key=lambda x: x['sustainability_score'], reverse=True)[:5]
         
-        return {
+        result = {
             'agent': 'sourcing',
             'analysis': results,
-            'top_suppliers': sorted(results, key=lambda x: x['sustainability_score'], reverse=True)[:5],
-            'strands_powered': True
+            'top_suppliers': top_suppliers,
+            'strands_powered': True,
+            'units': OUTPUT_UNITS['sourcing']
         }
+        if pricing is not None:
+            result['carbon_pricing'] = {'ranking_basis': 'carbon_adjusted_cost',
+                                        **pricing.summary(cost, adjusted, [r['supplier_id'] for r in results])}
+        return result
     
     def _calculate_sustainability_score(self, supplier: Dict) -> float:
         """Calculate sustainability score (0-100)"""
@@ -0,0 +1,247 @@
+"""
+Unit-tagged arrays for emissions math.
+
+A ``UnitArray`` is a numpy array plus one unit for the whole column, so unit
+checks and conversions happen once per operation rather than per value:
+converting is a single scalar multiply, and the arithmetic itself is plain
+numpy. Adding, subtracting or comparing columns of different dimensions
+raises ``UnitError`` before any values are touched; multiplying and dividing
+combine units (``kg CO2e / (t km)`` times ``km`` times ``t`` is ``kg CO2e``).
+
+Unit expressions are space-separated factors with at most one ``/``, e.g.
+``t CO2e``, ``kg CO2e / (t km)``, ``USD / t CO2e`` or ``100 kg CO2e``.
+Emissions (``CO2e``) are a dimension of their own, so cargo tonnes never add
+to tonnes of CO2e.
+
+``OUTPUT_UNITS`` documents the unit of every numeric field the agents emit;
+each agent reports its entry under ``units``.
+"""
+
+import re
+from typing import Any, Dict, Tuple, Union
+
+import numpy as np
+
+DIMENSIONS = ('co2e', 'mass', 'length', 'currency')
+
+
+def _dims(**exponents) -> Tuple[int, ...]:
+    return tuple(exponents.get(d, 0) for d in DIMENSIONS)
+
+
+# symbol -> (scale to the base unit of its dimension, dimension exponents)
+_UNITS = {
+    'g_CO2e': (1e-3, _dims(co2e=1)), 'kg_CO2e': (1.0, _dims(co2e=1)),
+    't_CO2e': (1e3, _dims(co2e=1)), 'kt_CO2e': (1e6, _dims(co2e=1)), 'Mt_CO2e': (1e9, _dims(co2e=1)),
+    'g': (1e-3, _dims(mass=1)), 'kg': (1.0, _dims(mass=1)), 't': (1e3, _dims(mass=1)),
+    'm': (1e-3, _dims(length=1)), 'km': (1.0, _dims(length=1)), 'mi': (1.609344, _dims(length=1)),
+    'USD': (1.0, _dims(currency=1)),
+    '%': (1e-2, _dims()), '1': (1.0, _dims())
+}
+_BASE_SYMBOLS = {'co2e': 'kg CO2e', 'mass': 'kg', 'length': 'km', 'currency': 'USD'}
+
+
+class UnitError(ValueError):
+    """Incompatible or unknown units"""
+
+
+class Unit:
+    """Scale to base units plus dimension exponents; equal units convert exactly"""
+    __slots__ = ('scale', 'dims', 'symbol')
+
+    def __init__(self, scale: float, dims: Tuple[int, ...], symbol: str):
+        self.scale = scale
+        self.dims = dims
+        self.symbol = symbol
+
+    def __repr__(self) -> str:
+        return f"Unit('{self.symbol}')"
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, Unit) and self.dims == other.dims and np.isclose(self.scale, other.scale)
+
+    def __hash__(self) -> int:
+        return hash(self.dims)
+
+    def factor_to(self, other: 'Unit') -> float:
+        """Multiplier from this unit to `other`; UnitError across dimensions"""
+        if self.dims != other.dims:
+            raise UnitError(f"Cannot convert '{self.symbol}' to '{other.symbol}'")
+        return self.scale / other.scale
+
+    def __mul__(self, other: 'Unit') -> 'Unit':
+        return _derived(self.scale * other.scale, tuple(a + b for a, b in zip(self.dims, other.dims)),
+                        f'{self.symbol} {other.symbol}')
+
+    def __truediv__(self, other: 'Unit') -> 'Unit':
+        return _derived(self.scale / other.scale, tuple(a - b for a, b in zip(self.dims, other.dims)),
+                        f'{self.symbol} / ({other.symbol})')
+
+    @property
+    def dimensionless(self) -> bool:
+        return not any(self.dims)
+
+
+def _derived(scale: float, dims: Tuple[int, ...], composed: str) -> Unit:
+    """Named unit when one matches, else the base-unit form (or the composed symbol)"""
+    for name, (known_scale, known_dims) in _UNITS.items():
+        if known_dims == dims and np.isclose(known_scale, scale) and name != '%':
+            return Unit(scale, dims, name.replace('_', ' '))
+    num = [_BASE_SYMBOLS[d] + (f'^{e}' if e > 1 else '') for d, e in zip(DIMENSIONS, dims) if e > 0]
+    den = [_BASE_SYMBOLS[d] + (f'^{-e}' if e < -1 else '') for d, e in zip(DIMENSIONS, dims) if e < 0]
+    if np.isclose(scale, 1.0):
+        symbol = ' '.join(num) or '1'
+        return Unit(scale, dims, f"{symbol} / ({' '.join(den)})" if den else symbol)
+    return Unit(scale, dims, composed)
+
+
+_CACHE: Dict[str, Unit] = {}
+
+
+def _product(expression: str, symbol: str) -> Tuple[float, Tuple[int, ...]]:
+    scale, dims = 1.0, _dims()
+    for token in re.sub(r'(\w+)\s+CO2e\b', r'\1_CO2e', expression.replace('(', ' ').replace(')', ' ')).split():
+        try:
+            value = float(token)
+        except ValueError:
+            if token not in _UNITS:
+                raise UnitError(f"Unknown unit '{token}' in '{symbol}'")
+            factor, token_dims = _UNITS[token]
+            scale *= factor
+            dims = tuple(a + b for a, b in zip(dims, token_dims))
+        else:
+            scale *= value
+    return scale, dims
+
+
+def unit(symbol: Union[str, Unit]) -> Unit:
+    """Parsed (and cached) unit for an expression such as 'kg CO2e / (t km)'"""
+    if isinstance(symbol, Unit):
+        return symbol
+    cached = _CACHE.get(symbol)
+    if cached is None:
+        parts = symbol.split('/')
+        if len(parts) > 2:
+            raise UnitError(f"At most one '/' in unit '{symbol}'")
+        scale, dims = _product(parts[0], symbol)
+        if len(parts) == 2:
+            den_scale, den_dims = _product(parts[1], symbol)
+            scale, dims = scale / den_scale, tuple(a - b for a, b in zip(dims, den_dims))
+        cached = _CACHE[symbol] = Unit(scale, dims, ' '.join(symbol.split()))
+    return cached
+
+
+def convert(values: Any, from_unit: Union[str, Unit], to_unit: Union[str, Unit]) -> Any:
+    """Values (scalar or array) converted between units with one multiply"""
+    factor = unit(from_unit).factor_to(unit(to_unit))
+    return values if factor == 1.0 else np.multiply(values, factor)
+
+
+class UnitArray:
+    """A numpy column with one unit"""
+    __slots__ = ('values', 'unit')
+    # Keep numpy from broadcasting into UnitArray operands elementwise
+    __array_ufunc__ = None
+
+    def __init__(self, values: Any, unit_symbol: Union[str, Unit]):
+        self.values = np.asarray(values, dtype=np.float64) if not isinstance(values, np.ndarray) else values
+        self.unit = unit(unit_symbol)
+
+    def __repr__(self) -> str:
+        return f"UnitArray({self.values!r}, '{self.unit.symbol}')"
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def __getitem__(self, key) -> 'UnitArray':
+        return UnitArray(self.values[key], self.unit)
+
+    def to(self, target: Union[str, Unit]) -> 'UnitArray':
+        target = unit(target)
+        return UnitArray(convert(self.values, self.unit, target), target)
+
+    def magnitude(self, target: Union[str, Unit]) -> np.ndarray:
+        """Plain values in `target` units"""
+        return self.to(target).values
+
+    def sum(self) -> 'UnitArray':
+        return UnitArray(self.values.sum(), self.unit)
+
+    def _aligned(self, other: Any, op: str) -> np.ndarray:
+        """`other` as values in this unit; plain numbers only when dimensionless
+
+        A plain number is read in this column's own unit, so adding 5 to a
+        column in '%' adds five percentage points.
+        """
+        if isinstance(other, UnitArray):
+            return convert(other.values, other.unit, self.unit)
+        if self.unit.dimensionless:
+            return np.asarray(other)
+        raise UnitError(f"Cannot {op} a plain number and '{self.unit.symbol}'")
+
+    def __add__(self, other: Any) -> 'UnitArray':
+        return UnitArray(self.values + self._aligned(other, 'add'), self.unit)
+
+    __radd__ = __add__
+
+    def __sub__(self, other: Any) -> 'UnitArray':
+        return UnitArray(self.values - self._aligned(other, 'subtract'), self.unit)
+
+    def __rsub__(self, other: Any) -> 'UnitArray':
+        return UnitArray(self._aligned(other, 'subtract') - self.values, self.unit)
+
+    def __neg__(self) -> 'UnitArray':
+        return UnitArray(-self.values, self.unit)
+
+    def __mul__(self, other: Any) -> 'UnitArray':
+        if isinstance(other, UnitArray):
+            return UnitArray(self.values * other.values, self.unit * other.unit)
+        return UnitArray(self.values * other, self.unit)
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, other: Any) -> 'UnitArray':
+        if isinstance(other, UnitArray):
+            return UnitArray(self.values / other.values, self.unit / other.unit)
+        return UnitArray(self.values / other, self.unit)
+
+    def __lt__(self, other: Any) -> np.ndarray:
+        return self.values < self._aligned(other, 'compare')
+
+    def __le__(self, other: Any) -> np.ndarray:
+        return self.values <= self._aligned(other, 'compare')
+
+    def __gt__(self, other: Any) -> np.ndarray:
+        return self.values > self._aligned(other, 'compare')
+
+    def __ge__(self, other: Any) -> np.ndarray:
+        return self.values >= self._aligned(other, 'compare')
+
+
+# Emission factor table transport rows (see data/emission_factors.json)
+TRANSPORT_FACTOR = 'kg CO2e / (t km)'
+EMISSIONS = 't CO2e'
+
+
+def freight_emissions(distance_km: Any, factor: Any, cargo_tonnes: Any) -> np.ndarray:
+    """t CO2e of moving `cargo_tonnes` over `distance_km` at a transport factor, per column"""
+    moved = UnitArray(distance_km, 'km') * UnitArray(cargo_tonnes, 't')
+    return (UnitArray(factor, TRANSPORT_FACTOR) * moved).magnitude(EMISSIONS)
+
+
+# Unit of each numeric field in agent outputs, reported under 'units'
+OUTPUT_UNITS = {
+    'sourcing': {'carbon_footprint': EMISSIONS, 'carbon_cost': 'USD', 'carbon_adjusted_cost': 'USD'},
+    'logistics': {'distance_km': 'km', 'cargo_tonnes': 't', 'current_emissions': EMISSIONS,
+                  'optimized_emissions': EMISSIONS, 'emission_reduction': '%', 'total_emission_reduction': '%',
+                  'carbon_adjusted_cost': 'USD', 'optimized_carbon_adjusted_cost': 'USD',
+                  'carbon_adjusted_saving': 'USD'},
+    'inventory': {'waste_percentage': '%', 'total_waste_reduction_potential': '%',
+                  'carbon_cost': 'USD', 'carbon_adjusted_cost': 'USD'},
+    'carbon_accounting': {'total_carbon_footprint_tons': EMISSIONS, 'footprint_breakdown': EMISSIONS,
+                          'footprint_percentage': '%', 'scope_breakdown': EMISSIONS}
+}
+# Fail at import, not mid-request, on a typo in the table above
+for _fields in OUTPUT_UNITS.values():
+    for _symbol in _fields.values():
+        unit(_symbol)
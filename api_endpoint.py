@@ -1,18 +1,91 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify, stream_with_context
 from agents import AgentCore
+from agents.carbon_cube import DIMENSIONS, CubeError
+from agents.carbon_pricing import PricingError, parse_curves
+from agents.carbon_uncertainty import UncertaintyError, parse_options as parse_uncertainty
+from agents.macc import MACCError, parse_options as parse_abatement
+from agents.peer_benchmarks import METRICS as BENCHMARK_METRICS, SegmentError, default_benchmarks, parse_segment
+from agents.scenario_engine import ScenarioEngine, ScenarioError
+from agents.scope_allocation import AllocationError, parse_basis, parse_line_items
 from bedrock_auth import BedrockAuthenticator
+from carbon_ledger import LedgerError
+from orchestration.instrumentation import METRICS
+from orchestration.response_shaping import (ResultStore, ShapingError, page, parse_options,
+                                            shape_results, wants_shaping)
+from serialization import dedup_strings, encode_response, iter_encode, loads
+from compression import (CompressionError, DecompressedSizeError, UnsupportedEncodingError, compress,
+                         decompress, iter_compress, negotiate, should_compress)
 import json
 import os
+import time
+from datetime import datetime, timezone
 
 app = Flask(__name__)
 agent_core = AgentCore()
 auth = BedrockAuthenticator(api_key="strands_api_key_ai_hackathon")
 
+RESPONSE_FORMATS = ('json', 'dedup')
+# Top-level analysis options: (key, parser, error); each is checked here and
+# passed on inside supply_chain_data
+ANALYSIS_OPTIONS = (
+    ('uncertainty', parse_uncertainty, UncertaintyError),
+    ('abatement', parse_abatement, MACCError),
+    ('carbon_price', parse_curves, PricingError),
+    ('allocation', parse_basis, AllocationError),
+    ('segment', parse_segment, SegmentError),
+)
+
+# Full results kept for paging / re-shaping without re-running the analysis
+result_store = ResultStore()
+
+def _json_response(payload, status=200, response_format=None, stream=False):
+    """Encode with the fast serializer; optionally stream in chunks"""
+    if stream:
+        if response_format == 'dedup':
+            payload = dedup_strings(payload)
+        return Response(stream_with_context(iter_encode(payload)), status=status, mimetype='application/json')
+    return Response(encode_response(payload, response_format), status=status, mimetype='application/json')
+
+def _request_json():
+    """Request body as JSON, decoded per its Content-Encoding"""
+    body = decompress(request.get_data(), request.headers.get('Content-Encoding'))
+    return loads(body) if body else None
+
+@app.after_request
+def _compress_response(response):
+    """Compress bodies per Accept-Encoding; small bodies are sent raw"""
+    if response.status_code < 200 or response.status_code == 204 or 'Content-Encoding' in response.headers:
+        return response
+    response.vary.add('Accept-Encoding')
+    encoding = negotiate(request.headers.get('Accept-Encoding'))
+    if encoding is None:
+        return response
+    if response.is_streamed:
+        # Size unknown up front; streamed responses are the large ones
+        response.response = iter_compress(response.response, encoding)
+        response.headers.pop('Content-Length', None)
+    else:
+        body = response.get_data()
+        if not should_compress(len(body), encoding):
+            return response
+        response.set_data(compress(body, encoding))
+    response.headers['Content-Encoding'] = encoding
+    return response
+
 @app.route('/api/sustainability/analyze', methods=['POST'])
 def analyze_sustainability():
     """API endpoint for sustainability analysis with authentication"""
     try:
-        data = request.get_json()
+        try:
+            data = _request_json()
+        except UnsupportedEncodingError as e:
+            return jsonify({'error': str(e)}), 415
+        except DecompressedSizeError as e:
+            return jsonify({'error': str(e)}), 413
+        except (CompressionError, ValueError) as e:
+            return jsonify({'error': f'Invalid request body: {e}'}), 400
+        if not isinstance(data, dict):
+            return jsonify({'error': 'JSON body required'}), 400
         
         # Check API key authentication
         api_key = request.headers.get('X-API-Key') or data.get('api_key')
@@ -23,17 +96,57 @@ def analyze_sustainability():
             }), 401
         
         # Validate required data
-        if not data or 'supply_chain_data' not in data:
+        if 'supply_chain_data' not in data:
             return jsonify({'error': 'supply_chain_data required'}), 400
         
+        response_format = data.get('response_format') or request.args.get('format', 'json')
+        if response_format not in RESPONSE_FORMATS:
+            return jsonify({'error': f"response_format must be one of {list(RESPONSE_FORMATS)}"}), 400
+        try:
+            shaping = parse_options(data)
+        except ShapingError as e:
+            return jsonify({'error': str(e)}), 400
+        deadline_ms = data.get('deadline_ms')
+        if deadline_ms is None:
+            deadline_ms = request.headers.get('X-Request-Deadline-Ms')
+        try:
+            deadline_ms = float(deadline_ms) if deadline_ms is not None else None
+        except (TypeError, ValueError):
+            return jsonify({'error': 'deadline_ms must be a number'}), 400
+        supply_chain_data = data['supply_chain_data']
+        for key, parse, error in ANALYSIS_OPTIONS:
+            value = data.get(key)
+            if value is None or value is False:
+                continue
+            try:
+                parse(value)
+            except error as e:
+                return jsonify({'error': str(e)}), 400
+            supply_chain_data = dict(supply_chain_data, **{key: value})
+        if supply_chain_data.get('line_items') is not None:
+            try:
+                parse_line_items(supply_chain_data['line_items'])
+            except AllocationError as e:
+                return jsonify({'error': str(e)}), 400
+        
         # Run analysis
-        results = agent_core.orchestrate_sustainability_analysis(data['supply_chain_data'])
+        results = agent_core.orchestrate_sustainability_analysis(
+            supply_chain_data,
+            profile=data.get('profile'),
+            deadline_ms=deadline_ms
+        )
+        if wants_shaping(shaping):
+            results = shape_results(results, shaping, result_store.put(results))
         
-        return jsonify({
+        start = time.perf_counter_ns()
+        response = _json_response({
             'status': 'success',
             'results': results,
             'authenticated': True
-        })
+        }, response_format=response_format, stream=bool(data.get('stream_response')))
+        METRICS.observe('api/json_serialization', time.perf_counter_ns() - start)
+        METRICS.incr('analysis_requests_total')
+        return response
         
     except Exception as e:
         return jsonify({
@@ -41,6 +154,118 @@ def analyze_sustainability():
             'message': str(e)
         }), 500
 
+@app.route('/api/sustainability/scenarios', methods=['POST'])
+def evaluate_scenarios():
+    """What-if scenarios against one base dataset, with deltas to the baseline"""
+    try:
+        data = _request_json()
+    except UnsupportedEncodingError as e:
+        return jsonify({'error': str(e)}), 415
+    except DecompressedSizeError as e:
+        return jsonify({'error': str(e)}), 413
+    except (CompressionError, ValueError) as e:
+        return jsonify({'error': f'Invalid request body: {e}'}), 400
+    if not isinstance(data, dict):
+        return jsonify({'error': 'JSON body required'}), 400
+    
+    api_key = request.headers.get('X-API-Key') or data.get('api_key')
+    if not auth.authenticate_request({'api_key': api_key}):
+        return jsonify({'error': 'Invalid or missing API key', 'status': 'unauthorized'}), 401
+    if 'supply_chain_data' not in data or not isinstance(data.get('scenarios'), list):
+        return jsonify({'error': 'supply_chain_data and a scenarios list required'}), 400
+    
+    try:
+        results = ScenarioEngine(data['supply_chain_data']).compare(data['scenarios'])
+    except ScenarioError as e:
+        return jsonify({'error': str(e)}), 400
+    METRICS.incr('scenario_requests_total')
+    return _json_response({'status': 'success', 'results': results, 'authenticated': True})
+
+@app.route('/api/sustainability/results/<result_id>', methods=['GET'])
+@app.route('/api/sustainability/results/<result_id>/<section>', methods=['GET'])
+def stored_results(result_id, section=None):
+    """Re-shape stored results, or page through one per-row section"""
+    if not auth.authenticate_request({'api_key': request.headers.get('X-API-Key')}):
+        return jsonify({'error': 'Invalid or missing API key', 'status': 'unauthorized'}), 401
+    
+    results = result_store.get(result_id)
+    if results is None:
+        return jsonify({'error': 'Unknown or expired result_id'}), 404
+    
+    try:
+        args = request.args.to_dict()
+        if 'limit' in args:
+            args['page_size'] = args.pop('limit')
+        options = parse_options(args)
+        if section is None:
+            return _json_response(shape_results(results, options, result_id))
+        return _json_response(page(results, section, request.args.get('cursor'),
+                                   options['page_size'] or 100, options['fields']))
+    except ShapingError as e:
+        return jsonify({'error': str(e)}), 400
+
+@app.route('/api/sustainability/cubes/<cube_id>', methods=['GET'])
+def carbon_rollup(cube_id):
+    """Roll up / drill down a stored carbon cube: ?by=transport_mode,month&category=logistics"""
+    if not auth.authenticate_request({'api_key': request.headers.get('X-API-Key')}):
+        return jsonify({'error': 'Invalid or missing API key', 'status': 'unauthorized'}), 401
+    
+    cube = agent_core.carbon_cube(cube_id)
+    if cube is None:
+        return jsonify({'error': 'Unknown or expired cube_id'}), 404
+    
+    by = [d for d in request.args.get('by', '').split(',') if d]
+    where = {dim: request.args[dim].split(',') for dim in DIMENSIONS if dim in request.args}
+    try:
+        limit = int(request.args['limit']) if 'limit' in request.args else None
+    except ValueError:
+        return jsonify({'error': 'limit must be an integer'}), 400
+    try:
+        rows = cube.rollup(by, where, limit)
+    except CubeError as e:
+        return jsonify({'error': str(e)}), 400
+    return _json_response({'cube_id': cube_id, 'by': by, 'where': where, 'total': cube.total(where), 'rows': rows})
+
+def _timestamp(value):
+    """Unix seconds from an ISO 8601 date/time (UTC unless it has an offset)"""
+    if value is None:
+        return None
+    parsed = datetime.fromisoformat(value)
+    return (parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)).timestamp()
+
+@app.route('/api/sustainability/ledger', methods=['GET'])
+def carbon_ledger_series():
+    """Emission trend from the ledger: ?entity_id=...&category=logistics&months=24"""
+    if not auth.authenticate_request({'api_key': request.headers.get('X-API-Key')}):
+        return jsonify({'error': 'Invalid or missing API key', 'status': 'unauthorized'}), 401
+    if agent_core.ledger is None:
+        return jsonify({'error': 'Carbon ledger not enabled (set CARBON_LEDGER_DIR)'}), 404
+    
+    args = request.args
+    try:
+        months = int(args['months']) if 'months' in args else None
+        start, end = _timestamp(args.get('start')), _timestamp(args.get('end'))
+    except ValueError:
+        return jsonify({'error': 'months must be an integer; start/end ISO 8601 dates'}), 400
+    try:
+        points = agent_core.ledger.series(args.get('entity_id'), args.get('category'), start, end,
+                                          months, args.get('bucket', 'month'))
+    except LedgerError as e:
+        return jsonify({'error': str(e)}), 400
+    return _json_response({'entity_id': args.get('entity_id'), 'category': args.get('category'), 'series': points})
+
+@app.route('/api/sustainability/benchmarks', methods=['GET'])
+def peer_benchmark_distribution():
+    """Peer distribution of a metric: ?metric=total_footprint&segment=retail"""
+    if not auth.authenticate_request({'api_key': request.headers.get('X-API-Key')}):
+        return jsonify({'error': 'Invalid or missing API key', 'status': 'unauthorized'}), 401
+    metric = request.args.get('metric', 'total_footprint')
+    if metric not in BENCHMARK_METRICS:
+        return jsonify({'error': f"metric must be one of {list(BENCHMARK_METRICS)}"}), 400
+    segment = request.args.get('segment', 'all')
+    return _json_response({'metric': metric, 'segment': segment,
+                           **default_benchmarks().distribution(metric, segment)})
+
 @app.route('/api/sustainability/test', methods=['GET'])
 def test_endpoint():
     """Test endpoint with sample data"""
@@ -76,11 +301,16 @@ def test_endpoint():
     
     results = agent_core.orchestrate_sustainability_analysis(sample_data)
     
-    return jsonify({
+    return _json_response({
         'status': 'success',
         'test_results': results
     })
 
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Prometheus text exposition of per-stage timings"""
+    return Response(METRICS.render_prometheus(), mimetype='text/plain; version=0.0.4')
+
 @app.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
@@ -1,16 +1,34 @@
-import boto3
 import os
-from botocore.config import Config
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+try:
+    import boto3  # type: ignore
+    from botocore.config import Config  # type: ignore
+    _BOTO3_AVAILABLE = True
+except Exception:  # ImportError or other issues
+    boto3 = None
+    Config = None
+    _BOTO3_AVAILABLE = False
 
 # AWS Configuration for Supply Chain Optimizer
 AWS_REGION = os.getenv('AWS_REGION', 'us-east-1')
 AWS_PROFILE = os.getenv('AWS_PROFILE', 'default')
 
+# Size of the urllib3 pool shared by every thread using a cached client.
+# botocore defaults to 10, which serialises threaded Flask workers.
+MAX_POOL_CONNECTIONS = int(os.getenv('AWS_MAX_POOL_CONNECTIONS', '50'))
+
 # Bedrock configuration for AI agents
 BEDROCK_CONFIG = Config(
     region_name=AWS_REGION,
-    retries={'max_attempts': 3, 'mode': 'adaptive'}
-)
+    retries={'max_attempts': 3, 'mode': 'adaptive'},
+    max_pool_connections=MAX_POOL_CONNECTIONS,
+    connect_timeout=5,
+    read_timeout=120,
+    tcp_keepalive=True
+) if _BOTO3_AVAILABLE else None
 
 # Model configurations
 MODELS = {
@@ -19,17 +37,102 @@ MODELS = {
     'llama': 'meta.llama2-70b-chat-v1'
 }
 
+# Process-wide client cache keyed by (service, region, id(config)). The config
+# object is stored alongside the client so its id cannot be recycled.
+_clients: Dict[Tuple[str, str, int], Tuple[Any, Any]] = {}
+_clients_lock = threading.Lock()
+_session = None
+
+# Optional clients whose build failed, by (service, region, id(config)):
+# monotonic time before which they resolve to None without retrying boto3
+FAILED_CLIENT_RETRY_SECONDS = 30.0
+_failed_until: Dict[Tuple[str, str, int], float] = {}
+
+
+def get_client(service_name: str, region_name: Optional[str] = None, config: Any = None):
+    """Return a shared boto3 client, creating it on first use.
+
+    Clients are thread-safe once built, so one instance per
+    (service, region, config) is reused by every agent in the process.
+    """
+    if not _BOTO3_AVAILABLE:
+        raise RuntimeError('boto3 is not installed')
+
+    region = region_name or AWS_REGION
+    config = config or BEDROCK_CONFIG
+    key = (service_name, region, id(config))
+
+    cached = _clients.get(key)
+    if cached is not None:
+        return cached[1]
+
+    global _session
+    with _clients_lock:
+        cached = _clients.get(key)
+        if cached is None:
+            # boto3.client() goes through the default session, which is not
+            # thread-safe; build clients from a dedicated session under the lock
+            if _session is None:
+                _session = boto3.session.Session()
+            client = _session.client(service_name, region_name=region, config=config)
+            cached = (config, client)
+            _clients[key] = cached
+    return cached[1]
+
+
+def reset_clients():
+    """Drop every cached client (tests and credential rotation)."""
+    global _session
+    with _clients_lock:
+        _clients.clear()
+        _failed_until.clear()
+        _session = None
+
+
+class LazyClient:
+    """Class attribute resolving to a shared client on first access.
+
+    This is a non-data descriptor, so assigning the attribute on an instance
+    (e.g. a fake client in tests) overrides it for that instance only.
+    With ``optional=True`` a missing boto3 or a failed client build yields
+    None instead of raising, and the failure is remembered for
+    ``FAILED_CLIENT_RETRY_SECONDS`` so hot paths do not rebuild on every access.
+    """
+
+    def __init__(self, service_name: str, region_name: Optional[str] = None,
+                 config: Any = None, optional: bool = False):
+        self.service_name = service_name
+        self.region_name = region_name
+        self.config = config
+        self.optional = optional
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        if self.optional:
+            key = (self.service_name, self.region_name or AWS_REGION, id(self.config or BEDROCK_CONFIG))
+            if _failed_until.get(key, 0.0) > time.monotonic():
+                return None
+        try:
+            return get_client(self.service_name, self.region_name, self.config)
+        except Exception:
+            if self.optional:
+                _failed_until[key] = time.monotonic() + FAILED_CLIENT_RETRY_SECONDS
+                return None
+            raise
+
+
 def get_bedrock_client():
     """Initialize Bedrock client with proper configuration"""
-    return boto3.client('bedrock-runtime', config=BEDROCK_CONFIG)
+    return get_client('bedrock-runtime')
 
 def get_s3_client():
     """Initialize S3 client for data storage"""
-    return boto3.client('s3', config=BEDROCK_CONFIG)
+    return get_client('s3')
 
 # MCP Server configuration
 MCP_CONFIG = {
     'name': 'supply-chain-optimizer',
     'version': '1.0.0',
     'description': 'Sustainable Supply Chain Optimizer with AI Agents'
-}
\ No newline at end of file
+}
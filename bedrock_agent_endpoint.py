@@ -2,12 +2,51 @@
 Bedrock Agent endpoint with API key authentication
 """
 
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify, stream_with_context
 from bedrock_auth import BedrockAuthenticator
+from session_store import SessionStore
 import json
 
 app = Flask(__name__)
 auth = BedrockAuthenticator(api_key="strands_api_key_ai_hackathon")
+sessions = SessionStore()
+
+def _wants_stream(data) -> bool:
+    """Stream when the body sets `stream` or the client accepts SSE"""
+    return bool(data.get('stream')) or 'text/event-stream' in request.headers.get('Accept', '')
+
+def _sse(event: str, payload) -> str:
+    return f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+
+def _unauthorized():
+    return jsonify({'error': 'Invalid API key', 'status': 'unauthorized', 'code': 401}), 401
+
+def _stream_agent_response(agent_id: str, session_id: str, input_text: str,
+                           cached: str = None, on_complete=None):
+    """Forward completion chunks to the client as Server-Sent Events"""
+    
+    def events():
+        yield _sse('start', {'session_id': session_id})
+        if cached is not None:
+            yield _sse('chunk', {'text': cached, 'cached': True})
+        else:
+            parts = []
+            try:
+                for text in auth.iter_agent_text(agent_id, session_id, input_text):
+                    parts.append(text)
+                    yield _sse('chunk', {'text': text})
+            except Exception as e:
+                yield _sse('error', {'error': str(e), 'status': 'error'})
+                return
+            if on_complete:
+                on_complete(''.join(parts))
+        yield _sse('done', {'session_id': session_id, 'authenticated': True, 'cached': cached is not None})
+    
+    return Response(
+        stream_with_context(events()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
 
 @app.route('/bedrock/agent/invoke', methods=['POST'])
 def invoke_bedrock_agent():
@@ -27,8 +66,18 @@ def invoke_bedrock_agent():
                 'status': 'bad_request'
             }), 400
         
-        # Generate session ID
-        session_id = auth.generate_session_id()
+        # Authenticate before a session can be created or taken over
+        if not auth.authenticate_request({'api_key': api_key}):
+            return _unauthorized()
+        
+        # Continue the caller's session when one is supplied
+        try:
+            session_id = sessions.resolve(data.get('session_id'), agent_id).session_id
+        except ValueError as e:
+            return jsonify({'error': str(e), 'status': 'bad_request'}), 400
+        
+        if _wants_stream(data):
+            return _stream_agent_response(agent_id, session_id, input_text)
         
         # Invoke agent with authentication
         result = auth.invoke_agent_with_auth(
@@ -63,22 +112,46 @@ def chat_with_agent():
                 'status': 'bad_request'
             }), 400
         
-        # Generate session ID
-        session_id = auth.generate_session_id()
+        # Authenticate before any memoized response can be returned
+        if not auth.authenticate_request({'api_key': api_key}):
+            return _unauthorized()
+        
+        # Continue the caller's session when one is supplied
+        try:
+            session = sessions.resolve(data.get('session_id'), agent_id)
+        except ValueError as e:
+            return jsonify({'error': str(e), 'status': 'bad_request'}), 400
+        cached = sessions.cached_response(session, message)
+        
+        if _wants_stream(data):
+            return _stream_agent_response(
+                agent_id, session.session_id, message, cached=cached,
+                on_complete=lambda text: sessions.remember_response(session, message, text)
+            )
+        
+        if cached is not None:
+            return jsonify({
+                'response': cached,
+                'session_id': session.session_id,
+                'authenticated': True,
+                'cached': True
+            })
         
         # Invoke agent
         result = auth.invoke_agent_with_auth(
             agent_id=agent_id,
-            session_id=session_id,
+            session_id=session.session_id,
             input_text=message,
             api_key=api_key
         )
         
         if result.get('status') == 'success':
+            sessions.remember_response(session, message, result.get('result'))
             return jsonify({
                 'response': result.get('result'),
                 'session_id': result.get('session_id'),
-                'authenticated': True
+                'authenticated': True,
+                'cached': False
             })
         else:
             return jsonify(result), result.get('code', 500)
@@ -89,6 +162,11 @@ def chat_with_agent():
             'status': 'error'
         }), 500
 
+@app.route('/bedrock/sessions/stats', methods=['GET'])
+def session_stats():
+    """Session cache and memoization counters"""
+    return jsonify(sessions.snapshot())
+
 @app.route('/bedrock/auth/validate', methods=['POST'])
 def validate_api_key():
     """Validate API key"""
@@ -2,16 +2,17 @@
 Bedrock Agent authentication using API key
 """
 
-import boto3
 import json
-import hashlib
-import time
-from typing import Dict, Any, Optional
+import codecs
+import uuid
+from typing import Dict, Any, Iterator, Optional
+from aws_config import LazyClient
 
 class BedrockAuthenticator:
+    bedrock_agent = LazyClient('bedrock-agent-runtime')
+
     def __init__(self, api_key: str = "strands_api_key_ai_hackathon"):
         self.api_key = api_key
-        self.bedrock_agent = boto3.client('bedrock-agent-runtime')
         
     def authenticate_request(self, request_data: Dict[str, Any]) -> bool:
         """Authenticate request using API key"""
@@ -30,25 +31,14 @@ class BedrockAuthenticator:
             }
         
         try:
-            # Invoke Bedrock agent
-            response = self.bedrock_agent.invoke_agent(
-                agentId=agent_id,
-                agentAliasId='TSTALIASID',  # Test alias
-                sessionId=session_id,
-                inputText=input_text
-            )
-            
-            # Process response
-            result = ""
-            for event in response.get('completion', []):
-                if 'chunk' in event:
-                    chunk = event['chunk']
-                    if 'bytes' in chunk:
-                        result += chunk['bytes'].decode('utf-8')
+            # Collect raw bytes and decode once; repeated str += is quadratic
+            buffer = bytearray()
+            for data in self.iter_agent_chunks(agent_id, session_id, input_text):
+                buffer += data
             
             return {
                 'status': 'success',
-                'result': result,
+                'result': buffer.decode('utf-8'),
                 'session_id': session_id,
                 'authenticated': True
             }
@@ -60,8 +50,35 @@ class BedrockAuthenticator:
                 'code': 500
             }
     
+    def iter_agent_chunks(self, agent_id: str, session_id: str, input_text: str) -> Iterator[bytes]:
+        """Invoke Bedrock agent and yield raw completion bytes as they arrive"""
+        response = self.bedrock_agent.invoke_agent(
+            agentId=agent_id,
+            agentAliasId='TSTALIASID',  # Test alias
+            sessionId=session_id,
+            inputText=input_text
+        )
+        
+        for event in response.get('completion', []):
+            chunk = event.get('chunk')
+            if chunk and 'bytes' in chunk:
+                yield chunk['bytes']
+    
+    def iter_agent_text(self, agent_id: str, session_id: str, input_text: str) -> Iterator[str]:
+        """Yield decoded completion text per chunk.
+        
+        Chunk boundaries may split multi-byte characters, so decoding is
+        incremental rather than per chunk.
+        """
+        decoder = codecs.getincrementaldecoder('utf-8')()
+        for data in self.iter_agent_chunks(agent_id, session_id, input_text):
+            text = decoder.decode(data)
+            if text:
+                yield text
+        tail = decoder.decode(b'', final=True)
+        if tail:
+            yield tail
+    
     def generate_session_id(self) -> str:
         """Generate unique session ID"""
-        timestamp = str(int(time.time()))
-        hash_input = f"{self.api_key}_{timestamp}"
-        return hashlib.md5(hash_input.encode()).hexdigest()[:16]
\ No newline at end of file
+        return uuid.uuid4().hex
\ No newline at end of file
@@ -0,0 +1 @@
+# Performance benchmarks for the Supply Chain Optimizer
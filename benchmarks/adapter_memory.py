@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Measure memory held by IntegrationAdapter conversions.
+
+For each entity, compares eagerly converted Phase 2 records
+(`_convert_data_format`) with lazy views (`convert_views`) over the same
+Phase 1 rows and over columnar generator output. Reports bytes retained by
+the conversion result and the tracemalloc peak of one full read pass over
+every field, as the agents do.
+
+Usage:
+    python -m benchmarks.adapter_memory --records 1000000 --output adapter_memory.json
+"""
+
+import argparse
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agents.columnar_generator import ColumnarDataGenerator
+from integration_adapter import PHASE2_SCHEMA, IntegrationAdapter
+from benchmarks.harness import BenchmarkRun
+
+
+def measure(fn):
+    """Return (result, stats) with retained/peak bytes and wall time.
+
+    tracemalloc slows allocation-heavy code several-fold, so the timing
+    comes from a separate untraced run.
+    """
+    gc.collect()
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    del result
+    gc.collect()
+    tracemalloc.start()
+    result = fn()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, {'median_s': elapsed, 'retained_bytes': current, 'peak_bytes': peak}
+
+
+def read_every_field(collection):
+    for record in collection:
+        for _ in record.values():
+            pass
+
+
+def run_entity(run: BenchmarkRun, adapter: IntegrationAdapter, target: str, records: int, seed: int):
+    source, _ = PHASE2_SCHEMA[target]
+    generator = ColumnarDataGenerator(seed)
+    columns = generator.generate(source, records)
+    datasets = {
+        'rows': {source: generator.to_records(source, columns)},
+        'columnar': {source: columns, 'format': 'columnar'}
+    }
+
+    for layout, data in datasets.items():
+        eager, stats = measure(lambda: adapter._convert_data_format(data)[target])
+        run.add(f'{target}_{layout}_eager', records, stats)
+        eager_bytes = stats['retained_bytes']
+        del eager
+
+        views, stats = measure(lambda: adapter.convert_views(data)[target])
+        run.add(f'{target}_{layout}_views', records, stats,
+                saved_bytes=eager_bytes - stats['retained_bytes'])
+
+        _, stats = measure(lambda: read_every_field(views))
+        run.add(f'{target}_{layout}_views_read_pass', records, stats)
+        del views, data
+    datasets.clear()
+    gc.collect()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--records', type=int, default=1_000_000)
+    parser.add_argument('--entities', default='suppliers,routes,inventory')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', default='adapter_memory.json')
+    args = parser.parse_args()
+
+    run = BenchmarkRun('adapter_memory', {'records': args.records, 'seed': args.seed})
+    adapter = IntegrationAdapter()
+    for target in args.entities.split(','):
+        print(f"{target}:", flush=True)
+        run_entity(run, adapter, target, args.records, args.seed)
+
+    for result in run.results:
+        if 'saved_bytes' in result:
+            print(f"  {result['name']:<28} saves {result['saved_bytes'] / 2**20:8.1f} MiB")
+    run.write(args.output)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
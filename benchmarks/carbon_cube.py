@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Benchmark building the carbon cube and rolling it up.
+
+Builds a cube from synthetic agent results (one fact per supplier, route and
+product; 200 cities, 25 supplier locations, 12 months), then times a lane x
+month roll-up filtered by mode and a supplier location roll-up.
+
+Usage:
+    python -m benchmarks.carbon_cube --scales 100000,1000000 --output carbon_cube.json
+"""
+
+import argparse
+import os
+import sys
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agents.carbon_cube import build_cube
+from benchmarks.harness import BenchmarkRun, time_call
+
+
+def synthetic_analysis(count: int, seed: int):
+    rng = np.random.default_rng(seed)
+    cities = [f'City {i}' for i in range(200)]
+    data = {
+        'suppliers': [{'location': f'Location {i % 25}'} for i in range(count)],
+        'routes': [{'origin': cities[a], 'destination': cities[b], 'transport_mode': m, 'month': f'2025-{k:02d}'}
+                   for a, b, m, k in zip(rng.integers(0, 200, count), rng.integers(0, 200, count),
+                                         rng.choice(['truck', 'rail', 'ship', 'air'], count),
+                                         rng.integers(1, 13, count))],
+        'inventory': [{'category': f'Category {i % 8}'} for i in range(count)]
+    }
+    results = {
+        'sourcing': {'analysis': [{'carbon_footprint': float(v)} for v in rng.random(count)]},
+        'logistics': {'optimized_routes': [{'current_emissions': float(v)} for v in rng.random(count)]},
+        'inventory': {'waste_analysis': [{'waste_percentage': float(v)} for v in rng.random(count) * 50]}
+    }
+    return data, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--scales', default='100000,1000000', help='Comma-separated records per entity')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', default='carbon_cube.json')
+    args = parser.parse_args()
+
+    scales = [int(float(s)) for s in args.scales.split(',') if s]
+    run = BenchmarkRun('carbon_cube', {'scales': scales, 'repeat': args.repeat, 'seed': args.seed})
+    for scale in scales:
+        data, results = synthetic_analysis(scale, args.seed)
+        stats = time_call(lambda: build_cube(data, results), args.repeat)
+        cube = stats['result']
+        run.add('build', scale, stats, facts=3 * scale)
+        stats = time_call(lambda: cube.rollup(['lane', 'month'], where={'transport_mode': ['rail', 'ship']}),
+                          args.repeat)
+        run.add('rollup_lane_month', scale, stats, rows=len(stats['result']))
+        stats = time_call(lambda: cube.rollup(['supplier_location'], where={'category': 'sourcing'}), args.repeat)
+        run.add('rollup_location', scale, stats, rows=len(stats['result']))
+
+    run.write(args.output)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Benchmark carbon-adjusted costs across entities x carbon price scenarios.
+
+Each scenario is a yearly price ramp with a regional override, so every
+entity needs a (region, year) price gather. Times the full broadcast in
+float64 and float32, and the chunked float32 reduction to per-scenario
+totals and cheapest entity.
+
+Usage:
+    python -m benchmarks.carbon_pricing --scales 100000,1000000 --prices 50 --output carbon_pricing.json
+"""
+
+import argparse
+import os
+import sys
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agents.carbon_pricing import CarbonPricing
+from benchmarks.harness import BenchmarkRun, time_call
+
+
+def price_curves(count: int):
+    return [{'name': f'price_{i}', 'by_year': {'2025': 40 + i, '2035': 100 + 4 * i},
+             'by_region': {'EU': {'2025': 80 + i, '2030': 150}, 'UK': 60 + i}} for i in range(count)]
+
+
+def run_scale(run: BenchmarkRun, pricing: CarbonPricing, scale: int, repeat: int, seed: int):
+    rng = np.random.default_rng(seed)
+    cost, emissions = rng.random(scale) * 1000, rng.random(scale) * 10
+    regions = pricing.region_codes(rng.choice(['EU', 'UK', 'US', 'CN'], scale), scale)
+    years = rng.integers(2024, 2036, scale)
+    year_codes = pricing.year_codes(years, scale)
+    cells = scale * pricing.scenarios
+
+    for dtype in (np.float64, np.float32):
+        stats = time_call(lambda: pricing.adjusted_costs(cost, emissions, regions, years, dtype), repeat)
+        run.add(f'broadcast_{np.dtype(dtype).name}', scale, stats, prices=pricing.scenarios,
+                mb=round(stats['result'].nbytes / 1e6, 1), ns_per_cell=round(stats['median_s'] / cells * 1e9, 2))
+        stats['result'] = None  # release the matrix before the next allocation
+    stats = time_call(lambda: pricing.totals(cost, emissions, regions, year_codes, dtype=np.float32), repeat)
+    run.add('chunked_totals_float32', scale, stats, prices=pricing.scenarios,
+            ns_per_cell=round(stats['median_s'] / cells * 1e9, 2))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--scales', default='100000,1000000', help='Comma-separated entity counts')
+    parser.add_argument('--prices', type=int, default=50, help='Carbon price scenarios')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', default='carbon_pricing.json')
+    args = parser.parse_args()
+
+    scales = [int(float(s)) for s in args.scales.split(',') if s]
+    run = BenchmarkRun('carbon_pricing', {'scales': scales, 'prices': args.prices,
+                                          'repeat': args.repeat, 'seed': args.seed})
+    pricing = CarbonPricing(price_curves(args.prices))
+    for scale in scales:
+        print(f"Scale {scale}:", flush=True)
+        run_scale(run, pricing, scale, args.repeat, args.seed)
+
+    run.write(args.output)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
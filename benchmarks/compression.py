@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Benchmark request/response compression of analysis results.
+
+Encodes real analysis results (see benchmarks.serialization) and times each
+available encoding at several levels: whole-body compress, decompress, and
+streamed encode+compress end to end. Compression ratio and throughput are
+recorded alongside the timings so level choices can be justified per scale.
+
+Usage:
+    python -m benchmarks.compression --scales 1000,10000,100000 --output compression.json
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import compression
+import serialization
+from benchmarks.harness import BenchmarkRun, time_call
+from benchmarks.serialization import build_payload
+
+LEVELS = {'gzip': [1, 6, 9], 'zstd': [1, 3, 10]}
+
+
+def run_scale(run: BenchmarkRun, scale: int, repeat: int, seed: int):
+    payload = build_payload(scale, seed)
+    body = serialization.dumps(payload)
+    mib = len(body) / 2**20
+
+    for encoding in compression.ENCODINGS:
+        for level in LEVELS[encoding]:
+            name = f'{encoding}_{level}'
+            stats = time_call(lambda: compression.compress(body, encoding, level), repeat)
+            packed = stats['result']
+            run.add(f'{name}_compress', scale, stats, raw_bytes=len(body), compressed_bytes=len(packed),
+                    ratio=round(len(body) / len(packed), 2), mib_per_s=round(mib / stats['median_s'], 1))
+
+            stats = time_call(lambda: compression.decompress(packed, encoding), repeat)
+            run.add(f'{name}_decompress', scale, stats, mib_per_s=round(mib / stats['median_s'], 1))
+
+            stats = time_call(lambda: sum(len(c) for c in compression.iter_compress(
+                serialization.iter_encode(payload), encoding, level)), repeat)
+            run.add(f'{name}_streamed', scale, stats, compressed_bytes=stats['result'])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--scales', default='1000,10000,100000', help='Comma-separated records per entity')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', default='compression.json')
+    args = parser.parse_args()
+
+    scales = [int(float(s)) for s in args.scales.split(',') if s]
+    run = BenchmarkRun('compression', {'scales': scales, 'repeat': args.repeat, 'seed': args.seed,
+                                       'encodings': list(compression.ENCODINGS), 'levels': LEVELS})
+    for scale in scales:
+        print(f"Scale {scale}:", flush=True)
+        run_scale(run, scale, args.repeat, args.seed)
+        for result in run.results:
+            if result['scale'] == scale and 'ratio' in result:
+                print(f"    {result['name']:<20} ratio {result['ratio']:6.2f}  {result['mib_per_s']:8.1f} MiB/s")
+
+    run.write(args.output)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
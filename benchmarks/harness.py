@@ -0,0 +1,128 @@
+"""
+Shared timing, result-file and regression-comparison helpers for benchmarks
+"""
+
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+
+def time_call(fn: Callable[[], Any], repeat: int = 3, warmup: int = 0) -> Dict[str, Any]:
+    """Run `fn` `repeat` times and return timing statistics in seconds.
+
+    The return value of the last run is kept under 'result' so callers can
+    chain stages without re-running them; it is dropped when writing JSON.
+    """
+    for _ in range(warmup):
+        fn()
+    timings = []
+    result = None
+    for _ in range(max(1, repeat)):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    return {
+        'repeat': len(timings),
+        'min_s': min(timings),
+        'median_s': statistics.median(timings),
+        'mean_s': statistics.fmean(timings),
+        'max_s': max(timings),
+        'result': result
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, timeout=5,
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        ).stdout.strip() or None
+    except Exception:
+        return None
+
+
+class BenchmarkRun:
+    """Collects benchmark cases and writes them as one JSON document"""
+
+    def __init__(self, suite: str, parameters: Optional[Dict[str, Any]] = None):
+        self.suite = suite
+        self.parameters = parameters or {}
+        self.results: List[Dict[str, Any]] = []
+
+    def add(self, name: str, scale: int, stats: Dict[str, Any], **extra) -> Dict[str, Any]:
+        entry = {'name': name, 'scale': scale}
+        entry.update({k: v for k, v in stats.items() if k != 'result'})
+        entry.update(extra)
+        self.results.append(entry)
+        print(f"  {name:<28} n={scale:<9} median={entry.get('median_s', 0):9.4f}s", flush=True)
+        return entry
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'suite': self.suite,
+            'created_at': datetime.now(timezone.utc).isoformat(),
+            'environment': {
+                'python': sys.version.split()[0],
+                'platform': platform.platform(),
+                'machine': platform.machine(),
+                'cpu_count': os.cpu_count(),
+                'git_commit': _git_commit()
+            },
+            'parameters': self.parameters,
+            'results': self.results
+        }
+
+    def write(self, path: str):
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float = 0.2,
+            metric: str = 'median_s', min_seconds: float = 0.0) -> Dict[str, Any]:
+    """Flag cases whose `metric` grew by more than `threshold` vs the baseline.
+
+    Cases below `min_seconds` in both runs are timer noise and never flagged.
+    """
+    baseline_index = {(r['name'], r['scale']): r for r in baseline.get('results', [])}
+    regressions, improvements, unmatched = [], [], []
+
+    for result in current.get('results', []):
+        base = baseline_index.get((result['name'], result['scale']))
+        if base is None or metric not in base or metric not in result:
+            unmatched.append({'name': result['name'], 'scale': result['scale']})
+            continue
+        if max(result[metric], base[metric]) < min_seconds:
+            continue
+        ratio = result[metric] / base[metric] if base[metric] > 0 else float('inf')
+        row = {
+            'name': result['name'],
+            'scale': result['scale'],
+            'baseline': base[metric],
+            'current': result[metric],
+            'ratio': round(ratio, 4)
+        }
+        if ratio > 1 + threshold:
+            regressions.append(row)
+        elif ratio < 1 - threshold:
+            improvements.append(row)
+
+    return {
+        'metric': metric,
+        'threshold': threshold,
+        'regressions': regressions,
+        'improvements': improvements,
+        'unmatched': unmatched,
+        'passed': not regressions
+    }
+
+
+def load(path: str) -> Dict[str, Any]:
+    with open(path) as f:
+        return json.load(f)
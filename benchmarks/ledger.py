@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Benchmark carbon ledger appends and trend queries over years of history.
+
+Fills a temporary ledger with `--years` of monthly history (`--runs` analyses
+per month, each with `scale` routes, suppliers and inventory items), then
+times one append and 24-month trend queries by entity, by entity and
+category, and by category alone.
+
+Usage:
+    python -m benchmarks.ledger --scales 1000,10000 --years 3 --runs 4 --output ledger.json
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+from datetime import datetime, timezone
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from carbon_ledger import CarbonLedger
+from orchestration import new_orchestration_id
+from benchmarks.harness import BenchmarkRun, time_call
+
+
+def build_results(scale: int):
+    return {
+        'sourcing': {'analysis': [{'supplier_id': f'S{i}', 'carbon_footprint': i % 97} for i in range(scale)]},
+        'logistics': {'optimized_routes': [{'route_id': f'R{i}', 'current_emissions': i % 89} for i in range(scale)]},
+        'inventory': {'waste_analysis': [{'product_id': f'P{i}', 'waste_percentage': i % 50} for i in range(scale)]}
+    }
+
+
+def run_scale(run: BenchmarkRun, scale: int, years: int, runs: int, repeat: int):
+    results = build_results(scale)
+    with tempfile.TemporaryDirectory() as tmp:
+        ledger = CarbonLedger(tmp)
+        first_year = 2026 - years
+        timestamps = [datetime(first_year + m // 12, m % 12 + 1, 1 + r * (27 // runs), tzinfo=timezone.utc).timestamp()
+                      for m in range(years * 12) for r in range(runs)]
+        stats = time_call(lambda: [ledger.record(new_orchestration_id(ts), results, ts) for ts in timestamps], 1)
+        entries = sum(stats['result'])
+        run.add('fill_history', scale, stats, entries=entries, analyses=len(timestamps),
+                entries_per_s=round(entries / stats['median_s']))
+
+        end = timestamps[-1] + 1
+        stats = time_call(lambda: ledger.record(new_orchestration_id(end), results, end), repeat)
+        run.add('append_one_analysis', scale, stats, entries=stats['result'])
+        for name, kwargs in (('trend_entity', {'entity_id': f'R{scale // 2}'}),
+                             ('trend_entity_category', {'entity_id': f'S{scale // 2}', 'category': 'operations'}),
+                             ('trend_category', {'category': 'logistics'})):
+            stats = time_call(lambda: ledger.series(months=24, end=end, **kwargs), repeat)
+            run.add(name, scale, stats, months=24, points=len(stats['result']), history_entries=entries)
+        ledger.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--scales', default='1000,10000', help='Comma-separated records per entity per analysis')
+    parser.add_argument('--years', type=int, default=3)
+    parser.add_argument('--runs', type=int, default=4, help='Analyses per month')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--output', default='ledger.json')
+    args = parser.parse_args()
+
+    scales = [int(float(s)) for s in args.scales.split(',') if s]
+    run = BenchmarkRun('ledger', {'scales': scales, 'years': args.years, 'runs': args.runs, 'repeat': args.repeat})
+    for scale in scales:
+        print(f"Scale {scale}:", flush=True)
+        run_scale(run, scale, args.years, args.runs, args.repeat)
+
+    run.write(args.output)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Benchmark marginal abatement cost curves and budgeted selection.
+
+Times candidate generation from one analysis of generated data, then the
+curve (convex hull steps and sort) and a budgeted greedy selection over
+synthetic candidate sets of each scale, about three options per entity.
+
+Usage:
+    python -m benchmarks.macc --scales 100000,1000000 --output macc.json
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agents import AgentCore, DataGeneratorAgent
+from agents.macc import ACTIONS, MACC, build_macc
+from integration_adapter import IntegrationAdapter
+from benchmarks.harness import BenchmarkRun, time_call
+
+
+def synthetic_candidates(count: int, seed: int):
+    rng = np.random.default_rng(seed)
+    abatement = rng.gamma(2, 5, count)
+    return (rng.integers(0, max(count // 3, 1), count), rng.integers(0, len(ACTIONS), count),
+            rng.normal(20, 40, count) * abatement, abatement)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--scales', default='100000,1000000', help='Comma-separated candidate counts')
+    parser.add_argument('--records', type=int, default=20000, help='Records per entity for the analysis')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', default='macc.json')
+    args = parser.parse_args()
+
+    scales = [int(float(s)) for s in args.scales.split(',') if s]
+    run = BenchmarkRun('macc', {'scales': scales, 'records': args.records,
+                                'repeat': args.repeat, 'seed': args.seed})
+
+    generated = asyncio.run(DataGeneratorAgent(seed=args.seed).execute({
+        'suppliers': args.records, 'routes': args.records, 'products': args.records, 'seed': args.seed
+    }))
+    data = IntegrationAdapter()._convert_data_format(generated)
+    results = AgentCore().orchestrate_sustainability_analysis(data)
+    stats = time_call(lambda: build_macc(data, results), args.repeat)
+    run.add('from_analysis', args.records, stats, candidates=stats['result'].candidates)
+
+    for scale in scales:
+        columns = synthetic_candidates(scale, args.seed)
+        stats = time_call(lambda: MACC(*columns), args.repeat)
+        macc = stats['result']
+        run.add('curve', scale, stats, steps=len(macc.steps['slope']))
+        budget = float(macc.cumulative_cost.max()) / 2
+        stats = time_call(lambda: macc.select(budget), args.repeat)
+        run.add('select_budget', scale, stats, actions=len(stats['result']))
+
+    run.write(args.output)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
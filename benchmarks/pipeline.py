@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Benchmark the full analysis pipeline at multiple scales.
+
+Times data generation, IntegrationAdapter._convert_data_format, each agent,
+the AgentOrchestrator, AgentCore end to end and JSON serialization of the
+final result. Data comes from a seeded DataGeneratorAgent, so runs are
+comparable across commits.
+
+Usage:
+    python -m benchmarks.pipeline --scales 100,1000,10000 --output bench.json
+    python -m benchmarks.pipeline --compare bench_baseline.json --threshold 0.25
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agents import (AgentCore, CarbonAccountingAgent, DataGeneratorAgent, InventoryAgent,
+                    LogisticsAgent, SourcingAgent)
+from integration_adapter import IntegrationAdapter
+from orchestration import AgentOrchestrator
+from benchmarks.harness import BenchmarkRun, compare, load, time_call
+
+DEFAULT_SCALES = [100, 1000, 10000, 100000, 1000000]
+
+
+def run_scale(run: BenchmarkRun, scale: int, repeat: int, seed: int, profile: str = 'uniform'):
+    # Large scales take minutes per stage; one timed run is enough there
+    repeat = repeat if scale < 100000 else 1
+    generator = DataGeneratorAgent(seed=seed)
+
+    def generate():
+        return asyncio.run(generator.execute({
+            'suppliers': scale, 'routes': scale, 'products': scale, 'seed': seed, 'profile': profile
+        }))
+
+    stats = time_call(generate, 1)
+    run.add('generate', scale, stats)
+    generated_data = stats['result']
+
+    adapter = IntegrationAdapter()
+    stats = time_call(lambda: adapter._convert_data_format(generated_data), repeat)
+    run.add('convert_data_format', scale, stats)
+    data = stats['result']
+
+    stats = time_call(lambda: SourcingAgent().analyze_supplier_sustainability(data['suppliers']), repeat)
+    run.add('sourcing_agent', scale, stats)
+    sourcing = stats['result']
+
+    stats = time_call(lambda: LogisticsAgent().optimize_routes_for_emissions(data['routes']), repeat)
+    run.add('logistics_agent', scale, stats)
+    logistics = stats['result']
+
+    stats = time_call(lambda: InventoryAgent().generate_waste_reduction_recommendations(data['inventory']), repeat)
+    run.add('inventory_agent', scale, stats)
+    inventory = stats['result']
+
+    carbon_input = {'sourcing': sourcing, 'logistics': logistics, 'inventory': inventory}
+    run.add('carbon_agent', scale,
+            time_call(lambda: CarbonAccountingAgent().calculate_overall_footprint(carbon_input), repeat))
+
+    run.add('orchestrator', scale, time_call(lambda: AgentOrchestrator().orchestrate_agents(data), repeat))
+
+    agent_core = AgentCore()
+    stats = time_call(lambda: agent_core.orchestrate_sustainability_analysis(data), repeat)
+    run.add('agentcore_end_to_end', scale, stats)
+    results = stats['result']
+
+    stats = time_call(lambda: json.dumps(results), repeat)
+    run.add('json_serialization', scale, stats, payload_bytes=len(stats['result']))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--scales', default=','.join(str(s) for s in DEFAULT_SCALES),
+                        help='Comma-separated records per entity')
+    parser.add_argument('--max-records', type=int, default=None,
+                        help='Skip scales above this many records per entity')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--profile', choices=['uniform', 'realistic'], default='uniform',
+                        help='Data generator profile (realistic = real city geography)')
+    parser.add_argument('--output', default='bench_output.json')
+    parser.add_argument('--compare', metavar='BASELINE', help='Baseline JSON to compare against')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='Relative slowdown that counts as a regression')
+    parser.add_argument('--noise-floor', type=float, default=0.001,
+                        help='Ignore cases faster than this many seconds in both runs')
+    args = parser.parse_args()
+
+    scales = [int(float(s)) for s in args.scales.split(',') if s]
+    if args.max_records:
+        scales = [s for s in scales if s <= args.max_records]
+
+    run = BenchmarkRun('pipeline', {'scales': scales, 'repeat': args.repeat, 'seed': args.seed,
+                                    'profile': args.profile})
+    for scale in scales:
+        print(f"Scale {scale}:", flush=True)
+        run_scale(run, scale, args.repeat, args.seed, args.profile)
+
+    run.write(args.output)
+    print(f"Results written to {args.output}")
+
+    if args.compare:
+        report = compare(run.to_dict(), load(args.compare), args.threshold, min_seconds=args.noise_floor)
+        print(json.dumps(report, indent=2))
+        if not report['passed']:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
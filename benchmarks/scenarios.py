@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Benchmark batched what-if scenarios against one full analysis.
+
+Builds a ScenarioEngine over a generated base dataset, then evaluates
+batches of random scenarios (mode shifts, supplier filters, renewable
+uplifts, stock cuts). One full AgentCore analysis of the same data is timed
+for reference, so the cost of a scenario can be read as a fraction of a
+re-run.
+
+Usage:
+    python -m benchmarks.scenarios --scales 10000,100000 --scenarios 1000 --output scenarios.json
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agents import AgentCore, DataGeneratorAgent
+from agents.scenario_engine import ScenarioEngine
+from integration_adapter import IntegrationAdapter
+from benchmarks.harness import BenchmarkRun, time_call
+
+
+def random_scenarios(count: int, seed: int):
+    rng = np.random.default_rng(seed)
+    scenarios = []
+    for i in range(count):
+        overrides = [
+            {'type': 'shift_mode', 'from': 'truck', 'to': str(rng.choice(['rail', 'ship'])),
+             'share': round(float(rng.random()), 2)},
+            {'type': 'reduce_stock', 'share': round(float(rng.random()) / 2, 2)}
+        ]
+        if rng.random() < 0.5:
+            overrides.append({'type': 'drop_suppliers', 'min_score': int(rng.integers(60, 100))})
+        if rng.random() < 0.5:
+            overrides.append({'type': 'renewable_energy', 'increase_percent': int(rng.integers(1, 5)) * 10})
+        if rng.random() < 0.3:
+            overrides.append({'type': 'scale_emission_factor', 'mode': 'truck', 'scale': 0.7})
+        scenarios.append({'name': f'scenario_{i}', 'overrides': overrides})
+    return scenarios
+
+
+def run_scale(run: BenchmarkRun, scale: int, count: int, repeat: int, seed: int):
+    generated = asyncio.run(DataGeneratorAgent(seed=seed).execute({
+        'suppliers': scale, 'routes': scale, 'products': scale, 'seed': seed
+    }))
+    data = IntegrationAdapter()._convert_data_format(generated)
+    scenarios = random_scenarios(count, seed)
+
+    analysis = time_call(lambda: AgentCore().orchestrate_sustainability_analysis(data), 1)
+    run.add('full_analysis', scale, analysis)
+
+    build = time_call(lambda: ScenarioEngine(data), repeat)
+    run.add('engine_build', scale, build)
+
+    # A fresh engine per call, so plan caches are rebuilt inside the timing
+    stats = time_call(lambda: ScenarioEngine(data).evaluate(scenarios), repeat)
+    run.add('build_and_evaluate', scale, stats, scenarios=count,
+            per_scenario_us=round(stats['median_s'] / count * 1e6, 2),
+            speedup_vs_reruns=round(analysis['median_s'] * count / stats['median_s'], 1))
+
+    engine = ScenarioEngine(data)
+    engine.evaluate(scenarios)
+    stats = time_call(lambda: engine.evaluate(scenarios), repeat)
+    run.add('evaluate_warm', scale, stats, scenarios=count,
+            per_scenario_us=round(stats['median_s'] / count * 1e6, 2))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--scales', default='10000,100000', help='Comma-separated records per entity')
+    parser.add_argument('--scenarios', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', default='scenarios.json')
+    args = parser.parse_args()
+
+    scales = [int(float(s)) for s in args.scales.split(',') if s]
+    run = BenchmarkRun('scenarios', {'scales': scales, 'scenarios': args.scenarios,
+                                     'repeat': args.repeat, 'seed': args.seed})
+    for scale in scales:
+        print(f"Scale {scale}:", flush=True)
+        run_scale(run, scale, args.scenarios, args.repeat, args.seed)
+
+    run.write(args.output)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
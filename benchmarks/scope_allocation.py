@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Benchmark allocating supplier and lane emissions to products.
+
+Each scale is a number of line items, with one product per 10 line items,
+one supplier per 50 and one lane per 20, allocated by the default value /
+mass basis.
+
+Usage:
+    python -m benchmarks.scope_allocation --scales 100000,1000000 --output scope_allocation.json
+"""
+
+import argparse
+import os
+import sys
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agents.scope_allocation import allocate_products
+from benchmarks.harness import BenchmarkRun, time_call
+
+
+def synthetic_line_items(count: int, seed: int):
+    rng = np.random.default_rng(seed)
+    products, suppliers, routes = max(count // 10, 1), max(count // 50, 1), max(count // 20, 1)
+    results = {
+        'sourcing': {'analysis': [{'supplier_id': f'S{i}', 'carbon_footprint': float(v)}
+                                  for i, v in enumerate(rng.random(suppliers) * 100)]},
+        'logistics': {'optimized_routes': [{'route_id': f'R{i}', 'current_emissions': float(v)}
+                                           for i, v in enumerate(rng.random(routes) * 50)]},
+        'inventory': {'waste_analysis': []}
+    }
+    line_items = {
+        'product_id': [f'P{i}' for i in rng.integers(0, products, count)],
+        'supplier_id': [f'S{i}' for i in rng.integers(0, suppliers, count)],
+        'route_id': [f'R{i}' for i in rng.integers(0, routes, count)],
+        'mass_kg': rng.random(count) * 1000,
+        'value': rng.random(count) * 500
+    }
+    return {'line_items': line_items}, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--scales', default='100000,1000000', help='Comma-separated line item counts')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', default='scope_allocation.json')
+    args = parser.parse_args()
+
+    scales = [int(float(s)) for s in args.scales.split(',') if s]
+    run = BenchmarkRun('scope_allocation', {'scales': scales, 'repeat': args.repeat, 'seed': args.seed})
+    for scale in scales:
+        data, results = synthetic_line_items(scale, args.seed)
+        stats = time_call(lambda: allocate_products(data, results), args.repeat)
+        run.add('allocate_products', scale, stats, products=len(stats['result'].products))
+
+    run.write(args.output)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Benchmark JSON encoding of analysis results.
+
+Builds real AgentCore results from seeded generator data at several scales,
+then times encoding with plain json.dumps (the previous Flask/Lambda path)
+and with each serialization backend, in plain and dedup format, whole and
+streamed. Payload sizes are recorded alongside the timings.
+
+Usage:
+    python -m benchmarks.serialization --scales 1000,10000,100000 --output serialization.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import serialization
+from agents import AgentCore, DataGeneratorAgent
+from integration_adapter import IntegrationAdapter
+from benchmarks.harness import BenchmarkRun, time_call
+
+
+def build_payload(scale: int, seed: int):
+    generated = asyncio.run(DataGeneratorAgent(seed=seed).execute({
+        'suppliers': scale, 'routes': scale, 'products': scale, 'seed': seed
+    }))
+    results = AgentCore().orchestrate_sustainability_analysis(IntegrationAdapter().convert_views(generated))
+    return {'status': 'success', 'results': results, 'authenticated': True}
+
+
+def run_scale(run: BenchmarkRun, scale: int, repeat: int, seed: int):
+    payload = build_payload(scale, seed)
+
+    stats = time_call(lambda: json.dumps(payload).encode('utf-8'), repeat)
+    run.add('stdlib_json_dumps', scale, stats, payload_bytes=len(stats['result']))
+
+    for backend in serialization.BACKENDS:
+        stats = time_call(lambda: serialization.dumps(payload, backend), repeat)
+        run.add(f'{backend}_plain', scale, stats, payload_bytes=len(stats['result']))
+
+        stats = time_call(lambda: serialization.encode_response(payload, 'dedup', backend), repeat)
+        run.add(f'{backend}_dedup', scale, stats, payload_bytes=len(stats['result']))
+
+        stats = time_call(lambda: sum(len(c) for c in serialization.iter_encode(payload, backend=backend)), repeat)
+        run.add(f'{backend}_streamed', scale, stats, payload_bytes=stats['result'])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--scales', default='1000,10000,100000', help='Comma-separated records per entity')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', default='serialization.json')
+    args = parser.parse_args()
+
+    scales = [int(float(s)) for s in args.scales.split(',') if s]
+    run = BenchmarkRun('serialization', {'scales': scales, 'repeat': args.repeat, 'seed': args.seed,
+                                         'backends': list(serialization.BACKENDS)})
+    for scale in scales:
+        print(f"Scale {scale}:", flush=True)
+        run_scale(run, scale, args.repeat, args.seed)
+        for result in run.results:
+            if result['scale'] == scale:
+                print(f"    {result['name']:<20} {result['payload_bytes'] / 2**20:8.2f} MiB")
+
+    run.write(args.output)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Replay a synthetic chat workload against /bedrock/agent/chat and count
+Bedrock calls with and without session continuation.
+
+Usage:
+    python -m benchmarks.session_replay --users 50 --turns 20 --repeat-rate 0.3
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import bedrock_agent_endpoint
+from fake_bedrock import FakeBedrockAgentRuntime
+from session_store import SessionStore
+
+API_KEY = "strands_api_key_ai_hackathon"
+
+PROMPTS = [
+    "Which suppliers have the highest carbon footprint?",
+    "How much CO2 would rail save on long routes?",
+    "Summarize inventory waste risks.",
+    "What is our overall sustainability grade?",
+    "Which routes should switch transport mode?",
+    "List quick wins for this quarter."
+]
+
+
+def build_trace(users: int, turns: int, repeat_rate: float, seed: int):
+    """Interleaved (user, prompt) requests; some prompts repeat within a user"""
+    rng = random.Random(seed)
+    conversations = []
+    for user in range(users):
+        asked = []
+        for _ in range(turns):
+            if asked and rng.random() < repeat_rate:
+                prompt = rng.choice(asked)
+            else:
+                prompt = f"{rng.choice(PROMPTS)} (context {rng.randint(0, 9)})"
+                asked.append(prompt)
+            conversations.append((user, prompt))
+    rng.shuffle(conversations)
+    return conversations
+
+
+def replay(trace, continue_sessions: bool):
+    fake = FakeBedrockAgentRuntime(chunks=["ok"])
+    bedrock_agent_endpoint.auth.bedrock_agent = fake
+    bedrock_agent_endpoint.sessions = SessionStore()
+    client = bedrock_agent_endpoint.app.test_client()
+
+    user_sessions = {}
+    for user, prompt in trace:
+        body = {'message': prompt}
+        if continue_sessions and user in user_sessions:
+            body['session_id'] = user_sessions[user]
+        response = client.post('/bedrock/agent/chat', json=body, headers={'X-API-Key': API_KEY})
+        user_sessions.setdefault(user, response.get_json()['session_id'])
+
+    return {
+        'requests': len(trace),
+        'bedrock_calls': len(fake.calls),
+        'distinct_sessions': len({call['sessionId'] for call in fake.calls}),
+        'session_stats': bedrock_agent_endpoint.sessions.snapshot()
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--users', type=int, default=50)
+    parser.add_argument('--turns', type=int, default=20)
+    parser.add_argument('--repeat-rate', type=float, default=0.3)
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--output', help='Write results JSON to this path')
+    args = parser.parse_args()
+
+    trace = build_trace(args.users, args.turns, args.repeat_rate, args.seed)
+    baseline = replay(trace, continue_sessions=False)
+    sessions = replay(trace, continue_sessions=True)
+    saved = baseline['bedrock_calls'] - sessions['bedrock_calls']
+
+    report = {
+        'benchmark': 'session_replay',
+        'parameters': vars(args),
+        'without_sessions': baseline,
+        'with_sessions': sessions,
+        'bedrock_calls_saved': saved,
+        'reduction_percent': round(100.0 * saved / max(baseline['bedrock_calls'], 1), 2)
+    }
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
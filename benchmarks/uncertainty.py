@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Benchmark Monte Carlo footprint uncertainty.
+
+Runs agent analysis once per scale, then times simulate_footprint for a
+sample count on one process and on all cores. Results are identical for a
+given seed whatever the worker count, so the runs are also checked for
+equality.
+
+Usage:
+    python -m benchmarks.uncertainty --scales 100,1000 --samples 100000 --output uncertainty.json
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agents import DataGeneratorAgent, InventoryAgent, LogisticsAgent, SourcingAgent
+from agents.carbon_uncertainty import PARALLEL_MIN_CELLS, simulate_footprint
+from integration_adapter import IntegrationAdapter
+from benchmarks.harness import BenchmarkRun, time_call
+
+
+def run_scale(run: BenchmarkRun, scale: int, samples: int, workers: int, repeat: int, seed: int):
+    generated = asyncio.run(DataGeneratorAgent(seed=seed).execute({
+        'suppliers': scale, 'routes': scale, 'products': scale, 'seed': seed
+    }))
+    data = IntegrationAdapter()._convert_data_format(generated)
+    args = (SourcingAgent().analyze_supplier_sustainability(data['suppliers']),
+            LogisticsAgent().optimize_routes_for_emissions(data['routes']),
+            InventoryAgent().generate_waste_reduction_recommendations(data['inventory']))
+
+    totals = {}
+    for count in sorted({1, workers}):
+        stats = time_call(lambda: simulate_footprint(*args, {'samples': samples, 'seed': seed, 'workers': count}), repeat)
+        result = stats['result']
+        totals[count] = result['total']
+        run.add(f'monte_carlo_{count}_workers', scale, stats, samples=samples, workers_used=result['workers'],
+                chunks=result['chunks'], samples_per_s=round(samples / stats['median_s']), total=result['total'])
+    if len(totals) > 1 and totals[1] != totals[workers]:
+        raise AssertionError(f'Results differ between worker counts at scale {scale}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--scales', default='100,1000', help='Comma-separated records per entity')
+    parser.add_argument('--samples', type=int, default=100000)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', default='uncertainty.json')
+    args = parser.parse_args()
+
+    scales = [int(float(s)) for s in args.scales.split(',') if s]
+    run = BenchmarkRun('uncertainty', {'scales': scales, 'samples': args.samples, 'workers': args.workers,
+                                       'repeat': args.repeat, 'seed': args.seed,
+                                       'parallel_min_cells': PARALLEL_MIN_CELLS})
+    for scale in scales:
+        print(f"Scale {scale}:", flush=True)
+        run_scale(run, scale, args.samples, args.workers, args.repeat, args.seed)
+
+    run.write(args.output)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Benchmark unit-tagged column math against plain NumPy.
+
+Times freight emissions (km x t x kg CO2e / (t km) -> t CO2e) through
+UnitArray and as the equivalent plain NumPy expression, plus a column
+conversion, to show units add a constant cost per column rather than per row.
+
+Usage:
+    python -m benchmarks.units --scales 100000,1000000,10000000 --output units.json
+"""
+
+import argparse
+import os
+import sys
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agents.units import UnitArray, freight_emissions
+from benchmarks.harness import BenchmarkRun, time_call
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--scales', default='100000,1000000,10000000', help='Comma-separated row counts')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', default='units.json')
+    args = parser.parse_args()
+
+    scales = [int(float(s)) for s in args.scales.split(',') if s]
+    run = BenchmarkRun('units', {'scales': scales, 'repeat': args.repeat, 'seed': args.seed})
+    for scale in scales:
+        rng = np.random.default_rng(args.seed)
+        distance, factor, cargo = rng.random(scale) * 2000, rng.random(scale), rng.random(scale) * 30
+        stats = time_call(lambda: distance * cargo * factor / 1000, args.repeat, warmup=1)
+        run.add('freight_plain_numpy', scale, stats)
+        stats = time_call(lambda: freight_emissions(distance, factor, cargo), args.repeat, warmup=1)
+        run.add('freight_unit_tagged', scale, stats)
+        column = UnitArray(distance, 'km')
+        stats = time_call(lambda: column.to('mi'), args.repeat, warmup=1)
+        run.add('convert_column', scale, stats)
+
+    run.write(args.output)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
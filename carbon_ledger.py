@@ -0,0 +1,211 @@
+"""
+Append-only carbon ledger of per-entity emissions across analyses.
+
+Each recorded orchestration appends one row per (entity, category) to a
+SQLite file for its UTC month (``ledger-YYYY-MM.sqlite`` under the ledger
+directory), so history grows by adding files and old months are never
+rewritten. Rows are only ever inserted.
+
+Each partition has a covering index on (entity_id, ts), and per-analysis
+category totals indexed on (category, ts) written alongside the entries. A
+trend query such as "logistics emissions of route X over 24 months" opens
+only the partitions in range and answers from an index alone; category-wide
+trends read one total per analysis instead of every entity.
+
+Entities and categories follow the CarbonAccountingAgent breakdown:
+suppliers carry ``sourcing`` and ``operations``, routes ``logistics``, and
+inventory items ``inventory_waste``.
+
+Enable recording in AgentCore with ``CARBON_LEDGER_DIR``.
+"""
+
+import glob
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+BUCKETS = {'month': '%Y-%m', 'day': '%Y-%m-%d'}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS orchestrations (
+    orchestration_id TEXT PRIMARY KEY,
+    ts REAL NOT NULL,
+    total_emissions REAL NOT NULL,
+    entries INTEGER NOT NULL,
+    emission_factors_version TEXT
+);
+CREATE TABLE IF NOT EXISTS entries (
+    orchestration_id TEXT NOT NULL,
+    ts REAL NOT NULL,
+    entity_type TEXT NOT NULL,
+    entity_id TEXT NOT NULL,
+    category TEXT NOT NULL,
+    emissions REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS category_totals (
+    orchestration_id TEXT NOT NULL,
+    ts REAL NOT NULL,
+    category TEXT NOT NULL,
+    emissions REAL NOT NULL,
+    entries INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_entries_entity_time ON entries (entity_id, ts, category, emissions);
+CREATE INDEX IF NOT EXISTS idx_category_totals_time ON category_totals (category, ts, emissions, entries);
+"""
+
+
+class LedgerError(ValueError):
+    """Ledger query with a bad bucket, no subject or a reversed date range"""
+
+
+def _month_of(ts: float) -> str:
+    return datetime.fromtimestamp(ts, timezone.utc).strftime('%Y-%m')
+
+
+def _months_between(start: float, end: float) -> List[str]:
+    """UTC months overlapping [start, end)"""
+    first = datetime.fromtimestamp(start, timezone.utc)
+    last = datetime.fromtimestamp(max(start, end - 1e-6), timezone.utc)
+    year, month, months = first.year, first.month, []
+    while (year, month) <= (last.year, last.month):
+        months.append(f'{year:04d}-{month:02d}')
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return months
+
+
+def ledger_entries(results: Dict[str, Any]) -> Iterator[Tuple[str, str, str, float]]:
+    """(entity_type, entity_id, category, emissions) per row of one analysis"""
+    # Imported here: agents.agent_core imports this module
+    from agents.emission_factors import load_emission_factors
+    factors = load_emission_factors()
+    operations_share = factors.multiplier('operations_share_of_sourcing')
+    waste_multiplier = factors.multiplier('inventory_waste_per_percent')
+    for row in results.get('sourcing', {}).get('analysis') or []:
+        carbon = float(row.get('carbon_footprint') or 0)
+        yield 'supplier', str(row.get('supplier_id')), 'sourcing', carbon
+        yield 'supplier', str(row.get('supplier_id')), 'operations', carbon * operations_share
+    for row in results.get('logistics', {}).get('optimized_routes') or []:
+        yield 'route', str(row.get('route_id')), 'logistics', float(row.get('current_emissions') or 0)
+    for row in results.get('inventory', {}).get('waste_analysis') or []:
+        yield 'product', str(row.get('product_id')), 'inventory_waste', float(row.get('waste_percentage') or 0) * waste_multiplier
+
+
+class CarbonLedger:
+    """Month-partitioned SQLite ledger under `directory`"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._connections: Dict[str, sqlite3.Connection] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> Optional['CarbonLedger']:
+        directory = os.getenv('CARBON_LEDGER_DIR')
+        return cls(directory) if directory else None
+
+    def _path(self, month: str) -> str:
+        return os.path.join(self.directory, f'ledger-{month}.sqlite')
+
+    def _connection(self, month: str, create: bool = False) -> Optional[sqlite3.Connection]:
+        """Connection to a partition; None if it does not exist and `create` is False"""
+        conn = self._connections.get(month)
+        if conn is None:
+            path = self._path(month)
+            if not create and not os.path.exists(path):
+                return None
+            # Connections are shared across threads; every use holds self._lock
+            conn = sqlite3.connect(path, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.executescript(_SCHEMA)
+            self._connections[month] = conn
+        return conn
+
+    def months(self) -> List[str]:
+        """Partitions on disk, oldest first"""
+        names = glob.glob(os.path.join(self.directory, 'ledger-*.sqlite'))
+        return sorted(os.path.basename(n)[len('ledger-'):-len('.sqlite')] for n in names)
+
+    def record(self, orchestration_id: str, results: Dict[str, Any], timestamp: float = None) -> int:
+        """Append one analysis; returns the number of entries written"""
+        ts = time.time() if timestamp is None else timestamp
+        rows = [(orchestration_id, ts, *entry) for entry in ledger_entries(results)]
+        totals: Dict[str, List[float]] = {}
+        for row in rows:
+            total = totals.setdefault(row[4], [0.0, 0])
+            total[0] += row[5]
+            total[1] += 1
+        with self._lock:
+            conn = self._connection(_month_of(ts), create=True)
+            with conn:
+                conn.execute('INSERT INTO orchestrations VALUES (?, ?, ?, ?, ?)',
+                             (orchestration_id, ts, sum(r[5] for r in rows), len(rows),
+                              results.get('carbon_accounting', {}).get('emission_factors_version')))
+                conn.executemany('INSERT INTO entries VALUES (?, ?, ?, ?, ?, ?)', rows)
+                conn.executemany('INSERT INTO category_totals VALUES (?, ?, ?, ?, ?)',
+                                 [(orchestration_id, ts, category, emissions, count)
+                                  for category, (emissions, count) in totals.items()])
+        return len(rows)
+
+    def series(self, entity_id: str = None, category: str = None, start: float = None, end: float = None,
+               months: int = None, bucket: str = 'month') -> List[Dict[str, Any]]:
+        """Emission totals per `bucket` ('month' or 'day') in [start, end)
+
+        Filters by entity, category or both; `months` is a shorthand for the
+        last N months up to `end` (default now).
+        """
+        if bucket not in BUCKETS:
+            raise LedgerError(f"bucket must be one of {list(BUCKETS)}")
+        if entity_id is None and category is None:
+            raise LedgerError('entity_id or category required')
+        end = time.time() if end is None else end
+        if start is None:
+            last = datetime.fromtimestamp(end, timezone.utc)
+            span_months = months or 12
+            year, month = divmod(last.year * 12 + last.month - 1 - (span_months - 1), 12)
+            start = datetime(year, month + 1, 1, tzinfo=timezone.utc).timestamp()
+        if start >= end:
+            raise LedgerError('start must be before end')
+
+        period = f"strftime('{BUCKETS[bucket]}', ts, 'unixepoch') AS period"
+        if entity_id is None:
+            sql = (f"SELECT {period}, SUM(emissions), SUM(entries) FROM category_totals "
+                   f"INDEXED BY idx_category_totals_time "
+                   f"WHERE category = ? AND ts >= ? AND ts < ? GROUP BY period ORDER BY period")
+            params = [category, start, end]
+        else:
+            sql = (f"SELECT {period}, SUM(emissions), COUNT(*) FROM entries INDEXED BY idx_entries_entity_time "
+                   f"WHERE entity_id = ? AND ts >= ? AND ts < ?{' AND category = ?' if category else ''} "
+                   f"GROUP BY period ORDER BY period")
+            params = [entity_id, start, end] + ([category] if category else [])
+
+        points = []
+        with self._lock:
+            for month in _months_between(start, end):
+                conn = self._connection(month)
+                if conn is None:
+                    continue
+                for period, emissions, entries in conn.execute(sql, params):
+                    points.append({'period': period, 'emissions': emissions, 'entries': entries})
+        return points
+
+    def orchestrations(self, month: str) -> List[Dict[str, Any]]:
+        """Analyses recorded in one month partition, oldest first"""
+        with self._lock:
+            conn = self._connection(month)
+            if conn is None:
+                return []
+            rows = conn.execute('SELECT orchestration_id, ts, total_emissions, entries, emission_factors_version '
+                                'FROM orchestrations ORDER BY ts').fetchall()
+        keys = ('orchestration_id', 'ts', 'total_emissions', 'entries', 'emission_factors_version')
+        return [dict(zip(keys, row)) for row in rows]
+
+    def close(self):
+        with self._lock:
+            for conn in self._connections.values():
+                conn.close()
+            self._connections.clear()
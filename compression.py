@@ -0,0 +1,139 @@
+"""
+HTTP body compression: gzip (stdlib) and zstd (optional `zstandard`).
+
+- ``negotiate`` picks a response encoding from an Accept-Encoding header.
+- ``compress`` / ``iter_compress`` encode a whole body or a stream of chunks.
+- ``decompress`` decodes a request body per its Content-Encoding, refusing
+  to inflate past ``MAX_DECOMPRESSED_BYTES`` (decompression-bomb guard).
+
+Bodies smaller than ``MIN_COMPRESS_BYTES`` are not worth the CPU and are
+sent as-is; callers check ``should_compress``.
+"""
+
+import os
+import zlib
+from typing import Iterable, Iterator, List, Optional
+
+try:
+    import zstandard
+    _ZSTD_AVAILABLE = True
+except ImportError:
+    zstandard = None
+    _ZSTD_AVAILABLE = False
+
+# Server preference order when the client accepts several with equal q
+ENCODINGS: List[str] = (['zstd'] if _ZSTD_AVAILABLE else []) + ['gzip']
+
+MIN_COMPRESS_BYTES = int(os.getenv('COMPRESSION_MIN_BYTES', '1024'))
+MAX_DECOMPRESSED_BYTES = int(os.getenv('MAX_DECOMPRESSED_BYTES', str(256 * 1024 * 1024)))
+LEVELS = {
+    'gzip': int(os.getenv('GZIP_LEVEL', '6')),
+    'zstd': int(os.getenv('ZSTD_LEVEL', '3'))
+}
+
+_ALIASES = {'x-gzip': 'gzip'}
+
+
+class CompressionError(ValueError):
+    pass
+
+
+class UnsupportedEncodingError(CompressionError):
+    """Content-Encoding we cannot decode (HTTP 415)"""
+
+
+class DecompressedSizeError(CompressionError):
+    """Body inflates past MAX_DECOMPRESSED_BYTES (HTTP 413)"""
+
+
+def negotiate(accept_encoding: Optional[str], available: Optional[List[str]] = None) -> Optional[str]:
+    """Best encoding the client accepts, or None for identity"""
+    if not accept_encoding:
+        return None
+    prefs = {}
+    for part in accept_encoding.split(','):
+        name, _, params = part.strip().partition(';')
+        name = _ALIASES.get(name.strip().lower(), name.strip().lower())
+        if not name:
+            continue
+        q = 1.0
+        for param in params.split(';'):
+            key, _, value = param.strip().partition('=')
+            if key.strip() == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        prefs[name] = q
+
+    best, best_q = None, 0.0
+    for encoding in available or ENCODINGS:
+        q = prefs.get(encoding, prefs.get('*', 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def should_compress(size: int, encoding: Optional[str]) -> bool:
+    return encoding is not None and size >= MIN_COMPRESS_BYTES
+
+
+def _compressor(encoding: str, level: Optional[int]):
+    level = LEVELS[encoding] if level is None else level
+    if encoding == 'gzip':
+        return zlib.compressobj(level, zlib.DEFLATED, 31)
+    if encoding == 'zstd' and _ZSTD_AVAILABLE:
+        return zstandard.ZstdCompressor(level=level).compressobj()
+    raise UnsupportedEncodingError(f"Unsupported encoding '{encoding}'")
+
+
+def compress(data: bytes, encoding: str, level: Optional[int] = None) -> bytes:
+    compressor = _compressor(encoding, level)
+    return compressor.compress(data) + compressor.flush()
+
+
+def iter_compress(chunks: Iterable[bytes], encoding: str, level: Optional[int] = None) -> Iterator[bytes]:
+    """Compress a stream chunk by chunk; only non-empty output is yielded"""
+    compressor = _compressor(encoding, level)
+    for chunk in chunks:
+        out = compressor.compress(chunk)
+        if out:
+            yield out
+    tail = compressor.flush()
+    if tail:
+        yield tail
+
+
+def _decode_one(data: bytes, encoding: str, limit: int) -> bytes:
+    if encoding == 'gzip':
+        decompressor = zlib.decompressobj(47)  # gzip or zlib header, auto-detected
+        try:
+            out = decompressor.decompress(data, limit + 1)
+        except zlib.error as e:
+            raise CompressionError(f"Invalid gzip body: {e}")
+        if len(out) > limit or decompressor.unconsumed_tail:
+            raise DecompressedSizeError(f"Decompressed body exceeds {limit} bytes")
+        if not decompressor.eof:
+            raise CompressionError("Invalid gzip body: truncated stream")
+        return out
+    if encoding == 'zstd' and _ZSTD_AVAILABLE:
+        reader = zstandard.ZstdDecompressor().stream_reader(data)
+        try:
+            out = reader.read(limit + 1)
+        except zstandard.ZstdError as e:
+            raise CompressionError(f"Invalid zstd body: {e}")
+        if len(out) > limit:
+            raise DecompressedSizeError(f"Decompressed body exceeds {limit} bytes")
+        return out
+    raise UnsupportedEncodingError(f"Unsupported Content-Encoding '{encoding}'")
+
+
+def decompress(data: bytes, content_encoding: Optional[str], limit: int = None) -> bytes:
+    """Undo every coding listed in Content-Encoding (applied in order)"""
+    if not content_encoding:
+        return data
+    limit = MAX_DECOMPRESSED_BYTES if limit is None else limit
+    codings = [_ALIASES.get(c.strip().lower(), c.strip().lower()) for c in content_encoding.split(',')]
+    for coding in reversed([c for c in codings if c and c != 'identity']):
+        data = _decode_one(data, coding, limit)
+    return data
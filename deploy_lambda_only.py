@@ -5,9 +5,17 @@ Deploy only Lambda function (skip Bedrock Agent due to permissions)
 
 import boto3
 import json
+import subprocess
+import sys
+import tempfile
 import zipfile
 import os
 
+LAMBDA_RUNTIME = 'python3.9'
+# Third-party packages the agents import that the Lambda runtime lacks
+# (boto3 is built in); installed as manylinux wheels into the zip
+VENDORED_PACKAGES = ['numpy>=1.24,<2.1']
+
 class LambdaDeployer:
     def __init__(self):
         self.lambda_client = boto3.client('lambda')
@@ -37,7 +45,7 @@ class LambdaDeployer:
                 # Function doesn't exist, create new one
                 response = self.lambda_client.create_function(
                     FunctionName='sustainability-agents-orchestrator',
-                    Runtime='python3.9',
+                    Runtime=LAMBDA_RUNTIME,
                     Role='arn:aws:iam::557017932249:role/lambda_execution_role',  # Use LabRole
                     Handler='lambda_handler.handler',
                     Code={'ZipFile': zip_content},
@@ -57,9 +65,13 @@ class LambdaDeployer:
             print(f"❌ Lambda deployment error: {e}")
             return None
     
-    def _create_deployment_package(self):
+    def _create_deployment_package(self, path='sustainability_agents.zip', vendor=True):
         """Create deployment ZIP package"""
-        with zipfile.ZipFile('sustainability_agents.zip', 'w') as zipf:
+        with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as zipf:
+            # Third-party packages the agents import (numpy)
+            if vendor:
+                self._vendor_packages(zipf)
+            
             # Add all agent files
             for root, dirs, files in os.walk('agents'):
                 for file in files:
@@ -75,17 +87,35 @@ class LambdaDeployer:
                         zipf.write(file_path, f'orchestration/{file}')
             
             # Add support files
-            support_files = ['strands_client.py', 'integration_adapter.py']
+            support_files = ['strands_client.py', 'integration_adapter.py', 'serialization.py', 'compression.py',
+                             'session_store.py', 'carbon_ledger.py', 'aws_config.py']
             for file in support_files:
                 if os.path.exists(file):
                     zipf.write(file, file)
             
+            # Emission factor table read by the agents at import time
+            zipf.write(os.path.join('data', 'emission_factors.json'), 'data/emission_factors.json')
+            
             # Add Lambda handler
             zipf.writestr('lambda_handler.py', self._get_lambda_handler_code())
     
+    def _vendor_packages(self, zipf, packages=VENDORED_PACKAGES):
+        """Install Lambda-platform wheels of `packages` and add them at the zip root"""
+        with tempfile.TemporaryDirectory() as target:
+            subprocess.run([sys.executable, '-m', 'pip', 'install', '--quiet', '--target', target,
+                            '--platform', 'manylinux2014_x86_64', '--implementation', 'cp',
+                            '--python-version', LAMBDA_RUNTIME[len('python'):], '--only-binary=:all:',
+                            *packages], check=True)
+            for root, dirs, files in os.walk(target):
+                dirs[:] = [d for d in dirs if d != '__pycache__']
+                for file in files:
+                    file_path = os.path.join(root, file)
+                    zipf.write(file_path, os.path.relpath(file_path, target))
+    
     def _get_lambda_handler_code(self):
         """Generate Lambda handler code"""
         return '''
+import base64
 import json
 import sys
 import os
@@ -101,6 +131,54 @@ except ImportError as e:
     print(f"Import error: {e}")
     AGENTS_AVAILABLE = False
 
+try:
+    from serialization import dedup_strings, dumps_str
+except ImportError:
+    dedup_strings = None
+    dumps_str = json.dumps
+
+try:
+    import compression
+except ImportError:
+    compression = None
+
+def encode_body(payload, response_format=None):
+    """Serialize a response body; 'dedup' interns repeated strings"""
+    if response_format == 'dedup' and dedup_strings is not None:
+        payload = dedup_strings(payload)
+    return dumps_str(payload)
+
+def _header(event, name):
+    for key, value in (event.get('headers') or {}).items():
+        if key.lower() == name:
+            return value
+    return None
+
+def decode_request_body(event):
+    """API Gateway body as text, undoing base64 and Content-Encoding"""
+    body = event.get('body') or ''
+    if not event.get('isBase64Encoded'):
+        return body
+    raw = base64.b64decode(body)
+    if compression is not None:
+        raw = compression.decompress(raw, _header(event, 'content-encoding'))
+    return raw.decode('utf-8')
+
+def compress_api_response(event, response):
+    """Compress a proxy response body per Accept-Encoding (base64 for API Gateway)"""
+    if compression is None:
+        return response
+    body = response['body'].encode('utf-8')
+    encoding = compression.negotiate(_header(event, 'accept-encoding'))
+    headers = response.setdefault('headers', {})
+    headers['Vary'] = 'Accept-Encoding'
+    if not compression.should_compress(len(body), encoding):
+        return response
+    headers['Content-Encoding'] = encoding
+    response['body'] = base64.b64encode(compression.compress(body, encoding)).decode('ascii')
+    response['isBase64Encoded'] = True
+    return response
+
 def handler(event, context):
     """Main Lambda handler for sustainability analysis"""
     
@@ -167,17 +245,24 @@ def handle_direct_invocation(event):
     
     return {
         'statusCode': 200,
-        'body': json.dumps({
+        'body': encode_body({
             'results': results,
             'message': 'Analysis completed successfully'
-        })
+        }, event.get('response_format'))
     }
 
 def handle_api_event(event):
     """Handle API Gateway event"""
     
     try:
-        body = json.loads(event.get('body', '{}'))
+        try:
+            body = json.loads(decode_request_body(event) or '{}')
+        except Exception as e:
+            status = 415 if compression and isinstance(e, compression.UnsupportedEncodingError) else 400
+            return {
+                'statusCode': status,
+                'body': json.dumps({'error': f'Invalid request body: {e}'})
+            }
         supply_chain_data = body.get('supply_chain_data')
         
         if not supply_chain_data:
@@ -189,17 +274,17 @@ def handle_api_event(event):
         agent_core = AgentCore()
         results = agent_core.orchestrate_sustainability_analysis(supply_chain_data)
         
-        return {
+        return compress_api_response(event, {
             'statusCode': 200,
             'headers': {
                 'Content-Type': 'application/json',
                 'Access-Control-Allow-Origin': '*'
             },
-            'body': json.dumps({
+            'body': encode_body({
                 'results': results,
                 'message': 'Analysis completed successfully'
-            })
-        }
+            }, body.get('response_format'))
+        })
         
     except Exception as e:
         return {
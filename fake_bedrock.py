@@ -0,0 +1,102 @@
+"""
+Local fake Bedrock clients for offline tests and benchmarks
+"""
+
+import io
+import json
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional
+
+
+class FakeBedrockAgentRuntime:
+    """Stands in for the `bedrock-agent-runtime` client.
+
+    `invoke_agent` returns a lazily produced completion stream shaped like
+    the real EventStream, so callers see chunks one at a time.
+    """
+
+    def __init__(self, chunks: Optional[List[Any]] = None, chunk_delay: float = 0.0,
+                 fail_after: Optional[int] = None):
+        self.chunks = chunks if chunks is not None else [
+            "Analyzing supplier emissions... ",
+            "Rail shifts cut logistics CO2 by 40%. ",
+            "Prioritise ISO 14001 suppliers."
+        ]
+        self.chunk_delay = chunk_delay
+        self.fail_after = fail_after
+        self.calls: List[Dict[str, Any]] = []
+        self.chunks_produced = 0
+        self._lock = threading.Lock()
+
+    def invoke_agent(self, **kwargs) -> Dict[str, Any]:
+        with self._lock:
+            self.calls.append(kwargs)
+        return {
+            'sessionId': kwargs.get('sessionId'),
+            'completion': self._stream()
+        }
+
+    def _stream(self) -> Iterator[Dict[str, Any]]:
+        for i, text in enumerate(self.chunks):
+            if self.fail_after is not None and i >= self.fail_after:
+                raise RuntimeError('Fake stream interrupted')
+            if self.chunk_delay:
+                time.sleep(self.chunk_delay)
+            with self._lock:
+                self.chunks_produced += 1
+            data = text if isinstance(text, bytes) else text.encode('utf-8')
+            yield {'chunk': {'bytes': data}}
+        yield {'trace': {}}
+
+
+class FakeThrottlingException(Exception):
+    """Mimics botocore's ClientError for a throttled Bedrock call"""
+
+    def __init__(self):
+        super().__init__('Rate exceeded')
+        self.response = {'Error': {'Code': 'ThrottlingException', 'Message': 'Rate exceeded'}}
+
+
+class FakeBedrockRuntime:
+    """Stands in for the `bedrock-runtime` client's invoke_model.
+
+    Calls block for `latency` seconds. When `max_concurrency` is set, calls
+    beyond it raise a throttling error, like a provisioned quota would.
+    """
+
+    def __init__(self, text: str = "Fake model answer", latency: float = 0.0,
+                 throttle_first: int = 0, max_concurrency: Optional[int] = None,
+                 usage: Optional[Dict[str, int]] = None):
+        self.text = text
+        self.latency = latency
+        self.throttle_first = throttle_first
+        self.max_concurrency = max_concurrency
+        self.usage = usage or {'input_tokens': 12, 'output_tokens': 34}
+        self.calls: List[Dict[str, Any]] = []
+        self.active = 0
+        self.peak_concurrency = 0
+        self._lock = threading.Lock()
+
+    def invoke_model(self, **kwargs) -> Dict[str, Any]:
+        with self._lock:
+            self.calls.append(kwargs)
+            throttle = len(self.calls) <= self.throttle_first or (
+                self.max_concurrency is not None and self.active >= self.max_concurrency
+            )
+            if not throttle:
+                self.active += 1
+                self.peak_concurrency = max(self.peak_concurrency, self.active)
+        if throttle:
+            raise FakeThrottlingException()
+        try:
+            if self.latency:
+                time.sleep(self.latency)
+            body = json.dumps({
+                'content': [{'type': 'text', 'text': self.text}],
+                'usage': self.usage
+            }).encode('utf-8')
+            return {'body': io.BytesIO(body), 'contentType': 'application/json'}
+        finally:
+            with self._lock:
+                self.active -= 1
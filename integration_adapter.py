@@ -3,18 +3,142 @@ Integration adapter to bridge Phase 1 (Data Generator) with Phase 2 (Analysis Ag
 Handles data format conversion and validation
 """
 
+from collections.abc import Mapping, Sequence
 from typing import Dict, Any, List
 import asyncio
 from agents.data_generator import DataGeneratorAgent
 from agents import AgentCore
+from agents.units import convert
+
+# Phase 1 supplier footprints are generated in hundreds of kg; Phase 2 works in t CO2e
+PHASE1_FOOTPRINT_UNIT = '100 kg CO2e'
+_FOOTPRINT_TO_TONNES = convert(1.0, PHASE1_FOOTPRINT_UNIT, 't CO2e')
+
+_MISSING = object()
+
+
+def _field(*names, transform=None, default=_MISSING):
+    """Getter reading the first present source key (snake_case or camelCase)"""
+    def get(record):
+        for name in names:
+            try:
+                value = record[name]
+            except KeyError:
+                continue
+            return transform(value) if transform else value
+        if default is _MISSING:
+            raise KeyError(names[0])
+        return default
+    return get
+
+
+# Phase 2 field -> getter over a Phase 1 record, per Phase 2 collection
+SUPPLIER_FIELDS = {
+    'id': _field('id'),
+    'name': _field('name'),
+    'carbon_footprint': _field('carbon_footprint', 'carbonFootprint', transform=lambda v: v * _FOOTPRINT_TO_TONNES),
+    'certifications': _field('certifications'),
+    'renewable_energy_percent': _field('sustainability_score', 'sustainabilityScore', default=50),  # Use sustainability_score as renewable %
+    'location': _field('location', default=None),
+    'cost': _field('cost', default=None)
+}
+
+ROUTE_FIELDS = {
+    'id': _field('id'),
+    'origin': _field('origin'),
+    'destination': _field('destination'),
+    'distance_km': _field('distance', 'distance_km'),
+    'transport_mode': _field('mode', 'transport_mode'),
+    'cost': _field('cost', default=None)
+}
+
+INVENTORY_FIELDS = {
+    'id': _field('id'),
+    'name': _field('name'),
+    'current_stock': _field('current_stock', 'currentStock'),
+    'monthly_demand': _field('reorder_point', 'reorderPoint', transform=lambda v: v * 2),  # Estimate monthly demand
+    'shelf_life_days': _field('category', transform=lambda c: 180 if c == 'Food' else 365),  # Category-based shelf life
+    'category': _field('category', default=None),
+    'holding_cost': _field('holding_cost', 'holdingCost', default=None)
+}
+
+# Phase 2 collection -> (Phase 1 collection, field getters)
+PHASE2_SCHEMA = {
+    'suppliers': ('suppliers', SUPPLIER_FIELDS),
+    'routes': ('routes', ROUTE_FIELDS),
+    'inventory': ('products', INVENTORY_FIELDS)
+}
+
+
+class RecordView(Mapping):
+    """Read-only Phase 2 record computed on access from a Phase 1 record"""
+    __slots__ = ('_source', '_fields')
+
+    def __init__(self, source: Mapping, fields: Dict[str, Any]):
+        self._source = source
+        self._fields = fields
+
+    def __getitem__(self, key):
+        return self._fields[key](self._source)
+
+    def __iter__(self):
+        return iter(self._fields)
+
+    def __len__(self):
+        return len(self._fields)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: get(self._source) for name, get in self._fields.items()}
+
+    def __repr__(self):
+        return f"RecordView({self.to_dict()!r})"
+
+
+class SequenceView(Sequence):
+    """Lazily mapped Phase 2 collection over a Phase 1 row sequence"""
+
+    def __init__(self, source: Sequence, fields: Dict[str, Any]):
+        self._source = source
+        self._fields = fields
+
+    def __len__(self):
+        return len(self._source)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return SequenceView(self._source[i], self._fields)
+        return RecordView(self._source[i], self._fields)
+
+    def __iter__(self):
+        fields = self._fields
+        for record in self._source:
+            yield RecordView(record, fields)
+
+    def to_list(self) -> List[Dict[str, Any]]:
+        fields = self._fields.items()
+        return [{name: get(record) for name, get in fields} for record in self._source]
+
+
+def materialize(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy views into plain lists of dicts (e.g. for JSON responses)"""
+    return {key: value.to_list() if isinstance(value, SequenceView) else value
+            for key, value in data.items()}
+
 
 class IntegrationAdapter:
     def __init__(self):
         self.data_generator = DataGeneratorAgent()
         self.agent_core = AgentCore()
     
-    async def generate_and_analyze(self, suppliers: int = 20, routes: int = 30, products: int = 15) -> Dict[str, Any]:
-        """Generate data and run complete sustainability analysis"""
+    async def generate_and_analyze(self, suppliers: int = 20, routes: int = 30, products: int = 15,
+                                   include_generated_data: bool = True,
+                                   include_converted_data: bool = True) -> Dict[str, Any]:
+        """Generate data and run complete sustainability analysis.
+
+        The analysis reads the generated records through views, so the
+        dataset is held once. Set the include flags to False to leave the
+        raw and converted copies out of the response.
+        """
         
         # Step 1: Generate data using Phase 1 agent
         generated_data = await self.data_generator.execute({
@@ -23,64 +147,48 @@ class IntegrationAdapter:
             'products': products
         })
         
-        # Step 2: Convert to Phase 2 format
-        converted_data = self._convert_data_format(generated_data)
+        # Step 2: Map to Phase 2 format without copying records
+        converted_data = self.convert_views(generated_data)
         
         # Step 3: Run Phase 2 analysis
         analysis_results = self.agent_core.orchestrate_sustainability_analysis(converted_data)
         
         # Step 4: Combine results
+        response: Dict[str, Any] = {}
+        if include_generated_data:
+            response['generated_data'] = generated_data
+        if include_converted_data:
+            response['converted_data'] = materialize(converted_data)
+        response['analysis_results'] = analysis_results
+        response['integration_metadata'] = {
+            'data_quality_score': self._calculate_data_quality(self._source_rows(generated_data)),
+            'conversion_success': True,
+            'analysis_success': 'error' not in analysis_results
+        }
+        return response
+    
+    def convert_views(self, generated_data: Dict[str, Any]) -> Dict[str, SequenceView]:
+        """Phase 2 views over Phase 1 data (row lists, camelCase rows or columnar arrays)"""
+        rows = self._source_rows(generated_data)
         return {
-            'generated_data': generated_data,
-            'converted_data': converted_data,
-            'analysis_results': analysis_results,
-            'integration_metadata': {
-                'data_quality_score': self._calculate_data_quality(generated_data),
-                'conversion_success': True,
-                'analysis_success': 'error' not in analysis_results
-            }
+            target: SequenceView(rows[source], fields)
+            for target, (source, fields) in PHASE2_SCHEMA.items()
         }
     
     def _convert_data_format(self, generated_data: Dict[str, Any]) -> Dict[str, Any]:
         """Convert Phase 1 data format to Phase 2 expected format"""
+        return materialize(self.convert_views(generated_data))
+    
+    def _source_rows(self, generated_data: Dict[str, Any]) -> Dict[str, Sequence]:
+        """Phase 1 rows per collection; columnar output is wrapped, not expanded"""
+        if generated_data.get('format') != 'columnar':
+            return {source: generated_data.get(source, []) for source, _ in PHASE2_SCHEMA.values()}
         
-        # Convert suppliers
-        suppliers = []
-        for supplier in generated_data.get('suppliers', []):
-            suppliers.append({
-                'id': supplier['id'],
-                'name': supplier['name'],
-                'carbon_footprint': supplier['carbon_footprint'] / 10,  # Scale down for Phase 2
-                'certifications': supplier['certifications'],
-                'renewable_energy_percent': supplier.get('sustainability_score', 50)  # Use sustainability_score as renewable %
-            })
-        
-        # Convert routes
-        routes = []
-        for route in generated_data.get('routes', []):
-            routes.append({
-                'id': route['id'],
-                'origin': route['origin'],
-                'destination': route['destination'],
-                'distance_km': route['distance'],
-                'transport_mode': route['mode']
-            })
-        
-        # Convert products to inventory
-        inventory = []
-        for product in generated_data.get('products', []):
-            inventory.append({
-                'id': product['id'],
-                'name': product['name'],
-                'current_stock': product['current_stock'],
-                'monthly_demand': product['reorder_point'] * 2,  # Estimate monthly demand
-                'shelf_life_days': 180 if product['category'] == 'Food' else 365  # Category-based shelf life
-            })
-        
+        from agents.columnar_generator import ColumnarDataGenerator, ColumnarRows
+        vocabularies = ColumnarDataGenerator(profile=generated_data.get('profile', 'uniform')).vocabularies
         return {
-            'suppliers': suppliers,
-            'routes': routes,
-            'inventory': inventory
+            source: ColumnarRows(source, generated_data[source], vocabularies) if source in generated_data else []
+            for source, _ in PHASE2_SCHEMA.values()
         }
     
     def _calculate_data_quality(self, data: Dict[str, Any]) -> float:
@@ -1,3 +1,3 @@
-from .agent_orchestrator import AgentOrchestrator, AgentStatus, AgentResult
+from .agent_orchestrator import AgentOrchestrator, AgentStatus, AgentResult, OrchestrationContext, new_orchestration_id
 
-__all__ = ['AgentOrchestrator', 'AgentStatus', 'AgentResult']
\ No newline at end of file
+__all__ = ['AgentOrchestrator', 'AgentStatus', 'AgentResult', 'OrchestrationContext', 'new_orchestration_id']
\ No newline at end of file
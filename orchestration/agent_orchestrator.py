@@ -1,8 +1,15 @@
 import json
+import os
+import sys
 import time
+import uuid
 from typing import Dict, Any, List, Optional
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from enum import Enum
+from .instrumentation import span
+from .retry_policy import Deadline, RetryPolicy
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 
 class AgentStatus(Enum):
     PENDING = "pending"
@@ -10,6 +17,10 @@ class AgentStatus(Enum):
     COMPLETED = "completed"
     FAILED = "failed"
 
+def new_orchestration_id(timestamp: float = None) -> str:
+    """orch_<unix seconds>_<random hex>: sorts by start time, unique within a second"""
+    return f"orch_{int(time.time() if timestamp is None else timestamp)}_{uuid.uuid4().hex[:16]}"
+
 @dataclass
 class AgentResult:
     agent_name: str
@@ -17,17 +28,55 @@ class AgentResult:
     data: Dict[str, Any]
     execution_time: float
     error_message: Optional[str] = None
+    attempts: int = 1
+    error_class: Optional[str] = None
+
+@dataclass
+class OrchestrationContext:
+    """State of one orchestration run.
+
+    A new context is built for every ``orchestrate_agents`` call and passed
+    explicitly to each step, so concurrent runs on one orchestrator never
+    see each other's data. Only the agents themselves are shared.
+    """
+    supply_chain_data: Dict[str, Any]
+    deadline: Deadline = field(default_factory=Deadline)
+    store: Dict[str, Any] = field(default_factory=dict)
+    agent_results: Dict[str, AgentResult] = field(default_factory=dict)
+    context_flow: List[Dict[str, Any]] = field(default_factory=list)
 
 class AgentOrchestrator:
-    def __init__(self):
-        self.execution_history = []
-        self.context_store = {}
+    """Runs the agent sequence; safe to share across threads.
+
+    The orchestrator holds only the (stateless) agents and configuration;
+    everything produced by a run lives in its ``OrchestrationContext``.
+    """
+
+    def __init__(self, sourcing_agent=None, logistics_agent=None, inventory_agent=None, carbon_agent=None,
+                 retry_policy: RetryPolicy = None):
+        from agents import SourcingAgent, LogisticsAgent, InventoryAgent, CarbonAccountingAgent
+
+        self.sourcing_agent = sourcing_agent or SourcingAgent()
+        self.logistics_agent = logistics_agent or LogisticsAgent()
+        self.inventory_agent = inventory_agent or InventoryAgent()
+        self.carbon_agent = carbon_agent or CarbonAccountingAgent()
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.agent_sequence = [
+            ('sourcing', self._execute_sourcing_agent),
+            ('logistics', self._execute_logistics_agent), 
+            ('inventory', self._execute_inventory_agent),
+            ('carbon_accounting', self._execute_carbon_agent)
+        ]
         
-    def orchestrate_agents(self, supply_chain_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Enhanced orchestration with proper flow control and context passing"""
+    def orchestrate_agents(self, supply_chain_data: Dict[str, Any], deadline: Deadline = None) -> Dict[str, Any]:
+        """Enhanced orchestration with proper flow control and context passing
+
+        Once `deadline` passes, no further agent attempt or retry starts;
+        the remaining agents report failure and get fallback results.
+        """
         
         orchestration_result = {
-            'orchestration_id': f"orch_{int(time.time())}",
+            'orchestration_id': new_orchestration_id(),
             'start_time': time.time(),
             'agent_results': {},
             'context_flow': [],
@@ -36,33 +85,28 @@ class AgentOrchestrator:
         }
         
         try:
-            # Step 1: Initialize context
-            self._initialize_context(supply_chain_data)
+            # Step 1: Initialize a context private to this run
+            context = self._initialize_context(supply_chain_data, deadline)
+            orchestration_result['agent_results'] = context.agent_results
+            orchestration_result['context_flow'] = context.context_flow
             
             # Step 2: Execute agents in sequence with context passing
-            agent_sequence = [
-                ('sourcing', self._execute_sourcing_agent),
-                ('logistics', self._execute_logistics_agent), 
-                ('inventory', self._execute_inventory_agent),
-                ('carbon_accounting', self._execute_carbon_agent)
-            ]
-            
-            for agent_name, agent_func in agent_sequence:
-                result = self._execute_with_retry(agent_name, agent_func)
-                orchestration_result['agent_results'][agent_name] = result
+            for agent_name, agent_func in self.agent_sequence:
+                result = self._execute_with_retry(agent_name, agent_func, context)
+                context.agent_results[agent_name] = result
                 
                 if result.status == AgentStatus.COMPLETED:
-                    self._update_context(agent_name, result.data)
-                    orchestration_result['context_flow'].append({
+                    self._update_context(context, agent_name, result.data)
+                    context.context_flow.append({
                         'agent': agent_name,
                         'context_keys_added': list(result.data.keys()),
                         'timestamp': time.time()
                     })
                 else:
-                    self._handle_agent_failure(agent_name, result)
+                    self._handle_agent_failure(context, agent_name, result)
             
             # Step 3: Generate final aggregated results
-            orchestration_result['final_results'] = self._aggregate_results()
+            orchestration_result['final_results'] = self._aggregate_results(context)
             orchestration_result['execution_summary'] = self._generate_execution_summary(orchestration_result)
             
         except Exception as e:
@@ -73,9 +117,9 @@ class AgentOrchestrator:
         
         return orchestration_result
     
-    def _initialize_context(self, supply_chain_data: Dict[str, Any]):
-        """Initialize shared context for all agents"""
-        self.context_store = {
+    def _initialize_context(self, supply_chain_data: Dict[str, Any], deadline: Deadline = None) -> OrchestrationContext:
+        """Build the context shared by the agents of one run"""
+        return OrchestrationContext(supply_chain_data, deadline=deadline or Deadline(), store={
             'original_data': supply_chain_data,
             'suppliers': supply_chain_data.get('suppliers', []),
             'routes': supply_chain_data.get('routes', []),
@@ -85,49 +129,46 @@ class AgentOrchestrator:
                 'total_routes': len(supply_chain_data.get('routes', [])),
                 'total_inventory_items': len(supply_chain_data.get('inventory', []))
             }
-        }
+        })
     
-    def _execute_with_retry(self, agent_name: str, agent_func, max_retries: int = 2) -> AgentResult:
-        """Execute agent with retry logic"""
+    def _execute_with_retry(self, agent_name: str, agent_func, context: OrchestrationContext) -> AgentResult:
+        """Execute agent under the retry policy (transient errors only)"""
         
-        for attempt in range(max_retries + 1):
-            try:
-                start_time = time.time()
-                result_data = agent_func(self.context_store)
-                execution_time = time.time() - start_time
-                
-                return AgentResult(
-                    agent_name=agent_name,
-                    status=AgentStatus.COMPLETED,
-                    data=result_data,
-                    execution_time=execution_time
+        start_time = time.perf_counter()
+        try:
+            with span(agent_name):
+                result_data, info = self.retry_policy.call(
+                    agent_name, lambda: agent_func(context.store), context.deadline
                 )
-                
-            except Exception as e:
-                if attempt == max_retries:
-                    return AgentResult(
-                        agent_name=agent_name,
-                        status=AgentStatus.FAILED,
-                        data={},
-                        execution_time=time.time() - start_time,
-                        error_message=str(e)
-                    )
-                time.sleep(0.5)
+        except Exception as e:
+            info = getattr(e, 'retry_info', {})
+            return AgentResult(
+                agent_name=agent_name,
+                status=AgentStatus.FAILED,
+                data={},
+                execution_time=time.perf_counter() - start_time,
+                error_message=f"{e.__class__.__name__}: {e}",
+                attempts=info.get('attempts', 1),
+                error_class=info.get('error_class')
+            )
+        
+        return AgentResult(
+            agent_name=agent_name,
+            status=AgentStatus.COMPLETED,
+            data=result_data,
+            execution_time=time.perf_counter() - start_time,
+            attempts=info['attempts']
+        )
     
     def _execute_sourcing_agent(self, context: Dict[str, Any]) -> Dict[str, Any]:
         """Execute sourcing agent with context"""
-        import sys
-        import os
-        sys.path.append(os.path.dirname(os.path.dirname(__file__)))
-        from agents import SourcingAgent
-        
-        agent = SourcingAgent()
+        agent = self.sourcing_agent
         suppliers = context.get('suppliers', [])
         
         if not suppliers:
             return {'analysis': [], 'top_suppliers': [], 'message': 'No suppliers to analyze'}
         
-        result = agent.analyze_supplier_sustainability(suppliers)
+        result = agent.analyze_supplier_sustainability(suppliers, context.get('original_data', {}).get('carbon_price'))
         result['context_metadata'] = {
             'suppliers_processed': len(suppliers),
             'avg_sustainability_score': sum(s.get('sustainability_score', 0) for s in result.get('analysis', [])) / max(len(result.get('analysis', [])), 1)
@@ -137,18 +178,13 @@ class AgentOrchestrator:
     
     def _execute_logistics_agent(self, context: Dict[str, Any]) -> Dict[str, Any]:
         """Execute logistics agent with context from sourcing"""
-        import sys
-        import os
-        sys.path.append(os.path.dirname(os.path.dirname(__file__)))
-        from agents import LogisticsAgent
-        
-        agent = LogisticsAgent()
+        agent = self.logistics_agent
         routes = context.get('routes', [])
         
         if not routes:
             return {'optimized_routes': [], 'total_emission_reduction': 0, 'message': 'No routes to optimize'}
         
-        result = agent.optimize_routes_for_emissions(routes)
+        result = agent.optimize_routes_for_emissions(routes, context.get('original_data', {}).get('carbon_price'))
         
         # Enhance with sourcing context
         sourcing_data = context.get('sourcing_results', {})
@@ -162,18 +198,13 @@ class AgentOrchestrator:
     
     def _execute_inventory_agent(self, context: Dict[str, Any]) -> Dict[str, Any]:
         """Execute inventory agent with context from previous agents"""
-        import sys
-        import os
-        sys.path.append(os.path.dirname(os.path.dirname(__file__)))
-        from agents import InventoryAgent
-        
-        agent = InventoryAgent()
+        agent = self.inventory_agent
         inventory = context.get('inventory', [])
         
         if not inventory:
             return {'waste_analysis': [], 'total_waste_reduction_potential': 0, 'message': 'No inventory to analyze'}
         
-        result = agent.generate_waste_reduction_recommendations(inventory)
+        result = agent.generate_waste_reduction_recommendations(inventory, context.get('original_data', {}).get('carbon_price'))
         
         # Enhance with logistics context
         logistics_data = context.get('logistics_results', {})
@@ -187,17 +218,14 @@ class AgentOrchestrator:
     
     def _execute_carbon_agent(self, context: Dict[str, Any]) -> Dict[str, Any]:
         """Execute carbon accounting agent with all previous context"""
-        import sys
-        import os
-        sys.path.append(os.path.dirname(os.path.dirname(__file__)))
-        from agents import CarbonAccountingAgent
-        
-        agent = CarbonAccountingAgent()
+        agent = self.carbon_agent
         
         supply_chain_data = {
             'sourcing': context.get('sourcing_results', {}),
             'logistics': context.get('logistics_results', {}),
-            'inventory': context.get('inventory_results', {})
+            'inventory': context.get('inventory_results', {}),
+            'uncertainty': context.get('original_data', {}).get('uncertainty'),
+            'segment': context.get('original_data', {}).get('segment')
         }
         
         result = agent.calculate_overall_footprint(supply_chain_data)
@@ -212,17 +240,17 @@ class AgentOrchestrator:
         
         return result
     
-    def _update_context(self, agent_name: str, result_data: Dict[str, Any]):
-        """Update shared context with agent results"""
-        self.context_store[f'{agent_name}_results'] = result_data
+    def _update_context(self, context: OrchestrationContext, agent_name: str, result_data: Dict[str, Any]):
+        """Update the run's context with agent results"""
+        context.store[f'{agent_name}_results'] = result_data
         
         if agent_name == 'sourcing':
-            self.context_store['supplier_scores'] = {
+            context.store['supplier_scores'] = {
                 s.get('supplier_id'): s.get('sustainability_score', 0) 
                 for s in result_data.get('analysis', [])
             }
         elif agent_name == 'logistics':
-            self.context_store['route_emissions'] = {
+            context.store['route_emissions'] = {
                 r.get('route_id'): r.get('current_emissions', 0)
                 for r in result_data.get('optimized_routes', [])
             }
@@ -238,7 +266,7 @@ class AgentOrchestrator:
         
         return sum(quality_factors)
     
-    def _handle_agent_failure(self, agent_name: str, result: AgentResult):
+    def _handle_agent_failure(self, context: OrchestrationContext, agent_name: str, result: AgentResult):
         """Handle agent failure gracefully"""
         fallback_data = {
             'sourcing': {'analysis': [], 'top_suppliers': []},
@@ -247,18 +275,19 @@ class AgentOrchestrator:
             'carbon_accounting': {'total_carbon_footprint_tons': 0, 'sustainability_score': 0}
         }
         
-        self.context_store[f'{agent_name}_results'] = fallback_data.get(agent_name, {})
+        context.store[f'{agent_name}_results'] = fallback_data.get(agent_name, {})
     
-    def _aggregate_results(self) -> Dict[str, Any]:
+    def _aggregate_results(self, context: OrchestrationContext) -> Dict[str, Any]:
         """Aggregate all agent results with orchestration metadata"""
+        store = context.store
         return {
-            'sourcing': self.context_store.get('sourcing_results', {}),
-            'logistics': self.context_store.get('logistics_results', {}),
-            'inventory': self.context_store.get('inventory_results', {}),
-            'carbon_accounting': self.context_store.get('carbon_accounting_results', {}),
+            'sourcing': store.get('sourcing_results', {}),
+            'logistics': store.get('logistics_results', {}),
+            'inventory': store.get('inventory_results', {}),
+            'carbon_accounting': store.get('carbon_accounting_results', {}),
             'orchestration_metadata': {
-                'successful_agents': len([k for k in self.context_store.keys() if k.endswith('_results')]),
-                'data_flow_integrity': len([k for k in self.context_store.keys() if k.endswith('_results')]) >= 3
+                'successful_agents': len([k for k in store.keys() if k.endswith('_results')]),
+                'data_flow_integrity': len([k for k in store.keys() if k.endswith('_results')]) >= 3
             }
         }
     
@@ -270,6 +299,7 @@ class AgentOrchestrator:
             'total_agents': len(agent_results),
             'successful_agents': len([r for r in agent_results.values() if r.status == AgentStatus.COMPLETED]),
             'failed_agents': len([r for r in agent_results.values() if r.status == AgentStatus.FAILED]),
+            'retries': sum(r.attempts - 1 for r in agent_results.values() if r.attempts),
             'context_flow_steps': len(orchestration_result.get('context_flow', [])),
             'orchestration_success': orchestration_result.get('orchestration_error') is None
         }
\ No newline at end of file
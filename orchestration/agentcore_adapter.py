@@ -34,6 +34,9 @@ import os
 import time
 import json
 
+from .instrumentation import span
+from .retry_policy import Deadline, RetryPolicy
+
 try:  # Placeholder import - adjust to real package when known
     import agentcore  # type: ignore  # noqa: F401
     _AGENTCORE_AVAILABLE = True
@@ -58,9 +61,9 @@ class AgentCoreAdapter:
         self.client = None  # Avoid NameErrors
 
     def register_local_agents(self,
-                              sourcing_fn: Callable[[List[Dict[str, Any]]], Dict[str, Any]],
-                              logistics_fn: Callable[[List[Dict[str, Any]]], Dict[str, Any]],
-                              inventory_fn: Callable[[List[Dict[str, Any]]], Dict[str, Any]],
+                              sourcing_fn: Callable[[List[Dict[str, Any]], Any], Dict[str, Any]],
+                              logistics_fn: Callable[[List[Dict[str, Any]], Any], Dict[str, Any]],
+                              inventory_fn: Callable[[List[Dict[str, Any]], Any], Dict[str, Any]],
                               carbon_fn: Callable[[Dict[str, Any]], Dict[str, Any]]):
         """Wrap local agent callables so AgentCore can invoke them as tools.
 
@@ -68,20 +71,25 @@ class AgentCoreAdapter:
         beyond computation, enabling remote execution if needed.
         """
         self._tools = {
-            'sourcing_analysis': lambda ctx: sourcing_fn(ctx.get('suppliers', [])),
-            'logistics_optimization': lambda ctx: logistics_fn(ctx.get('routes', [])),
-            'inventory_waste_reduction': lambda ctx: inventory_fn(ctx.get('inventory', [])),
+            'sourcing_analysis': lambda ctx: sourcing_fn(ctx.get('suppliers', []), ctx.get('carbon_price')),
+            'logistics_optimization': lambda ctx: logistics_fn(ctx.get('routes', []), ctx.get('carbon_price')),
+            'inventory_waste_reduction': lambda ctx: inventory_fn(ctx.get('inventory', []), ctx.get('carbon_price')),
             'carbon_accounting': lambda ctx: carbon_fn({
                 'sourcing': ctx.get('sourcing_result', {}),
                 'logistics': ctx.get('logistics_result', {}),
-                'inventory': ctx.get('inventory_result', {})
+                'inventory': ctx.get('inventory_result', {}),
+                'uncertainty': ctx.get('uncertainty'),
+                'segment': ctx.get('segment')
             })
         }
         self._registered = True
 
-    def run_workflow(self, supply_chain_data: Dict[str, Any]) -> Dict[str, Any]:
+    def run_workflow(self, supply_chain_data: Dict[str, Any], deadline: Deadline = None,
+                     retry_policy: RetryPolicy = None) -> Dict[str, Any]:
         """Execute the multi-step workflow through AgentCore or simulate locally.
 
+        Each step runs under `retry_policy` (default: a single attempt) and
+        fails without running once `deadline` has expired.
         Returns a dict with shape similar to local Orchestrator for compatibility.
         """
         if not self.enabled or not self._registered:
@@ -94,6 +102,7 @@ class AgentCoreAdapter:
         start = time.time()
         ctx: Dict[str, Any] = dict(supply_chain_data)
         execution_trace = []
+        policy = retry_policy or RetryPolicy(max_attempts=1)
 
         # Define execution order; a future AgentCore workflow would encode this declaratively
         order = [
@@ -109,19 +118,24 @@ class AgentCoreAdapter:
                 continue
             step_start = time.time()
             try:
-                result = fn(ctx)
                 key = step.replace('_analysis', '').replace('_optimization', '').replace('_waste_reduction', '')
+                with span(key):
+                    result, info = policy.call(step, lambda: fn(ctx), deadline)
                 ctx[f'{key}_result'] = result
                 execution_trace.append({
                     'step': step,
                     'status': 'success',
-                    'duration': time.time() - step_start
+                    'duration': time.time() - step_start,
+                    'attempts': info['attempts']
                 })
             except Exception as e:  # noqa: BLE001
+                info = getattr(e, 'retry_info', {})
                 execution_trace.append({
                     'step': step,
                     'status': 'error',
-                    'error': str(e)
+                    'error': f"{e.__class__.__name__}: {e}",
+                    'attempts': info.get('attempts', 1),
+                    'error_class': info.get('error_class')
                 })
 
         end = time.time()
@@ -0,0 +1,205 @@
+"""
+Execution backends for the four-agent workflow.
+
+Every executor takes the supply chain data and returns an orchestration
+result shaped like ``AgentOrchestrator.orchestrate_agents`` output
+(``orchestration_id``, ``final_results``, ``execution_summary``,
+``context_flow``, ``total_execution_time``) plus ``backend`` and
+``agentcore_used``. The workflow runs exactly once per request on the
+selected backend; results are never recomputed by another path.
+
+Backends (``AGENT_EXECUTION_BACKEND``):
+
+- ``local``: the in-process ``AgentOrchestrator``.
+- ``agentcore``: the ``AgentCoreAdapter`` workflow, under the orchestrator's
+  retry policy and the request deadline. Falls back to ``local`` when the
+  adapter is not enabled (SDK absent or USE_AWS_AGENTCORE != 1) or the
+  workflow does not run.
+- ``shadow``: runs ``local`` and then ``agentcore``, returns the local
+  result and attaches a comparison plus the extra time spent. Doubles the
+  work per request, so it is meant for validation runs only.
+
+When the variable is unset, ``agentcore`` is used if the adapter is
+enabled, otherwise ``local``.
+"""
+
+import math
+import os
+import time
+from typing import Any, Dict, List
+
+from .agent_orchestrator import new_orchestration_id
+from .instrumentation import METRICS, span
+from .retry_policy import Deadline, DeadlineExceeded
+
+BACKENDS = ('local', 'agentcore', 'shadow')
+SECTIONS = ('sourcing', 'logistics', 'inventory', 'carbon_accounting')
+
+# AgentCoreAdapter trace step -> result section
+_STEP_SECTIONS = {
+    'sourcing_analysis': 'sourcing',
+    'logistics_optimization': 'logistics',
+    'inventory_waste_reduction': 'inventory',
+    'carbon_accounting': 'carbon_accounting'
+}
+
+
+class LocalExecutor:
+    name = 'local'
+
+    def __init__(self, orchestrator):
+        self.orchestrator = orchestrator
+
+    def run(self, supply_chain_data: Dict[str, Any], deadline: Deadline = None) -> Dict[str, Any]:
+        result = self.orchestrator.orchestrate_agents(supply_chain_data, deadline)
+        result['backend'] = self.name
+        result['agentcore_used'] = False
+        return result
+
+
+class AgentCoreExecutor:
+    name = 'agentcore'
+
+    def __init__(self, adapter, fallback=None, retry_policy=None):
+        self.adapter = adapter
+        self.fallback = fallback
+        self.retry_policy = retry_policy
+
+    def run(self, supply_chain_data: Dict[str, Any], deadline: Deadline = None) -> Dict[str, Any]:
+        if deadline is not None and deadline.expired():
+            raise DeadlineExceeded('Deadline exceeded before the AgentCore workflow started')
+        start = time.time()
+        with span('agentcore_workflow'):
+            workflow = self.adapter.run_workflow(supply_chain_data, deadline, self.retry_policy)
+        if not workflow.get('agentcore_used'):
+            message = workflow.get('message', 'AgentCore workflow did not run')
+            if self.fallback is None:
+                raise RuntimeError(message)
+            METRICS.incr('agentcore_fallbacks_total')
+            result = self.fallback.run(supply_chain_data, deadline)
+            result['agentcore_fallback'] = message
+            return result
+
+        trace = workflow.get('trace', [])
+        final_results = {section: workflow['results'].get(section, {}) for section in SECTIONS}
+        succeeded = [_STEP_SECTIONS.get(step['step'], step['step']) for step in trace if step['status'] == 'success']
+        final_results['orchestration_metadata'] = {
+            'successful_agents': len(succeeded),
+            'data_flow_integrity': len(succeeded) >= 3
+        }
+        end = time.time()
+        return {
+            'orchestration_id': new_orchestration_id(start),
+            'backend': self.name,
+            'agentcore_used': True,
+            'trace': trace,
+            'start_time': start,
+            'end_time': end,
+            'total_execution_time': end - start,
+            'final_results': final_results,
+            'context_flow': [
+                {'agent': section, 'context_keys_added': list(final_results[section].keys())}
+                for section in succeeded
+            ],
+            'execution_summary': {
+                'total_agents': len(trace),
+                'successful_agents': len(succeeded),
+                'failed_agents': len(trace) - len(succeeded),
+                'context_flow_steps': len(succeeded),
+                'orchestration_success': bool(trace) and len(succeeded) == len(trace)
+            }
+        }
+
+
+class ShadowExecutor:
+    """Serve the primary result; run the shadow path only to compare"""
+    name = 'shadow'
+
+    def __init__(self, primary, shadow):
+        self.primary = primary
+        self.shadow = shadow
+
+    def run(self, supply_chain_data: Dict[str, Any], deadline: Deadline = None) -> Dict[str, Any]:
+        start = time.perf_counter()
+        result = self.primary.run(supply_chain_data, deadline)
+        primary_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        try:
+            # the shadow run is extra work, so it never extends past the deadline
+            shadow_result = self.shadow.run(supply_chain_data, deadline)
+            differences = compare_results(result['final_results'], shadow_result['final_results'])
+            error = None
+        except Exception as e:
+            differences, error = [], f"{e.__class__.__name__}: {e}"
+        shadow_s = time.perf_counter() - start
+
+        report = {
+            'primary_backend': self.primary.name,
+            'shadow_backend': self.shadow.name,
+            'match': error is None and not differences,
+            'differences': differences[:50],
+            'difference_count': len(differences),
+            'primary_seconds': primary_s,
+            'shadow_seconds': shadow_s,
+            'overhead_ratio': (primary_s + shadow_s) / primary_s if primary_s else None
+        }
+        if error:
+            report['error'] = error
+        METRICS.observe('shadow_execution', int(shadow_s * 1e9))
+        METRICS.incr('shadow_runs_total')
+        if not report['match']:
+            METRICS.incr('shadow_mismatches_total')
+
+        result['backend'] = self.name
+        result['shadow'] = report
+        return result
+
+
+def _diff(a: Any, b: Any, path: str, out: List[str]):
+    if isinstance(a, dict) and isinstance(b, dict):
+        for key in a.keys() & b.keys():
+            _diff(a[key], b[key], f"{path}.{key}", out)
+    elif isinstance(a, list) and isinstance(b, list):
+        if len(a) != len(b):
+            out.append(f"{path} (length {len(a)} != {len(b)})")
+            return
+        for i, (x, y) in enumerate(zip(a, b)):
+            _diff(x, y, f"{path}[{i}]", out)
+    elif isinstance(a, float) or isinstance(b, float):
+        if not (isinstance(a, (int, float)) and isinstance(b, (int, float))
+                and math.isclose(a, b, rel_tol=1e-9, abs_tol=1e-12)):
+            out.append(path)
+    elif a != b:
+        out.append(path)
+
+
+def compare_results(primary: Dict[str, Any], shadow: Dict[str, Any]) -> List[str]:
+    """Paths of values that differ between two sets of final results.
+
+    Only keys present on both sides are compared: each backend may add its
+    own metadata (e.g. the local orchestrator's cross-agent insights).
+    """
+    differences: List[str] = []
+    for section in SECTIONS:
+        _diff(primary.get(section, {}), shadow.get(section, {}), section, differences)
+    return differences
+
+
+def build_executor(backend: str = None, orchestrator=None, adapter=None):
+    """Executor for `backend` (default: AGENT_EXECUTION_BACKEND)"""
+    backend = (backend or os.getenv('AGENT_EXECUTION_BACKEND') or '').strip().lower()
+    agentcore_ready = adapter is not None and getattr(adapter, 'enabled', False)
+    if not backend:
+        backend = 'agentcore' if agentcore_ready else 'local'
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown execution backend '{backend}', expected one of {list(BACKENDS)}")
+
+    local = LocalExecutor(orchestrator)
+    if backend == 'local' or not agentcore_ready:
+        return local
+    retry_policy = getattr(orchestrator, 'retry_policy', None)
+    if backend == 'agentcore':
+        return AgentCoreExecutor(adapter, fallback=local, retry_policy=retry_policy)
+    # no fallback for the shadow: comparing local with itself proves nothing
+    return ShadowExecutor(local, AgentCoreExecutor(adapter, retry_policy=retry_policy))
@@ -0,0 +1,236 @@
+"""
+Per-stage latency and allocation profiling for agent runs.
+
+Agents wrap their stages in ``span('name')``. Spans are recorded only while a
+``StageProfiler`` is active in the current context (thread / asyncio task);
+otherwise ``span`` returns a shared no-op context manager, so instrumented
+code costs one ContextVar lookup when profiling is off.
+
+Span names nest: a ``per_row_loop`` span opened inside the ``sourcing`` span
+is reported as ``sourcing/per_row_loop``. Repeated spans are aggregated
+(count, total, max) rather than stored individually.
+"""
+
+import contextvars
+import cProfile
+import io
+import pstats
+import threading
+import time
+import tracemalloc
+from typing import Any, Dict, Optional
+
+_active_profiler: contextvars.ContextVar = contextvars.ContextVar('stage_profiler', default=None)
+_span_path: contextvars.ContextVar = contextvars.ContextVar('stage_span_path', default='')
+
+# tracemalloc is process-global, so only one request may trace at a time
+_tracemalloc_lock = threading.Lock()
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ('profiler', 'path', 'token', 'start')
+
+    def __init__(self, profiler: 'StageProfiler', name: str):
+        self.profiler = profiler
+        parent = _span_path.get()
+        self.path = f"{parent}/{name}" if parent else name
+
+    def __enter__(self):
+        self.token = _span_path.set(self.path)
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter_ns() - self.start
+        _span_path.reset(self.token)
+        self.profiler.record(self.path, elapsed)
+        return False
+
+
+def span(name: str):
+    """Time a stage under the active profiler (no-op when none is active)"""
+    profiler = _active_profiler.get()
+    if profiler is None:
+        return _NULL_SPAN
+    return _Span(profiler, name)
+
+
+class StageProfiler:
+    """Collects span timings and optional tracemalloc / cProfile captures"""
+
+    def __init__(self, memory: bool = False, cprofile: bool = False, cprofile_top: int = 25):
+        self.memory = memory
+        self.cprofile = cprofile
+        self.cprofile_top = cprofile_top
+        self.stages: Dict[str, list] = {}
+        self._lock = threading.Lock()
+        self._token = None
+        self._profile: Optional[cProfile.Profile] = None
+        self._tracing = False
+        self._peak_bytes: Optional[int] = None
+        self._memory_note: Optional[str] = None
+        self._started_ns = 0
+        self._elapsed_ns = 0
+
+    @classmethod
+    def from_options(cls, options: Any) -> 'StageProfiler':
+        """Build from a request option: True, a list of names or a dict"""
+        if isinstance(options, dict):
+            return cls(memory=bool(options.get('memory')), cprofile=bool(options.get('cprofile')),
+                       cprofile_top=int(options.get('cprofile_top', 25)))
+        if isinstance(options, str):
+            options = [o.strip() for o in options.split(',')]
+        if isinstance(options, (list, tuple, set)):
+            return cls(memory='memory' in options, cprofile='cprofile' in options)
+        return cls()
+
+    def record(self, path: str, elapsed_ns: int):
+        with self._lock:
+            stats = self.stages.get(path)
+            if stats is None:
+                self.stages[path] = [1, elapsed_ns, elapsed_ns]
+            else:
+                stats[0] += 1
+                stats[1] += elapsed_ns
+                if elapsed_ns > stats[2]:
+                    stats[2] = elapsed_ns
+
+    def __enter__(self):
+        if self.memory:
+            if not tracemalloc.is_tracing() and _tracemalloc_lock.acquire(blocking=False):
+                tracemalloc.start()
+                self._tracing = True
+            else:
+                self._memory_note = 'skipped: tracemalloc already in use'
+        if self.cprofile:
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+        self._token = _active_profiler.set(self)
+        self._started_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        self._elapsed_ns = time.perf_counter_ns() - self._started_ns
+        _active_profiler.reset(self._token)
+        if self._profile is not None:
+            self._profile.disable()
+        if self._tracing:
+            self._peak_bytes = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            self._tracing = False
+            _tracemalloc_lock.release()
+        return False
+
+    def report(self) -> Dict[str, Any]:
+        with self._lock:
+            stages = {
+                path: {
+                    'count': count,
+                    'total_ms': round(total_ns / 1e6, 4),
+                    'avg_us': round(total_ns / count / 1e3, 3),
+                    'max_ms': round(max_ns / 1e6, 4)
+                }
+                for path, (count, total_ns, max_ns) in sorted(self.stages.items())
+            }
+        report: Dict[str, Any] = {
+            'total_ms': round(self._elapsed_ns / 1e6, 4),
+            'stages': stages
+        }
+        if self.memory:
+            report['memory'] = (
+                {'peak_bytes': self._peak_bytes} if self._peak_bytes is not None
+                else {'note': self._memory_note}
+            )
+        if self._profile is not None:
+            report['cprofile'] = self._cprofile_summary()
+        return report
+
+    def _cprofile_summary(self):
+        stats = pstats.Stats(self._profile, stream=io.StringIO())
+        rows = []
+        for (filename, line, func), (cc, nc, tt, ct, _) in stats.stats.items():
+            rows.append({
+                'function': f"{filename}:{line}({func})",
+                'calls': nc,
+                'tottime_ms': round(tt * 1000, 4),
+                'cumtime_ms': round(ct * 1000, 4)
+            })
+        rows.sort(key=lambda r: r['cumtime_ms'], reverse=True)
+        return rows[:self.cprofile_top]
+
+
+class MetricsRegistry:
+    """Process-wide stage totals rendered in Prometheus text format"""
+
+    def __init__(self, namespace: str = 'supply_chain'):
+        self.namespace = namespace
+        self._lock = threading.Lock()
+        self._stages: Dict[str, list] = {}
+        self._counters: Dict[str, float] = {}
+        self._gauges: Dict[str, float] = {}
+
+    def observe(self, stage: str, elapsed_ns: int, count: int = 1, max_ns: Optional[int] = None):
+        with self._lock:
+            stats = self._stages.setdefault(stage, [0, 0, 0])
+            stats[0] += count
+            stats[1] += elapsed_ns
+            stats[2] = max(stats[2], max_ns if max_ns is not None else elapsed_ns)
+
+    def observe_profiler(self, profiler: StageProfiler):
+        with profiler._lock:
+            stages = {path: list(stats) for path, stats in profiler.stages.items()}
+        for path, (count, total_ns, max_ns) in stages.items():
+            self.observe(path, total_ns, count, max_ns)
+        self.incr('profiled_runs_total')
+        if profiler._peak_bytes is not None:
+            self.set_gauge('last_peak_memory_bytes', profiler._peak_bytes)
+
+    def incr(self, name: str, amount: float = 1):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+
+    def set_gauge(self, name: str, value: float):
+        with self._lock:
+            self._gauges[name] = value
+
+    def render_prometheus(self) -> str:
+        ns = self.namespace
+        with self._lock:
+            stages = sorted(self._stages.items())
+            counters = sorted(self._counters.items())
+            gauges = sorted(self._gauges.items())
+
+        lines = [
+            f"# HELP {ns}_stage_seconds Time spent per pipeline stage",
+            f"# TYPE {ns}_stage_seconds summary"
+        ]
+        for stage, (count, total_ns, _) in stages:
+            lines.append(f'{ns}_stage_seconds_count{{stage="{stage}"}} {count}')
+            lines.append(f'{ns}_stage_seconds_sum{{stage="{stage}"}} {total_ns / 1e9:.9f}')
+        lines += [
+            f"# HELP {ns}_stage_max_seconds Slowest single occurrence per stage",
+            f"# TYPE {ns}_stage_max_seconds gauge"
+        ]
+        for stage, (_, _, max_ns) in stages:
+            lines.append(f'{ns}_stage_max_seconds{{stage="{stage}"}} {max_ns / 1e9:.9f}')
+        for name, value in counters:
+            lines += [f"# TYPE {ns}_{name} counter", f"{ns}_{name} {value:g}"]
+        for name, value in gauges:
+            lines += [f"# TYPE {ns}_{name} gauge", f"{ns}_{name} {value:g}"]
+        return "\n".join(lines) + "\n"
+
+
+METRICS = MetricsRegistry()
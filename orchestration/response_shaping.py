@@ -0,0 +1,186 @@
+"""
+Summary views, field projection and cursor pagination for analysis results.
+
+Full results are kept in a ``ResultStore`` (a TTL-bounded LRU) under a
+``result_id``, and pages of the large per-row arrays are sliced from that
+stored copy, so fetching page N never re-runs the analysis.
+
+Options (all optional) accepted by ``shape_results``:
+
+- ``view``: ``'full'`` (default) or ``'summary'``. Summary drops every
+  per-row array and reports its length as ``<name>_count`` instead.
+- ``fields``: a list of keys kept on every per-row record, or a dict mapping
+  a section name (see ``ROW_SECTIONS``) to its list of keys.
+- ``page_size``: return only the first page of each row section, with a
+  ``next_cursor`` for ``page()``.
+"""
+
+import base64
+import json
+import os
+import sys
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from session_store import TTLCache
+
+# Section name -> (agent key, array key) of the per-row arrays in results
+ROW_SECTIONS: Dict[str, Tuple[str, str]] = {
+    'analysis': ('sourcing', 'analysis'),
+    'top_suppliers': ('sourcing', 'top_suppliers'),
+    'optimized_routes': ('logistics', 'optimized_routes'),
+    'best_routes': ('logistics', 'best_routes'),
+    'waste_analysis': ('inventory', 'waste_analysis'),
+    'high_risk_items': ('inventory', 'high_risk_items')
+}
+
+VIEWS = ('full', 'summary')
+MAX_PAGE_SIZE = 10000
+
+
+class ShapingError(ValueError):
+    """Unknown view, section or field, bad page size, or a cursor from another section"""
+
+
+class ResultStore:
+    """Full analysis results by result_id, expiring after `ttl_seconds`"""
+
+    def __init__(self, max_entries: int = 64, ttl_seconds: float = 900):
+        self._cache = TTLCache(max_entries=max_entries, ttl_seconds=ttl_seconds)
+
+    def put(self, results: Dict[str, Any]) -> str:
+        result_id = uuid.uuid4().hex
+        self._cache.set(result_id, results)
+        return result_id
+
+    def get(self, result_id: str) -> Optional[Dict[str, Any]]:
+        return self._cache.get(result_id)
+
+    def __len__(self):
+        return len(self._cache)
+
+
+def encode_cursor(section: str, offset: int) -> str:
+    raw = json.dumps({'s': section, 'o': offset}, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str, section: str) -> int:
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        state = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        offset = int(state['o'])
+    except Exception:
+        raise ShapingError('Invalid cursor')
+    if state.get('s') != section or offset < 0:
+        raise ShapingError('Cursor does not belong to this section')
+    return offset
+
+
+def _rows(results: Dict[str, Any], section: str) -> List[Dict[str, Any]]:
+    if section not in ROW_SECTIONS:
+        raise ShapingError(f"Unknown section '{section}', expected one of {sorted(ROW_SECTIONS)}")
+    agent, key = ROW_SECTIONS[section]
+    return results.get(agent, {}).get(key, [])
+
+
+def _project(rows: List[Dict[str, Any]], fields: Optional[List[str]]) -> List[Dict[str, Any]]:
+    if not fields:
+        return rows
+    return [{f: row[f] for f in fields if f in row} for row in rows]
+
+
+def _section_fields(fields: Any, section: str) -> Optional[List[str]]:
+    if isinstance(fields, dict):
+        return fields.get(section)
+    return fields
+
+
+def _all_strings(values: List[Any]) -> bool:
+    return all(isinstance(v, str) for v in values)
+
+
+def parse_options(options: Dict[str, Any]) -> Dict[str, Any]:
+    """Validate and normalize shaping options from a request body / query"""
+    view = options.get('view') or 'full'
+    if view not in VIEWS:
+        raise ShapingError(f"view must be one of {list(VIEWS)}")
+
+    fields = options.get('fields')
+    if isinstance(fields, str):
+        fields = [f.strip() for f in fields.split(',') if f.strip()]
+    if fields is not None and not isinstance(fields, (list, dict)):
+        raise ShapingError('fields must be a list or a dict of section -> list')
+    if isinstance(fields, dict) and set(fields) - set(ROW_SECTIONS):
+        raise ShapingError(f"Unknown sections in fields: {sorted(set(fields) - set(ROW_SECTIONS))}")
+    if isinstance(fields, list) and not _all_strings(fields):
+        raise ShapingError('fields must be a list of field names')
+    if isinstance(fields, dict):
+        for section, names in fields.items():
+            if not isinstance(names, list) or not _all_strings(names):
+                raise ShapingError(f"fields for '{section}' must be a list of field names")
+
+    page_size = options.get('page_size')
+    if page_size is not None:
+        try:
+            page_size = int(page_size)
+        except (TypeError, ValueError):
+            raise ShapingError('page_size must be an integer')
+        if not 1 <= page_size <= MAX_PAGE_SIZE:
+            raise ShapingError(f"page_size must be between 1 and {MAX_PAGE_SIZE}")
+
+    return {'view': view, 'fields': fields, 'page_size': page_size}
+
+
+def wants_shaping(options: Dict[str, Any]) -> bool:
+    return options['view'] != 'full' or options['fields'] is not None or options['page_size'] is not None
+
+
+def shape_results(results: Dict[str, Any], options: Dict[str, Any],
+                  result_id: Optional[str] = None) -> Dict[str, Any]:
+    """Shallow-copy `results` with row sections summarized, projected or paged.
+
+    The stored full results are never modified.
+    """
+    shaped = dict(results)
+    for agent in {agent for agent, _ in ROW_SECTIONS.values()}:
+        if isinstance(results.get(agent), dict):
+            shaped[agent] = dict(results[agent])
+
+    pages = {}
+    for section, (agent, key) in ROW_SECTIONS.items():
+        if not isinstance(shaped.get(agent), dict) or key not in shaped[agent]:
+            continue
+        rows = shaped[agent][key]
+        if options['view'] == 'summary':
+            del shaped[agent][key]
+            shaped[agent][f'{key}_count'] = len(rows)
+            continue
+        if options['page_size'] is not None and result_id is not None:
+            page_info = page(results, section, None, options['page_size'], options['fields'])
+            shaped[agent][key] = page_info['items']
+            pages[section] = {k: v for k, v in page_info.items() if k != 'items'}
+        else:
+            shaped[agent][key] = _project(rows, _section_fields(options['fields'], section))
+
+    if result_id is not None:
+        shaped['result_id'] = result_id
+    if pages:
+        shaped['pagination'] = pages
+    return shaped
+
+
+def page(results: Dict[str, Any], section: str, cursor: Optional[str], limit: int,
+         fields: Any = None) -> Dict[str, Any]:
+    """One page of a row section from stored results"""
+    rows = _rows(results, section)
+    offset = decode_cursor(cursor, section) if cursor else 0
+    end = offset + limit
+    return {
+        'section': section,
+        'items': _project(rows[offset:end], _section_fields(fields, section)),
+        'offset': offset,
+        'total': len(rows),
+        'next_cursor': encode_cursor(section, end) if end < len(rows) else None
+    }
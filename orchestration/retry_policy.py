@@ -0,0 +1,174 @@
+"""
+Retry policy for agent execution.
+
+- ``classify`` sorts exceptions into transient (worth retrying: timeouts,
+  connection errors, AWS throttling / 5xx codes) and permanent (deterministic
+  bugs such as KeyError or ZeroDivisionError, which fail again on retry).
+  Unknown exception types are treated as permanent.
+- Backoff is exponential with full jitter, capped at ``max_delay``.
+- Each agent has a ``RetryBudget``: every call deposits ``ratio`` tokens and
+  every retry spends one, so under a failure storm retries stay a bounded
+  fraction of traffic instead of multiplying load.
+- A ``Deadline`` travels with the request. No attempt starts and no backoff
+  sleeps past it; sleeps wait on an Event, so ``cancel()`` wakes them.
+"""
+
+import concurrent.futures
+import os
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from .instrumentation import METRICS
+
+TRANSIENT = 'transient'
+PERMANENT = 'permanent'
+
+TRANSIENT_EXCEPTIONS: Tuple[type, ...] = (TimeoutError, ConnectionError, concurrent.futures.TimeoutError)
+TRANSIENT_ERROR_CODES = {
+    'ThrottlingException',
+    'TooManyRequestsException',
+    'ServiceQuotaExceededException',
+    'ServiceUnavailableException',
+    'InternalServerException',
+    'ModelTimeoutException',
+    'RequestTimeout'
+}
+
+
+class DeadlineExceeded(TimeoutError):
+    """The request deadline passed before the work could (re)start"""
+
+
+def classify(error: BaseException) -> str:
+    """TRANSIENT or PERMANENT for `error`"""
+    if isinstance(error, DeadlineExceeded):
+        return PERMANENT
+    retryable = getattr(error, 'retryable', None)
+    if retryable is not None:
+        return TRANSIENT if retryable else PERMANENT
+    if isinstance(error, TRANSIENT_EXCEPTIONS):
+        return TRANSIENT
+    response = getattr(error, 'response', None)
+    if isinstance(response, dict):
+        if response.get('Error', {}).get('Code') in TRANSIENT_ERROR_CODES:
+            return TRANSIENT
+        if response.get('ResponseMetadata', {}).get('HTTPStatusCode', 0) >= 500:
+            return TRANSIENT
+    return PERMANENT
+
+
+class Deadline:
+    """Absolute monotonic deadline with a cancellation event"""
+
+    def __init__(self, seconds: Optional[float] = None):
+        self.expires_at = None if seconds is None else time.monotonic() + seconds
+        self._cancelled = threading.Event()
+
+    @classmethod
+    def from_ms(cls, milliseconds: Any) -> 'Deadline':
+        return cls(None if milliseconds is None else float(milliseconds) / 1000)
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left (never negative), or None when unbounded"""
+        if self.expires_at is None:
+            return None
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self) -> bool:
+        return self._cancelled.is_set() or self.remaining() == 0.0
+
+    def cancel(self):
+        self._cancelled.set()
+
+    def sleep(self, seconds: float) -> bool:
+        """Sleep up to `seconds`; False if cancelled or the deadline cut it short"""
+        remaining = self.remaining()
+        if remaining is not None and remaining < seconds:
+            return False
+        return not self._cancelled.wait(seconds)
+
+
+class RetryBudget:
+    """Token bucket limiting retries to a fraction of calls"""
+
+    def __init__(self, ratio: float = 0.2, min_tokens: float = 10, max_tokens: float = 100):
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self._tokens = float(min_tokens)
+        self._lock = threading.Lock()
+
+    def record_call(self):
+        with self._lock:
+            self._tokens = min(self.max_tokens, self._tokens + self.ratio)
+
+    def try_spend(self) -> bool:
+        with self._lock:
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+    @property
+    def tokens(self) -> float:
+        return self._tokens
+
+
+class RetryPolicy:
+    """Exponential backoff with full jitter, per-agent budgets and deadlines"""
+
+    def __init__(self, max_attempts: int = None, base_delay: float = None, max_delay: float = 2.0,
+                 budget_ratio: float = 0.2, budget_min_tokens: float = 10, rng: random.Random = None):
+        self.max_attempts = max_attempts or int(os.getenv('AGENT_MAX_ATTEMPTS', '3'))
+        self.base_delay = base_delay if base_delay is not None else float(os.getenv('AGENT_RETRY_BASE_DELAY', '0.1'))
+        self.max_delay = max_delay
+        self.budget_ratio = budget_ratio
+        self.budget_min_tokens = budget_min_tokens
+        self._rng = rng or random.Random()
+        self._budgets: Dict[str, RetryBudget] = {}
+        self._lock = threading.Lock()
+
+    def budget(self, name: str) -> RetryBudget:
+        with self._lock:
+            budget = self._budgets.get(name)
+            if budget is None:
+                budget = self._budgets[name] = RetryBudget(self.budget_ratio, self.budget_min_tokens)
+            return budget
+
+    def backoff(self, attempt: int) -> float:
+        """Delay before retry number `attempt` (1-based)"""
+        return self._rng.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+    def call(self, name: str, fn: Callable[[], Any], deadline: Deadline = None) -> Tuple[Any, Dict[str, Any]]:
+        """Run `fn` under the policy.
+
+        Returns ``(result, info)`` where info has ``attempts`` and, on
+        failure, ``error_class``. The last error is re-raised with
+        ``info`` attached as ``error.retry_info``.
+        """
+        deadline = deadline or Deadline()
+        budget = self.budget(name)
+        budget.record_call()
+        attempt = 0
+        while True:
+            if deadline.expired():
+                error = DeadlineExceeded(f"Deadline exceeded before {name} attempt {attempt + 1}")
+                error.retry_info = {'attempts': attempt, 'error_class': PERMANENT, 'deadline_exceeded': True}
+                raise error
+            attempt += 1
+            try:
+                return fn(), {'attempts': attempt}
+            except Exception as e:
+                error_class = classify(e)
+                e.retry_info = {'attempts': attempt, 'error_class': error_class}
+                if error_class == PERMANENT or attempt >= self.max_attempts:
+                    raise
+                if not budget.try_spend():
+                    METRICS.incr('agent_retry_budget_exhausted_total')
+                    e.retry_info['budget_exhausted'] = True
+                    raise
+                if not deadline.sleep(self.backoff(attempt)):
+                    e.retry_info['deadline_exceeded'] = True
+                    raise
+                METRICS.incr('agent_retries_total')
@@ -0,0 +1,20 @@
+"""
+Generated supply chains and API credentials shared by the test files
+"""
+
+import asyncio
+from typing import Any, Dict
+
+from agents import DataGeneratorAgent
+from integration_adapter import IntegrationAdapter
+
+API_KEY = "strands_api_key_ai_hackathon"
+API_HEADERS = {'X-API-Key': API_KEY}
+
+
+def generated_supply_chain(n: int, seed: int) -> Dict[str, Any]:
+    """`n` suppliers, routes and products from DataGeneratorAgent, in Phase 2 format"""
+    generated = asyncio.run(DataGeneratorAgent(seed=seed).execute({
+        'suppliers': n, 'routes': n, 'products': n, 'seed': seed
+    }))
+    return IntegrationAdapter()._convert_data_format(generated)
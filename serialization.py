@@ -0,0 +1,214 @@
+"""
+JSON encoding for analysis results.
+
+Uses orjson when it is installed and falls back to the stdlib json module
+otherwise; both produce equivalent JSON. Also provides:
+
+- ``iter_encode``: chunked encoding that walks dicts and encodes long
+  arrays in batches, so a large response can be streamed without building
+  one giant string first.
+- ``dedup_strings`` / ``expand_strings``: an optional response format where
+  recommendation-like strings, repeated on thousands of rows, are stored once
+  in a ``strings`` table and referenced by index.
+"""
+
+import json
+import os
+from collections.abc import Mapping, Sequence
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+try:
+    import orjson
+    _ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None
+    _ORJSON_AVAILABLE = False
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional for serialization alone
+    np = None
+
+BACKENDS = ('orjson', 'json') if _ORJSON_AVAILABLE else ('json',)
+DEFAULT_BACKEND = os.getenv('JSON_BACKEND', BACKENDS[0])
+
+DEDUP_FORMAT = 'dedup-v1'
+
+# Keys whose string values (or lists of strings) are interned by dedup_strings
+DEDUP_KEYS = frozenset({
+    'recommendations', 'top_recommendations', 'priority_actions', 'strands_insights',
+    'strands_explanation', 'recommendation', 'action'
+})
+
+# Arrays longer than this are encoded in batches by iter_encode
+STREAM_BATCH_SIZE = 1000
+
+
+def _default(obj: Any) -> Any:
+    """Fallback for types neither encoder handles natively"""
+    if np is not None and isinstance(obj, (np.generic, np.ndarray)):
+        return obj.tolist()
+    if isinstance(obj, Mapping):
+        return dict(obj)
+    if isinstance(obj, (Sequence, set, frozenset)) and not isinstance(obj, (str, bytes)):
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+if _ORJSON_AVAILABLE:
+    _ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+
+def dumps(obj: Any, backend: Optional[str] = None) -> bytes:
+    """Encode `obj` as compact UTF-8 JSON bytes"""
+    backend = backend or DEFAULT_BACKEND
+    if backend == 'orjson':
+        if not _ORJSON_AVAILABLE:
+            raise ValueError("orjson is not installed")
+        return orjson.dumps(obj, default=_default, option=_ORJSON_OPTIONS)
+    if backend != 'json':
+        raise ValueError(f"Unknown JSON backend '{backend}'")
+    return json.dumps(obj, default=_default, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+def dumps_str(obj: Any, backend: Optional[str] = None) -> str:
+    """Like `dumps` but returns str (e.g. for Lambda proxy bodies)"""
+    return dumps(obj, backend).decode('utf-8')
+
+
+def loads(data):
+    if _ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def iter_encode(obj: Any, chunk_size: int = 64 * 1024, batch_size: int = STREAM_BATCH_SIZE,
+                backend: Optional[str] = None) -> Iterator[bytes]:
+    """Encode `obj` as a stream of JSON byte chunks of roughly `chunk_size`.
+
+    Dicts are walked key by key and arrays longer than `batch_size` are
+    encoded `batch_size` items at a time; everything else is encoded whole.
+    Joining the chunks gives the same document as `dumps`.
+    """
+    buffer = bytearray()
+    for piece in _iter_pieces(obj, batch_size, backend):
+        buffer += piece
+        if len(buffer) >= chunk_size:
+            yield bytes(buffer)
+            buffer.clear()
+    if buffer:
+        yield bytes(buffer)
+
+
+def _iter_pieces(obj: Any, batch_size: int, backend: Optional[str]) -> Iterator[bytes]:
+    if isinstance(obj, Mapping):
+        yield b'{'
+        for i, (key, value) in enumerate(obj.items()):
+            if i:
+                yield b','
+            # Non-string keys are stringified the way json.dumps does it
+            yield dumps(key if isinstance(key, str) else dumps(key, 'json').decode(), backend)
+            yield b':'
+            yield from _iter_pieces(value, batch_size, backend)
+        yield b'}'
+    elif isinstance(obj, (list, tuple)) and len(obj) > batch_size:
+        yield b'['
+        for start in range(0, len(obj), batch_size):
+            if start:
+                yield b','
+            # Encode the batch as an array and drop its brackets
+            yield dumps(obj[start:start + batch_size], backend)[1:-1]
+        yield b']'
+    else:
+        yield dumps(obj, backend)
+
+
+def dedup_strings(obj: Any, keys: Iterable[str] = DEDUP_KEYS) -> Dict[str, Any]:
+    """Replace strings under `keys` with indexes into a shared string table.
+
+    Only str values and lists of str are interned; `expand_strings` treats
+    every int (or list of ints) under `keys` as a table reference. Unchanged
+    sub-trees are shared with `obj` rather than copied.
+    """
+    keys = frozenset(keys)
+    table: Dict[str, int] = {}
+
+    def index_of(value):
+        index = table.get(value)
+        if index is None:
+            index = table[value] = len(table)
+        return index
+
+    def intern(value):
+        if type(value) is str:
+            return index_of(value)
+        # Recommendation lists are homogeneous, so the first item decides
+        if type(value) is list and value and type(value[0]) is str:
+            return [index_of(v) for v in value]
+        return walk(value)
+
+    def walk(value):
+        kind = type(value)
+        if kind is dict:
+            # Copy a dict only once something in it actually changes
+            out = None
+            for k, v in value.items():
+                if k in keys:
+                    new = intern(v)
+                elif type(v) is dict or type(v) is list:
+                    new = walk(v)
+                    if new is v:
+                        continue
+                else:
+                    continue
+                if out is None:
+                    out = dict(value)
+                out[k] = new
+            return value if out is None else out
+        if kind is list:
+            walked = None
+            for i, v in enumerate(value):
+                if type(v) is dict or type(v) is list:
+                    new = walk(v)
+                    if new is not v:
+                        if walked is None:
+                            walked = list(value)
+                        walked[i] = new
+            return value if walked is None else walked
+        return value
+
+    data = walk(obj)
+    return {'format': DEDUP_FORMAT, 'keys': sorted(keys), 'strings': list(table), 'data': data}
+
+
+def expand_strings(payload: Dict[str, Any]) -> Any:
+    """Inverse of `dedup_strings`"""
+    if payload.get('format') != DEDUP_FORMAT:
+        raise ValueError(f"Expected format '{DEDUP_FORMAT}'")
+    keys = frozenset(payload['keys'])
+    strings: List[str] = payload['strings']
+
+    def resolve(value):
+        if isinstance(value, int) and not isinstance(value, bool):
+            return strings[value]
+        if isinstance(value, list) and all(isinstance(v, int) and not isinstance(v, bool) for v in value):
+            return [strings[v] for v in value]
+        return walk(value)
+
+    def walk(value):
+        if isinstance(value, dict):
+            return {k: resolve(v) if k in keys else walk(v) for k, v in value.items()}
+        if isinstance(value, list):
+            return [walk(v) for v in value]
+        return value
+
+    return walk(payload['data'])
+
+
+def encode_response(payload: Any, response_format: Optional[str] = None, backend: Optional[str] = None) -> bytes:
+    """Encode an API payload in the requested format ('json' or 'dedup')"""
+    if response_format == 'dedup':
+        payload = dedup_strings(payload)
+    elif response_format not in (None, 'json'):
+        raise ValueError(f"Unknown response format '{response_format}'")
+    return dumps(payload, backend)
@@ -0,0 +1,160 @@
+"""
+In-process session state for Bedrock agent conversations
+"""
+
+import hashlib
+import re
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional, Tuple
+
+# Bedrock sessionId constraint: 2-100 chars of [0-9a-zA-Z._:-]
+_SESSION_ID_PATTERN = re.compile(r'^[0-9a-zA-Z._:-]{2,100}$')
+
+
+class TTLCache:
+    """Thread-safe LRU mapping whose entries expire after `ttl_seconds`.
+
+    Expiry is checked lazily on access and when inserting, so there is no
+    background sweeper thread.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 1800,
+                 clock: Callable[[], float] = time.monotonic):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.clock = clock
+        self.evictions = 0
+        self.expirations = 0
+        self._data: "OrderedDict[Any, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        now = self.clock()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            touched_at, value = entry
+            if now - touched_at > self.ttl_seconds:
+                del self._data[key]
+                self.expirations += 1
+                return default
+            self._data[key] = (now, value)
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        now = self.clock()
+        with self._lock:
+            self._data[key] = (now, value)
+            self._data.move_to_end(key)
+            self._evict(now)
+
+    def pop(self, key, default=None):
+        with self._lock:
+            entry = self._data.pop(key, None)
+        return default if entry is None else entry[1]
+
+    def _evict(self, now: float):
+        # Oldest entries sit at the front: drop expired ones, then trim to size
+        while self._data:
+            key, (touched_at, _) = next(iter(self._data.items()))
+            if now - touched_at > self.ttl_seconds:
+                self._data.popitem(last=False)
+                self.expirations += 1
+            elif len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+            else:
+                break
+
+    def __len__(self):
+        with self._lock:
+            return len(self._data)
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+
+@dataclass
+class SessionState:
+    session_id: str
+    agent_id: str
+    created_at: float = field(default_factory=time.time)
+    turns: int = 0
+    responses: "OrderedDict[str, str]" = field(default_factory=OrderedDict)
+
+
+class SessionStore:
+    """Bedrock session registry with per-session response memoization"""
+
+    def __init__(self, max_sessions: int = 10000, ttl_seconds: float = 1800,
+                 max_memo_per_session: int = 64, clock: Callable[[], float] = time.monotonic):
+        self.sessions = TTLCache(max_sessions, ttl_seconds, clock)
+        self.max_memo_per_session = max_memo_per_session
+        self.stats = {'sessions_created': 0, 'sessions_resumed': 0, 'memo_hits': 0, 'memo_misses': 0}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def new_session_id() -> str:
+        return uuid.uuid4().hex
+
+    @staticmethod
+    def is_valid_session_id(session_id: str) -> bool:
+        return bool(_SESSION_ID_PATTERN.match(session_id or ''))
+
+    def resolve(self, session_id: Optional[str], agent_id: str) -> SessionState:
+        """Continue the client's session or start a new one.
+
+        An unknown but well-formed ID (expired locally, or issued by another
+        worker) is adopted so Bedrock keeps its server-side context.
+        """
+        if session_id and not self.is_valid_session_id(session_id):
+            raise ValueError('Invalid session_id')
+
+        with self._lock:
+            state = self.sessions.get(session_id) if session_id else None
+            if state is not None and state.agent_id == agent_id:
+                self.stats['sessions_resumed'] += 1
+                return state
+            state = SessionState(session_id=session_id or self.new_session_id(), agent_id=agent_id)
+            self.sessions.set(state.session_id, state)
+            self.stats['sessions_created'] += 1
+            return state
+
+    @staticmethod
+    def _prompt_key(prompt: str) -> str:
+        return hashlib.sha256(prompt.strip().encode('utf-8')).hexdigest()
+
+    def cached_response(self, state: SessionState, prompt: str) -> Optional[str]:
+        """Return the memoized response for an identical prompt, if any"""
+        key = self._prompt_key(prompt)
+        with self._lock:
+            state.turns += 1
+            response = state.responses.get(key)
+            if response is None:
+                self.stats['memo_misses'] += 1
+                return None
+            state.responses.move_to_end(key)
+            self.stats['memo_hits'] += 1
+            return response
+
+    def remember_response(self, state: SessionState, prompt: str, response: str):
+        with self._lock:
+            state.responses[self._prompt_key(prompt)] = response
+            while len(state.responses) > self.max_memo_per_session:
+                state.responses.popitem(last=False)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self.stats)
+        stats.update({
+            'active_sessions': len(self.sessions),
+            'evicted_sessions': self.sessions.evictions,
+            'expired_sessions': self.sessions.expirations
+        })
+        return stats
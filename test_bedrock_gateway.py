@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Test the Bedrock gateway: non-blocking calls, single flight, adaptive limits
+"""
+
+import asyncio
+import time
+
+from agents.base_agent import BaseAgent
+from agents.bedrock_gateway import AdaptiveLimiter, BedrockGateway
+from fake_bedrock import FakeBedrockRuntime
+
+
+class EchoAgent(BaseAgent):
+    async def process(self, parameters):
+        return {'answer': await self.invoke_bedrock(parameters['prompt'])}
+
+
+def _agent(client, gateway):
+    agent = EchoAgent("EchoAgent")
+    agent.bedrock = client
+    agent.gateway = gateway
+    return agent
+
+
+def test_identical_requests_are_coalesced():
+    """Concurrent agents asking the same prompt share one Bedrock call"""
+    fake = FakeBedrockRuntime(latency=0.1)
+    gateway = BedrockGateway(max_workers=4)
+    agents = [_agent(fake, gateway) for _ in range(20)]
+
+    async def run():
+        return await asyncio.gather(*(a.invoke_bedrock("Rank suppliers") for a in agents))
+
+    answers = asyncio.run(run())
+    assert answers == ["Fake model answer"] * 20
+    assert len(fake.calls) == 1
+
+    metrics = gateway.snapshot()
+    assert metrics['coalesced'] == 19
+    assert metrics['input_tokens'] == 12 and metrics['output_tokens'] == 34
+    print(f"✅ Gateway metrics: {metrics}")
+
+
+def test_event_loop_not_blocked():
+    """A slow Bedrock call runs off-loop while other coroutines progress"""
+    fake = FakeBedrockRuntime(latency=0.3)
+    agent = _agent(fake, BedrockGateway(max_workers=2))
+    ticks = []
+
+    async def ticker():
+        for _ in range(5):
+            ticks.append(time.perf_counter())
+            await asyncio.sleep(0.02)
+
+    async def run():
+        await asyncio.gather(agent.invoke_bedrock("slow prompt"), ticker())
+
+    start = time.perf_counter()
+    asyncio.run(run())
+    assert len(ticks) == 5 and ticks[-1] - start < 0.25
+
+
+def test_throttling_shrinks_concurrency_and_retries():
+    """Throttled calls back off, lower the limit and eventually succeed"""
+    fake = FakeBedrockRuntime(throttle_first=2)
+    limiter = AdaptiveLimiter(initial_limit=8, max_limit=8)
+    gateway = BedrockGateway(max_workers=8, limiter=limiter, retry_base_delay=0.01)
+
+    payload = gateway.submit(fake, '{"prompt": 1}', 'model').result(timeout=5)
+    assert payload['content'][0]['text'] == "Fake model answer"
+    assert gateway.snapshot()['throttled'] == 2
+    assert limiter.limit < 8
+
+
+def test_concurrency_adapts_to_quota():
+    """Sustained throttling keeps in-flight calls near the provider quota"""
+    fake = FakeBedrockRuntime(latency=0.02, max_concurrency=3)
+    gateway = BedrockGateway(max_workers=16, limiter=AdaptiveLimiter(initial_limit=16, max_limit=16),
+                             max_throttle_retries=10, retry_base_delay=0.005)
+
+    futures = [gateway.submit(fake, f'{{"prompt": {i}}}', 'model') for i in range(60)]
+    for f in futures:
+        f.result(timeout=30)
+    assert fake.peak_concurrency <= 3
+    assert gateway.limiter.limit < 16
+
+
+if __name__ == "__main__":
+    test_identical_requests_are_coalesced()
+    test_event_loop_not_blocked()
+    test_throttling_shrinks_concurrency_and_retries()
+    test_concurrency_adapts_to_quota()
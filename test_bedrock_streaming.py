@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Test streaming Bedrock agent responses against a local fake stream
+"""
+
+import json
+from unittest import mock
+
+import bedrock_agent_endpoint
+from fake_bedrock import FakeBedrockAgentRuntime
+
+API_KEY = "strands_api_key_ai_hackathon"
+
+
+def _parse_sse(raw: str):
+    events = []
+    for block in raw.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines['event'], json.loads(lines['data'])))
+    return events
+
+
+def test_chat_streams_chunks_as_they_arrive():
+    """First SSE chunk is delivered before the fake stream is exhausted"""
+    fake = FakeBedrockAgentRuntime(chunks=[f"part{i} " for i in range(50)])
+    with mock.patch.object(bedrock_agent_endpoint.auth, 'bedrock_agent', fake):
+        client = bedrock_agent_endpoint.app.test_client()
+        response = client.post(
+            '/bedrock/agent/chat',
+            json={'message': 'Analyze my suppliers', 'stream': True},
+            headers={'X-API-Key': API_KEY},
+            buffered=False
+        )
+        assert response.status_code == 200
+        assert response.mimetype == 'text/event-stream'
+
+        body_iter = iter(response.response)
+        first = next(body_iter).decode()
+        second = next(body_iter).decode()
+        assert first.startswith('event: start')
+        assert second.startswith('event: chunk')
+        assert fake.chunks_produced < 50
+        print(f"✅ First chunk delivered after {fake.chunks_produced} of 50 produced")
+
+        rest = first + second + b''.join(body_iter).decode()
+        events = _parse_sse(rest)
+        text = ''.join(payload['text'] for name, payload in events if name == 'chunk')
+        assert text == ''.join(fake.chunks)
+        assert events[-1][0] == 'done'
+
+
+def test_full_response_mode_unchanged():
+    """Non-streaming chat still returns the whole completion as JSON"""
+    fake = FakeBedrockAgentRuntime(chunks=["héllo ", "wörld"])
+    with mock.patch.object(bedrock_agent_endpoint.auth, 'bedrock_agent', fake):
+        client = bedrock_agent_endpoint.app.test_client()
+        response = client.post(
+            '/bedrock/agent/chat',
+            json={'message': 'hi'},
+            headers={'X-API-Key': API_KEY}
+        )
+        assert response.status_code == 200
+        assert response.get_json()['response'] == "héllo wörld"
+
+
+def test_split_multibyte_characters_decode():
+    """Incremental decoding survives a character split across chunks"""
+    encoded = "CO₂ budget".encode('utf-8')
+    fake = FakeBedrockAgentRuntime(chunks=[encoded[:3], encoded[3:]])
+    with mock.patch.object(bedrock_agent_endpoint.auth, 'bedrock_agent', fake):
+        text = ''.join(bedrock_agent_endpoint.auth.iter_agent_text('agent', 'sess', 'hi'))
+    assert text == "CO₂ budget"
+
+
+def test_stream_reports_errors_and_auth():
+    """Mid-stream failures become an error event; bad keys get 401"""
+    fake = FakeBedrockAgentRuntime(fail_after=1)
+    with mock.patch.object(bedrock_agent_endpoint.auth, 'bedrock_agent', fake):
+        client = bedrock_agent_endpoint.app.test_client()
+
+        response = client.post(
+            '/bedrock/agent/invoke',
+            json={'agent_id': 'a1', 'input_text': 'hi', 'api_key': API_KEY},
+            headers={'Accept': 'text/event-stream'}
+        )
+        events = _parse_sse(response.get_data(as_text=True))
+        assert [name for name, _ in events] == ['start', 'chunk', 'error']
+
+        response = client.post(
+            '/bedrock/agent/chat',
+            json={'message': 'hi', 'stream': True, 'api_key': 'wrong'}
+        )
+        assert response.status_code == 401
+
+
+if __name__ == "__main__":
+    test_chat_streams_chunks_as_they_arrive()
+    test_full_response_mode_unchanged()
+    test_split_multibyte_characters_decode()
+    test_stream_reports_errors_and_auth()
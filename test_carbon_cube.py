@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Test carbon roll-ups and drill-downs from the aggregate cube
+"""
+
+import math
+from collections import defaultdict
+
+import numpy as np
+
+from agents import AgentCore
+from agents.carbon_cube import CubeError, build_cube
+from sample_data import API_HEADERS, generated_supply_chain
+
+
+def _data(n: int = 200):
+    data = generated_supply_chain(n, seed=9)
+    for i, route in enumerate(data['routes']):
+        route['date'] = f"2026-{i % 3 + 1:02d}-15"
+    return data
+
+
+def test_rollups_match_row_level_sums():
+    data = _data()
+    core = AgentCore()
+    results = core.orchestrate_sustainability_analysis(data)
+    carbon = results['carbon_accounting']
+    cube = core.carbon_cube(carbon['rollups']['cube_id'])
+
+    by_category = {row['category']: row['emissions'] for row in cube.rollup(['category'])}
+    for category, value in carbon['footprint_breakdown'].items():
+        assert math.isclose(by_category[category], value, rel_tol=1e-9), category
+    assert math.isclose(carbon['rollups']['total'], carbon['total_carbon_footprint_tons'], rel_tol=1e-9)
+
+    # Logistics by mode and month, against a row-by-row group-by
+    expected = defaultdict(float)
+    for route, row in zip(data['routes'], results['logistics']['optimized_routes']):
+        expected[(route['transport_mode'], route['date'][:7])] += row['current_emissions']
+    rows = cube.rollup(['transport_mode', 'month'], where={'category': 'logistics'})
+    assert len(rows) == len(expected)
+    for row in rows:
+        assert math.isclose(row['emissions'], expected[(row['transport_mode'], row['month'])], rel_tol=1e-9)
+    assert [r['emissions'] for r in rows] == sorted((r['emissions'] for r in rows), reverse=True)
+
+    locations = {row['supplier_location'] for row in carbon['rollups']['by_dimension']['supplier_location']}
+    assert {s['location'] for s in data['suppliers']} <= locations | {'n/a'}
+    print(f"✅ {cube.facts} facts in {cube.cells} cells; {len(rows)} mode/month groups")
+
+
+def test_drill_down_partitions_parent():
+    data = _data()
+    core = AgentCore()
+    cube = core.carbon_cube(core.orchestrate_sustainability_analysis(data)['carbon_accounting']['rollups']['cube_id'])
+    for mode_row in cube.drill_down({'category': 'logistics'}, 'transport_mode'):
+        path = {'category': 'logistics', 'transport_mode': mode_row['transport_mode']}
+        lanes = cube.drill_down(path, 'lane')
+        assert math.isclose(sum(r['emissions'] for r in lanes), mode_row['emissions'], rel_tol=1e-9)
+        assert sum(r['rows'] for r in lanes) == mode_row['rows']
+        assert math.isclose(sum(r['share_percent'] for r in lanes), 100, abs_tol=0.5)
+    assert cube.rollup(['lane'], where={'transport_mode': 'hovercraft'}) == []
+    for query in ({'by': ['planet']}, {'by': ['lane', 'lane']}, {'where': {'planet': 'Mars'}}):
+        try:
+            cube.rollup(**query)
+            assert False, f'{query} accepted'
+        except CubeError:
+            pass
+
+
+def test_large_cube_queries_stay_fast():
+    n = 100_000
+    rng = np.random.default_rng(1)
+    cities = [f'City {i}' for i in range(200)]
+    data = {
+        'suppliers': [{'location': f'Country {i % 25}'} for i in range(n)],
+        'routes': [{'origin': cities[a], 'destination': cities[b], 'transport_mode': m, 'month': f'2025-{k:02d}'}
+                   for a, b, m, k in zip(rng.integers(0, 200, n), rng.integers(0, 200, n),
+                                         rng.choice(['truck', 'rail', 'ship', 'air'], n), rng.integers(1, 13, n))],
+        'inventory': [{'category': f'Category {i % 8}'} for i in range(n)]
+    }
+    results = {
+        'sourcing': {'analysis': [{'carbon_footprint': float(v)} for v in rng.random(n)]},
+        'logistics': {'optimized_routes': [{'current_emissions': float(v)} for v in rng.random(n)]},
+        'inventory': {'waste_analysis': [{'waste_percentage': float(v)} for v in rng.random(n) * 50]}
+    }
+    cube = build_cube(data, results)
+    by_lane_month = cube.rollup(['lane', 'month'], where={'transport_mode': ['rail', 'ship']})
+    by_location = cube.rollup(['supplier_location'], where={'category': 'sourcing'})
+    assert len(by_location) == 25 and len(by_lane_month) > 1000
+    print(f"✅ 400k-fact cube: {len(by_lane_month)} rail/ship lane-months")
+
+
+def test_cube_endpoint():
+    from api_endpoint import app
+    client = app.test_client()
+    headers = API_HEADERS
+    response = client.post('/api/sustainability/analyze', json={'supply_chain_data': _data(20)}, headers=headers)
+    cube_id = response.get_json()['results']['carbon_accounting']['rollups']['cube_id']
+
+    response = client.get(f'/api/sustainability/cubes/{cube_id}?by=transport_mode,month&category=logistics&limit=2',
+                          headers=headers)
+    body = response.get_json()
+    assert response.status_code == 200 and len(body['rows']) <= 2
+    assert body['where'] == {'category': ['logistics']}
+    assert client.get(f'/api/sustainability/cubes/{cube_id}?by=planet', headers=headers).status_code == 400
+    assert client.get('/api/sustainability/cubes/missing', headers=headers).status_code == 404
+
+
+if __name__ == "__main__":
+    test_rollups_match_row_level_sums()
+    test_drill_down_partitions_parent()
+    test_large_cube_queries_stay_fast()
+    test_cube_endpoint()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Test the month-partitioned carbon ledger and orchestration IDs
+"""
+
+import os
+import tempfile
+import time
+from datetime import datetime, timezone
+from unittest import mock
+
+from agents import AgentCore
+from carbon_ledger import CarbonLedger, LedgerError
+from orchestration import new_orchestration_id
+from sample_data import API_HEADERS, generated_supply_chain
+
+
+def _results(routes: int, scale: float = 1.0):
+    return {
+        'sourcing': {'analysis': [{'supplier_id': 'S1', 'carbon_footprint': 10 * scale}]},
+        'logistics': {'optimized_routes': [{'route_id': f'R{i}', 'current_emissions': (i + 1) * scale}
+                                           for i in range(routes)]},
+        'inventory': {'waste_analysis': [{'product_id': 'P1', 'waste_percentage': 20.0}]}
+    }
+
+
+def _ts(year: int, month: int, day: int = 15) -> float:
+    return datetime(year, month, day, tzinfo=timezone.utc).timestamp()
+
+
+def test_orchestration_ids_do_not_collide():
+    now = time.time()
+    ids = {new_orchestration_id(now) for _ in range(10000)}
+    assert len(ids) == 10000
+    assert all(i.startswith(f'orch_{int(now)}_') for i in ids)
+
+
+def test_series_over_month_partitions():
+    with tempfile.TemporaryDirectory() as tmp:
+        ledger = CarbonLedger(tmp)
+        for year, month in [(2024, m) for m in range(1, 13)] + [(2025, m) for m in range(1, 13)]:
+            for day in (3, 17):
+                ledger.record(new_orchestration_id(), _results(5, scale=month), _ts(year, month, day))
+        assert len(ledger.months()) == 24 and len(ledger.orchestrations('2024-03')) == 2
+
+        series = ledger.series('R4', start=_ts(2024, 7, 1), end=_ts(2025, 7, 1))
+        assert [p['period'] for p in series] == [f'2024-{m:02d}' for m in range(7, 13)] + [f'2025-{m:02d}' for m in range(1, 7)]
+        assert series[0] == {'period': '2024-07', 'emissions': 2 * 5 * 7, 'entries': 2}
+
+        series = ledger.series('S1', category='operations', months=3, end=_ts(2025, 12, 31))
+        assert [p['emissions'] for p in series] == [2 * 10 * m * 0.2 for m in (10, 11, 12)]
+        by_day = ledger.series(category='inventory_waste', start=_ts(2025, 1, 1), end=_ts(2025, 2, 1), bucket='day')
+        assert [p['period'] for p in by_day] == ['2025-01-03', '2025-01-17']
+        for bad in ({}, {'entity_id': 'R1', 'bucket': 'week'}, {'entity_id': 'R1', 'start': 2, 'end': 1}):
+            try:
+                ledger.series(**bad)
+                assert False, f'{bad} accepted'
+            except LedgerError:
+                pass
+        ledger.close()
+
+
+def test_trend_query_over_years_of_history():
+    with tempfile.TemporaryDirectory() as tmp:
+        ledger = CarbonLedger(tmp)
+        results = _results(2000)
+        for year in (2023, 2024, 2025):
+            for month in range(1, 13):
+                for day in (5, 20):
+                    ledger.record(new_orchestration_id(), results, _ts(year, month, day))
+
+        series = ledger.series('R1234', category='logistics', months=24, end=_ts(2025, 12, 31))
+        assert len(series) == 24 and all(p['entries'] == 2 for p in series)
+        print(f"✅ {72 * 2004:,} entries written; 24-month trend from the last 24 partitions")
+        ledger.close()
+
+
+def test_agent_core_records_each_analysis():
+    data = generated_supply_chain(5, seed=2)
+    with tempfile.TemporaryDirectory() as tmp, mock.patch.dict(os.environ, {'CARBON_LEDGER_DIR': tmp}):
+        core = AgentCore()
+        first = core.orchestrate_sustainability_analysis(data)['orchestration_metadata']
+        second = core.orchestrate_sustainability_analysis(data)['orchestration_metadata']
+        assert first['orchestration_id'] != second['orchestration_id']
+        assert first['ledger'] == {'recorded': True, 'entries': 5 * 2 + 5 + 5}
+
+        route_id = data['routes'][0]['id']
+        series = core.ledger.series(route_id, months=1)
+        assert series[-1]['entries'] == 2
+
+        from api_endpoint import app, agent_core
+        with mock.patch.object(agent_core, 'ledger', core.ledger):
+            response = app.test_client().get(f'/api/sustainability/ledger?entity_id={route_id}&months=1',
+                                             headers=API_HEADERS)
+        assert response.status_code == 200 and response.get_json()['series'] == series
+        core.ledger.close()
+
+
+if __name__ == "__main__":
+    test_orchestration_ids_do_not_collide()
+    test_series_over_month_partitions()
+    test_trend_query_over_years_of_history()
+    test_agent_core_records_each_analysis()
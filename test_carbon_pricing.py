@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Test carbon price curves and carbon-adjusted cost rankings
+"""
+
+import math
+
+import numpy as np
+
+from agents import AgentCore, LogisticsAgent
+from agents.carbon_pricing import CarbonPricing, PricingError
+from agents.emission_factors import load_emission_factors
+from sample_data import API_HEADERS, generated_supply_chain
+
+CURVES = [
+    {'name': 'flat', 'price': 50},
+    {'name': 'ramp', 'by_year': {'2025': 60, '2030': 110}},
+    {'name': 'ets', 'by_region': {'EU': {'2026': 90, '2028': 130}, 'UK': 70}, 'price': 20}
+]
+
+
+def _price(curve, region, year):
+    """Reference price lookup, one entity at a time"""
+    if curve['name'] == 'flat':
+        return 50
+    if curve['name'] == 'ramp':
+        return 60 + 10 * (min(max(year, 2025), 2030) - 2025)
+    if region == 'EU':
+        return 90 + 20 * (min(max(year, 2026), 2028) - 2026)
+    return 70 if region == 'UK' else 20
+
+
+def test_broadcast_matches_per_entity_prices():
+    rng = np.random.default_rng(4)
+    n = 2000
+    cost, emissions = rng.random(n) * 100, rng.random(n) * 5
+    regions = rng.choice(['EU', 'UK', 'US'], n).tolist()
+    years = rng.integers(2023, 2033, n)
+    pricing = CarbonPricing(CURVES)
+    adjusted = pricing.adjusted_costs(cost, emissions, regions, years)
+    expected = np.array([[c + e * _price(curve, r, y) for c, e, r, y in zip(cost, emissions, regions, years.tolist())]
+                         for curve in CURVES])
+    assert adjusted.shape == (3, n) and np.allclose(adjusted, expected)
+
+    totals = pricing.totals(cost, emissions, pricing.region_codes(regions, n), pricing.year_codes(years, n),
+                            chunk=300, dtype=np.float32)
+    assert np.allclose(totals['total'], expected.sum(axis=1), rtol=1e-5)
+    assert (totals['best'] == expected.argmin(axis=1)).all()
+    for bad in ('cheap', [], {'price': -1}, {'by_year': {'soon': 10}}, {'by_region': ['EU']},
+                {'by_year': {'1': 1, '999999999': 2}}, {'by_year': {'0': 5}}, {'by_region': {'EU': {'3000': 1}}}):
+        try:
+            CarbonPricing(bad)
+            assert False, f'{bad} accepted'
+        except PricingError:
+            pass
+    print("✅ Broadcast prices match per-entity lookups across flat, yearly and regional curves")
+
+
+def test_rankings_reflect_cost_and_carbon():
+    data = generated_supply_chain(20, seed=6)
+    results = AgentCore().orchestrate_sustainability_analysis(dict(data, carbon_price=[100, 0]))
+
+    sourcing = results['sourcing']
+    for row, supplier in zip(sourcing['analysis'], data['suppliers']):
+        assert math.isclose(row['carbon_adjusted_cost'], supplier['cost'] + 100 * supplier['carbon_footprint'])
+    adjusted = sorted(r['carbon_adjusted_cost'] for r in sourcing['analysis'])[:5]
+    assert [r['carbon_adjusted_cost'] for r in sourcing['top_suppliers']] == adjusted
+    free, priced = sourcing['carbon_pricing']['scenarios'][1], sourcing['carbon_pricing']['scenarios'][0]
+    assert free['total_carbon_cost'] == 0 and priced['total_carbon_cost'] > 0
+
+    logistics = results['logistics']
+    savings = [r['carbon_adjusted_saving'] for r in logistics['best_routes']]
+    assert savings == sorted(savings, reverse=True)
+    assert savings[0] == max(r['carbon_adjusted_saving'] for r in logistics['optimized_routes'])
+    assert logistics['carbon_pricing']['ranking_basis'] == 'carbon_adjusted_saving'
+    factors = load_emission_factors()
+    for row, route in zip(logistics['optimized_routes'], data['routes']):
+        feasible = factors.feasible_shifts(route['transport_mode'], route['distance_km'])[0]
+        assert row['cheapest_mode'] == route['transport_mode'] or feasible[factors.modes.index(row['cheapest_mode'])]
+        assert row['carbon_adjusted_saving'] >= 0
+
+    # A short inland truck lane has nowhere to shift; a long air lane does
+    lanes = [{'id': 'R1', 'distance_km': 140, 'transport_mode': 'truck'},
+             {'id': 'R2', 'distance_km': 6000, 'transport_mode': 'air'}]
+    short, long_haul = LogisticsAgent().optimize_routes_for_emissions(lanes, carbon_price=100)['optimized_routes']
+    assert short['cheapest_mode'] == 'truck' and short['carbon_adjusted_saving'] == 0
+    assert short['lowest_emission_mode'] == 'ship'
+    assert long_haul['cheapest_mode'] != 'air' and long_haul['carbon_adjusted_saving'] > 0
+
+    for row, item in zip(results['inventory']['waste_analysis'], data['inventory']):
+        assert row['carbon_adjusted_cost'] >= item['holding_cost'] * item['current_stock']
+
+    # Without a price the rankings stay on sustainability score and emission reduction
+    plain = AgentCore().orchestrate_sustainability_analysis(data)
+    assert 'carbon_pricing' not in plain['sourcing'] and 'carbon_adjusted_cost' not in plain['logistics']['best_routes'][0]
+
+
+def test_time_varying_curve_over_routes_without_year():
+    data = generated_supply_chain(10, seed=8)
+    assert all(route.get('year') is None for route in data['routes'])
+    curve = {'by_year': {'2025': 80, '2030': 140}}
+    logistics = AgentCore().orchestrate_sustainability_analysis(dict(data, carbon_price=curve))['logistics']
+    pricing = CarbonPricing(curve, year=2027)
+    assert len(logistics['optimized_routes']) == 10
+    assert all(row['carbon_adjusted_cost'] >= row['optimized_carbon_adjusted_cost'] for row in logistics['optimized_routes'])
+    # Missing, NaN and unreadable years all price at the default year
+    codes = pricing.year_codes([None, np.nan, 'soon', '2027-06-01', 2027.0], 5)
+    assert (codes == 2).all() and (pricing.year_codes(np.array([np.nan, 2031.0]), 2) == [2, 5]).all()
+
+    from api_endpoint import app
+    response = app.test_client().post('/api/sustainability/analyze', json={
+        'supply_chain_data': data, 'carbon_price': curve}, headers=API_HEADERS)
+    routes = response.get_json()['results']['logistics']['optimized_routes']
+    assert response.status_code == 200 and all('carbon_adjusted_cost' in row for row in routes)
+    print("✅ Yearly curves price routes that carry no year")
+
+
+def test_million_entities_by_fifty_prices():
+    n = 1_000_000
+    rng = np.random.default_rng(1)
+    curves = [{'name': f'p{i}', 'by_year': {'2025': 40 + i, '2035': 100 + 4 * i},
+               'by_region': {'EU': {'2025': 80 + i, '2030': 150}}} for i in range(50)]
+    pricing = CarbonPricing(curves)
+    cost, emissions = rng.random(n) * 1000, rng.random(n) * 10
+    region_codes = pricing.region_codes(rng.choice(['EU', 'US'], n), n)
+    year_codes = pricing.year_codes(rng.integers(2024, 2036, n), n)
+    totals = pricing.totals(cost, emissions, region_codes, year_codes, dtype=np.float32)
+    assert totals['total'].shape == (50,) and (np.diff(totals['total']) > 0).all()
+    print("✅ 1M entities x 50 prices (float32, chunked)")
+
+
+def test_api_validates_carbon_price():
+    from api_endpoint import app
+    response = app.test_client().post('/api/sustainability/analyze', json={
+        'supply_chain_data': {'suppliers': [], 'routes': [], 'inventory': []}, 'carbon_price': {'price': 'high'}
+    }, headers=API_HEADERS)
+    assert response.status_code == 400
+
+
+if __name__ == "__main__":
+    test_broadcast_matches_per_entity_prices()
+    test_rankings_reflect_cost_and_carbon()
+    test_time_varying_curve_over_routes_without_year()
+    test_million_entities_by_fifty_prices()
+    test_api_validates_carbon_price()
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Test Monte Carlo uncertainty ranges for the carbon footprint
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from unittest import mock
+
+import numpy as np
+
+from agents import AgentCore, CarbonAccountingAgent, InventoryAgent, LogisticsAgent, SourcingAgent
+from agents import carbon_uncertainty
+from agents.carbon_uncertainty import UncertaintyError, simulate_footprint
+from agents.inventory_agent import MAX_WASTE_PERCENT
+from sample_data import API_HEADERS, generated_supply_chain
+
+FIXED = {name: {'distribution': 'fixed'} for name in carbon_uncertainty.DEFAULT_DISTRIBUTIONS}
+
+
+def _agent_results(n: int = 300):
+    data = generated_supply_chain(n, seed=3)
+    return {
+        'sourcing': SourcingAgent().analyze_supplier_sustainability(data['suppliers']),
+        'logistics': LogisticsAgent().optimize_routes_for_emissions(data['routes']),
+        'inventory': InventoryAgent().generate_waste_reduction_recommendations(data['inventory'])
+    }, data
+
+
+def test_fixed_inputs_reproduce_point_estimate():
+    results, _ = _agent_results()
+    carbon = CarbonAccountingAgent().calculate_overall_footprint(
+        dict(results, uncertainty={'samples': 50, 'distributions': FIXED}))
+    ranges = carbon['uncertainty']
+    for category, value in carbon['footprint_breakdown'].items():
+        summary = ranges['categories'][category]
+        assert np.allclose([summary['p5'], summary['p50'], summary['p95']], value)
+    assert np.isclose(ranges['total']['p50'], carbon['total_carbon_footprint_tons'])
+
+
+def test_ranges_bracket_point_estimate():
+    results, _ = _agent_results()
+    ranges = simulate_footprint(results['sourcing'], results['logistics'], results['inventory'],
+                                {'samples': 20000, 'seed': 11})
+    breakdown = CarbonAccountingAgent()._calculate_footprint_breakdown(
+        results['sourcing'], results['logistics'], results['inventory'])
+    for category, value in breakdown.items():
+        summary = ranges['categories'][category]
+        assert summary['p5'] < summary['p50'] < summary['p95'], category
+        assert abs(summary['mean'] / value - 1) < 0.02, category
+    # A shared factor error dominates independent per-lane distance errors
+    logistics = ranges['categories']['logistics']
+    assert 0.35 < (logistics['p95'] - logistics['p5']) / logistics['p50'] < 0.6
+    print(f"✅ Total footprint P5/P50/P95: {ranges['total']['p5']:.0f} / "
+          f"{ranges['total']['p50']:.0f} / {ranges['total']['p95']:.0f}")
+
+
+def test_same_seed_same_result_for_any_worker_count():
+    results, _ = _agent_results(100)
+    args = (results['sourcing'], results['logistics'], results['inventory'])
+    serial = simulate_footprint(*args, {'samples': 3000, 'seed': 5, 'workers': 1}, chunk_bytes=8 * 100 * 250)
+    pools = []
+
+    def pool(*a, **kwargs):
+        pools.append(kwargs)
+        return ProcessPoolExecutor(*a, **kwargs)
+    with mock.patch.object(carbon_uncertainty, 'PARALLEL_MIN_CELLS', 0), \
+            mock.patch.object(carbon_uncertainty, 'ProcessPoolExecutor', pool):
+        parallel = simulate_footprint(*args, {'samples': 3000, 'seed': 5, 'workers': 3}, chunk_bytes=8 * 100 * 250)
+    # Workers are spawned, never forked from a threaded API process
+    assert pools[0]['mp_context'].get_start_method() == 'spawn'
+    assert serial['chunks'] == parallel['chunks'] == 12
+    assert parallel['workers'] in (1, 3)  # 1 where processes are unavailable
+    assert serial['categories'] == parallel['categories'] and serial['total'] == parallel['total']
+
+
+def test_sampled_waste_respects_inventory_cap():
+    inventory = {'waste_analysis': [{'waste_percentage': MAX_WASTE_PERCENT}] * 20}
+    ranges = simulate_footprint({}, {}, inventory, {'samples': 5000, 'seed': 2})
+    point = CarbonAccountingAgent()._calculate_footprint_breakdown({}, {}, inventory)['inventory_waste']
+    # Items at the cap can only sample lower waste, never more than the agent reports
+    assert ranges['categories']['inventory_waste']['p95'] <= point + 1e-9
+    assert ranges['categories']['inventory_waste']['p5'] < point
+
+
+def test_invalid_options_rejected():
+    for options in ({'samples': 0}, {'samples': 'many'}, {'seed': -1}, {'seed': 1 << 64},
+                    {'distributions': {'distance': {'distribution': 'cauchy'}}},
+                    {'distributions': {'weather': {'distribution': 'fixed'}}},
+                    {'distributions': {'waste_rate': {'distribution': 'uniform', 'low': 2, 'high': 1}}}):
+        try:
+            carbon_uncertainty.parse_options(options)
+            assert False, f'{options} accepted'
+        except UncertaintyError:
+            pass
+
+
+def test_uncertainty_through_agent_core():
+    _, data = _agent_results(50)
+    results = AgentCore().orchestrate_sustainability_analysis(dict(data, uncertainty={'samples': 1000, 'seed': 1}))
+    ranges = results['carbon_accounting']['uncertainty']
+    assert ranges['samples'] == 1000 and ranges['seed'] == 1
+    assert set(ranges['categories']) == set(results['carbon_accounting']['footprint_breakdown'])
+    assert 'uncertainty' not in AgentCore().orchestrate_sustainability_analysis(data)['carbon_accounting']
+
+
+def test_api_without_seed_reports_a_reusable_seed():
+    from api_endpoint import app
+    _, data = _agent_results(10)
+    client = app.test_client()
+    response = client.post('/api/sustainability/analyze', json={
+        'supply_chain_data': data, 'uncertainty': {'samples': 100}}, headers=API_HEADERS)
+    assert response.status_code == 200, response.get_data(as_text=True)
+    ranges = response.get_json()['results']['carbon_accounting']['uncertainty']
+    assert 0 <= ranges['seed'] < 1 << 63
+
+    # The reported seed reproduces the run
+    again = client.post('/api/sustainability/analyze', json={
+        'supply_chain_data': data, 'uncertainty': {'samples': 100, 'seed': ranges['seed']}}, headers=API_HEADERS)
+    assert again.get_json()['results']['carbon_accounting']['uncertainty']['total'] == ranges['total']
+    print(f"✅ Unseeded run reported seed {ranges['seed']}")
+
+
+if __name__ == "__main__":
+    test_fixed_inputs_reproduce_point_estimate()
+    test_ranges_bracket_point_estimate()
+    test_same_seed_same_result_for_any_worker_count()
+    test_sampled_waste_respects_inventory_cap()
+    test_invalid_options_rejected()
+    test_uncertainty_through_agent_core()
+    test_api_without_seed_reports_a_reusable_seed()
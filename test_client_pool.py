@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Test the shared boto3 client pool in aws_config
+"""
+
+import threading
+import time
+from unittest import mock
+
+import aws_config
+from aws_config import LazyClient, get_client, reset_clients, MAX_POOL_CONNECTIONS
+
+
+def test_clients_are_shared_and_lazy():
+    """Agents reuse one pooled client and build nothing at construction"""
+    from agents.sourcing_agent import SourcingAgent
+    from agents.logistics_agent import LogisticsAgent
+
+    reset_clients()
+
+    start = time.perf_counter()
+    sourcing, logistics = SourcingAgent(), LogisticsAgent()
+    construct_time = time.perf_counter() - start
+    print(f"✅ Constructed two agents in {construct_time * 1e6:.0f}µs")
+    assert not aws_config._clients
+
+    assert sourcing.bedrock_client is logistics.bedrock_client
+    assert sourcing.bedrock_client.meta.config.max_pool_connections == MAX_POOL_CONNECTIONS
+    assert len(aws_config._clients) == 1
+
+
+def test_client_cache_is_thread_safe():
+    """Concurrent first use creates exactly one client per key"""
+    reset_clients()
+    seen = []
+
+    def worker():
+        seen.append(get_client('s3'))
+
+    threads = [threading.Thread(target=worker) for _ in range(16)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len({id(c) for c in seen}) == 1
+    assert get_client('s3', region_name='eu-west-1') is not seen[0]
+
+
+def test_instance_override():
+    """Assigning a client on an instance shadows the shared one"""
+    from bedrock_auth import BedrockAuthenticator
+
+    auth = BedrockAuthenticator()
+    fake = object()
+    auth.bedrock_agent = fake
+    assert auth.bedrock_agent is fake
+    assert BedrockAuthenticator().bedrock_agent is not fake
+
+
+def test_failed_optional_client_is_not_rebuilt_per_access():
+    """A failed optional build resolves to None until the retry window passes"""
+    class Holder:
+        client = LazyClient('s3', optional=True)
+
+    reset_clients()
+    holder = Holder()
+    with mock.patch.object(aws_config, 'get_client', side_effect=RuntimeError('no credentials')) as build:
+        assert holder.client is None and holder.client is None
+        assert build.call_count == 1
+        with mock.patch.object(aws_config.time, 'monotonic',
+                               return_value=time.monotonic() + aws_config.FAILED_CLIENT_RETRY_SECONDS + 1):
+            assert holder.client is None
+        assert build.call_count == 2
+    reset_clients()
+    assert holder.client is not None
+
+
+if __name__ == "__main__":
+    test_clients_are_shared_and_lazy()
+    test_client_cache_is_thread_safe()
+    test_instance_override()
+    test_failed_optional_client_is_not_rebuilt_per_access()
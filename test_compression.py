@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Test request/response compression and Accept-Encoding negotiation
+"""
+
+import gzip
+import json
+
+import compression
+from api_endpoint import app
+
+HEADERS = {'X-API-Key': 'strands_api_key_ai_hackathon', 'Content-Type': 'application/json'}
+SUPPLY_CHAIN = {
+    'suppliers': [{'id': f'SUP{i:03d}', 'name': f'Supplier {i}', 'carbon_footprint': 20 + i,
+                   'certifications': ['ISO14001'], 'renewable_energy_percent': 50} for i in range(40)],
+    'routes': [{'id': f'RT{i:03d}', 'origin': 'A', 'destination': 'B', 'distance_km': 200 + 10 * i,
+                'transport_mode': 'truck'} for i in range(40)],
+    'inventory': []
+}
+
+
+def test_negotiation():
+    assert compression.negotiate('gzip, deflate') == 'gzip'
+    assert compression.negotiate('gzip;q=0, identity') is None
+    assert compression.negotiate('*') == compression.ENCODINGS[0]
+    assert compression.negotiate('br') is None
+    assert compression.negotiate(None) is None
+
+
+def test_decompress_guards_size_and_encoding():
+    bomb = gzip.compress(b'\0' * 10_000)
+    assert compression.decompress(bomb, 'gzip') == b'\0' * 10_000
+    for encoding, error in (('gzip', compression.DecompressedSizeError), ('br', compression.UnsupportedEncodingError)):
+        try:
+            compression.decompress(bomb, encoding, limit=1000)
+            assert False, f'{encoding} accepted'
+        except error:
+            pass
+    # a cut-off body must not pass as its decodable prefix
+    for truncated in (bomb[:-8], bomb[:len(bomb) // 2], bomb[:10]):
+        try:
+            compression.decompress(truncated, 'gzip')
+            assert False, 'truncated gzip accepted'
+        except compression.CompressionError:
+            pass
+
+
+def test_gzip_request_and_response_round_trip():
+    client = app.test_client()
+    body = gzip.compress(json.dumps({'supply_chain_data': SUPPLY_CHAIN}).encode())
+    response = client.post('/api/sustainability/analyze', data=body,
+                           headers={**HEADERS, 'Content-Encoding': 'gzip', 'Accept-Encoding': 'gzip'})
+    assert response.status_code == 200
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in response.headers['Vary']
+    payload = json.loads(gzip.decompress(response.get_data()))
+    assert payload['results']['summary']['total_suppliers_analyzed'] == 40
+    print(f"✅ {len(response.get_data())} compressed bytes for {len(json.dumps(payload))} bytes of JSON")
+
+    streamed = client.post('/api/sustainability/analyze',
+                           json={'supply_chain_data': SUPPLY_CHAIN, 'stream_response': True},
+                           headers={**HEADERS, 'Accept-Encoding': 'gzip'})
+    assert json.loads(gzip.decompress(streamed.get_data()))['status'] == 'success'
+
+
+def test_small_and_unsupported_bodies():
+    client = app.test_client()
+    health = client.get('/health', headers={'Accept-Encoding': 'gzip'})
+    assert 'Content-Encoding' not in health.headers
+
+    response = client.post('/api/sustainability/analyze', data=b'{}',
+                           headers={**HEADERS, 'Content-Encoding': 'br'})
+    assert response.status_code == 415
+
+    for body in (b'', b'[1, 2]'):
+        for path in ('/api/sustainability/analyze', '/api/sustainability/scenarios'):
+            response = client.post(path, data=body, headers=HEADERS)
+            assert response.status_code == 400 and response.get_json()['error'] == 'JSON body required'
+
+
+if __name__ == "__main__":
+    test_negotiation()
+    test_decompress_guards_size_and_encoding()
+    test_gzip_request_and_response_round_trip()
+    test_small_and_unsupported_bodies()
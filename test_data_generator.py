@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Test deterministic synthetic data generation
+"""
+
+import asyncio
+import tempfile
+
+import numpy as np
+
+from agents.columnar_generator import ColumnarDataGenerator, load_dataset
+from agents.data_generator import EMISSIONS_PER_MILE, DataGeneratorAgent
+from agents.geography import CITY_LAT, CITY_LON, CITY_NAMES, haversine_km
+
+
+def _generate(seed, **counts):
+    params = {'suppliers': 5, 'routes': 5, 'products': 5, **counts}
+    data = asyncio.run(DataGeneratorAgent(seed=seed).execute(params))
+    data.pop('timestamp')
+    return data
+
+
+def test_seeded_generation_is_reproducible():
+    """Same seed yields identical rows, IDs included"""
+    assert _generate(42) == _generate(42)
+    assert _generate(42)['suppliers'] != _generate(43)['suppliers']
+
+
+def test_columnar_output_independent_of_chunking():
+    """Any chunk size or start offset reproduces the same rows"""
+    generator = ColumnarDataGenerator(seed=7, block_rows=1000)
+    whole = generator.generate('suppliers', 3500)
+    chunked = list(generator.iter_chunks('suppliers', 3500, chunk_rows=777))
+    for name, values in whole.items():
+        assert np.array_equal(values, np.concatenate([c[name] for c in chunked])), name
+    window = generator.generate('suppliers', 600, start=1700)
+    assert np.array_equal(window['sustainability_score'], whole['sustainability_score'][1700:2300])
+    print(f"✅ {len(chunked)} chunks match one-shot generation")
+
+
+def test_columnar_shards_match_across_worker_counts():
+    generator = ColumnarDataGenerator(seed=3, block_rows=500)
+    with tempfile.TemporaryDirectory() as serial_dir, tempfile.TemporaryDirectory() as parallel_dir:
+        generator.write_dataset(serial_dir, {'routes': 2200}, chunk_rows=1000, workers=1)
+        manifest = generator.write_dataset(parallel_dir, {'routes': 2200}, chunk_rows=1000, workers=2)
+        assert len(manifest['files']) == 3
+        serial = list(load_dataset(serial_dir, 'routes'))
+        parallel = list(load_dataset(parallel_dir, 'routes'))
+    whole = generator.generate('routes', 2200)
+    for name in whole:
+        assert np.array_equal(np.concatenate([c[name] for c in serial]), whole[name])
+        assert np.array_equal(np.concatenate([c[name] for c in parallel]), whole[name])
+
+
+def test_columnar_invariants():
+    generator = ColumnarDataGenerator(seed=11)
+    suppliers = generator.generate('suppliers', 200000)
+    assert len(np.unique(suppliers['id'])) == 200000
+
+    routes = generator.generate('routes', 10000)
+    modes = ['truck', 'rail', 'ship', 'air']
+    expected = np.array([EMISSIONS_PER_MILE[modes[m]] for m in routes['mode']])
+    assert np.array_equal(routes['emissions_per_mile'], expected)
+
+    counts = np.unpackbits(suppliers['certifications_mask'][:, None], axis=1).sum(axis=1)
+    assert counts.min() >= 1 and counts.max() <= 3
+
+
+def test_columnar_records_match_row_schema():
+    """to_records yields the same keys and types as the row generator"""
+    rows = _generate(1, suppliers=2, routes=2, products=2)
+    generator = ColumnarDataGenerator(seed=1)
+    for entity in ('suppliers', 'routes', 'products'):
+        records = generator.to_records(entity, generator.generate(entity, 2))
+        assert records[0].keys() == rows[entity][0].keys(), entity
+        for key, value in rows[entity][0].items():
+            assert type(records[0][key]) is type(value), (entity, key)
+
+    columnar = asyncio.run(DataGeneratorAgent().execute({'format': 'columnar', 'seed': 1, 'routes': 4}))
+    assert columnar['format'] == 'columnar'
+    assert len(columnar['routes']['id']) == 4
+
+
+def test_realistic_routes_follow_geography():
+    generator = ColumnarDataGenerator(seed=5, profile='realistic')
+    routes = generator.generate('routes', 50000)
+    assert not np.any(routes['origin'] == routes['destination'])
+
+    o, d = routes['origin'], routes['destination']
+    great_circle = haversine_km(CITY_LAT[o], CITY_LON[o], CITY_LAT[d], CITY_LON[d])
+    circuity = routes['distance'] / great_circle
+    assert circuity.min() > 1.0 and circuity.max() < 1.45
+
+    # Short hauls are never flown or shipped
+    short = great_circle < 800
+    assert set(np.unique(routes['mode'][short])) <= {0, 1}
+    print(f"✅ {short.sum()} short-haul lanes, max distance {routes['distance'].max()} km")
+
+    # Cross-sea lanes are shipped or flown, never trucked or railed
+    overseas = [('Tokyo', 'Beijing'), ('London', 'Tokyo'), ('Mumbai', 'Johannesburg'),
+                ('Seoul', 'Shanghai'), ('New York', 'Rotterdam'), ('Houston', 'Sao Paulo')]
+    for a, b in overseas:
+        a, b = CITY_NAMES.index(a), CITY_NAMES.index(b)
+        lanes = ((o == a) & (d == b)) | ((o == b) & (d == a))
+        assert lanes.any() and set(np.unique(routes['mode'][lanes])) <= {2, 3}
+    # The Channel Tunnel keeps London -> Paris overland
+    london_paris = (o == CITY_NAMES.index('London')) & (d == CITY_NAMES.index('Paris'))
+    assert set(np.unique(routes['mode'][london_paris])) <= {0, 1}
+
+    # New York -> London is ~5570 km great-circle
+    assert abs(haversine_km(40.7128, -74.0060, 51.5074, -0.1278) - 5570) < 20
+
+
+def test_realistic_supplier_attributes_are_correlated():
+    suppliers = ColumnarDataGenerator(seed=5, profile='realistic').generate('suppliers', 20000)
+    score = suppliers['sustainability_score']
+    assert np.corrcoef(score, suppliers['carbon_footprint'])[0, 1] < -0.5
+    assert np.corrcoef(score, suppliers['cost'])[0, 1] > 0.5
+
+    rows = _generate(9, profile='realistic')
+    assert rows['profile'] == 'realistic'
+    assert all(r['origin'] != r['destination'] for r in rows['routes'])
+
+
+if __name__ == "__main__":
+    test_seeded_generation_is_reproducible()
+    test_columnar_output_independent_of_chunking()
+    test_columnar_shards_match_across_worker_counts()
+    test_columnar_invariants()
+    test_columnar_records_match_row_schema()
+    test_realistic_routes_follow_geography()
+    test_realistic_supplier_attributes_are_correlated()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Test the emission factor table: fallbacks, vectorized lookup, file overrides
+"""
+
+import json
+import math
+import os
+import tempfile
+from unittest import mock
+
+import numpy as np
+
+from agents import LogisticsAgent
+from agents.emission_factors import DEFAULT_PATH, EmissionFactorTable, load_emission_factors, reload_emission_factors
+
+
+def test_default_factors_and_fallbacks():
+    factors = load_emission_factors()
+    assert {m: factors.factor(m) for m in factors.modes} == {'air': 2.1, 'rail': 0.14, 'ship': 0.10, 'truck': 0.62}
+    assert factors.factor('rail', 'Europe') == 0.08
+    assert factors.factor('rail', 'Atlantis') == 0.14          # unknown region -> GLOBAL
+    assert factors.factor('rail', 'Europe', 'electric') == 0.06  # no Europe/electric -> GLOBAL/electric
+    assert factors.factor('truck', year=2023) == 0.64
+    assert factors.factor('rail', year=2023) == 0.15            # latest earlier year
+    assert factors.factor('truck', year=1990) == 0.66           # clamped
+    assert factors.factor('hovercraft') == 0.62                 # default mode
+    assert factors.best_mode() == 'ship'
+    assert factors.best_mode('Europe') == 'rail'
+
+
+def test_vectorized_lookup_matches_scalar():
+    factors = load_emission_factors()
+    rng = np.random.default_rng(0)
+    n = 100_000
+    modes = rng.choice(factors.modes + ['unknown'], n)
+    regions = rng.choice(factors.regions + [None], n)
+    classes = rng.choice(factors.vehicle_classes, n)
+    years = rng.integers(2020, 2027, n)
+    batch = factors.lookup(modes, regions, classes, years)
+    for i in range(0, n, 997):
+        assert batch[i] == factors.factor(modes[i], regions[i], classes[i], int(years[i]))
+    # pre-coded columns take the array-index fast path
+    assert np.array_equal(factors.lookup(factors.mode_codes(modes), factors.region_codes(regions),
+                                         factors.vehicle_class_codes(classes), years), batch)
+
+
+def test_factor_file_update_needs_no_code_change():
+    with open(DEFAULT_PATH) as f:
+        spec = json.load(f)
+    for row in spec['transport']:
+        if row['mode'] == 'truck' and row['region'] == 'GLOBAL' and row['vehicle_class'] == 'default':
+            row['factor'] = 1.0
+    spec['version'] = 'test'
+
+    route = {'id': 'RT1', 'distance_km': 100, 'transport_mode': 'truck'}
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'factors.json')
+        with open(path, 'w') as f:
+            json.dump(spec, f)
+        with mock.patch.dict(os.environ, {'EMISSION_FACTORS_PATH': path}):
+            result = LogisticsAgent().optimize_routes_for_emissions([route])
+    assert result['emission_factors_version'] == 'test'
+    # 100 km x 1 t default cargo x 1.0 kg CO2e / (t km) = 0.1 t CO2e
+    assert math.isclose(result['optimized_routes'][0]['current_emissions'], 0.1)
+
+    result = LogisticsAgent().optimize_routes_for_emissions([route, dict(route, region='Europe', transport_mode='rail')])
+    assert result['emission_factors_version'] == reload_emission_factors().version
+    assert np.allclose([r['current_emissions'] for r in result['optimized_routes']], [0.062, 0.008])
+    print(f"✅ Factors version {result['emission_factors_version']} loaded from file")
+
+
+def test_feasible_mode_shifts():
+    factors = load_emission_factors()
+    # Chicago-Houston sized truck lane, a long truck lane, an intercontinental air lane
+    feasible = factors.feasible_shifts(['truck', 'truck', 'air', 'ship'], [140, 1500, 8000, 8000])
+    allowed = [{factors.modes[m] for m in np.flatnonzero(row)} for row in feasible]
+    assert allowed == [set(), {'rail'}, {'truck', 'rail', 'ship'}, set()]
+
+    with open(DEFAULT_PATH) as f:
+        spec = json.load(f)
+    spec['mode_shifts'] = {'allowed': {'truck': ['rail', 'ship']}, 'min_distance_km': {}}
+    table = EmissionFactorTable(spec)
+    assert table.feasible_shifts('truck', 50)[0].sum() == 2 and not table.feasible_shifts('rail', 900).any()
+    print("✅ Mode shifts follow the allowed table and minimum lane lengths")
+
+
+if __name__ == "__main__":
+    test_default_factors_and_fallbacks()
+    test_vectorized_lookup_matches_scalar()
+    test_factor_file_update_needs_no_code_change()
+    test_feasible_mode_shifts()
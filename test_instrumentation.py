@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Test per-stage profiling spans and the Prometheus metrics registry
+"""
+
+from agents.sourcing_agent import SourcingAgent
+from orchestration.instrumentation import MetricsRegistry, StageProfiler, span
+
+SUPPLIERS = [
+    {'id': f'SUP{i:03d}', 'name': f'Supplier {i}', 'carbon_footprint': 20 + i,
+     'certifications': ['ISO14001'], 'renewable_energy_percent': 50}
+    for i in range(8)
+]
+
+
+def test_spans_are_noops_without_profiler():
+    with span('anything') as s:
+        pass
+    assert type(s).__name__ == '_NullSpan'
+
+
+def test_agent_stages_nest_under_profiler():
+    """Per-row, Strands and ranking stages are reported under the agent"""
+    profiler = StageProfiler(memory=True, cprofile=True, cprofile_top=5)
+    with profiler:
+        with span('sourcing'):
+            SourcingAgent().analyze_supplier_sustainability(SUPPLIERS)
+
+    report = profiler.report()
+    stages = report['stages']
+    print(f"✅ Stages: {sorted(stages)}")
+    assert stages['sourcing/per_row_loop']['count'] == 1
+    assert stages['sourcing/per_row_loop/scoring']['count'] == len(SUPPLIERS)
+    assert stages['sourcing/per_row_loop/strands_calls']['count'] == 2 * len(SUPPLIERS)
+    assert 'sourcing/ranking' in stages
+    assert report['memory']['peak_bytes'] > 0
+    assert 0 < len(report['cprofile']) <= 5
+
+
+def test_prometheus_rendering():
+    registry = MetricsRegistry()
+    profiler = StageProfiler()
+    with profiler:
+        with span('logistics'):
+            with span('per_row_loop'):
+                pass
+    registry.observe_profiler(profiler)
+    registry.observe_profiler(profiler)
+
+    text = registry.render_prometheus()
+    assert '# TYPE supply_chain_stage_seconds summary' in text
+    assert 'supply_chain_stage_seconds_count{stage="logistics/per_row_loop"} 2' in text
+    assert 'supply_chain_profiled_runs_total 2' in text
+
+
+if __name__ == "__main__":
+    test_spans_are_noops_without_profiler()
+    test_agent_stages_nest_under_profiler()
+    test_prometheus_rendering()
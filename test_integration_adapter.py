@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Test the view-based Phase 1 -> Phase 2 schema adapter
+"""
+
+import asyncio
+import json
+import os
+
+from agents.columnar_generator import ColumnarDataGenerator
+from integration_adapter import IntegrationAdapter, RecordView, materialize
+
+SAMPLE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'sample-output.json')
+
+
+def test_views_map_fields_without_copying():
+    rows = {'suppliers': [], 'routes': [{'id': 'r1', 'origin': 'A', 'destination': 'B', 'mode': 'rail', 'distance': 900}],
+            'products': []}
+    views = IntegrationAdapter().convert_views(rows)
+    route = views['routes'][0]
+    assert isinstance(route, RecordView)
+    assert route['distance_km'] == 900 and route['transport_mode'] == 'rail'
+
+    # Views read through to the source record
+    rows['routes'][0]['distance'] = 950
+    assert views['routes'][0]['distance_km'] == 950
+    print("✅ Route view reads distance_km / transport_mode from the source row")
+
+
+def test_camel_case_sample_output():
+    with open(SAMPLE) as f:
+        sample = json.load(f)
+    converted = IntegrationAdapter()._convert_data_format(sample)
+    assert converted['suppliers'][0]['carbon_footprint'] == 25.0
+    assert converted['suppliers'][0]['renewable_energy_percent'] == 85
+    assert converted['inventory'][0] == {
+        'id': '550e8400-e29b-41d4-a716-446655440002', 'name': 'Product 1',
+        'current_stock': 500, 'monthly_demand': 200, 'shelf_life_days': 365, 'category': 'Electronics',
+        'holding_cost': 15
+    }
+
+
+def test_columnar_views_match_row_conversion():
+    generator = ColumnarDataGenerator(seed=4)
+    columnar = {'format': 'columnar'}
+    rows = {}
+    for entity in ('suppliers', 'routes', 'products'):
+        columnar[entity] = generator.generate(entity, 20)
+        rows[entity] = generator.to_records(entity, columnar[entity])
+
+    adapter = IntegrationAdapter()
+    assert materialize(adapter.convert_views(columnar)) == adapter._convert_data_format(rows)
+
+
+def test_response_can_omit_data_copies():
+    adapter = IntegrationAdapter()
+    full = asyncio.run(adapter.generate_and_analyze(3, 3, 3))
+    lean = asyncio.run(adapter.generate_and_analyze(3, 3, 3, include_generated_data=False,
+                                                    include_converted_data=False))
+    assert {'generated_data', 'converted_data'} <= set(full)
+    assert set(lean) == {'analysis_results', 'integration_metadata'}
+    assert isinstance(full['converted_data']['routes'], list)
+    json.dumps(full['converted_data'])
+
+
+if __name__ == "__main__":
+    test_views_map_fields_without_copying()
+    test_camel_case_sample_output()
+    test_columnar_views_match_row_conversion()
+    test_response_can_omit_data_copies()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Test that the Lambda deployment package imports on its own
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+import zipfile
+from unittest import mock
+
+import deploy_lambda_only
+from deploy_lambda_only import LambdaDeployer
+
+REPO = os.path.dirname(os.path.abspath(__file__))
+
+
+def _zip(path: str, vendor: bool = False):
+    cwd = os.getcwd()
+    os.chdir(REPO)
+    try:
+        # No boto3 client needed to build the zip
+        LambdaDeployer.__new__(LambdaDeployer)._create_deployment_package(path, vendor=vendor)
+    finally:
+        os.chdir(cwd)
+
+
+def _build(tmp: str) -> str:
+    """Zip built from the repo (without vendored wheels) and extracted into `tmp`/task"""
+    path = os.path.join(tmp, 'package.zip')
+    _zip(path)
+    task = os.path.join(tmp, 'task')
+    with zipfile.ZipFile(path) as zipf:
+        zipf.extractall(task)
+    return task
+
+
+def test_package_imports_agents():
+    with tempfile.TemporaryDirectory() as tmp:
+        task = _build(tmp)
+        # Only the extracted package on the path, not the repo; numpy comes
+        # from this interpreter instead of the vendored Lambda wheel
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join(
+            [task] + [p for p in os.environ.get('PYTHONPATH', '').split(os.pathsep)
+                      if p and os.path.abspath(p) != REPO]))
+        check = ("import agents, lambda_handler; "
+                 "assert agents.__file__.startswith(%r), agents.__file__; "
+                 "assert lambda_handler.AGENTS_AVAILABLE" % task)
+        result = subprocess.run([sys.executable, '-c', check], cwd=task, env=env,
+                                capture_output=True, text=True)
+        assert result.returncode == 0, result.stdout + result.stderr
+    print("✅ Lambda package imports agents and the handler from the zip alone")
+
+
+def test_package_vendors_numpy_for_the_runtime():
+    def pip_install(args, check):
+        target = args[args.index('--target') + 1]
+        os.makedirs(os.path.join(target, 'numpy'))
+        open(os.path.join(target, 'numpy', '__init__.py'), 'w').close()
+
+    with tempfile.TemporaryDirectory() as tmp, \
+            mock.patch.object(deploy_lambda_only.subprocess, 'run', side_effect=pip_install) as run:
+        path = os.path.join(tmp, 'package.zip')
+        _zip(path, vendor=True)
+        with zipfile.ZipFile(path) as zipf:
+            assert 'numpy/__init__.py' in zipf.namelist()
+    args = run.call_args[0][0]
+    assert args[args.index('--python-version') + 1] == deploy_lambda_only.LAMBDA_RUNTIME[len('python'):]
+    assert '--only-binary=:all:' in args and any(p.startswith('numpy') for p in args)
+    print("✅ numpy wheels for the Lambda runtime are packed at the zip root")
+
+
+if __name__ == "__main__":
+    test_package_imports_agents()
+    test_package_vendors_numpy_for_the_runtime()
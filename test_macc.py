@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Test the marginal abatement cost curve and budgeted action selection
+"""
+
+import math
+from itertools import product
+
+import numpy as np
+
+from agents import AgentCore
+from agents.emission_factors import load_emission_factors
+from agents.macc import MACC, MACCError, build_macc
+from sample_data import API_HEADERS, generated_supply_chain
+
+
+def _data(n: int = 40):
+    return generated_supply_chain(n, seed=5)
+
+
+def _best_under_budget(entity, cost, abatement, budget):
+    """Exhaustive multiple-choice knapsack: at most one option per entity"""
+    options = [[None] + list(np.flatnonzero(entity == e)) for e in np.unique(entity)]
+    best = 0.0
+    for pick in product(*options):
+        chosen = [i for i in pick if i is not None]
+        if cost[chosen].sum() <= budget:
+            best = max(best, abatement[chosen].sum())
+    return best
+
+
+def test_greedy_selection_against_exhaustive_search():
+    rng = np.random.default_rng(7)
+    for _ in range(100):
+        entity = rng.integers(0, 4, 10)
+        abatement = rng.random(10) * 10
+        cost = rng.normal(5, 10, 10)
+        macc = MACC(entity, np.zeros(10), cost, abatement)
+        budget = float(rng.random() * 30)
+        chosen = macc.select(budget)
+        assert len(set(entity[chosen])) == len(chosen)
+        assert cost[chosen].sum() <= budget + 1e-9
+        # Greedy takes at least every hull step before the first that does
+        # not fit, and that prefix plus the step is the LP bound on the optimum
+        steps = macc.steps
+        fits = np.maximum.accumulate(np.cumsum(steps['cost'])) <= budget + 1e-9
+        head = int(np.argmin(fits)) if not fits.all() else len(fits)
+        prefix = steps['abatement'][:head].sum()
+        optimum = _best_under_budget(entity, cost, abatement, budget)
+        assert abatement[chosen].sum() >= prefix - 1e-9
+        assert optimum <= prefix + (steps['abatement'][head] if head < len(fits) else 0) + 1e-9
+
+        # Unbounded: every entity ends on its largest option
+        chosen = macc.select()
+        expected = sum(abatement[entity == e].max() for e in np.unique(entity))
+        assert math.isclose(abatement[chosen].sum(), expected, rel_tol=1e-9)
+        slopes = [p['cost_per_ton'] for p in macc.curve()]
+        assert slopes == sorted(slopes)
+    # An upgrade cheaper per ton than another entity's first step comes first
+    macc = MACC([0, 0, 1], [1, 1, 1], [1, 11, 5], [1, 10, 1])
+    assert list(macc.select(11)) == [1]
+    print("✅ Greedy selections stay within budget and near the exhaustive optimum")
+
+
+def test_actions_from_analysis():
+    data = _data()
+    results = AgentCore().orchestrate_sustainability_analysis(data)
+    macc = build_macc(data, results)
+    factors = load_emission_factors()
+
+    for i in np.flatnonzero(macc.action == 1):
+        route = data['routes'][macc.entity[i] - len(data['suppliers'])]
+        to = macc.modes[macc.target[i]]
+        # kg CO2e over the route's default cargo, in t
+        expected = route['distance_km'] * (factors.factor(route['transport_mode']) - factors.factor(to)) \
+            * factors.multiplier('default_cargo_tonnes') / 1000
+        assert to != route['transport_mode'] and math.isclose(macc.abatement[i], expected, rel_tol=1e-9)
+        # Only shifts the lane can take: no ship for overland lanes, no rail for short ones
+        assert to != 'ship' or route['transport_mode'] == 'air'
+        assert to != 'rail' or route['distance_km'] >= 300
+    # Only suppliers above the best-in-class footprint can switch
+    footprints = [row['carbon_footprint'] for row in results['sourcing']['analysis']]
+    assert (macc.action == 0).sum() == sum(f > np.percentile(footprints, 10) for f in footprints)
+
+    carbon = results['carbon_accounting']
+    curve = carbon['abatement_curve']
+    assert curve['selection']['budget'] is None
+    assert math.isclose(curve['selection']['abatement_tons'], macc.potential, rel_tol=1e-9)
+    assert curve['selection']['abatement_tons'] < carbon['total_carbon_footprint_tons']
+    total = sum(o['potential_reduction_tons'] for o in carbon['reduction_opportunities'])
+    assert math.isclose(total, curve['selection']['abatement_tons'], rel_tol=1e-9)
+
+    budgeted = build_macc(data, results).summary(budget=2000)['selection']
+    assert budgeted['cost'] <= 2000 and budgeted['abatement_tons'] <= macc.potential
+    for bad in ({'costs': {'unknown': 1}}, {'costs': {'benchmark_percentile': 200}}):
+        try:
+            build_macc(data, results, bad['costs'])
+            assert False, f'{bad} accepted'
+        except MACCError:
+            pass
+    print(f"✅ {macc.candidates} actions, {curve['selection']['abatement_tons']:.0f} tons abatable")
+
+
+def test_million_candidate_selection():
+    n, entities = 1_000_000, 350_000
+    rng = np.random.default_rng(3)
+    abatement = rng.gamma(2, 5, n)
+    cost = rng.normal(20, 40, n) * abatement
+    macc = MACC(rng.integers(0, entities, n), rng.integers(0, 3, n), cost, abatement)
+    chosen = macc.select(budget=1e6)
+    assert cost[chosen].sum() <= 1e6 and len(np.unique(macc.entity[chosen])) == len(chosen)
+    print(f"✅ 1M candidates: {len(chosen):,} actions within budget")
+
+
+def test_abatement_option_in_api():
+    from api_endpoint import app
+    client = app.test_client()
+    headers = API_HEADERS
+    body = {'supply_chain_data': _data(10), 'abatement': {'budget': 500, 'limit': 3}}
+    response = client.post('/api/sustainability/analyze', json=body, headers=headers)
+    curve = response.get_json()['results']['carbon_accounting']['abatement_curve']
+    assert response.status_code == 200 and curve['selection']['cost'] <= 500 and len(curve['top_actions']) <= 3
+    body['abatement'] = {'budget': -1}
+    assert client.post('/api/sustainability/analyze', json=body, headers=headers).status_code == 400
+
+    # Options that bypass the endpoint are reported, not raised
+    carbon = AgentCore().orchestrate_sustainability_analysis(
+        dict(_data(5), abatement={'budget': -5}))['carbon_accounting']
+    assert 'budget' in carbon['abatement_curve']['error']
+
+
+if __name__ == "__main__":
+    test_greedy_selection_against_exhaustive_search()
+    test_actions_from_analysis()
+    test_million_candidate_selection()
+    test_abatement_option_in_api()
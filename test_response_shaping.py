@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Test summary views, field projection and cursor pagination of results
+"""
+
+import json
+
+from orchestration.response_shaping import ResultStore, ShapingError, page, parse_options, shape_results
+
+RESULTS = {
+    'sourcing': {
+        'agent': 'sourcing',
+        'analysis': [{'supplier_id': f'SUP{i:03d}', 'name': f'Supplier {i}', 'sustainability_score': i,
+                      'recommendations': ['Request carbon reduction plan from supplier']} for i in range(25)],
+        'top_suppliers': [{'supplier_id': 'SUP024', 'name': 'Supplier 24', 'sustainability_score': 24}]
+    },
+    'logistics': {'optimized_routes': [{'route_id': f'RT{i:03d}', 'emission_reduction': i} for i in range(7)],
+                  'total_emission_reduction': 3.0},
+    'summary': {'total_suppliers_analyzed': 25}
+}
+
+
+def test_summary_view_drops_row_arrays():
+    shaped = shape_results(RESULTS, parse_options({'view': 'summary'}))
+    assert 'analysis' not in shaped['sourcing']
+    assert shaped['sourcing']['analysis_count'] == 25
+    assert shaped['logistics']['optimized_routes_count'] == 7
+    assert shaped['logistics']['total_emission_reduction'] == 3.0
+    assert len(RESULTS['sourcing']['analysis']) == 25  # stored copy untouched
+    print(f"✅ Summary payload {len(json.dumps(shaped))} bytes vs {len(json.dumps(RESULTS))} full")
+
+
+def test_field_projection():
+    shaped = shape_results(RESULTS, parse_options({'fields': 'supplier_id,sustainability_score'}))
+    assert shaped['sourcing']['analysis'][0] == {'supplier_id': 'SUP000', 'sustainability_score': 0}
+    shaped = shape_results(RESULTS, parse_options({'fields': {'optimized_routes': ['route_id']}}))
+    assert shaped['logistics']['optimized_routes'][0] == {'route_id': 'RT000'}
+    assert 'name' in shaped['sourcing']['analysis'][0]
+
+    # unhashable or non-string names would fail later with a 500
+    for fields in ([['supplier_id']], [{'a': 1}], [1], {'analysis': 'supplier_id'}, {'analysis': [None]}):
+        try:
+            parse_options({'fields': fields})
+            assert False, f'{fields} accepted'
+        except ShapingError:
+            pass
+
+
+def test_cursor_pagination_over_stored_results():
+    store = ResultStore()
+    result_id = store.put(RESULTS)
+    shaped = shape_results(RESULTS, parse_options({'page_size': 10, 'fields': ['supplier_id']}), result_id)
+    assert shaped['result_id'] == result_id
+    assert len(shaped['sourcing']['analysis']) == 10
+    cursor = shaped['pagination']['analysis']['next_cursor']
+
+    seen = [row['supplier_id'] for row in shaped['sourcing']['analysis']]
+    while cursor:
+        chunk = page(store.get(result_id), 'analysis', cursor, 10, ['supplier_id'])
+        seen += [row['supplier_id'] for row in chunk['items']]
+        cursor = chunk['next_cursor']
+    assert seen == [f'SUP{i:03d}' for i in range(25)]
+
+    try:
+        page(RESULTS, 'optimized_routes', shaped['pagination']['analysis']['next_cursor'], 10)
+        assert False, 'cursor from another section accepted'
+    except ShapingError:
+        pass
+
+
+if __name__ == "__main__":
+    test_summary_view_drops_row_arrays()
+    test_field_projection()
+    test_cursor_pagination_over_stored_results()
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Test retry classification, backoff budgets and deadlines
+"""
+
+import threading
+import time
+from unittest import mock
+
+from orchestration import AgentOrchestrator, AgentStatus
+from orchestration.retry_policy import (PERMANENT, TRANSIENT, Deadline, DeadlineExceeded, RetryPolicy,
+                                        classify)
+
+
+class ThrottlingError(Exception):
+    response = {'Error': {'Code': 'ThrottlingException'}}
+
+
+def _flaky(failures, error=ConnectionError):
+    calls = []
+
+    def fn():
+        calls.append(1)
+        if len(calls) <= failures:
+            raise error('boom')
+        return 'ok'
+    return fn, calls
+
+
+def test_classification():
+    assert classify(ConnectionError()) == TRANSIENT
+    assert classify(TimeoutError()) == TRANSIENT
+    assert classify(ThrottlingError()) == TRANSIENT
+    for error in (KeyError('x'), ZeroDivisionError(), ValueError(), DeadlineExceeded()):
+        assert classify(error) == PERMANENT, error
+
+
+def test_permanent_errors_fail_fast_and_transient_retry():
+    policy = RetryPolicy(max_attempts=3, base_delay=0.001)
+    fn, calls = _flaky(5, KeyError)
+    start = time.perf_counter()
+    try:
+        policy.call('agent', fn)
+        assert False, 'permanent error swallowed'
+    except KeyError as e:
+        assert e.retry_info == {'attempts': 1, 'error_class': PERMANENT}
+    assert len(calls) == 1 and time.perf_counter() - start < 0.05
+
+    fn, calls = _flaky(2)
+    assert policy.call('agent', fn) == ('ok', {'attempts': 3})
+
+
+def test_retry_budget_caps_retries_per_agent():
+    policy = RetryPolicy(max_attempts=5, base_delay=0, budget_ratio=0.0, budget_min_tokens=3)
+    retried = 0
+    for _ in range(5):
+        fn, calls = _flaky(100)
+        try:
+            policy.call('logistics', fn)
+        except ConnectionError:
+            retried += len(calls) - 1
+    assert retried == 3
+    # other agents keep their own budget
+    assert policy.call('sourcing', _flaky(1)[0])[0] == 'ok'
+
+
+def test_deadline_bounds_and_interrupts_backoff():
+    policy = RetryPolicy(max_attempts=10, base_delay=5, max_delay=5)
+    fn, calls = _flaky(100)
+    start = time.perf_counter()
+    try:
+        policy.call('agent', fn, Deadline(0.05))
+    except ConnectionError as e:
+        assert e.retry_info['deadline_exceeded']
+    assert time.perf_counter() - start < 0.05 and len(calls) == 1
+
+    deadline = Deadline()
+    threading.Timer(0.05, deadline.cancel).start()
+    start = time.perf_counter()
+    assert deadline.sleep(10) is False
+    assert time.perf_counter() - start < 1
+
+
+def test_orchestrator_fails_fast_on_deterministic_errors():
+    orchestrator = AgentOrchestrator()
+
+    def broken(routes):
+        raise ZeroDivisionError('division by zero')
+    orchestrator.logistics_agent.optimize_routes_for_emissions = broken
+
+    start = time.perf_counter()
+    result = orchestrator.orchestrate_agents({'suppliers': [], 'routes': [{'id': 'r', 'distance_km': 10}]})
+    logistics = result['agent_results']['logistics']
+    assert logistics.status == AgentStatus.FAILED and logistics.attempts == 1
+    assert logistics.error_class == PERMANENT
+    assert time.perf_counter() - start < 0.5
+    # sourcing returned an empty analysis; carbon accounting must still succeed
+    assert result['agent_results']['carbon_accounting'].status == AgentStatus.COMPLETED
+
+    expired = orchestrator.orchestrate_agents({'suppliers': []}, Deadline(0))
+    assert expired['execution_summary']['failed_agents'] == 4
+    print("✅ Deterministic errors fail in one attempt; expired deadlines skip agents")
+
+
+def test_api_keeps_explicit_zero_deadline():
+    import api_endpoint
+    client = api_endpoint.app.test_client()
+    headers = {'X-API-Key': 'strands_api_key_ai_hackathon', 'X-Request-Deadline-Ms': '60000'}
+    with mock.patch.object(api_endpoint.agent_core, 'orchestrate_sustainability_analysis',
+                           return_value={}) as analyze:
+        for body, expected in (({'deadline_ms': 0}, 0.0), ({}, 60000.0), ({'deadline_ms': None}, 60000.0)):
+            response = client.post('/api/sustainability/analyze', json={'supply_chain_data': {}, **body},
+                                   headers=headers)
+            assert response.status_code == 200
+            assert analyze.call_args.kwargs['deadline_ms'] == expected
+    print("✅ deadline_ms: 0 is honoured rather than replaced by the header")
+
+
+def test_expired_deadline_skips_post_analysis_stages():
+    from agents import AgentCore
+    agent_core = AgentCore()
+    agent_core.ledger = mock.Mock()
+    data = {
+        'suppliers': [{'id': 'S1', 'name': 'Supplier 1', 'carbon_footprint': 20}],
+        'line_items': [{'product_id': 'P1', 'supplier_id': 'S1', 'mass_kg': 10, 'value': 100}]
+    }
+    results = agent_core.orchestrate_sustainability_analysis(data, deadline_ms=0)
+    skipped = results['orchestration_metadata']['skipped_stages']
+    assert skipped == ['carbon_cube', 'abatement_curve', 'scope_allocation', 'ledger'], skipped
+    carbon = results['carbon_accounting']
+    assert not {'rollups', 'abatement_curve', 'product_allocation'} & carbon.keys()
+    agent_core.ledger.record.assert_not_called()
+
+    results = agent_core.orchestrate_sustainability_analysis(data)
+    assert results['orchestration_metadata']['skipped_stages'] == []
+    assert {'rollups', 'abatement_curve', 'product_allocation'} <= results['carbon_accounting'].keys()
+    print("✅ Expired deadlines skip the cube, abatement, allocation and ledger stages")
+
+
+if __name__ == "__main__":
+    test_classification()
+    test_permanent_errors_fail_fast_and_transient_retry()
+    test_retry_budget_caps_retries_per_agent()
+    test_deadline_bounds_and_interrupts_backoff()
+    test_orchestrator_fails_fast_on_deterministic_errors()
+    test_api_keeps_explicit_zero_deadline()
+    test_expired_deadline_skips_post_analysis_stages()
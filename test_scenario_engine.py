@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Test the what-if scenario engine against the agents it summarizes
+"""
+
+import math
+
+import numpy as np
+
+from agents import CarbonAccountingAgent, InventoryAgent, LogisticsAgent, SourcingAgent
+from agents.emission_factors import load_emission_factors
+from agents.scenario_engine import ScenarioEngine, ScenarioError
+from sample_data import API_HEADERS, generated_supply_chain
+
+
+def _base(n: int, seed: int = 7):
+    return generated_supply_chain(n, seed)
+
+
+def _agent_breakdown(data, ship_scale=1.0):
+    sourcing = SourcingAgent().analyze_supplier_sustainability(data['suppliers'])
+    logistics = LogisticsAgent().optimize_routes_for_emissions(data['routes'])
+    for route, optimized in zip(data['routes'], logistics['optimized_routes']):
+        if route['transport_mode'] == 'ship':
+            optimized['current_emissions'] *= ship_scale
+    inventory = InventoryAgent().generate_waste_reduction_recommendations(data['inventory'])
+    carbon = CarbonAccountingAgent().calculate_overall_footprint(
+        {'sourcing': sourcing, 'logistics': logistics, 'inventory': inventory})
+    scores = [s['sustainability_score'] for s in sourcing['analysis']]
+    return carbon['footprint_breakdown'], sum(scores) / len(scores)
+
+
+def _apply(data, share=0.3, uplift=20, certification='ISO 14001', min_score=90, stock_cut=0.25):
+    """The scenario in test_overrides_match_brute_force, applied row by row"""
+    factors = load_emission_factors()
+    suppliers = []
+    for s in data['suppliers']:
+        s = dict(s, renewable_energy_percent=min(100, s['renewable_energy_percent'] + uplift))
+        if certification in s['certifications'] and SourcingAgent()._calculate_sustainability_score(s) >= min_score:
+            suppliers.append(s)
+
+    routes = [dict(r) for r in data['routes']]
+    trucks = [i for i, r in enumerate(routes) if r['transport_mode'] == 'truck']
+    saving = [routes[i]['distance_km'] * (factors.factor('rail') - factors.factor('truck')) for i in trucks]
+    for i in [trucks[j] for j in np.argsort(saving, kind='stable')[:round(share * len(trucks))]]:
+        routes[i]['transport_mode'] = 'rail'
+
+    inventory = [dict(p, current_stock=p['current_stock'] * (1 - stock_cut)) for p in data['inventory']]
+    return {'suppliers': suppliers, 'routes': routes, 'inventory': inventory}
+
+
+def test_baseline_matches_agents():
+    data = _base(200)
+    breakdown, avg_score = _agent_breakdown(data)
+    baseline = ScenarioEngine(data).baseline()
+    for category, value in breakdown.items():
+        assert math.isclose(baseline[category], value, rel_tol=1e-9), category
+    assert math.isclose(baseline['avg_supplier_score'], avg_score, rel_tol=1e-9)
+
+
+def test_overrides_match_brute_force():
+    data = _base(300)
+    result = ScenarioEngine(data).compare([{'name': 'combined', 'overrides': [
+        {'type': 'renewable_energy', 'increase_percent': 20},
+        {'type': 'drop_suppliers', 'without_certification': 'ISO 14001', 'min_score': 90},
+        {'type': 'shift_mode', 'from': 'truck', 'to': 'rail', 'share': 0.3},
+        {'type': 'scale_emission_factor', 'mode': 'ship', 'scale': 0.5},
+        {'type': 'reduce_stock', 'share': 0.25}
+    ]}])
+    scenario = result['scenarios'][0]
+    breakdown, avg_score = _agent_breakdown(_apply(data), ship_scale=0.5)
+    for category, value in breakdown.items():
+        assert math.isclose(scenario[category], value, rel_tol=1e-9), (category, scenario[category], value)
+    assert math.isclose(scenario['avg_supplier_score'], avg_score, rel_tol=1e-9)
+    assert scenario['delta_carbon'] < 0
+    print(f"✅ Combined scenario: {scenario['delta_carbon_percent']:.1f}% carbon, "
+          f"{scenario['delta_cost']:+.0f} cost vs baseline")
+
+
+def test_thousand_scenarios_batch():
+    engine = ScenarioEngine(_base(20000))
+    rng = np.random.default_rng(0)
+    scenarios = [{'name': f's{i}', 'overrides': [
+        {'type': 'shift_mode', 'from': 'truck', 'to': str(rng.choice(['rail', 'ship'])), 'share': float(rng.random())},
+        {'type': 'drop_suppliers', 'min_score': float(rng.integers(60, 100))},
+        {'type': 'renewable_energy', 'increase_percent': int(rng.integers(0, 4)) * 10},
+        {'type': 'reduce_stock', 'share': float(rng.random() / 2)}
+    ]} for i in range(1000)]
+    result = engine.evaluate(scenarios)
+    assert len(result['total_carbon']) == 1000 and np.all(np.isfinite(result['total_carbon']))
+    print("✅ 1000 scenarios over 20k rows/entity")
+
+
+def test_invalid_overrides_rejected():
+    engine = ScenarioEngine(_base(5))
+    for override in ({'type': 'teleport'}, {'type': 'shift_mode', 'from': 'truck', 'to': 'truck', 'share': 1},
+                     {'type': 'reduce_stock', 'share': 2}, {'type': 'scale_emission_factor', 'mode': 'rocket', 'scale': 1}):
+        try:
+            engine.evaluate([{'overrides': [override]}])
+            assert False, f'{override} accepted'
+        except ScenarioError:
+            pass
+
+
+def test_scenarios_endpoint():
+    from api_endpoint import app
+    client = app.test_client()
+    headers = API_HEADERS
+    body = {'supply_chain_data': _base(20), 'scenarios': [
+        {'name': 'rail', 'overrides': [{'type': 'shift_mode', 'from': 'truck', 'to': 'rail', 'share': 1}]}]}
+    response = client.post('/api/sustainability/scenarios', json=body, headers=headers)
+    assert response.status_code == 200
+    results = response.get_json()['results']
+    assert results['scenarios'][0]['name'] == 'rail' and 'total_carbon' in results['baseline']
+
+    body['scenarios'] = [{'overrides': [{'type': 'teleport'}]}]
+    assert client.post('/api/sustainability/scenarios', json=body, headers=headers).status_code == 400
+
+    # malformed input is a JSON 400, never a 500
+    base = _base(5)
+    scenarios = [{'name': 'rail', 'overrides': [{'type': 'shift_mode', 'from': 'truck', 'to': 'rail', 'share': 1}]}]
+    for data, scenarios in (
+            ([base], scenarios),
+            (dict(base, suppliers=['x']), scenarios),
+            (dict(base, suppliers=[dict(base['suppliers'][0], cost='abc')]), scenarios),
+            (dict(base, routes=[dict(base['routes'][0], transport_mode=['truck'])]), scenarios),
+            (base, [{'overrides': [{'type': 'drop_suppliers', 'without_certification': ['a']}]}]),
+            (base, [{'overrides': {'type': 'reduce_stock', 'share': 0.1}}])):
+        response = client.post('/api/sustainability/scenarios', json={'supply_chain_data': data, 'scenarios': scenarios},
+                               headers=headers)
+        assert response.status_code == 400, (data, scenarios, response.status_code)
+        assert 'error' in response.get_json()
+    print("✅ Scenarios endpoint answers malformed input with 400")
+
+
+if __name__ == "__main__":
+    test_baseline_matches_agents()
+    test_overrides_match_brute_force()
+    test_thousand_scenarios_batch()
+    test_invalid_overrides_rejected()
+    test_scenarios_endpoint()
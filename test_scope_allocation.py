@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Test GHG scope mapping and allocation of shared emissions to products
+"""
+
+import math
+
+import numpy as np
+
+from agents import AgentCore
+from agents.emission_factors import load_emission_factors
+from agents.scope_allocation import AllocationError, allocate_products, scope_breakdown
+from sample_data import API_HEADERS, generated_supply_chain
+
+
+def _results():
+    return {
+        'sourcing': {'analysis': [{'supplier_id': 'S1', 'carbon_footprint': 100.0},
+                                  {'supplier_id': 'S2', 'carbon_footprint': 40.0},
+                                  {'supplier_id': 'S3', 'carbon_footprint': 7.0}]},
+        'logistics': {'optimized_routes': [{'route_id': 'R1', 'current_emissions': 30.0}]},
+        'inventory': {'waste_analysis': [{'product_id': 'P3', 'waste_percentage': 20.0}]}
+    }
+
+
+def test_scope_breakdown_partitions_footprint():
+    breakdown = {'sourcing': 100.0, 'logistics': 30.0, 'inventory_waste': 2.0, 'operations': 20.0}
+    scopes = scope_breakdown(breakdown)
+    share = load_emission_factors().multiplier('operations_scope_2_share')
+    assert math.isclose(scopes['scope_2'], 20 * share) and math.isclose(scopes['scope_1'], 20 * (1 - share))
+    assert [c['category'] for c in scopes['scope_3_categories']] == [1, 4, 5]
+    assert math.isclose(scopes['scope_1'] + scopes['scope_2'] + scopes['scope_3'], sum(breakdown.values()))
+    print("✅ Footprint categories map onto Scope 1/2/3")
+
+
+def test_allocation_by_value_and_mass():
+    line_items = [
+        {'product_id': 'P1', 'supplier_id': 'S1', 'route_id': 'R1', 'mass_kg': 300, 'value': 750},
+        {'product_id': 'P2', 'supplier_id': 'S1', 'route_id': 'R1', 'mass_kg': 100, 'value': 250},
+        {'product_id': 'P2', 'supplier_id': 'S2', 'mass_kg': 0, 'value': 0},
+        {'product_id': 'P3', 'supplier_id': 'S2', 'mass_kg': 0, 'value': 0},
+        {'product_id': 'P4', 'supplier_id': 'unknown', 'mass_kg': 5, 'value': 5}
+    ]
+    allocation = allocate_products({'line_items': line_items}, _results())
+    ops = load_emission_factors().multiplier('operations_share_of_sourcing')
+    p1, p2, p3 = (allocation.product(p) for p in ('P1', 'P2', 'P3'))
+    # S1 by value (75/25), R1 by mass (75/25), S2 evenly since its lines weigh nothing
+    assert math.isclose(p1['scope_3_categories'][0]['emissions'], 75)
+    assert math.isclose(p1['scope_3_categories'][1]['emissions'], 22.5)
+    assert math.isclose(p2['scope_3_categories'][0]['emissions'], 25 + 20)
+    assert math.isclose(p3['total'], 20 * (1 + ops) + 2.0)
+    assert allocation.product('P4')['total'] == 0 and allocation.unmatched == 1
+
+    summary = allocation.summary()
+    assert math.isclose(summary['unallocated']['scope_3'], 7.0)  # S3 has no line items
+    allocated = summary['allocated']
+    assert math.isclose(allocated['scope_1'] + allocated['scope_2'] + summary['unallocated']['scope_1']
+                        + summary['unallocated']['scope_2'], 147 * ops)
+    assert [p['product_id'] for p in summary['top_products']][:2] == ['P1', 'P2']
+
+    by_mass = allocate_products({'line_items': line_items}, _results(), {'suppliers': 'mass'})
+    assert math.isclose(by_mass.product('P1')['scope_3_categories'][0]['emissions'], 75)
+    for bad in ({'suppliers': 'volume'}, {'warehouses': 'mass'}, 'mass'):
+        try:
+            allocate_products({'line_items': line_items}, _results(), bad)
+            assert False, f'{bad} accepted'
+        except AllocationError:
+            pass
+
+
+def test_agent_core_allocates_line_items():
+    data = generated_supply_chain(10, seed=8)
+    rng = np.random.default_rng(8)
+    data['line_items'] = [{'product_id': data['inventory'][rng.integers(10)]['id'],
+                           'supplier_id': data['suppliers'][i % 10]['id'],
+                           'route_id': data['routes'][i % 10]['id'],
+                           'mass_kg': float(rng.integers(1, 100)), 'value': float(rng.integers(1, 100))}
+                          for i in range(60)]
+    carbon = AgentCore().orchestrate_sustainability_analysis(data)['carbon_accounting']
+    scopes = carbon['scope_breakdown']
+    assert math.isclose(scopes['scope_1'] + scopes['scope_2'] + scopes['scope_3'],
+                        carbon['total_carbon_footprint_tons'], rel_tol=1e-9)
+    allocation = carbon['product_allocation']
+    assert allocation['line_items'] == 60 and allocation['unmatched_line_items'] == 0
+    allocated = allocation['allocated']
+    # Every supplier and lane has lines, so the whole footprint lands on products
+    assert math.isclose(allocated['scope_1'] + allocated['scope_2'] + allocated['scope_3'],
+                        carbon['total_carbon_footprint_tons'], rel_tol=1e-9)
+
+
+def test_million_line_items_over_100k_products():
+    n, products, suppliers, routes = 1_000_000, 100_000, 20_000, 50_000
+    rng = np.random.default_rng(2)
+    results = {
+        'sourcing': {'analysis': [{'supplier_id': f'S{i}', 'carbon_footprint': float(v)}
+                                  for i, v in enumerate(rng.random(suppliers) * 100)]},
+        'logistics': {'optimized_routes': [{'route_id': f'R{i}', 'current_emissions': float(v)}
+                                           for i, v in enumerate(rng.random(routes) * 50)]},
+        'inventory': {'waste_analysis': []}
+    }
+    line_items = {
+        'product_id': [f'P{i}' for i in rng.permutation(np.arange(n) % products)],
+        'supplier_id': [f'S{i}' for i in rng.integers(0, suppliers, n)],
+        'route_id': [f'R{i}' for i in rng.integers(0, routes, n)],
+        'mass_kg': rng.random(n) * 1000,
+        'value': rng.random(n) * 500
+    }
+    allocation = allocate_products({'line_items': line_items}, results)
+    total = sum(r['carbon_footprint'] for r in results['sourcing']['analysis']) \
+        * (1 + load_emission_factors().multiplier('operations_share_of_sourcing')) \
+        + sum(r['current_emissions'] for r in results['logistics']['optimized_routes'])
+    assert math.isclose(allocation.emissions.sum() + allocation.unallocated.sum(), total, rel_tol=1e-9)
+    assert len(allocation.products) == products
+    print(f"✅ 1M line items allocated over {products:,} products")
+
+
+def test_invalid_allocation_rejected_by_api():
+    from api_endpoint import app
+    client = app.test_client()
+    data = {'suppliers': [], 'routes': [], 'inventory': []}
+    rows = [{'product_id': 'P1', 'supplier_id': 'S1', 'value': 10}]
+    response = client.post('/api/sustainability/analyze', json={
+        'supply_chain_data': dict(data, line_items=rows), 'allocation': {'suppliers': 'mass'}
+    }, headers=API_HEADERS)
+    assert response.status_code == 200
+    assert response.get_json()['results']['carbon_accounting']['product_allocation']['basis']['suppliers'] == 'mass'
+
+    for body in ({'supply_chain_data': data, 'allocation': {'routes': 'volume'}},
+                 {'supply_chain_data': dict(data, line_items='abc')},
+                 {'supply_chain_data': dict(data, line_items=[dict(rows[0], value='x')])},
+                 {'supply_chain_data': dict(data, line_items={'product_id': ['P1', 'P2'], 'value': [1]})}):
+        response = client.post('/api/sustainability/analyze', json=body, headers=API_HEADERS)
+        assert response.status_code == 400, body
+
+    # Line items that bypass the endpoint are reported, not raised
+    carbon = AgentCore().orchestrate_sustainability_analysis(dict(data, line_items='abc'))['carbon_accounting']
+    assert 'line_items' in carbon['product_allocation']['error']
+    print("✅ Malformed line items and bases are rejected with 400")
+
+if __name__ == "__main__":
+    test_scope_breakdown_partitions_footprint()
+    test_allocation_by_value_and_mass()
+    test_agent_core_allocates_line_items()
+    test_million_line_items_over_100k_products()
+    test_invalid_allocation_rejected_by_api()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Test the pluggable JSON serializer, streaming encoder and dedup format
+"""
+
+import json
+
+import numpy as np
+
+import serialization
+from integration_adapter import IntegrationAdapter
+
+PAYLOAD = {
+    'status': 'success',
+    'results': {
+        'logistics': {
+            'optimized_routes': [
+                {'route_id': f'RT{i:04d}', 'distance_km': 100 + i, 'emission_reduction': i / 3,
+                 'recommendations': ['Implement load consolidation to reduce trips',
+                                     'Consider rail transport for long-distance shipping'][:1 + i % 2]}
+                for i in range(2500)
+            ]
+        },
+        'summary': {'top_recommendations': ['Implement load consolidation to reduce trips'], 'grade': 'A'}
+    }
+}
+
+
+def test_backends_produce_equivalent_json():
+    for backend in serialization.BACKENDS:
+        encoded = serialization.dumps(PAYLOAD, backend)
+        assert json.loads(encoded) == PAYLOAD, backend
+    print(f"✅ Backends: {serialization.BACKENDS}")
+
+
+def test_streamed_chunks_join_to_whole_document():
+    chunks = list(serialization.iter_encode(PAYLOAD, chunk_size=4096, batch_size=100))
+    assert len(chunks) > 10
+    assert b''.join(chunks) == serialization.dumps(PAYLOAD)
+
+
+def test_dedup_round_trip_is_smaller():
+    plain = serialization.dumps(PAYLOAD)
+    dedup = serialization.encode_response(PAYLOAD, 'dedup')
+    decoded = json.loads(dedup)
+    assert len(decoded['strings']) == 2
+    assert serialization.expand_strings(decoded) == PAYLOAD
+    assert len(dedup) < len(plain) * 0.6
+    print(f"✅ Dedup payload {len(dedup)} bytes vs {len(plain)} plain")
+
+
+def test_numpy_values_and_adapter_views_encode():
+    rows = {'routes': [{'id': 'r1', 'origin': 'A', 'destination': 'B', 'mode': 'rail', 'distance': 900, 'cost': 310}]}
+    views = IntegrationAdapter().convert_views(rows)
+    payload = {'routes': views['routes'], 'total': np.float64(1.5), 'codes': np.arange(3, dtype=np.int8)}
+    for backend in serialization.BACKENDS:
+        assert json.loads(serialization.dumps(payload, backend)) == {
+            'routes': [{'id': 'r1', 'origin': 'A', 'destination': 'B', 'distance_km': 900, 'transport_mode': 'rail',
+                        'cost': 310}],
+            'total': 1.5,
+            'codes': [0, 1, 2]
+        }
+
+
+if __name__ == "__main__":
+    test_backends_produce_equivalent_json()
+    test_streamed_chunks_join_to_whole_document()
+    test_dedup_round_trip_is_smaller()
+    test_numpy_values_and_adapter_views_encode()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Test Bedrock chat session reuse and response memoization
+"""
+
+from unittest import mock
+
+import bedrock_agent_endpoint
+from fake_bedrock import FakeBedrockAgentRuntime
+from session_store import SessionStore, TTLCache
+
+API_KEY = "strands_api_key_ai_hackathon"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_ttl_and_lru_eviction():
+    """Entries expire after the TTL and the LRU bound holds"""
+    clock = FakeClock()
+    cache = TTLCache(max_entries=2, ttl_seconds=10, clock=clock)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    assert cache.get('a') == 1          # 'a' becomes most recent
+    cache.set('c', 3)                   # evicts 'b'
+    assert cache.get('b') is None and cache.evictions == 1
+
+    clock.now = 11
+    assert cache.get('a') is None and cache.expirations == 1
+    assert len(cache) == 1
+
+
+def test_session_ids_unique():
+    """IDs no longer collide for requests in the same second"""
+    store = SessionStore()
+    ids = {store.resolve(None, 'agent').session_id for _ in range(1000)}
+    assert len(ids) == 1000
+    assert len(bedrock_agent_endpoint.auth.generate_session_id()) == 32
+
+
+def test_chat_continues_session_and_memoizes():
+    """Repeated prompts in a session are answered without calling Bedrock"""
+    fake = FakeBedrockAgentRuntime(chunks=["Use rail."])
+    sessions = SessionStore()
+    with mock.patch.object(bedrock_agent_endpoint.auth, 'bedrock_agent', fake), \
+            mock.patch.object(bedrock_agent_endpoint, 'sessions', sessions):
+        client = bedrock_agent_endpoint.app.test_client()
+        headers = {'X-API-Key': API_KEY}
+
+        first = client.post('/bedrock/agent/chat', json={'message': 'Best mode?'}, headers=headers).get_json()
+        session_id = first['session_id']
+        assert first['cached'] is False
+
+        second = client.post('/bedrock/agent/chat',
+                             json={'message': 'Best mode?', 'session_id': session_id},
+                             headers=headers).get_json()
+        assert second == {**first, 'cached': True}
+
+        third = client.post('/bedrock/agent/chat',
+                            json={'message': 'Why?', 'session_id': session_id},
+                            headers=headers).get_json()
+        assert third['session_id'] == session_id and third['cached'] is False
+
+    assert len(fake.calls) == 2
+    assert {call['sessionId'] for call in fake.calls} == {session_id}
+    print(f"✅ Session stats: {sessions.snapshot()}")
+
+
+def test_invalid_session_and_auth_rejected():
+    """Malformed IDs get 400 and memoized answers require a valid key"""
+    client = bedrock_agent_endpoint.app.test_client()
+    response = client.post('/bedrock/agent/chat',
+                           json={'message': 'hi', 'session_id': 'bad id!'},
+                           headers={'X-API-Key': API_KEY})
+    assert response.status_code == 400
+
+    response = client.post('/bedrock/agent/chat', json={'message': 'hi', 'api_key': 'wrong'})
+    assert response.status_code == 401
+
+
+def test_unauthenticated_invoke_leaves_sessions_alone():
+    """A bad key on /invoke neither creates nor takes over a session"""
+    sessions = SessionStore()
+    with mock.patch.object(bedrock_agent_endpoint, 'sessions', sessions):
+        client = bedrock_agent_endpoint.app.test_client()
+        owner = sessions.resolve(None, 'agent-a')
+        before = dict(sessions.stats)
+        for stream in (False, True):
+            response = client.post('/bedrock/agent/invoke', json={
+                'agent_id': 'agent-b', 'input_text': 'hi', 'session_id': owner.session_id,
+                'api_key': 'wrong', 'stream': stream})
+            assert response.status_code == 401
+    assert sessions.stats == before
+    assert sessions.resolve(owner.session_id, 'agent-a') is owner
+
+
+if __name__ == "__main__":
+    test_ttl_and_lru_eviction()
+    test_session_ids_unique()
+    test_chat_continues_session_and_memoizes()
+    test_invalid_session_and_auth_rejected()
+    test_unauthenticated_invoke_leaves_sessions_alone()
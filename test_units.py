@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Test unit-tagged arrays and the units agents report
+"""
+
+import json
+import math
+
+import numpy as np
+
+from agents import CarbonAccountingAgent, InventoryAgent, LogisticsAgent, SourcingAgent
+from agents.emission_factors import DEFAULT_PATH, EmissionFactorTable
+from agents.peer_benchmarks import PeerBenchmarks
+from agents.units import OUTPUT_UNITS, UnitArray, UnitError, convert, freight_emissions, unit
+
+
+def test_conversions_and_fail_fast():
+    assert convert(2.5, 't CO2e', 'kg CO2e') == 2500
+    assert math.isclose(convert(1.0, '100 kg CO2e', 't CO2e'), 0.1)
+    assert math.isclose(convert(1.0, 'kg CO2e / (t mi)', 'kg CO2e / (t km)'), 1 / 1.609344)
+    assert unit('kg CO2e / (t km)') * unit('t') * unit('km') == unit('kg CO2e')
+
+    total = UnitArray([1.0, 2.0], 't CO2e') + UnitArray([500.0, 250.0], 'kg CO2e')
+    assert total.unit == unit('t CO2e') and np.allclose(total.values, [1.5, 2.25])
+    assert list(UnitArray([0.5, 2.0], 't CO2e') > UnitArray([1000.0, 1000.0], 'kg CO2e')) == [False, True]
+    assert np.allclose((UnitArray([50.0], '%') + UnitArray([0.25], '1')).magnitude('1'), [0.75])
+    # Plain numbers are read in the column's own unit
+    assert np.allclose((UnitArray([10.0], '%') + 5).values, [15]) and (UnitArray([60.0], '%') + 5).unit == unit('%')
+    assert list(UnitArray([60.0, 40.0], '%') > 50) == [True, False]
+    assert np.allclose((100 - UnitArray([30.0], '%')).magnitude('1'), [0.7])
+
+    for bad in (lambda: UnitArray([1.0], 't') + UnitArray([1.0], 't CO2e'),  # cargo is not CO2e
+                lambda: UnitArray([1.0], 'km') - 3.0,
+                lambda: UnitArray([1.0], 'USD') < UnitArray([1.0], 'kg CO2e'),
+                lambda: unit('furlongs'),
+                lambda: unit('kg / t / km')):
+        try:
+            bad()
+            assert False, 'expected UnitError'
+        except UnitError:
+            pass
+    print("✅ Conversions combine units and incompatible units fail fast")
+
+
+def test_factor_file_units_and_cargo():
+    with open(DEFAULT_PATH) as f:
+        spec = json.load(f)
+    base = EmissionFactorTable(spec)
+    spec['units']['transport'] = 'g CO2e / (t km)'
+    for row in spec['transport']:
+        row['factor'] *= 1000
+    assert np.allclose(EmissionFactorTable(spec).factors, base.factors)
+    # The units block the file had before units were parsed
+    spec['units'] = {'transport': 'kg CO2e per km (per tonne of cargo)', 'grid_intensity': 'kg CO2e per kWh'}
+    for row in spec['transport']:
+        row['factor'] /= 1000
+    assert np.allclose(EmissionFactorTable(spec).factors, base.factors)
+    spec['units']['transport'] = 'kg CO2e / km'
+    try:
+        EmissionFactorTable(spec)
+        assert False, 'expected UnitError'
+    except UnitError:
+        pass
+
+    route = {'id': 'RT1', 'distance_km': 800, 'transport_mode': 'truck'}
+    result = LogisticsAgent().optimize_routes_for_emissions([route, dict(route, cargo_tonnes=20)])
+    light, heavy = result['optimized_routes']
+    assert light['cargo_tonnes'] == base.multiplier('default_cargo_tonnes')
+    assert math.isclose(light['current_emissions'], 800 * base.factor('truck') * light['cargo_tonnes'] / 1000)
+    assert math.isclose(heavy['current_emissions'], light['current_emissions'] * 20 / light['cargo_tonnes'])
+    assert result['units']['current_emissions'] == 't CO2e'
+    print(f"✅ 800 km truck: {light['current_emissions']:.3f} t CO2e per tonne, {heavy['current_emissions']:.2f} for 20 t")
+
+
+def test_agent_outputs_declare_units():
+    suppliers = [{'id': 'S1', 'carbon_footprint': 30.0, 'certifications': [], 'renewable_energy_percent': 40}]
+    routes = [{'id': 'R1', 'distance_km': 1200, 'transport_mode': 'truck', 'cargo_tonnes': 10}]
+    inventory = [{'id': 'P1', 'current_stock': 900, 'monthly_demand': 100, 'shelf_life_days': 365}]
+    results = {
+        'sourcing': SourcingAgent().analyze_supplier_sustainability(suppliers),
+        'logistics': LogisticsAgent().optimize_routes_for_emissions(routes),
+        'inventory': InventoryAgent().generate_waste_reduction_recommendations(inventory)
+    }
+    for name, result in results.items():
+        assert result['units'] == OUTPUT_UNITS[name]
+    agent = CarbonAccountingAgent(PeerBenchmarks())
+    carbon = agent.calculate_overall_footprint(results)
+    assert carbon['units']['total_carbon_footprint_tons'] == 't CO2e'
+    assert carbon['footprint_breakdown']['sourcing'] == 30.0
+    assert math.isclose(carbon['footprint_breakdown']['logistics'], results['logistics']['optimized_routes'][0]['current_emissions'])
+
+    # Outputs in other units are converted; incompatible ones are rejected
+    in_kg = dict(results['sourcing'], units={'carbon_footprint': 'kg CO2e'})
+    breakdown = agent._calculate_footprint_breakdown(in_kg, results['logistics'], results['inventory'])
+    assert breakdown['sourcing'] == 0.03
+    try:
+        agent._calculate_footprint_breakdown(dict(results['sourcing'], units={'carbon_footprint': 'km'}),
+                                             results['logistics'], results['inventory'])
+        assert False, 'expected UnitError'
+    except UnitError:
+        pass
+    print("✅ Every agent reports units and the footprint converts them to t CO2e")
+
+
+def test_column_math_matches_plain_numpy():
+    n = 100_000
+    rng = np.random.default_rng(0)
+    distance, factor, cargo = rng.random(n) * 2000, rng.random(n), rng.random(n) * 30
+    assert np.allclose(freight_emissions(distance, factor, cargo), distance * cargo * factor / 1000)
+    # Same-unit conversion hands back the column itself, without a copy
+    assert convert(distance, 'km', 'km') is distance
+    print("✅ Unit-tagged freight emissions match plain numpy")
+
+
+if __name__ == "__main__":
+    test_conversions_and_fail_fast()
+    test_factor_file_units_and_cargo()
+    test_agent_outputs_declare_units()
+    test_column_math_matches_plain_numpy()